@@ -0,0 +1,114 @@
+"""
+Benchmark: chỉ mục SQLite (CatalogIndex) cho chế độ bảng theo trang.
+
+Đo theo kích thước kho (ms):
+- sync_ms:     đồng bộ lần đầu (nạp toàn bộ thuốc/kệ, tính trạng thái)
+- first_ms:    trang đầu theo thứ tự lưu trữ
+- sorted_ms:   trang đầu sắp xếp theo HSD giảm dần
+- filtered_ms: trang đầu lọc "sắp hết hạn", sắp xếp theo giá
+- scroll_ms:   trung bình mỗi trang khi cuộn SCROLL_PAGES trang theo tên
+- edit_ms:     sửa một thuốc rồi đồng bộ lại (qua nhật ký thay đổi)
+
+Các số liệu trang gần như không đổi theo kích thước kho: phân trang theo
+khóa (keyset) trên cột có chỉ mục, chỉ các dòng của trang được đọc ra.
+
+Usage:
+    python benchmarks/bench_catalog_index.py [--sizes 10000 100000 300000]
+                                             [--page-size 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.catalog_index import CatalogIndex, MedicineQuery  # noqa: E402
+from src.inventory_manager import InventoryManager  # noqa: E402
+from src.models import Medicine, Shelf  # noqa: E402
+from src.thresholds import ThresholdPolicy  # noqa: E402
+
+SCROLL_PAGES = 50
+
+
+def make_manager(count: int, directory: str) -> InventoryManager:
+    """InventoryManager loaded from a random catalog written to `directory`."""
+    today = date.today()
+    manager = InventoryManager(
+        os.path.join(directory, "medicines.json"), os.path.join(directory, "shelves.json")
+    )
+    manager.shelves = [
+        Shelf(id=f"K-A{i}", zone="A", column="A", row=str(i), capacity="1000000")
+        for i in range(50)
+    ]
+    manager.medicines = [
+        Medicine(
+            id=f"K-A{i % 50}.{i:07d}",
+            name=f"Thuốc {random.randint(1, 9999)} {random.randint(10, 500)}mg",
+            quantity=random.randint(0, 300),
+            expiry_date=today + timedelta(days=random.randint(-60, 900)),
+            shelf_id=f"K-A{i % 50}",
+            price=float(random.randint(1, 200) * 1000)
+        )
+        for i in range(count)
+    ]
+    manager.save_data()
+    manager.save_shelves()
+    manager.load_data()
+    return manager
+
+
+def elapsed_ms(func) -> float:
+    """Wall time of one call."""
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 300000])
+    parser.add_argument("--page-size", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(0)
+    policy = ThresholdPolicy()
+    limit = args.page_size
+
+    print(f"{'rows':>8} {'sync_ms':>9} {'first_ms':>9} {'sorted_ms':>10} "
+          f"{'filtered_ms':>12} {'scroll_ms':>10} {'edit_ms':>8}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            manager = make_manager(size, directory)
+            index = CatalogIndex()
+
+            sync_ms = elapsed_ms(lambda: index.sync(manager, policy))
+            first_ms = elapsed_ms(lambda: index.medicine_page(MedicineQuery(), limit))
+            sorted_ms = elapsed_ms(lambda: index.medicine_page(
+                MedicineQuery(sort_key="expiry", descending=True), limit
+            ))
+            filtered_ms = elapsed_ms(lambda: index.medicine_page(
+                MedicineQuery({"status": "expiring"}, "price"), limit
+            ))
+
+            query = MedicineQuery(sort_key="name")
+            cursor = None
+            start = time.perf_counter()
+            for _ in range(SCROLL_PAGES):
+                cursor = index.medicine_page(query, limit, cursor).cursor
+            scroll_ms = (time.perf_counter() - start) * 1000 / SCROLL_PAGES
+
+            target = manager.medicines[size // 2]
+            manager.update_medicine(target.id, {"quantity": target.quantity + 1}, auto_save=False)
+            edit_ms = elapsed_ms(lambda: index.sync(manager, policy))
+            index.close()
+
+        print(f"{size:>8} {sync_ms:9.1f} {first_ms:9.2f} {sorted_ms:10.2f} "
+              f"{filtered_ms:12.2f} {scroll_ms:10.2f} {edit_ms:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
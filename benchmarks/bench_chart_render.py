@@ -0,0 +1,168 @@
+"""
+Benchmark: vẽ biểu đồ Dashboard trên luồng GUI vs. trên luồng nền.
+
+So sánh hai cách làm mới biểu đồ cột + donut:
+- sync:    cập nhật artist và vẽ Agg ngay trên luồng GUI, rồi sao chép bộ
+           đệm sang QImage (tương đương FigureCanvasQTAgg.draw + paintEvent)
+- offload: ChartView.set_data() chỉ phát tín hiệu; ChartRenderer vẽ trên
+           QThread và trả về QImage trỏ thẳng vào bộ đệm Agg
+
+Số liệu:
+- gui_ms:   thời gian luồng GUI bị chặn mỗi lần làm mới
+- frame_ms: thời gian tới khi khung hình mới sẵn sàng để hiển thị
+- max_gap:  khoảng lặng lớn nhất của một QTimer 1 ms trên luồng GUI trong
+            suốt phép đo (độ "giật" người dùng cảm nhận được)
+
+Usage:
+    python benchmarks/bench_chart_render.py [--refreshes 50] [--items 10]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt6.QtGui import QImage  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QHBoxLayout, QWidget  # noqa: E402
+
+from src.dashboard_manager import BarChartData, DashboardManager  # noqa: E402
+from src.ui.chart_renderer import ChartRenderer, ChartView  # noqa: E402
+from src.ui.charts import BarChart, ChartPalette, DonutChart  # noqa: E402
+
+PALETTE = ChartPalette(
+    surface="#FFFFFF", text_primary="#1F2933",
+    text_secondary="#52606D", border="#E4E7EB", bar="#3B82F6"
+)
+SIZE = (600, 350)
+
+
+def random_data(items: int):
+    """Random pie + bar data shaped like the dashboard's."""
+    counts = tuple(random.randint(0, 500) for _ in range(3))
+    pie = DashboardManager.build_pie_chart_data(counts)
+    quantities = sorted((random.randint(1, 1000) for _ in range(items)), reverse=True)
+    bar = BarChartData(
+        names=[f"Thuốc {random.randint(1, 999)}" for _ in quantities],
+        quantities=quantities,
+        has_data=True
+    )
+    return pie, bar
+
+
+class GapMeter:
+    """1 ms heartbeat on the GUI thread; records the longest silence."""
+
+    def __init__(self):
+        self.max_gap = 0.0
+        self._last = time.perf_counter()
+        self._timer = QTimer()
+        self._timer.timeout.connect(self._tick)
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.max_gap = max(self.max_gap, now - self._last)
+        self._last = now
+
+    def start(self):
+        self._last = time.perf_counter()
+        self._timer.start(1)
+
+    def stop(self):
+        self._timer.stop()
+
+
+def pump(ms: int):
+    """Run the GUI event loop for a while."""
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def bench_sync(refreshes: int, items: int):
+    """Draw both charts on the GUI thread (old path)."""
+    charts = [DonutChart(PALETTE), BarChart(PALETTE, items)]
+    for chart in charts:
+        chart.resize(*SIZE)
+    gui_ms = []
+    meter = GapMeter()
+    meter.start()
+    for _ in range(refreshes):
+        pie, bar = random_data(items)
+        start = time.perf_counter()
+        for chart, data in zip(charts, (pie, bar)):
+            chart.set_data(data)
+            renderer = chart.render()
+            buf = renderer.buffer_rgba()
+            # FigureCanvasQTAgg sao chép bộ đệm vào QImage khi paint
+            QImage(bytes(buf), int(renderer.width), int(renderer.height),
+                   QImage.Format.Format_RGBA8888)
+        gui_ms.append((time.perf_counter() - start) * 1000)
+        pump(5)
+    meter.stop()
+    return gui_ms, gui_ms, meter.max_gap * 1000
+
+
+def bench_offload(refreshes: int, items: int):
+    """Hand data to ChartView; the renderer thread draws."""
+    renderer = ChartRenderer()
+    renderer.start()
+    host = QWidget()
+    layout = QHBoxLayout(host)
+    views = [ChartView(renderer, lambda: DonutChart(PALETTE), PALETTE),
+             ChartView(renderer, lambda: BarChart(PALETTE, items), PALETTE, figsize=(6, 3.5))]
+    for view in views:
+        layout.addWidget(view)
+    host.resize(SIZE[0] * 2, SIZE[1])
+    host.show()
+    pump(100)
+
+    gui_ms, frame_ms = [], []
+    meter = GapMeter()
+    meter.start()
+    for _ in range(refreshes):
+        pie, bar = random_data(items)
+        loop = QEventLoop()
+        received = []
+
+        def on_frame(key, frame, received=received, loop=loop):
+            received.append(key)
+            if len(received) == len(views):
+                loop.quit()
+
+        renderer._worker.frame_ready.connect(on_frame)
+        start = time.perf_counter()
+        views[0].set_data(pie)
+        views[1].set_data(bar)
+        gui_ms.append((time.perf_counter() - start) * 1000)
+        loop.exec()
+        frame_ms.append((time.perf_counter() - start) * 1000)
+        renderer._worker.frame_ready.disconnect(on_frame)
+        pump(5)
+    meter.stop()
+    renderer.stop()
+    return gui_ms, frame_ms, meter.max_gap * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--refreshes", type=int, default=50)
+    parser.add_argument("--items", type=int, default=10)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    random.seed(0)
+
+    print(f"{'path':<8} {'gui_ms (median)':>16} {'frame_ms (median)':>18} {'max_gap_ms':>11}")
+    for name, bench in (("sync", bench_sync), ("offload", bench_offload)):
+        gui_ms, frame_ms, max_gap = bench(args.refreshes, args.items)
+        print(f"{name:<8} {statistics.median(gui_ms):>16.2f} "
+              f"{statistics.median(frame_ms):>18.2f} {max_gap:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
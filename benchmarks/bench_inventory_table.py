@@ -0,0 +1,138 @@
+"""
+Benchmark: làm mới bảng danh sách thuốc khi kho lớn dần.
+
+So sánh hai cách hiển thị:
+- widget: QTableWidget tạo 7 QTableWidgetItem (font, màu riêng) cho mỗi
+          dòng — cách làm cũ của InventoryView
+- model:  InventoryView hiện tại (QTableView + MedicineTableModel), ô được
+          tính theo yêu cầu nên chỉ các dòng đang hiển thị tốn chi phí
+
+Số liệu (ms, trung vị): thời gian load_medicines + vẽ lại viewport.
+Đường "model" gần như phẳng; phần còn lại tăng tuyến tính là đánh giá
+StatusTable (NumPy) cho toàn bộ kho.
+
+Thêm hai cột cho proxy lọc/sắp xếp (MedicineFilterProxyModel):
+- sort_ms:   sắp xếp theo cột số lượng (khóa số, argsort)
+- filter_ms: bật rồi tắt bộ lọc trạng thái — chỉ tính lại ánh xạ proxy,
+             model nguồn không bị nạp lại
+
+Usage:
+    python benchmarks/bench_inventory_table.py [--sizes 1000 10000 50000]
+                                               [--widget-max 20000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import Qt  # noqa: E402
+from PyQt6.QtGui import QColor  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QTableWidget, QTableWidgetItem  # noqa: E402
+
+from src.alerts import AlertSystem  # noqa: E402
+from src.models import Medicine  # noqa: E402
+from src.views.inventory_view import InventoryView  # noqa: E402
+
+VIEW_SIZE = (1100, 700)
+
+
+def make_medicines(count: int):
+    """Random catalog shaped like data/medicines.json."""
+    today = date.today()
+    return [
+        Medicine(
+            id=f"K-A{i % 50}.{i:05d}",
+            name=f"Thuốc {random.randint(1, 9999)} {random.randint(10, 500)}mg",
+            quantity=random.randint(0, 300),
+            expiry_date=today + timedelta(days=random.randint(-60, 900)),
+            shelf_id=f"K-A{i % 50}",
+            price=float(random.randint(1, 200) * 1000)
+        )
+        for i in range(count)
+    ]
+
+
+def fill_widget(table: QTableWidget, medicines, alert_system: AlertSystem):
+    """Old path: one QTableWidgetItem per cell, each with its own font/colour."""
+    status_table = alert_system.evaluate(medicines)
+    table.setSortingEnabled(False)
+    table.setRowCount(0)
+    for i, med in enumerate(medicines):
+        row = table.rowCount()
+        table.insertRow(row)
+        texts = (
+            med.id, med.name, str(med.quantity), med.expiry_date.strftime("%d/%m/%Y"),
+            med.shelf_id, f"{med.price:,.2f}", str(int(status_table.status[i]))
+        )
+        for col, text in enumerate(texts):
+            item = QTableWidgetItem(text)
+            item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            font = item.font()
+            font.setBold(col == 6)
+            item.setFont(font)
+            item.setForeground(QColor("#B91C1C"))
+            table.setItem(row, col, item)
+    table.setSortingEnabled(True)
+
+
+def time_refresh(refresh, widget, app, repeats: int):
+    """Median time of refresh() followed by a synchronous repaint."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        refresh()
+        widget.repaint()
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000, 50000])
+    parser.add_argument("--widget-max", type=int, default=20000,
+                        help="Skip the QTableWidget path above this size (slow)")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    random.seed(0)
+    alert_system = AlertSystem()
+
+    widget = QTableWidget(0, 7)
+    widget.resize(*VIEW_SIZE)
+    widget.show()
+    view = InventoryView(alert_system=alert_system)
+    view.resize(*VIEW_SIZE)
+    view.show()
+    app.processEvents()
+
+    def toggle_filter():
+        view.set_filters({'status': 'expiring'})
+        view.set_filters(None)
+
+    print(f"{'rows':>8} {'widget_ms':>10} {'model_ms':>10} {'sort_ms':>10} {'filter_ms':>10}")
+    for size in args.sizes:
+        medicines = make_medicines(size)
+        if size <= args.widget_max:
+            widget_ms = f"{time_refresh(lambda: fill_widget(widget, medicines, alert_system), widget, app, args.repeats):10.1f}"
+        else:
+            widget_ms = f"{'-':>10}"
+        model_ms = time_refresh(lambda: view.load_medicines(medicines), view, app, args.repeats)
+        sort_ms = time_refresh(
+            lambda: view.proxy.sort(view.model.COL_QUANTITY, Qt.SortOrder.DescendingOrder),
+            view, app, args.repeats
+        )
+        filter_ms = time_refresh(toggle_filter, view, app, args.repeats)
+        view.proxy.sort(-1)
+        print(f"{size:>8} {widget_ms} {model_ms:10.1f} {sort_ms:10.1f} {filter_ms:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
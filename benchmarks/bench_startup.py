@@ -0,0 +1,131 @@
+"""
+Benchmark: thời gian khởi động (báo cáo kiểu `python -X importtime`).
+
+Chạy các tiến trình con riêng để mỗi lần đo bắt đầu với cache import rỗng:
+- import:  `python -X importtime -c "import src.ui.main_window"` — tổng thời
+           gian import và TOP module tốn nhất (tính cả module con)
+- deferred: các module lẽ ra chỉ nạp khi cần (Matplotlib, thefuzz, UI tối)
+           nhưng lại bị import sớm trên đường khởi động
+- window:  (tùy chọn, --window) thời gian tới khi cửa sổ hiện ra và tới khi
+           dữ liệu tải nền đã áp dụng xong (QT_QPA_PLATFORM=offscreen)
+
+--budget-ms đặt ngân sách cho tổng thời gian import: vượt ngân sách hoặc có
+module nạp sớm thì thoát với mã 1 (dùng được trong CI để chặn hồi quy).
+
+Usage:
+    python benchmarks/bench_startup.py [--top 15] [--window] [--budget-ms 600]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STARTUP_MODULE = "src.ui.main_window"
+
+# Tiền tố/hậu tố module phải được nạp lười (không có trên đường khởi động)
+DEFERRED_PREFIXES = ("matplotlib", "thefuzz", "rapidfuzz", "src.ui.charts")
+DEFERRED_SUFFIXES = ("_dark",)
+
+
+def import_times(module: str):
+    """
+    Import `module` in a fresh interpreter with -X importtime.
+
+    Returns:
+        List of (module, self_us, cumulative_us, depth) in import order
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def is_deferred(module: str) -> bool:
+    """True for modules that must only be imported on demand."""
+    return module.startswith(DEFERRED_PREFIXES) or module.endswith(DEFERRED_SUFFIXES)
+
+
+def window_times() -> tuple:
+    """Time to first show and to data loaded, measured in a child process."""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child-window"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    shown_ms, loaded_ms = result.stdout.split()[-2:]
+    return float(shown_ms), float(loaded_ms)
+
+
+def child_window():
+    """Open MainWindow and print ms to first show and to data loaded."""
+    start = time.perf_counter()
+    from PyQt6.QtWidgets import QApplication
+    from src.ui.main_window import MainWindow
+
+    app = QApplication(sys.argv)
+    window = MainWindow()
+    window.show()
+    app.processEvents()
+    shown_ms = (time.perf_counter() - start) * 1000
+    while window.is_loading:
+        app.processEvents()
+    loaded_ms = (time.perf_counter() - start) * 1000
+
+    window.data_loader.stop()
+    window.alert_scheduler.stop()
+    window.chart_renderer.stop()
+    print(f"{shown_ms:.1f} {loaded_ms:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--window", action="store_true")
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--child-window", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_window:
+        child_window()
+        return
+
+    rows = import_times(STARTUP_MODULE)
+    total_ms = sum(self_us for _, self_us, _, _ in rows) / 1000
+
+    print(f"import {STARTUP_MODULE}: {total_ms:.1f} ms ({len(rows)} modules)")
+    print(f"{'cumulative_ms':>14} {'self_ms':>9}  module")
+    for name, self_us, cumulative_us, depth in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {'  ' * depth}{name}")
+
+    # Chỉ liệt kê gốc của mỗi nhánh (matplotlib, không cả matplotlib.*)
+    eager = [
+        name for name, _, _, _ in rows
+        if is_deferred(name) and not is_deferred(name.rpartition(".")[0])
+    ]
+    if eager:
+        print(f"\nimported eagerly (should be deferred): {', '.join(eager)}")
+
+    if args.window:
+        shown_ms, loaded_ms = window_times()
+        print(f"\nwindow shown: {shown_ms:.1f} ms, data loaded: {loaded_ms:.1f} ms")
+
+    if args.budget_ms is not None and (total_ms > args.budget_ms or eager):
+        print(f"\nFAIL: over {args.budget_ms:.0f} ms budget or deferred modules imported",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: bản đồ kho (OccupancyGrid + WarehouseMapView).
+
+Đo theo số kệ (ms):
+- build_ms:  dựng ma trận chiếm dụng lần đầu (quét kệ + đánh giá cảnh báo)
+- edit_ms:   trung bình mỗi lần sửa thuốc, tính cả cập nhật ô qua sự kiện
+- render_ms: vẽ lại ảnh bản đồ sau các lần sửa
+- recount_ms: đếm lại cảnh báo khi sang ngày mới
+- zoom_ms:   trung bình mỗi lần thu phóng + vẽ lại viewport
+
+Bản đồ là một ảnh raster duy nhất nên thời gian vẽ và thu phóng tăng theo
+số ô (khu × cột × dãy), không theo số widget.
+
+Usage:
+    python benchmarks/bench_warehouse_map.py [--shelves 1000 10000]
+                                             [--medicines-per-shelf 10]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from src.alerts import AlertSystem  # noqa: E402
+from src.events import InventoryEvent  # noqa: E402
+from src.inventory_manager import InventoryManager  # noqa: E402
+from src.models import Medicine, Shelf  # noqa: E402
+from src.thresholds import ThresholdPolicy  # noqa: E402
+from src.ui.warehouse_map_view import WarehouseMapView  # noqa: E402
+from src.warehouse_map import OccupancyGrid  # noqa: E402
+
+EDITS = 200
+ZOOMS = 20
+ZONES = 10
+COLUMNS = 20
+
+
+def make_manager(shelf_count: int, per_shelf: int, directory: str) -> InventoryManager:
+    """InventoryManager with shelves spread over ZONES × COLUMNS × rows."""
+    today = date.today()
+    manager = InventoryManager(
+        os.path.join(directory, "medicines.json"), os.path.join(directory, "shelves.json")
+    )
+    rows = math.ceil(shelf_count / (ZONES * COLUMNS))
+    shelves = [
+        Shelf(id=f"{zone}-{chr(65 + column)}{row}", zone=chr(65 + zone),
+              column=chr(65 + column), row=str(row), capacity="5000")
+        for zone in range(ZONES) for column in range(COLUMNS) for row in range(1, rows + 1)
+    ][:shelf_count]
+    medicines = [
+        Medicine(
+            id=f"{shelf.id}.{i:03d}",
+            name=f"Thuốc {random.randint(1, 9999)}",
+            quantity=random.randint(0, 300),
+            expiry_date=today + timedelta(days=random.randint(-30, 600)),
+            shelf_id=shelf.id,
+            price=1000.0
+        )
+        for shelf in shelves for i in range(per_shelf)
+    ]
+    manager.set_data(medicines, shelves)
+    return manager
+
+
+def elapsed_ms(func) -> float:
+    """Wall time of one call."""
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shelves", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--medicines-per-shelf", type=int, default=10)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    random.seed(0)
+
+    print(f"{'shelves':>8} {'build_ms':>9} {'edit_ms':>8} {'render_ms':>10} "
+          f"{'recount_ms':>11} {'zoom_ms':>8}")
+    for count in args.shelves:
+        with tempfile.TemporaryDirectory() as directory:
+            manager = make_manager(count, args.medicines_per_shelf, directory)
+            alert_system = AlertSystem(policy=ThresholdPolicy())
+            alert_system.policy.set_shelves(manager.shelves)
+            grid = OccupancyGrid(manager, alert_system)
+            manager.events.subscribe(InventoryEvent, alert_system.apply_event)
+            manager.events.subscribe(InventoryEvent, grid.apply_event)
+
+            build_ms = elapsed_ms(grid.ensure_current)
+            view = WarehouseMapView(grid)
+            view.resize(1000, 700)
+            view.show()
+            view.refresh()
+            app.processEvents()
+
+            start = time.perf_counter()
+            for _ in range(EDITS):
+                target = random.choice(manager.medicines)
+                manager.update_medicine(
+                    target.id, {"quantity": random.randint(0, 300)}, auto_save=False
+                )
+            edit_ms = (time.perf_counter() - start) * 1000 / EDITS
+
+            def render():
+                view.refresh()
+                view.viewport().repaint()
+
+            render_ms = elapsed_ms(render)
+            recount_ms = elapsed_ms(
+                lambda: grid.ensure_current(date.today() + timedelta(days=1))
+            )
+
+            start = time.perf_counter()
+            for i in range(ZOOMS):
+                factor = 1.2 if i < ZOOMS // 2 else 1 / 1.2
+                view.scale(factor, factor)
+                view.viewport().repaint()
+            zoom_ms = (time.perf_counter() - start) * 1000 / ZOOMS
+            view.close()
+
+        print(f"{count:>8} {build_ms:9.1f} {edit_ms:8.2f} {render_ms:10.1f} "
+              f"{recount_ms:11.1f} {zoom_ms:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Pharmacy Management System - Headless Alert CLI
+
+Runs the alert checks without the GUI (PyQt6 is never imported), so it can
+be scheduled from cron on a headless server:
+- Loads data through InventoryManager
+- Applies thresholds from data/settings.json and data/thresholds.json
+- Streams alerts as JSON, JSON Lines or CSV to stdout or a file
+
+Usage:
+    python cli.py alerts                          # JSON to stdout
+    python cli.py alerts --format csv -o out.csv
+    python cli.py alerts --type expired --type expiring_soon --format jsonl
+    python cli.py summary
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import date
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+from src.inventory_manager import InventoryManager
+from src.alerts import Alert, AlertSystem, AlertType
+from src.thresholds import ThresholdPolicy
+from src.config import ConfigService
+
+
+# Các cột xuất ra cho mỗi cảnh báo (dùng chung cho JSON và CSV)
+ALERT_FIELDS = (
+    "medicine_id", "name", "shelf_id", "quantity", "expiry_date",
+    "alert_type", "severity", "message",
+)
+
+FORMATS = ("json", "jsonl", "csv")
+
+# Mã thoát: 0 = không có cảnh báo (hoặc không dùng --fail-on-alerts)
+EXIT_OK = 0
+EXIT_ALERTS = 1
+EXIT_ERROR = 2
+
+
+def alert_to_row(alert: Alert) -> dict:
+    """Flatten an Alert into a JSON/CSV-friendly dictionary."""
+    med = alert.medicine
+    return {
+        "medicine_id": med.id,
+        "name": med.name,
+        "shelf_id": med.shelf_id,
+        "quantity": med.quantity,
+        "expiry_date": med.expiry_date.isoformat(),
+        "alert_type": alert.alert_type.value,
+        "severity": alert.severity,
+        "message": alert.message,
+    }
+
+
+def write_json(alerts: Iterable[Alert], out: TextIO) -> int:
+    """
+    Stream alerts as a JSON array, one element at a time.
+
+    Returns:
+        Number of alerts written
+    """
+    count = 0
+    out.write("[")
+    for alert in alerts:
+        out.write(",\n  " if count else "\n  ")
+        out.write(json.dumps(alert_to_row(alert), ensure_ascii=False))
+        count += 1
+    out.write("\n]\n" if count else "]\n")
+    return count
+
+
+def write_jsonl(alerts: Iterable[Alert], out: TextIO) -> int:
+    """Stream alerts as JSON Lines (one object per line)."""
+    count = 0
+    for alert in alerts:
+        out.write(json.dumps(alert_to_row(alert), ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def write_csv(alerts: Iterable[Alert], out: TextIO) -> int:
+    """Stream alerts as CSV with a header row."""
+    writer = csv.DictWriter(out, fieldnames=ALERT_FIELDS)
+    writer.writeheader()
+    count = 0
+    for alert in alerts:
+        writer.writerow(alert_to_row(alert))
+        count += 1
+    return count
+
+
+WRITERS = {
+    "json": write_json,
+    "jsonl": write_jsonl,
+    "csv": write_csv,
+}
+
+
+def build_alert_system(args: argparse.Namespace) -> AlertSystem:
+    """
+    Create an AlertSystem using the same threshold sources as the GUI.
+
+    Priority: command-line flags > settings.json > built-in defaults.
+    Per-zone/shelf/medicine overrides come from thresholds.json.
+    """
+    config = ConfigService(args.settings)
+    config.load()
+
+    expiry = args.expiry_threshold
+    if expiry is None:
+        expiry = config.get("expiry_threshold")
+    low_stock = args.low_stock_threshold
+    if low_stock is None:
+        low_stock = config.get("low_stock_threshold")
+
+    policy = ThresholdPolicy(expiry_threshold=expiry, low_stock_threshold=low_stock)
+    policy.load_overrides(args.thresholds)
+    return AlertSystem(policy=policy)
+
+
+def filter_alerts(alerts: Iterator[Alert], types: Optional[List[str]]) -> Iterator[Alert]:
+    """Lazily keep only the requested alert types."""
+    if not types:
+        return alerts
+    wanted = {AlertType(t) for t in types}
+    return (a for a in alerts if a.alert_type in wanted)
+
+
+def cmd_alerts(args: argparse.Namespace, inventory: InventoryManager,
+               alert_system: AlertSystem) -> int:
+    """Write the alert report and return the exit code."""
+    today = date.fromisoformat(args.date) if args.date else None
+    alerts = filter_alerts(
+        alert_system.iter_alerts(inventory.get_all_medicines(), today), args.type
+    )
+    writer = WRITERS[args.format]
+
+    if args.output:
+        # newline="" để module csv tự quản lý ký tự xuống dòng
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            count = writer(alerts, out)
+    else:
+        count = writer(alerts, sys.stdout)
+        sys.stdout.flush()
+
+    if args.fail_on_alerts and count:
+        return EXIT_ALERTS
+    return EXIT_OK
+
+
+def cmd_summary(args: argparse.Namespace, inventory: InventoryManager,
+                alert_system: AlertSystem) -> int:
+    """Print alert counts per type as JSON."""
+    summary = alert_system.get_alert_summary(inventory.get_all_medicines())
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    alert_count = sum(summary[t.value] for t in AlertType)
+    if args.fail_on_alerts and alert_count:
+        return EXIT_ALERTS
+    return EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the CLI."""
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Headless alert reports for the pharmacy inventory."
+    )
+    parser.add_argument("--medicines", default="data/medicines.json",
+                        help="Medicines JSON file (default: %(default)s)")
+    parser.add_argument("--shelves", default="data/shelves.json",
+                        help="Shelves JSON file (default: %(default)s)")
+    parser.add_argument("--settings", default="data/settings.json",
+                        help="Settings JSON file (default: %(default)s)")
+    parser.add_argument("--thresholds", default="data/thresholds.json",
+                        help="Threshold overrides JSON file (default: %(default)s)")
+    parser.add_argument("--expiry-threshold", type=int,
+                        help="Override the global expiry threshold (days)")
+    parser.add_argument("--low-stock-threshold", type=int,
+                        help="Override the global low-stock threshold (units)")
+    parser.add_argument("--fail-on-alerts", action="store_true",
+                        help=f"Exit with code {EXIT_ALERTS} when any alert is reported")
+
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_alerts = sub.add_parser("alerts", help="Write all alerts")
+    p_alerts.add_argument("-f", "--format", choices=FORMATS, default="json",
+                          help="Output format (default: %(default)s)")
+    p_alerts.add_argument("-o", "--output",
+                          help="Output file (default: stdout)")
+    p_alerts.add_argument("-t", "--type", action="append",
+                          choices=[t.value for t in AlertType],
+                          help="Only include this alert type (repeatable)")
+    p_alerts.add_argument("--date",
+                          help="Evaluate as of this date (YYYY-MM-DD, default: today)")
+    p_alerts.set_defaults(handler=cmd_alerts)
+
+    p_summary = sub.add_parser("summary", help="Print alert counts per type")
+    p_summary.set_defaults(handler=cmd_summary)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    args = build_parser().parse_args(argv)
+
+    inventory = InventoryManager(args.medicines, args.shelves)
+    try:
+        inventory.load_data()
+        alert_system = build_alert_system(args)
+        alert_system.policy.set_shelves(inventory.get_all_shelves())
+        return args.handler(args, inventory, alert_system)
+    except BrokenPipeError:
+        # Bên đọc (ví dụ `| head`) đóng pipe sớm — không phải lỗi
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return EXIT_OK
+    except (ValueError, IOError) as e:
+        print(f"Lỗi: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,13 +11,6 @@ Các module:
 - dashboard_manager: Xử lý dữ liệu dashboard
 """
 
-from src.models import Medicine, Shelf
-from src.storage import StorageEngine
-from src.inventory_manager import InventoryManager
-from src.alerts import AlertSystem, AlertType, Alert
-from src.search_engine import SearchEngine
-from src.dashboard_manager import DashboardManager
-
 __all__ = [
     'Medicine',
     'Shelf',
@@ -30,3 +23,25 @@ __all__ = [
     'DashboardManager',
 ]
 
+# Nạp lười: import một module con (VD: src.models) không kéo theo NumPy,
+# thefuzz... của các module còn lại
+_IMPORT_MAP = {
+    'Medicine': ('src.models', 'Medicine'),
+    'Shelf': ('src.models', 'Shelf'),
+    'StorageEngine': ('src.storage', 'StorageEngine'),
+    'InventoryManager': ('src.inventory_manager', 'InventoryManager'),
+    'AlertSystem': ('src.alerts', 'AlertSystem'),
+    'AlertType': ('src.alerts', 'AlertType'),
+    'Alert': ('src.alerts', 'Alert'),
+    'SearchEngine': ('src.search_engine', 'SearchEngine'),
+    'DashboardManager': ('src.dashboard_manager', 'DashboardManager'),
+}
+
+
+def __getattr__(name):
+    if name in _IMPORT_MAP:
+        module_path, attr_name = _IMPORT_MAP[name]
+        import importlib
+        module = importlib.import_module(module_path)
+        return getattr(module, attr_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,466 @@
+"""
+Nhật ký lịch sử cảnh báo cho Hệ Thống Quản Lý Kho Thuốc.
+
+Module này ghi lại thời điểm mỗi thuốc VÀO hoặc RỜI một trạng thái cảnh báo:
+- Lưu dạng JSON Lines chỉ-ghi-thêm (append-only), mỗi dòng một sự kiện
+- Khử trùng lặp: trạng thái đang mở được giữ trong bộ nhớ, nên một thuốc
+  đã hết hạn không bị ghi lại mỗi lần làm mới
+- Nén (compaction): viết lại file, bỏ các khoảng cảnh báo đã đóng quá cũ
+- Tạo bản tóm tắt theo ngày và truy vấn "thuốc mới hết hạn trong tuần"
+  chỉ bằng cách quét nhật ký, không cần đánh giá lại medicines.json cũ
+"""
+import json
+import os
+from dataclasses import dataclass, asdict
+from datetime import date, timedelta
+from itertools import product
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.models import Medicine
+from src.alerts import AlertSystem, AlertTransition, AlertType
+from src.events import InventoryEvent, MedicineAdded, MedicineRemoved, MedicineUpdated
+
+
+# Khóa trạng thái đang mở: (mã thuốc, loại cảnh báo)
+OpenKey = Tuple[str, AlertType]
+
+
+@dataclass
+class AlertEvent:
+    """
+    Một sự kiện trong nhật ký cảnh báo.
+
+    Thuộc tính:
+        day: Ngày xảy ra sự kiện
+        medicine_id: Mã thuốc
+        medicine_name: Tên thuốc tại thời điểm ghi
+        alert_type: Loại cảnh báo
+        event: 'enter' (bắt đầu cảnh báo) hoặc 'leave' (hết cảnh báo)
+    """
+    day: date
+    medicine_id: str
+    medicine_name: str
+    alert_type: AlertType
+    event: str
+
+    ENTER = "enter"
+    LEAVE = "leave"
+
+    def to_dict(self) -> Dict[str, str]:
+        """Chuyển sự kiện thành dictionary để tuần tự hóa JSON."""
+        data = asdict(self)
+        data["day"] = self.day.isoformat()
+        data["alert_type"] = self.alert_type.value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, str]) -> "AlertEvent":
+        """
+        Tạo sự kiện từ dictionary.
+
+        Ngoại lệ:
+            KeyError, ValueError: Nếu dữ liệu không hợp lệ
+        """
+        event = data["event"]
+        if event not in (cls.ENTER, cls.LEAVE):
+            raise ValueError(f"Loại sự kiện không hợp lệ: {event!r}")
+        return cls(
+            day=date.fromisoformat(data["day"]),
+            medicine_id=data["medicine_id"],
+            medicine_name=data.get("medicine_name", ""),
+            alert_type=AlertType(data["alert_type"]),
+            event=event,
+        )
+
+
+class AlertHistory:
+    """
+    Nhật ký cảnh báo chỉ-ghi-thêm với khử trùng lặp và nén.
+
+    Thuộc tính:
+        filepath: Đường dẫn tới file nhật ký (.jsonl)
+        alert_system: AlertSystem dùng để đánh giá trạng thái
+        retention_days: Số ngày giữ các khoảng cảnh báo đã đóng khi nén
+    """
+
+    # Nén tự động khi số dòng vượt quá N lần số trạng thái đang mở
+    COMPACT_RATIO = 4
+    COMPACT_MIN_LINES = 1000
+
+    def __init__(
+        self,
+        filepath: str = "data/alert_history.jsonl",
+        alert_system: Optional[AlertSystem] = None,
+        retention_days: int = 365
+    ):
+        """
+        Khởi tạo AlertHistory (chưa đọc file).
+
+        Tham số:
+            filepath: Đường dẫn tới file nhật ký
+            alert_system: AlertSystem dùng chung (tạo mới nếu None)
+            retention_days: Số ngày giữ lịch sử đã đóng
+        """
+        self.filepath = filepath
+        self.alert_system = alert_system or AlertSystem()
+        self.retention_days = retention_days
+        self._open: Dict[OpenKey, AlertEvent] = {}
+        self._line_count = 0
+        self._compacted_on: Optional[date] = None
+
+    # ── Đọc nhật ký ──
+
+    def _iter_file(self) -> Iterator[AlertEvent]:
+        """
+        Duyệt tuần tự các sự kiện trong file (bỏ qua dòng hỏng).
+
+        Trả về:
+            Iterator các AlertEvent theo thứ tự ghi
+        """
+        try:
+            f = open(self.filepath, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield AlertEvent.from_dict(json.loads(line))
+                except (KeyError, ValueError, TypeError):
+                    # Dòng bị cắt dở (ví dụ mất điện khi đang ghi) — bỏ qua
+                    continue
+
+    def load(self) -> None:
+        """Phát lại nhật ký để dựng tập trạng thái đang mở."""
+        self._open.clear()
+        self._line_count = 0
+        for event in self._iter_file():
+            self._line_count += 1
+            key = (event.medicine_id, event.alert_type)
+            if event.event == AlertEvent.ENTER:
+                self._open[key] = event
+            else:
+                self._open.pop(key, None)
+
+    def open_alerts(self) -> List[AlertEvent]:
+        """
+        Lấy các sự kiện 'enter' của những cảnh báo chưa kết thúc.
+
+        Trả về:
+            Danh sách AlertEvent đang mở
+        """
+        return list(self._open.values())
+
+    # ── Ghi nhật ký ──
+
+    def _active_keys(self, medicines: List[Medicine], today: date) -> Dict[OpenKey, Medicine]:
+        """
+        Tính tập (mã thuốc, loại cảnh báo) đang hoạt động bằng mặt nạ NumPy.
+
+        Tham số:
+            medicines: Danh sách thuốc hiện tại
+            today: Ngày đánh giá
+
+        Trả về:
+            Dictionary khóa trạng thái -> thuốc
+        """
+        table = self.alert_system.evaluate(medicines, today)
+        masks = (
+            (AlertType.EXPIRED, table.expired),
+            (AlertType.EXPIRING_SOON, table.expiring & ~table.expired),
+            (AlertType.OUT_OF_STOCK, table.out_of_stock),
+            (AlertType.LOW_STOCK, table.low_stock & ~table.out_of_stock),
+        )
+        active: Dict[OpenKey, Medicine] = {}
+        for alert_type, mask in masks:
+            for row in np.flatnonzero(mask):
+                med = medicines[row]
+                active[(med.id, alert_type)] = med
+        return active
+
+    def record(self, medicines: List[Medicine], today: Optional[date] = None) -> List[AlertEvent]:
+        """
+        So sánh trạng thái hiện tại với tập đang mở và ghi thêm phần chênh lệch.
+
+        Gọi nhiều lần với cùng dữ liệu không ghi thêm dòng nào.
+
+        Tham số:
+            medicines: Danh sách thuốc hiện tại
+            today: Ngày đánh giá (mặc định: hôm nay)
+
+        Trả về:
+            Danh sách sự kiện vừa được ghi
+
+        Ngoại lệ:
+            IOError: Nếu ghi file thất bại
+        """
+        today = today or date.today()
+        active = self._active_keys(medicines, today)
+        return self._commit(active, list(self._open.items()), today)
+
+    def apply_event(self, event: InventoryEvent, today: Optional[date] = None) -> List[AlertEvent]:
+        """
+        Ghi chênh lệch trạng thái chỉ cho thuốc trong một sự kiện kho.
+
+        Tương đương record() trên toàn kho nhưng chỉ đánh giá thuốc vừa
+        thêm/sửa/xóa (giả định các thuốc khác không đổi trạng thái).
+
+        Tham số:
+            event: Sự kiện từ InventoryManager.events
+            today: Ngày đánh giá (mặc định: hôm nay)
+
+        Trả về:
+            Danh sách sự kiện vừa được ghi
+
+        Ngoại lệ:
+            IOError: Nếu ghi file thất bại
+        """
+        if isinstance(event, MedicineUpdated):
+            medicines, ids = [event.new], {event.old.id, event.new.id}
+        elif isinstance(event, MedicineAdded):
+            medicines, ids = [event.medicine], {event.medicine.id}
+        elif isinstance(event, MedicineRemoved):
+            medicines, ids = [], {event.medicine.id}
+        else:
+            return []
+
+        today = today or date.today()
+        active = self._active_keys(medicines, today)
+        opened = [
+            (key, self._open[key]) for key in product(ids, AlertType) if key in self._open
+        ]
+        return self._commit(active, opened, today)
+
+    def apply_transitions(
+        self,
+        transitions: List[AlertTransition],
+        today: Optional[date] = None
+    ) -> List[AlertEvent]:
+        """
+        Ghi chênh lệch trạng thái hạn dùng từ danh sách chuyển trạng thái.
+
+        Qua nửa đêm hoặc khi đổi ngưỡng hạn dùng chỉ trạng thái hạn dùng đổi,
+        và ExpiryIndex đã biết chính xác thuốc nào đổi — không cần đánh giá
+        lại toàn kho như record().
+
+        Tham số:
+            transitions: AlertTransition từ ExpiryIndex.advance() hoặc rebucket()
+            today: Ngày ghi (mặc định: hôm nay)
+
+        Trả về:
+            Danh sách sự kiện vừa được ghi
+
+        Ngoại lệ:
+            IOError: Nếu ghi file thất bại
+        """
+        today = today or date.today()
+        active: Dict[OpenKey, Medicine] = {}
+        opened: List[Tuple[OpenKey, AlertEvent]] = []
+        for transition in transitions:
+            med = transition.medicine
+            if transition.current is not None:
+                active[(med.id, transition.current)] = med
+            if transition.previous is not None:
+                key = (med.id, transition.previous)
+                if key in self._open:
+                    opened.append((key, self._open[key]))
+        return self._commit(active, opened, today)
+
+    def _commit(
+        self,
+        active: Dict[OpenKey, Medicine],
+        opened: List[Tuple[OpenKey, AlertEvent]],
+        today: date
+    ) -> List[AlertEvent]:
+        """
+        Ghi sự kiện vào cho khóa mới hoạt động và sự kiện rời cho khóa đã tắt.
+
+        Tham số:
+            active: Các khóa đang hoạt động trong phạm vi xét
+            opened: Các khóa đang mở trong cùng phạm vi
+            today: Ngày ghi
+
+        Trả về:
+            Danh sách sự kiện vừa được ghi
+        """
+        events: List[AlertEvent] = []
+        for key, med in active.items():
+            if key not in self._open:
+                events.append(AlertEvent(today, med.id, med.name, key[1], AlertEvent.ENTER))
+        for key, opened_event in opened:
+            if key not in active:
+                events.append(AlertEvent(
+                    today, opened_event.medicine_id, opened_event.medicine_name,
+                    opened_event.alert_type, AlertEvent.LEAVE
+                ))
+
+        if not events:
+            return events
+
+        self._append(events)
+        for event in events:
+            key = (event.medicine_id, event.alert_type)
+            if event.event == AlertEvent.ENTER:
+                self._open[key] = event
+            else:
+                del self._open[key]
+
+        # Nén tối đa một lần mỗi ngày, tránh viết lại file liên tục khi
+        # mọi khoảng cảnh báo vẫn còn trong hạn lưu giữ
+        oversized = self._line_count > max(
+            self.COMPACT_MIN_LINES, self.COMPACT_RATIO * len(self._open)
+        )
+        if oversized and self._compacted_on != today:
+            self.compact(today)
+        return events
+
+    def _append(self, events: List[AlertEvent]) -> None:
+        """Ghi thêm các sự kiện vào cuối file trong một lần ghi."""
+        Path(self.filepath).parent.mkdir(parents=True, exist_ok=True)
+        payload = "".join(
+            json.dumps(e.to_dict(), ensure_ascii=False) + "\n" for e in events
+        )
+        try:
+            with open(self.filepath, 'a', encoding='utf-8') as f:
+                f.write(payload)
+        except OSError as e:
+            raise IOError(f"Ghi nhật ký cảnh báo thất bại {self.filepath}: {str(e)}") from e
+        self._line_count += len(events)
+
+    def compact(self, today: Optional[date] = None) -> int:
+        """
+        Viết lại nhật ký, bỏ các khoảng cảnh báo đã đóng trước hạn lưu giữ.
+
+        Cảnh báo đang mở luôn được giữ lại. Ghi nguyên tử: file tạm -> đổi tên.
+
+        Tham số:
+            today: Ngày tham chiếu (mặc định: hôm nay)
+
+        Trả về:
+            Số dòng đã loại bỏ
+        """
+        today = today or date.today()
+        self._compacted_on = today
+        cutoff = today - timedelta(days=self.retention_days)
+
+        # Ghép từng enter với leave tương ứng để biết khoảng nào đã đóng
+        events = list(self._iter_file())
+        pending: Dict[OpenKey, int] = {}
+        dropped: Set[int] = set()
+        for i, event in enumerate(events):
+            key = (event.medicine_id, event.alert_type)
+            if event.event == AlertEvent.ENTER:
+                pending[key] = i
+                continue
+            start = pending.pop(key, None)
+            if start is None:
+                dropped.add(i)  # leave mồ côi
+            elif event.day < cutoff:
+                dropped.update((start, i))
+
+        if not dropped:
+            self._line_count = len(events)
+            return 0
+
+        kept = [e for i, e in enumerate(events) if i not in dropped]
+        temp_path = Path(f"{self.filepath}.tmp")
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for event in kept:
+                    f.write(json.dumps(event.to_dict(), ensure_ascii=False) + "\n")
+            os.replace(temp_path, self.filepath)
+        except OSError as e:
+            if temp_path.exists():
+                temp_path.unlink()
+            raise IOError(f"Nén nhật ký cảnh báo thất bại {self.filepath}: {str(e)}") from e
+
+        removed = len(events) - len(kept)
+        self._line_count = len(kept)
+        return removed
+
+    # ── Truy vấn ──
+
+    def events_between(
+        self,
+        start: date,
+        end: date,
+        alert_type: Optional[AlertType] = None,
+        event: Optional[str] = None
+    ) -> List[AlertEvent]:
+        """
+        Quét nhật ký lấy sự kiện trong khoảng ngày [start, end].
+
+        Tham số:
+            start: Ngày bắt đầu (bao gồm)
+            end: Ngày kết thúc (bao gồm)
+            alert_type: Chỉ lấy một loại cảnh báo (tùy chọn)
+            event: Chỉ lấy 'enter' hoặc 'leave' (tùy chọn)
+
+        Trả về:
+            Danh sách AlertEvent theo thứ tự ghi
+        """
+        return [
+            e for e in self._iter_file()
+            if start <= e.day <= end
+            and (alert_type is None or e.alert_type == alert_type)
+            and (event is None or e.event == event)
+        ]
+
+    def entered_between(
+        self,
+        start: date,
+        end: date,
+        alert_type: Optional[AlertType] = None
+    ) -> List[AlertEvent]:
+        """
+        Lấy các thuốc mới vào trạng thái cảnh báo trong khoảng ngày.
+
+        Ví dụ: entered_between(today - 6 ngày, today, AlertType.EXPIRED)
+        trả về các thuốc mới hết hạn trong tuần.
+
+        Tham số:
+            start: Ngày bắt đầu (bao gồm)
+            end: Ngày kết thúc (bao gồm)
+            alert_type: Chỉ lấy một loại cảnh báo (tùy chọn)
+
+        Trả về:
+            Danh sách sự kiện 'enter'
+        """
+        return self.events_between(start, end, alert_type, AlertEvent.ENTER)
+
+    def daily_digest(self, day: Optional[date] = None) -> Dict[str, object]:
+        """
+        Tạo bản tóm tắt cảnh báo của một ngày.
+
+        Tham số:
+            day: Ngày cần tóm tắt (mặc định: hôm nay)
+
+        Trả về:
+            Dictionary với các khóa:
+                - date: Ngày (ISO)
+                - entered: {loại cảnh báo: [tên thuốc]} mới vào trong ngày
+                - left: {loại cảnh báo: [tên thuốc]} hết cảnh báo trong ngày
+                - open: {loại cảnh báo: số lượng} đang mở hiện tại
+        """
+        day = day or date.today()
+        entered: Dict[str, List[str]] = {}
+        left: Dict[str, List[str]] = {}
+        for e in self.events_between(day, day):
+            bucket = entered if e.event == AlertEvent.ENTER else left
+            bucket.setdefault(e.alert_type.value, []).append(e.medicine_name)
+
+        open_counts = {t.value: 0 for t in AlertType}
+        for _, alert_type in self._open:
+            open_counts[alert_type.value] += 1
+
+        return {
+            "date": day.isoformat(),
+            "entered": entered,
+            "left": left,
+            "open": open_counts,
+        }
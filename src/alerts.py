@@ -4,13 +4,22 @@ Hệ thống Cảnh báo cho Hệ Thống Quản Lý Kho Thuốc.
 Module này cung cấp giám sát cho:
 - Thuốc sắp hết hạn (trong ngưỡng có thể cấu hình)
 - Thuốc tồn kho thấp (dưới ngưỡng có thể cấu hình)
+- Ngưỡng riêng theo khu/kệ/thuốc qua ThresholdPolicy (src/thresholds.py)
+- Chỉ mục hạn dùng theo ngày để cập nhật cảnh báo tăng dần khi qua ngày mới
 """
-from datetime import date
-from typing import List, Tuple
+import heapq
+from datetime import date, timedelta
+from typing import List, Tuple, Dict, Set, Optional, Iterator
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
+from src.events import (
+    InventoryEvent, MedicineAdded, MedicineRemoved, MedicineUpdated, ShelfChanged
+)
 from src.models import Medicine
+from src.thresholds import ThresholdPolicy, StatusTable, MedicineStatus
 
 
 class AlertType(Enum):
@@ -54,15 +63,21 @@ class AlertSystem:
     - Tồn kho thấp
     - Hết hàng
     
+    Ngưỡng được phân giải qua ThresholdPolicy (toàn cục → khu → kệ → thuốc)
+    và đánh giá dạng vector qua StatusTable — mọi nơi cần trạng thái thuốc
+    đều đọc từ cùng một nguồn này.
+    
     Thuộc tính:
-        expiry_threshold: Số ngày trước hạn để kích hoạt cảnh báo (mặc định: 30)
-        low_stock_threshold: Ngưỡng số lượng cho tồn kho thấp (mặc định: 5)
+        policy: Bảng ngưỡng nhiều cấp
+        expiry_threshold: Ngưỡng ngày toàn cục trước hạn (mặc định: 30)
+        low_stock_threshold: Ngưỡng số lượng toàn cục cho tồn kho thấp (mặc định: 5)
     """
     
     def __init__(
         self,
         expiry_threshold: int = 30,
-        low_stock_threshold: int = 5
+        low_stock_threshold: int = 5,
+        policy: Optional[ThresholdPolicy] = None
     ):
         """
         Khởi tạo AlertSystem với các ngưỡng.
@@ -70,9 +85,75 @@ class AlertSystem:
         Tham số:
             expiry_threshold: Số ngày trước hạn để kích hoạt cảnh báo
             low_stock_threshold: Số lượng dưới ngưỡng để kích hoạt cảnh báo
+            policy: Bảng ngưỡng có sẵn (bỏ qua hai tham số trên nếu có)
         """
-        self.expiry_threshold = expiry_threshold
-        self.low_stock_threshold = low_stock_threshold
+        self.policy = policy or ThresholdPolicy(
+            expiry_threshold=expiry_threshold,
+            low_stock_threshold=low_stock_threshold
+        )
+    
+    @property
+    def expiry_threshold(self) -> int:
+        """Ngưỡng ngày sắp hết hạn toàn cục."""
+        return self.policy.expiry_threshold
+    
+    @expiry_threshold.setter
+    def expiry_threshold(self, value: int) -> None:
+        self.policy.expiry_threshold = value
+    
+    @property
+    def low_stock_threshold(self) -> int:
+        """Ngưỡng tồn kho thấp toàn cục."""
+        return self.policy.low_stock_threshold
+    
+    @low_stock_threshold.setter
+    def low_stock_threshold(self, value: int) -> None:
+        self.policy.low_stock_threshold = value
+    
+    def apply_event(self, event: InventoryEvent) -> None:
+        """
+        Cập nhật ánh xạ kệ -> khu của chính sách ngưỡng khi kệ thay đổi.
+
+        Tham số:
+            event: Sự kiện từ InventoryManager.events
+        """
+        if isinstance(event, ShelfChanged):
+            shelf = event.new or event.old
+            self.policy.set_shelf_zone(shelf.id, event.new.zone if event.new else None)
+
+    def evaluate(
+        self,
+        medicines: List[Medicine],
+        today: Optional[date] = None
+    ) -> StatusTable:
+        """
+        Đánh giá trạng thái toàn bộ danh sách thuốc một lần.
+        
+        Tham số:
+            medicines: Danh sách thuốc cần kiểm tra
+            today: Ngày tham chiếu (mặc định: hôm nay)
+            
+        Trả về:
+            StatusTable dùng chung cho mọi phép lọc/đếm tiếp theo
+        """
+        return self.policy.evaluate(medicines, today)
+    
+    def status_of(
+        self,
+        medicine: Medicine,
+        today: Optional[date] = None
+    ) -> MedicineStatus:
+        """
+        Lấy mã trạng thái của một thuốc đơn lẻ.
+        
+        Tham số:
+            medicine: Thuốc cần kiểm tra
+            today: Ngày tham chiếu (mặc định: hôm nay)
+            
+        Trả về:
+            MedicineStatus ưu tiên cao nhất của thuốc
+        """
+        return self.evaluate([medicine], today).status_at(0)
     
     def check_expiry(self, medicines: List[Medicine]) -> List[Medicine]:
         """
@@ -85,10 +166,8 @@ class AlertSystem:
             Danh sách thuốc có days_until_expiry <= ngưỡng,
             sắp xếp theo ngày hết hạn (sớm nhất trước)
         """
-        expiring = [
-            med for med in medicines
-            if med.days_until_expiry() <= self.expiry_threshold
-        ]
+        table = self.evaluate(medicines)
+        expiring = table.select(table.expiring)
         
         # Sắp xếp theo ngày hết hạn (sớm nhất trước)
         expiring.sort(key=lambda m: m.expiry_date)
@@ -106,10 +185,8 @@ class AlertSystem:
             Danh sách thuốc có quantity <= ngưỡng,
             sắp xếp theo số lượng (thấp nhất trước)
         """
-        low_stock = [
-            med for med in medicines
-            if med.quantity <= self.low_stock_threshold
-        ]
+        table = self.evaluate(medicines)
+        low_stock = table.select(table.low_stock)
         
         # Sắp xếp theo số lượng (thấp nhất trước)
         low_stock.sort(key=lambda m: m.quantity)
@@ -127,7 +204,8 @@ class AlertSystem:
             Danh sách thuốc hết hạn (expiry_date < hôm nay),
             sắp xếp theo ngày hết hạn (cũ nhất trước)
         """
-        expired = [med for med in medicines if med.is_expired()]
+        table = self.evaluate(medicines)
+        expired = table.select(table.expired)
         
         # Sắp xếp theo ngày hết hạn (cũ nhất trước - quá hạn nhất)
         expired.sort(key=lambda m: m.expiry_date)
@@ -144,7 +222,8 @@ class AlertSystem:
         Trả về:
             Danh sách thuốc có quantity == 0, sắp xếp theo tên
         """
-        out_of_stock = [med for med in medicines if med.quantity == 0]
+        table = self.evaluate(medicines)
+        out_of_stock = table.select(table.out_of_stock)
         
         # Sắp xếp theo tên để dễ tra cứu
         out_of_stock.sort(key=lambda m: m.name)
@@ -167,53 +246,76 @@ class AlertSystem:
         Trả về:
             Danh sách đối tượng Alert, sắp xếp theo mức độ (cao nhất trước)
         """
-        alerts: List[Alert] = []
-        
-        # Kiểm tra thuốc hết hạn (ưu tiên cao nhất)
-        for med in self.check_expired(medicines):
-            days_overdue = abs(med.days_until_expiry())
-            alerts.append(Alert(
+        return list(self.iter_alerts(medicines))
+
+    def iter_alerts(
+        self,
+        medicines: List[Medicine],
+        today: Optional[date] = None
+    ) -> Iterator[Alert]:
+        """
+        Sinh lần lượt từng cảnh báo, cùng thứ tự với generate_alerts().
+
+        Chỉ giữ mảng trạng thái và chỉ số dòng trong bộ nhớ; mỗi Alert được
+        tạo khi người gọi cần, nên phù hợp để ghi báo cáo dạng luồng cho kho
+        rất lớn.
+
+        Tham số:
+            medicines: Danh sách thuốc cần kiểm tra
+            today: Ngày đánh giá (mặc định: hôm nay)
+
+        Trả về:
+            Iterator các Alert, mức độ cao nhất trước
+        """
+        table = self.evaluate(medicines, today)
+        today = table.today
+
+        # Thuốc hết hạn (mức độ 3), hạn cũ nhất trước
+        rows = np.flatnonzero(table.expired)
+        for row in rows[np.argsort(table.days_left[rows], kind="stable")]:
+            med = medicines[row]
+            days_overdue = abs(med.days_until_expiry(today))
+            yield Alert(
                 medicine=med,
                 alert_type=AlertType.EXPIRED,
                 message=f"'{med.name}' đã hết hạn được {days_overdue} ngày",
                 severity=3
-            ))
-        
-        # Kiểm tra sắp hết hạn (loại trừ đã hết hạn)
-        for med in self.check_expiry(medicines):
-            if not med.is_expired():
-                days_left = med.days_until_expiry()
-                alerts.append(Alert(
-                    medicine=med,
-                    alert_type=AlertType.EXPIRING_SOON,
-                    message=f"'{med.name}' sẽ hết hạn trong {days_left} ngày",
-                    severity=2
-                ))
-        
-        # Kiểm tra hết hàng (ưu tiên cao nhất)
-        for med in self.check_out_of_stock(medicines):
-            alerts.append(Alert(
+            )
+
+        # Hết hàng (mức độ 3), theo tên
+        rows = np.flatnonzero(table.out_of_stock)
+        for row in sorted(rows, key=lambda r: medicines[r].name):
+            med = medicines[row]
+            yield Alert(
                 medicine=med,
                 alert_type=AlertType.OUT_OF_STOCK,
                 message=f"'{med.name}' đã hết hàng",
                 severity=3
-            ))
-        
-        # Kiểm tra tồn kho thấp (loại trừ hết hàng - đã xử lý)
-        for med in self.check_low_stock(medicines):
-            if med.quantity > 0:
-                alerts.append(Alert(
-                    medicine=med,
-                    alert_type=AlertType.LOW_STOCK,
-                    message=f"'{med.name}' còn ít hàng, với ({med.quantity} đơn vị còn lại)",
-                    severity=1
-                ))
-        
-        # Sắp xếp theo mức độ (cao nhất trước)
-        alerts.sort(key=lambda a: a.severity, reverse=True)
-        
-        return alerts
-    
+            )
+
+        # Sắp hết hạn (mức độ 2, loại trừ đã hết hạn)
+        rows = np.flatnonzero(table.expiring & ~table.expired)
+        for row in rows[np.argsort(table.days_left[rows], kind="stable")]:
+            med = medicines[row]
+            days_left = med.days_until_expiry(today)
+            yield Alert(
+                medicine=med,
+                alert_type=AlertType.EXPIRING_SOON,
+                message=f"'{med.name}' sẽ hết hạn trong {days_left} ngày",
+                severity=2
+            )
+
+        # Tồn kho thấp (mức độ 1, loại trừ hết hàng - đã xử lý)
+        rows = np.flatnonzero(table.low_stock & ~table.out_of_stock)
+        for row in rows[np.argsort(table.quantities[rows], kind="stable")]:
+            med = medicines[row]
+            yield Alert(
+                medicine=med,
+                alert_type=AlertType.LOW_STOCK,
+                message=f"'{med.name}' còn ít hàng, với ({med.quantity} đơn vị còn lại)",
+                severity=1
+            )
+
     def get_alert_summary(self, medicines: List[Medicine]) -> dict:
         """
         Lấy thống kê tóm tắt cho cảnh báo.
@@ -224,16 +326,249 @@ class AlertSystem:
         Trả về:
             Dictionary với số lượng cho mỗi loại cảnh báo
         """
+        table = self.evaluate(medicines)
         return {
-            "expired": len(self.check_expired(medicines)),
-            "expiring_soon": len([
-                m for m in self.check_expiry(medicines)
-                if not m.is_expired()
-            ]),
-            "out_of_stock": len(self.check_out_of_stock(medicines)),
-            "low_stock": len([
-                m for m in self.check_low_stock(medicines)
-                if m.quantity > 0
-            ]),
+            "expired": int(table.expired.sum()),
+            "expiring_soon": int((table.expiring & ~table.expired).sum()),
+            "out_of_stock": int(table.out_of_stock.sum()),
+            "low_stock": int((table.low_stock & ~table.out_of_stock).sum()),
             "total_medicines": len(medicines)
         }
+
+    def expiry_state(
+        self,
+        medicine: Medicine,
+        today: Optional[date] = None
+    ) -> Optional[AlertType]:
+        """
+        Xác định trạng thái hạn dùng của một thuốc tại ngày chỉ định.
+
+        Tham số:
+            medicine: Thuốc cần kiểm tra
+            today: Ngày tham chiếu (mặc định: hôm nay)
+
+        Trả về:
+            AlertType.EXPIRED, AlertType.EXPIRING_SOON hoặc None nếu còn hạn dài
+        """
+        if medicine.is_expired(today):
+            return AlertType.EXPIRED
+        expiry_threshold, _ = self.policy.thresholds_for(medicine)
+        if medicine.days_until_expiry(today) <= expiry_threshold:
+            return AlertType.EXPIRING_SOON
+        return None
+
+    def next_expiry_transition(
+        self,
+        medicine: Medicine,
+        today: Optional[date] = None
+    ) -> Optional[date]:
+        """
+        Tính ngày sớm nhất mà trạng thái hạn dùng của thuốc sẽ thay đổi.
+
+        Tham số:
+            medicine: Thuốc cần kiểm tra
+            today: Ngày tham chiếu (mặc định: hôm nay)
+
+        Trả về:
+            Ngày chuyển trạng thái tiếp theo, None nếu thuốc đã hết hạn
+        """
+        state = self.expiry_state(medicine, today)
+        if state == AlertType.EXPIRED:
+            return None
+        if state == AlertType.EXPIRING_SOON:
+            return medicine.expiry_date
+        expiry_threshold, _ = self.policy.thresholds_for(medicine)
+        return medicine.expiry_date - timedelta(days=expiry_threshold)
+
+
+@dataclass
+class AlertTransition:
+    """
+    Một lần thuốc chuyển trạng thái hạn dùng.
+
+    Thuộc tính:
+        medicine: Thuốc liên quan
+        previous: Trạng thái trước (None = còn hạn dài)
+        current: Trạng thái mới (None = còn hạn dài)
+    """
+    medicine: Medicine
+    previous: Optional[AlertType]
+    current: Optional[AlertType]
+
+
+class ExpiryIndex:
+    """
+    Chỉ mục hạn dùng dạng "bánh xe hẹn giờ" theo ngày.
+
+    Mỗi thuốc được xếp vào ô (bucket) của ngày nó sẽ đổi trạng thái
+    (bắt đầu sắp hết hạn, hoặc hết hạn). Khi sang ngày mới chỉ cần xử lý
+    các ô đã đến hạn thay vì quét lại toàn bộ kho.
+
+    Thuộc tính:
+        alert_system: Hệ thống cảnh báo cung cấp ngưỡng
+        today: Ngày chỉ mục đang phản ánh
+    """
+
+    def __init__(self, alert_system: AlertSystem):
+        """
+        Khởi tạo ExpiryIndex rỗng.
+
+        Tham số:
+            alert_system: Hệ thống cảnh báo dùng để phân loại thuốc
+        """
+        self.alert_system = alert_system
+        self.today: Optional[date] = None
+        self._medicines: Dict[str, Medicine] = {}
+        self._states: Dict[str, Optional[AlertType]] = {}
+        self._due: Dict[str, date] = {}             # id -> ngày chuyển tiếp theo
+        self._buckets: Dict[date, Set[str]] = {}    # ngày -> tập id
+        self._heap: List[date] = []                 # các ngày có bucket
+
+    def build(self, medicines: List[Medicine], today: Optional[date] = None) -> None:
+        """
+        Xây lại toàn bộ chỉ mục (quét đầy đủ một lần).
+
+        Tham số:
+            medicines: Danh sách thuốc cần đánh chỉ mục
+            today: Ngày tham chiếu (mặc định: hôm nay)
+        """
+        self.today = today or date.today()
+        self._medicines = {}
+        self._states = {}
+        self._due = {}
+        self._buckets = {}
+        self._heap = []
+
+        for med in medicines:
+            self._medicines[med.id] = med
+            self._states[med.id] = self.alert_system.expiry_state(med, self.today)
+            self._schedule(med)
+
+    def add(self, medicine: Medicine) -> None:
+        """
+        Đánh chỉ mục một thuốc mới (không báo chuyển trạng thái).
+
+        Tham số:
+            medicine: Thuốc cần thêm
+        """
+        if self.today is None:
+            return
+        self._medicines[medicine.id] = medicine
+        self._states[medicine.id] = self.alert_system.expiry_state(medicine, self.today)
+        self._schedule(medicine)
+
+    def remove(self, medicine_id: str) -> None:
+        """
+        Bỏ một thuốc khỏi chỉ mục và khỏi bucket đang chờ của nó.
+
+        Tham số:
+            medicine_id: ID thuốc
+        """
+        self._medicines.pop(medicine_id, None)
+        self._states.pop(medicine_id, None)
+        due = self._due.pop(medicine_id, None)
+        if due is not None:
+            # Ngày trong heap được giữ lại; advance() bỏ qua bucket đã rỗng
+            bucket = self._buckets.get(due)
+            if bucket is not None:
+                bucket.discard(medicine_id)
+
+    def apply_event(self, event: InventoryEvent) -> None:
+        """
+        Cập nhật chỉ mục cho một thay đổi thuốc thay vì build() lại toàn bộ.
+
+        Tham số:
+            event: Sự kiện từ InventoryManager.events
+        """
+        if isinstance(event, MedicineUpdated):
+            self.remove(event.old.id)
+            self.add(event.new)
+        elif isinstance(event, MedicineAdded):
+            self.add(event.medicine)
+        elif isinstance(event, MedicineRemoved):
+            self.remove(event.medicine.id)
+
+    def _schedule(self, medicine: Medicine) -> None:
+        """Xếp thuốc vào bucket của ngày chuyển trạng thái tiếp theo."""
+        due = self.alert_system.next_expiry_transition(medicine, self.today)
+        if due is None:
+            return
+        self._due[medicine.id] = due
+        bucket = self._buckets.get(due)
+        if bucket is None:
+            bucket = self._buckets[due] = set()
+            heapq.heappush(self._heap, due)
+        bucket.add(medicine.id)
+
+    def advance(self, today: Optional[date] = None) -> List[AlertTransition]:
+        """
+        Đưa chỉ mục tới ngày mới, chỉ đánh giá lại các thuốc đến hạn.
+
+        Tham số:
+            today: Ngày mới (mặc định: hôm nay)
+
+        Trả về:
+            Danh sách AlertTransition của các thuốc đổi trạng thái
+        """
+        today = today or date.today()
+        if self.today is None or today <= self.today:
+            return []
+        self.today = today
+
+        transitions: List[AlertTransition] = []
+        while self._heap and self._heap[0] <= today:
+            due = heapq.heappop(self._heap)
+            for med_id in self._buckets.pop(due, ()):
+                self._due.pop(med_id, None)
+                med = self._medicines[med_id]
+                previous = self._states[med_id]
+                current = self.alert_system.expiry_state(med, today)
+                self._states[med_id] = current
+                if current != previous:
+                    transitions.append(AlertTransition(med, previous, current))
+                self._schedule(med)
+
+        return transitions
+
+    def rebucket(self) -> List[AlertTransition]:
+        """
+        Xếp lại bucket sau khi ngưỡng thay đổi, dùng thuốc đã đánh chỉ mục.
+
+        Không đọc lại dữ liệu từ kho; chỉ phân loại lại các thuốc trong
+        chỉ mục theo ngưỡng mới và báo các thuốc đổi trạng thái.
+
+        Trả về:
+            Danh sách AlertTransition do thay đổi ngưỡng gây ra
+        """
+        if self.today is None:
+            return []
+
+        previous_states = self._states
+        self.build(list(self._medicines.values()), self.today)
+
+        return [
+            AlertTransition(med, previous_states.get(med_id), self._states[med_id])
+            for med_id, med in self._medicines.items()
+            if previous_states.get(med_id) != self._states[med_id]
+        ]
+
+    def next_transition_date(self) -> Optional[date]:
+        """
+        Lấy ngày sớm nhất có thuốc đổi trạng thái.
+
+        Trả về:
+            Ngày chuyển trạng thái gần nhất, None nếu không còn
+        """
+        return self._heap[0] if self._heap else None
+
+    def state_of(self, medicine_id: str) -> Optional[AlertType]:
+        """
+        Lấy trạng thái hạn dùng đã đánh chỉ mục của thuốc.
+
+        Tham số:
+            medicine_id: ID thuốc
+
+        Trả về:
+            AlertType hạn dùng hoặc None
+        """
+        return self._states.get(medicine_id)
@@ -0,0 +1,542 @@
+"""
+Chỉ mục danh mục (SQLite) cho chế độ bảng phân trang.
+
+Khi kho quá lớn để hiển thị bằng bảng nạp toàn bộ, các bảng thuốc/kệ chỉ
+lấy từng trang nhỏ từ chỉ mục này:
+- Bản sao dạng bảng SQLite (thư viện chuẩn sqlite3) của thuốc và kệ, có
+  chỉ mục trên mọi cột sắp xếp
+- Lọc (kệ, khoảng giá, nhóm trạng thái) và sắp xếp được đẩy xuống SQL
+- Phân trang theo khóa (keyset): trang tiếp theo bắt đầu sau (khóa, ID) của
+  dòng cuối trang trước, nên cuộn sâu vẫn nhanh như trang đầu
+- Trạng thái và cờ lọc được lưu thành cột, tính lại bằng một câu UPDATE khi
+  đổi ngày hoặc đổi ngưỡng
+
+File JSON vẫn là nguồn dữ liệu gốc. Chỉ mục được đồng bộ từ InventoryManager
+qua nhật ký thay đổi (changes_since), chỉ dựng lại toàn bộ khi nhật ký không
+đủ (sau load_data). Lần dựng đầu (build) có thể chạy trên luồng nền rồi
+trao chỉ mục cho luồng GUI.
+"""
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.models import Medicine, Shelf
+from src.thresholds import STATUS_FILTER_BITS, MedicineStatus, ThresholdPolicy
+
+
+_SCHEMA = """
+CREATE TABLE medicines (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    expiry INTEGER NOT NULL,
+    shelf_id TEXT NOT NULL,
+    price REAL NOT NULL,
+    image_path TEXT NOT NULL,
+    expiry_threshold INTEGER NOT NULL,
+    low_stock_threshold INTEGER NOT NULL,
+    status INTEGER NOT NULL DEFAULT 0,
+    flags INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX medicines_by_name ON medicines (name_key, id);
+CREATE INDEX medicines_by_quantity ON medicines (quantity, id);
+CREATE INDEX medicines_by_expiry ON medicines (expiry, id);
+CREATE INDEX medicines_by_shelf ON medicines (shelf_id, id);
+CREATE INDEX medicines_by_price ON medicines (price, id);
+CREATE INDEX medicines_by_status ON medicines (status, id);
+
+CREATE TABLE shelves (
+    id TEXT PRIMARY KEY,
+    zone TEXT NOT NULL,
+    col TEXT NOT NULL,
+    row_label TEXT NOT NULL,
+    capacity TEXT NOT NULL
+);
+"""
+
+# Biểu thức trạng thái/cờ lọc theo ngày tham chiếu :today (ordinal) — cùng
+# quy tắc với StatusTable
+_DAYS_LEFT = "(expiry - :today)"
+_STATUS_SQL = f"""CASE
+    WHEN {_DAYS_LEFT} <= 0 THEN {int(MedicineStatus.EXPIRED)}
+    WHEN quantity = 0 THEN {int(MedicineStatus.OUT_OF_STOCK)}
+    WHEN {_DAYS_LEFT} <= expiry_threshold THEN {int(MedicineStatus.EXPIRING)}
+    WHEN quantity <= low_stock_threshold THEN {int(MedicineStatus.LOW_STOCK)}
+    ELSE {int(MedicineStatus.NORMAL)} END"""
+_FLAGS_SQL = f"""(
+    ({_DAYS_LEFT} <= 0) * {STATUS_FILTER_BITS['expired']}
+    + ({_DAYS_LEFT} > 0 AND {_DAYS_LEFT} <= expiry_threshold) * {STATUS_FILTER_BITS['expiring']}
+    + (quantity > 0 AND quantity <= low_stock_threshold) * {STATUS_FILTER_BITS['low_stock']}
+    + (quantity = 0) * {STATUS_FILTER_BITS['out_of_stock']}
+    + ({_DAYS_LEFT} > 0 AND quantity > low_stock_threshold
+       AND {_DAYS_LEFT} > expiry_threshold) * {STATUS_FILTER_BITS['normal']})"""
+
+_USED_SQL = "(SELECT COALESCE(SUM(quantity), 0) FROM medicines WHERE shelf_id = shelves.id)"
+
+
+@dataclass
+class MedicineQuery:
+    """
+    Truy vấn danh sách thuốc được đẩy xuống chỉ mục.
+
+    Thuộc tính:
+        filters: Bộ lọc (shelf_id, price_min, price_max, status) như FilterMedicineDialog
+        sort_key: Khóa sắp xếp (xem CatalogIndex.MEDICINE_SORT_KEYS), None = thứ tự lưu trữ
+        descending: Sắp xếp giảm dần
+    """
+    filters: Dict[str, Any] = field(default_factory=dict)
+    sort_key: Optional[str] = None
+    descending: bool = False
+
+
+@dataclass
+class MedicinePage:
+    """
+    Một trang thuốc.
+
+    Thuộc tính:
+        rows: Các bộ (thuốc, mã trạng thái, số ngày còn lại, cờ lọc)
+        cursor: Vị trí để lấy trang tiếp theo, None nếu đã hết
+        keys: Khóa phân trang của từng dòng (cùng dạng với cursor)
+    """
+    rows: List[Tuple[Medicine, int, int, int]]
+    cursor: Optional[tuple]
+    keys: List[tuple] = field(default_factory=list)
+
+
+@dataclass
+class ShelfPage:
+    """
+    Một trang kệ.
+
+    Thuộc tính:
+        rows: Các bộ (kệ, số lượng đã dùng)
+        cursor: Vị trí để lấy trang tiếp theo, None nếu đã hết
+        keys: Khóa phân trang của từng dòng (cùng dạng với cursor)
+    """
+    rows: List[Tuple[Shelf, int]]
+    cursor: Optional[tuple]
+    keys: List[tuple] = field(default_factory=list)
+
+
+class CatalogIndex:
+    """
+    Bản sao SQLite của kho phục vụ truy vấn theo trang.
+
+    Chỉ dùng trên luồng tạo ra nó (sqlite3 mặc định kiểm tra luồng), trừ
+    khi tạo với check_same_thread=False để dựng trên một luồng rồi trao
+    hẳn cho luồng khác — mỗi lúc chỉ một luồng được dùng chỉ mục.
+
+    Thuộc tính:
+        version: Phiên bản InventoryManager mà chỉ mục đang phản ánh
+    """
+
+    # Khóa sắp xếp -> cột SQL
+    MEDICINE_SORT_KEYS = {
+        "id": "id",
+        "name": "name_key",
+        "quantity": "quantity",
+        "expiry": "expiry",
+        "shelf_id": "shelf_id",
+        "price": "price",
+        "status": "status",
+    }
+    SHELF_SORT_KEYS = {
+        "id": "id",
+        "column": "col",
+        "row": "row_label",
+        "capacity": "CAST(capacity AS INTEGER)",
+        "used": _USED_SQL,
+        "remaining": f"(CAST(capacity AS INTEGER) - {_USED_SQL})",
+    }
+
+    _MEDICINE_COLUMNS = "id, name, quantity, expiry, shelf_id, price, image_path"
+
+    # Số ID tối đa trong một mệnh đề IN (giới hạn tham số của SQLite)
+    _IDS_PER_QUERY = 500
+
+    def __init__(self, path: str = ":memory:", check_same_thread: bool = True):
+        """
+        Khởi tạo chỉ mục rỗng.
+
+        Tham số:
+            path: File SQLite (mặc định: trong bộ nhớ)
+            check_same_thread: False để trao chỉ mục sang luồng khác sau khi dựng
+        """
+        self._db = sqlite3.connect(path, check_same_thread=check_same_thread)
+        self._db.executescript(
+            "DROP TABLE IF EXISTS medicines; DROP TABLE IF EXISTS shelves;" + _SCHEMA
+        )
+        self.version: Optional[int] = None
+        self._threshold_version: Optional[int] = None
+        self._status_stamp: Optional[Tuple[int, int]] = None   # (ngày, phiên bản ngưỡng)
+
+    def close(self) -> None:
+        """Đóng kết nối SQLite."""
+        self._db.close()
+
+    # ── Đồng bộ ──
+
+    def sync(self, manager, policy: ThresholdPolicy, today: Optional[date] = None) -> None:
+        """
+        Đưa chỉ mục về đúng trạng thái hiện tại của kho.
+
+        Áp dụng nhật ký thay đổi kể từ lần đồng bộ trước; dựng lại toàn bộ
+        nếu nhật ký không còn đủ. Ngưỡng và trạng thái được tính lại khi
+        chính sách ngưỡng hoặc ngày thay đổi.
+
+        Tham số:
+            manager: InventoryManager nguồn
+            policy: Chính sách ngưỡng dùng để phân giải trạng thái
+            today: Ngày tham chiếu (mặc định: hôm nay)
+        """
+        today_ordinal = (today or date.today()).toordinal()
+        changes = manager.changes_since(self.version) if self.version is not None else None
+
+        with self._db:
+            if changes is None:
+                self._rebuild(manager.medicines, manager.shelves, policy)
+            elif len(changes):
+                self._apply(changes, policy, today_ordinal)
+
+            if policy.version != self._threshold_version:
+                self._resolve_thresholds(manager.medicines, policy)
+            self._update_statuses(policy, today_ordinal)
+
+        self.version = manager.version
+
+    def build(
+        self,
+        medicines: List[Medicine],
+        shelves: List[Shelf],
+        policy: ThresholdPolicy,
+        today: Optional[date] = None
+    ) -> None:
+        """
+        Dựng toàn bộ chỉ mục từ danh sách (không cần InventoryManager).
+
+        Dùng trên luồng tải nền; bên nhận đặt version bằng phiên bản kho
+        tương ứng với danh sách rồi gọi sync() để bắt kịp các thay đổi sau đó.
+
+        Tham số:
+            medicines: Toàn bộ thuốc
+            shelves: Toàn bộ kệ
+            policy: Chính sách ngưỡng dùng để phân giải trạng thái
+            today: Ngày tham chiếu (mặc định: hôm nay)
+        """
+        today_ordinal = (today or date.today()).toordinal()
+        with self._db:
+            self._rebuild(medicines, shelves, policy)
+            self._update_statuses(policy, today_ordinal)
+        self.version = None
+
+    def _update_statuses(self, policy: ThresholdPolicy, today_ordinal: int) -> None:
+        """Tính lại trạng thái và cờ lọc của mọi thuốc khi ngày hoặc ngưỡng đổi."""
+        stamp = (today_ordinal, policy.version)
+        if stamp != self._status_stamp:
+            self._db.execute(
+                f"UPDATE medicines SET status = {_STATUS_SQL}, flags = {_FLAGS_SQL}",
+                {"today": today_ordinal}
+            )
+            self._status_stamp = stamp
+
+    def _rebuild(self, medicines: List[Medicine], shelves: List[Shelf],
+                 policy: ThresholdPolicy) -> None:
+        """Nạp lại toàn bộ thuốc và kệ (trạng thái tính sau đó)."""
+        # Chốt phiên bản trước khi phân giải: nếu chính sách đổi giữa chừng
+        # (dựng trên luồng nền), lần sync() sau sẽ phân giải lại
+        threshold_version = policy.version
+        self._db.execute("DELETE FROM medicines")
+        self._db.execute("DELETE FROM shelves")
+        expiry, low_stock = policy.resolve(medicines)
+        self._db.executemany(
+            "INSERT INTO medicines VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0)",
+            (
+                self._medicine_values(m) + (e, s)
+                for m, e, s in zip(medicines, expiry.tolist(), low_stock.tolist())
+            )
+        )
+        self._db.executemany(
+            "INSERT INTO shelves VALUES (?, ?, ?, ?, ?)",
+            (self._shelf_values(shelf) for shelf in shelves)
+        )
+        self._threshold_version = threshold_version
+        self._status_stamp = None
+
+    def _apply(self, changes, policy: ThresholdPolicy, today_ordinal: int) -> None:
+        """Áp dụng một ChangeSet: chỉ các dòng bị chạm tới được ghi lại."""
+        self._db.executemany(
+            "DELETE FROM medicines WHERE id = ?",
+            [(m.id,) for m in changes.removed]
+        )
+        self._db.executemany(
+            "DELETE FROM shelves WHERE id = ?",
+            [(shelf.id,) for shelf in changes.shelves_removed]
+        )
+        self._db.executemany(
+            "INSERT OR REPLACE INTO shelves VALUES (?, ?, ?, ?, ?)",
+            [self._shelf_values(new) for _, new in changes.shelves_updated]
+            + [self._shelf_values(shelf) for shelf in changes.shelves_inserted]
+        )
+
+        written = [new for _, new in changes.updated] + changes.inserted
+        if not written:
+            return
+        # UPSERT giữ nguyên rowid (thứ tự lưu trữ) của thuốc được sửa
+        self._db.executemany(
+            """INSERT INTO medicines VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0)
+               ON CONFLICT(id) DO UPDATE SET
+                   name = excluded.name, name_key = excluded.name_key,
+                   quantity = excluded.quantity, expiry = excluded.expiry,
+                   shelf_id = excluded.shelf_id, price = excluded.price,
+                   image_path = excluded.image_path,
+                   expiry_threshold = excluded.expiry_threshold,
+                   low_stock_threshold = excluded.low_stock_threshold""",
+            [self._medicine_values(m) + policy.thresholds_for(m) for m in written]
+        )
+        if self._status_stamp is not None:
+            self._db.executemany(
+                f"UPDATE medicines SET status = {_STATUS_SQL}, flags = {_FLAGS_SQL} WHERE id = :id",
+                [{"today": today_ordinal, "id": m.id} for m in written]
+            )
+
+    def _resolve_thresholds(self, medicines: List[Medicine], policy: ThresholdPolicy) -> None:
+        """Phân giải lại ngưỡng theo từng thuốc sau khi chính sách đổi."""
+        if policy.has_overrides():
+            expiry, low_stock = policy.resolve(medicines)
+            self._db.executemany(
+                "UPDATE medicines SET expiry_threshold = ?, low_stock_threshold = ? WHERE id = ?",
+                zip(expiry.tolist(), low_stock.tolist(), (m.id for m in medicines))
+            )
+        else:
+            self._db.execute(
+                "UPDATE medicines SET expiry_threshold = ?, low_stock_threshold = ?",
+                (policy.expiry_threshold, policy.low_stock_threshold)
+            )
+        self._threshold_version = policy.version
+        self._status_stamp = None
+
+    @staticmethod
+    def _medicine_values(medicine: Medicine) -> tuple:
+        return (
+            medicine.id, medicine.name, medicine.name.lower(), medicine.quantity,
+            medicine.expiry_date.toordinal(), medicine.shelf_id, medicine.price,
+            medicine.image_path,
+        )
+
+    @staticmethod
+    def _shelf_values(shelf: Shelf) -> tuple:
+        return (shelf.id, shelf.zone, shelf.column, shelf.row, shelf.capacity)
+
+    # ── Truy vấn thuốc ──
+
+    def count_medicines(self, query: Optional[MedicineQuery] = None) -> int:
+        """
+        Đếm số thuốc khớp bộ lọc.
+
+        Tham số:
+            query: Truy vấn (chỉ dùng phần bộ lọc)
+
+        Trả về:
+            Số thuốc
+        """
+        where, params = self._where((query or MedicineQuery()).filters)
+        return self._db.execute(f"SELECT COUNT(*) FROM medicines{where}", params).fetchone()[0]
+
+    def medicine_page(
+        self,
+        query: MedicineQuery,
+        limit: int,
+        after: Optional[tuple] = None
+    ) -> MedicinePage:
+        """
+        Lấy một trang thuốc đã lọc và sắp xếp.
+
+        Tham số:
+            query: Bộ lọc và sắp xếp
+            limit: Số dòng tối đa
+            after: Con trỏ của trang trước (None = trang đầu)
+
+        Trả về:
+            MedicinePage
+        """
+        where, params = self._where(query.filters)
+        clauses = [where[len(" WHERE "):]] if where else []
+        direction = "DESC" if query.descending else "ASC"
+
+        if query.sort_key is None:
+            # Thứ tự lưu trữ
+            key_sql, order = "rowid", f"rowid {direction}"
+            if after is not None:
+                clauses.append(f"rowid {'<' if query.descending else '>'} ?")
+                params.append(after[0])
+        else:
+            key_sql = self.MEDICINE_SORT_KEYS[query.sort_key]
+            order = f"{key_sql} {direction}, id {direction}"
+            if after is not None:
+                clauses.append(f"({key_sql}, id) {'<' if query.descending else '>'} (?, ?)")
+                params.extend(after)
+
+        sql = f"SELECT {self._MEDICINE_COLUMNS}, status, flags, {key_sql} FROM medicines"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+        page = self._medicine_rows(self._db.execute(sql, params).fetchall(), query)
+        if len(page.rows) == limit:
+            page.cursor = page.keys[-1]
+        return page
+
+    def medicines_by_id(self, query: MedicineQuery, medicine_ids) -> MedicinePage:
+        """
+        Lấy các thuốc (trong số ID cho trước) còn khớp bộ lọc, kèm khóa phân trang.
+
+        Dùng để vá các dòng đã tải sau khi đồng bộ, thay vì tải lại mọi trang.
+
+        Tham số:
+            query: Bộ lọc và sắp xếp (như medicine_page)
+            medicine_ids: ID các thuốc cần lấy (ID không còn tồn tại bị bỏ qua)
+
+        Trả về:
+            MedicinePage không theo thứ tự, cursor luôn là None
+        """
+        where, params = self._where(query.filters)
+        key_sql = "rowid" if query.sort_key is None else self.MEDICINE_SORT_KEYS[query.sort_key]
+        sql = (
+            f"SELECT {self._MEDICINE_COLUMNS}, status, flags, {key_sql} FROM medicines"
+            + (where + " AND" if where else " WHERE") + " id IN ({})"
+        )
+        ids = list(medicine_ids)
+        records = []
+        for start in range(0, len(ids), self._IDS_PER_QUERY):
+            batch = ids[start:start + self._IDS_PER_QUERY]
+            records += self._db.execute(
+                sql.format(", ".join("?" * len(batch))), params + batch
+            ).fetchall()
+        return self._medicine_rows(records, query)
+
+    def _medicine_rows(self, records: list, query: MedicineQuery) -> MedicinePage:
+        """Dựng MedicinePage (chưa có cursor) từ các bản ghi SELECT."""
+        today = self._status_stamp[0] if self._status_stamp else date.today().toordinal()
+        rows = [
+            (
+                Medicine(
+                    id=r[0], name=r[1], quantity=r[2], expiry_date=date.fromordinal(r[3]),
+                    shelf_id=r[4], price=r[5], image_path=r[6]
+                ),
+                r[7], r[3] - today, r[8],
+            )
+            for r in records
+        ]
+        if query.sort_key is None:
+            keys = [(r[9],) for r in records]
+        else:
+            keys = [(r[9], r[0]) for r in records]
+        return MedicinePage(rows, None, keys)
+
+    @staticmethod
+    def _where(filters: Dict[str, Any]) -> Tuple[str, list]:
+        """Dịch bộ lọc thành mệnh đề WHERE (cùng tiêu chí với filter_medicines)."""
+        clauses, params = [], []
+        if filters.get("shelf_id"):
+            clauses.append("shelf_id = ?")
+            params.append(filters["shelf_id"])
+        if filters.get("price_min") is not None:
+            clauses.append("price >= ?")
+            params.append(filters["price_min"])
+        if filters.get("price_max") is not None:
+            clauses.append("price <= ?")
+            params.append(filters["price_max"])
+        if filters.get("status"):
+            # Nhóm không hợp lệ (bit 0) không khớp dòng nào
+            clauses.append("(flags & ?) != 0")
+            params.append(STATUS_FILTER_BITS.get(filters["status"], 0))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    # ── Truy vấn kệ ──
+
+    def count_shelves(self) -> int:
+        """Đếm số kệ."""
+        return self._db.execute("SELECT COUNT(*) FROM shelves").fetchone()[0]
+
+    def shelf_page(
+        self,
+        limit: int,
+        after: Optional[tuple] = None,
+        sort_key: Optional[str] = None,
+        descending: bool = False
+    ) -> ShelfPage:
+        """
+        Lấy một trang kệ kèm số lượng đã dùng (chỉ tính cho các kệ trong trang).
+
+        Tham số:
+            limit: Số dòng tối đa
+            after: Con trỏ của trang trước (None = trang đầu)
+            sort_key: Khóa sắp xếp (xem SHELF_SORT_KEYS), None = thứ tự lưu trữ
+            descending: Sắp xếp giảm dần
+
+        Trả về:
+            ShelfPage
+        """
+        direction = "DESC" if descending else "ASC"
+        comparison = "<" if descending else ">"
+        params: list = []
+        if sort_key is None:
+            key_sql, order = "rowid", f"rowid {direction}"
+            where = f" WHERE rowid {comparison} ?" if after is not None else ""
+            params.extend(after or ())
+        else:
+            key_sql = self.SHELF_SORT_KEYS[sort_key]
+            order = f"{key_sql} {direction}, id {direction}"
+            where = f" WHERE ({key_sql}, id) {comparison} (?, ?)" if after is not None else ""
+            params.extend(after or ())
+
+        records = self._db.execute(
+            f"SELECT id, zone, col, row_label, capacity, {_USED_SQL}, {key_sql} FROM shelves"
+            f"{where} ORDER BY {order} LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        page = self._shelf_rows(records, sort_key)
+        if len(page.rows) == limit:
+            page.cursor = page.keys[-1]
+        return page
+
+    def shelves_by_id(self, shelf_ids, sort_key: Optional[str] = None) -> ShelfPage:
+        """
+        Lấy các kệ (trong số ID cho trước) kèm số lượng đã dùng và khóa phân trang.
+
+        Tham số:
+            shelf_ids: ID các kệ cần lấy (ID không còn tồn tại bị bỏ qua)
+            sort_key: Khóa sắp xếp (như shelf_page)
+
+        Trả về:
+            ShelfPage không theo thứ tự, cursor luôn là None
+        """
+        key_sql = "rowid" if sort_key is None else self.SHELF_SORT_KEYS[sort_key]
+        sql = (
+            f"SELECT id, zone, col, row_label, capacity, {_USED_SQL}, {key_sql} FROM shelves"
+            " WHERE id IN ({})"
+        )
+        ids = list(shelf_ids)
+        records = []
+        for start in range(0, len(ids), self._IDS_PER_QUERY):
+            batch = ids[start:start + self._IDS_PER_QUERY]
+            records += self._db.execute(
+                sql.format(", ".join("?" * len(batch))), batch
+            ).fetchall()
+        return self._shelf_rows(records, sort_key)
+
+    @staticmethod
+    def _shelf_rows(records: list, sort_key: Optional[str]) -> ShelfPage:
+        """Dựng ShelfPage (chưa có cursor) từ các bản ghi SELECT."""
+        rows = [
+            (Shelf(id=r[0], zone=r[1], column=r[2], row=r[3], capacity=r[4]), r[5])
+            for r in records
+        ]
+        if sort_key is None:
+            keys = [(r[6],) for r in records]
+        else:
+            keys = [(r[6], r[0]) for r in records]
+        return ShelfPage(rows, None, keys)
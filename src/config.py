@@ -0,0 +1,190 @@
+"""
+Dịch vụ cấu hình cho Hệ Thống Quản Lý Kho Thuốc.
+
+Module này đọc data/settings.json và cung cấp:
+- Tải cài đặt một lần, lưu giá trị đã phân tích trong bộ nhớ
+- Kiểm tra hợp lệ từng khóa, giữ giá trị cũ nếu giá trị mới không hợp lệ
+- Theo dõi file bằng mtime (polling) để tải lại nóng khi file thay đổi
+- Đăng ký callback theo từng khóa để chỉ tính lại phần bị ảnh hưởng
+"""
+import os
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from src.storage import StorageEngine
+
+
+# Callback nhận (giá_trị_mới, giá_trị_cũ)
+ConfigCallback = Callable[[Any, Any], None]
+
+
+class ConfigService:
+    """
+    Bộ đệm cài đặt có khả năng tải lại nóng.
+
+    Thuộc tính:
+        filepath: Đường dẫn tới file JSON cài đặt
+        storage: Thực thể StorageEngine cho thao tác file
+    """
+
+    DEFAULTS: Dict[str, Any] = {
+        "theme": "light",
+        "expiry_threshold": 30,
+        "low_stock_threshold": 5,
+        "language": "vi",
+    }
+
+    VALID_THEMES = ("light", "dark")
+
+    def __init__(self, filepath: str = "data/settings.json"):
+        """
+        Khởi tạo ConfigService (chưa đọc file).
+
+        Tham số:
+            filepath: Đường dẫn tới file JSON cài đặt
+        """
+        self.filepath = filepath
+        self.storage = StorageEngine()
+        self._values: Dict[str, Any] = dict(self.DEFAULTS)
+        self._extra: Dict[str, Any] = {}
+        self._mtime_ns: Optional[int] = None
+        self._subscribers: Dict[str, List[ConfigCallback]] = {}
+
+    def _stat_mtime(self) -> Optional[int]:
+        """Lấy mtime (nano giây) của file cài đặt, None nếu không tồn tại."""
+        try:
+            return os.stat(self.filepath).st_mtime_ns
+        except OSError:
+            return None
+
+    def _parse(self, key: str, value: Any, fallback: Any) -> Any:
+        """
+        Kiểm tra và chuẩn hóa một giá trị cài đặt.
+
+        Tham số:
+            key: Tên khóa
+            value: Giá trị thô từ JSON
+            fallback: Giá trị dùng khi không hợp lệ
+
+        Trả về:
+            Giá trị đã chuẩn hóa, hoặc fallback
+        """
+        if key in ("expiry_threshold", "low_stock_threshold"):
+            try:
+                parsed = int(value)
+            except (TypeError, ValueError):
+                return fallback
+            return parsed if parsed >= 0 else fallback
+        if key == "theme":
+            return value if value in self.VALID_THEMES else fallback
+        if key == "language":
+            return value if isinstance(value, str) and value else fallback
+        return value
+
+    def load(self) -> Set[str]:
+        """
+        Đọc file cài đặt và cập nhật bộ đệm.
+
+        File không tồn tại hoặc hỏng không làm ứng dụng dừng — giá trị
+        hiện có (hoặc mặc định) được giữ nguyên.
+
+        Trả về:
+            Tập các khóa có giá trị thay đổi
+        """
+        self._mtime_ns = self._stat_mtime()
+        try:
+            data = self.storage.read_json(self.filepath)
+        except (FileNotFoundError, ValueError):
+            return set()
+        if not isinstance(data, dict):
+            return set()
+
+        changed: Set[str] = set()
+        for key, value in data.items():
+            if key in self.DEFAULTS:
+                new_value = self._parse(key, value, self._values[key])
+                if new_value != self._values[key]:
+                    self._values[key] = new_value
+                    changed.add(key)
+            elif self._extra.get(key) != value:
+                self._extra[key] = value
+                changed.add(key)
+        return changed
+
+    def poll(self) -> Set[str]:
+        """
+        Kiểm tra mtime của file; tải lại và báo cho subscriber nếu thay đổi.
+
+        Chỉ tốn một lời gọi stat() khi file không đổi.
+
+        Trả về:
+            Tập các khóa có giá trị thay đổi (rỗng nếu không có gì mới)
+        """
+        mtime_ns = self._stat_mtime()
+        if mtime_ns == self._mtime_ns:
+            return set()
+
+        old_values = {**self._values, **self._extra}
+        changed = self.load()
+        for key in changed:
+            for callback in self._subscribers.get(key, []):
+                callback(self.get(key), old_values.get(key))
+        return changed
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Lấy giá trị cài đặt đã lưu trong bộ đệm.
+
+        Tham số:
+            key: Tên khóa
+            default: Giá trị trả về nếu khóa không tồn tại
+
+        Trả về:
+            Giá trị cài đặt
+        """
+        if key in self._values:
+            return self._values[key]
+        return self._extra.get(key, default)
+
+    def set(self, key: str, value: Any, auto_save: bool = True) -> None:
+        """
+        Đặt giá trị cài đặt (không gọi subscriber — người gọi đã biết thay đổi).
+
+        Tham số:
+            key: Tên khóa
+            value: Giá trị mới
+            auto_save: Nếu True, ghi file ngay
+
+        Ngoại lệ:
+            ValueError: Nếu giá trị không hợp lệ cho khóa đã biết
+        """
+        if key in self.DEFAULTS:
+            parsed = self._parse(key, value, None)
+            if parsed is None:
+                raise ValueError(f"Giá trị cài đặt không hợp lệ cho '{key}': {value!r}")
+            self._values[key] = parsed
+        else:
+            self._extra[key] = value
+
+        if auto_save:
+            self.save()
+
+    def save(self) -> None:
+        """
+        Ghi toàn bộ cài đặt ra file.
+
+        Ngoại lệ:
+            IOError: Nếu thao tác ghi thất bại
+        """
+        self.storage.write_json(self.filepath, {**self._values, **self._extra})
+        # Ghi nhận mtime của chính lần ghi này để poll() không tải lại vô ích
+        self._mtime_ns = self._stat_mtime()
+
+    def subscribe(self, key: str, callback: ConfigCallback) -> None:
+        """
+        Đăng ký callback khi một khóa thay đổi sau tải lại nóng.
+
+        Tham số:
+            key: Tên khóa cần theo dõi
+            callback: Hàm nhận (giá_trị_mới, giá_trị_cũ)
+        """
+        self._subscribers.setdefault(key, []).append(callback)
@@ -7,13 +7,55 @@ Module này chứa logic xử lý dữ liệu cho trang Dashboard:
 - Chuẩn bị dữ liệu biểu đồ cột (top thuốc theo số lượng)
 - Lọc danh sách thuốc sắp hết hạn
 - Lọc danh sách thuốc tồn kho thấp
+- Chỉ số giá trị tồn kho (tổng, có nguy cơ hết hạn, theo kệ/khu)
+
+Mọi số liệu được tính trong một lần đánh giá (StatusTable) và ghi nhớ theo
+khóa (phiên bản kho, ngày, phiên bản ngưỡng): quay lại Dashboard khi dữ liệu
+không đổi không phải tính lại gì. Khi kho đổi, StatusTable được vá theo sự
+kiện (apply_event) nên chỉ các thuốc bị sửa được đánh giá lại.
 """
+import math
 from dataclasses import dataclass, field
-from typing import List, Tuple
+from typing import List, Tuple, Optional, Hashable
 from datetime import date
 
+import numpy as np
+
 from src.models import Medicine
 from src.alerts import AlertSystem
+from src.events import (
+    InventoryEvent, MedicineAdded, MedicineRemoved, MedicineUpdated, ShelfChanged
+)
+from src.thresholds import StatusTable
+from src.valuation import InventoryValuation
+
+
+def smallest_rows(values: np.ndarray, rows: np.ndarray, k: int) -> np.ndarray:
+    """
+    Chọn k dòng có giá trị nhỏ nhất mà không sắp xếp toàn bộ.
+
+    Tương đương rows[np.argsort(values[rows], kind="stable")][:k] (bằng nhau
+    thì giữ thứ tự dòng gốc) nhưng chỉ tốn O(n) để chọn ứng viên và
+    O(k log k) để sắp xếp k kết quả.
+
+    Tham số:
+        values: Mảng giá trị theo dòng của StatusTable
+        rows: Chỉ số dòng ứng viên (tăng dần)
+        k: Số dòng cần lấy
+
+    Trả về:
+        Mảng chỉ số dòng đã sắp xếp theo giá trị tăng dần
+    """
+    if k <= 0:
+        return rows[:0]
+    candidates = values[rows]
+    if len(rows) > k:
+        kth = np.partition(candidates, k - 1)[k - 1]
+        below = rows[candidates < kth]
+        ties = rows[candidates == kth][:k - len(below)]
+        rows = np.concatenate((below, ties))
+        candidates = values[rows]
+    return rows[np.lexsort((rows, candidates))]
 
 
 @dataclass
@@ -33,6 +75,36 @@ class DashboardStats:
     low_stock: int = 0
 
 
+@dataclass
+class ValuationStats:
+    """
+    Chỉ số giá trị tồn kho cho Dashboard.
+
+    Thuộc tính:
+        total_value: Tổng giá trị tồn kho (Σ giá × số lượng)
+        at_risk_value: Giá trị thuốc trong ngưỡng hạn dùng (kể cả đã hết hạn)
+        expired_value: Giá trị thuốc đã hết hạn
+        top_zone: Khu có giá trị cao nhất ("" nếu không có)
+        top_zone_value: Giá trị của khu đó
+        top_shelf: Kệ có giá trị cao nhất ("" nếu không có)
+        top_shelf_value: Giá trị của kệ đó
+    """
+    total_value: float = 0.0
+    at_risk_value: float = 0.0
+    expired_value: float = 0.0
+    top_zone: str = ""
+    top_zone_value: float = 0.0
+    top_shelf: str = ""
+    top_shelf_value: float = 0.0
+
+    @property
+    def at_risk_ratio(self) -> float:
+        """Tỷ lệ giá trị có nguy cơ trên tổng giá trị (0..1)."""
+        if self.total_value <= 0:
+            return 0.0
+        return self.at_risk_value / self.total_value
+
+
 @dataclass
 class PieChartData:
     """
@@ -97,6 +169,27 @@ class LowStockItem:
     quantity: int
 
 
+@dataclass
+class DashboardData:
+    """
+    Toàn bộ số liệu của Dashboard, tính trong một lần duyệt.
+
+    Thuộc tính:
+        stats: Chỉ số KPI
+        expiry_counts: Số thuốc (bình thường, sắp hết hạn, đã hết hạn) cho biểu đồ tròn
+        bar: Dữ liệu biểu đồ cột
+        expiring_items: Các mục bảng thuốc sắp hết hạn
+        low_stock_items: Các mục bảng thuốc tồn kho thấp
+        valuation: Chỉ số giá trị tồn kho
+    """
+    stats: DashboardStats
+    expiry_counts: Tuple[int, int, int]
+    bar: BarChartData
+    expiring_items: List[ExpiryItem]
+    low_stock_items: List[LowStockItem]
+    valuation: ValuationStats = field(default_factory=ValuationStats)
+
+
 class DashboardManager:
     """
     Bộ xử lý dữ liệu trung tâm cho trang Dashboard.
@@ -105,9 +198,9 @@ class DashboardManager:
     sẵn sàng cho UI hiển thị. Tách biệt logic nghiệp vụ khỏi tầng view.
 
     Thuộc tính:
-        alert_system: Hệ thống cảnh báo để tính thống kê
-        expiry_threshold: Ngưỡng ngày sắp hết hạn (mặc định: 30)
-        low_stock_threshold: Ngưỡng tồn kho thấp (mặc định: 5)
+        alert_system: Hệ thống cảnh báo (nguồn trạng thái và ngưỡng duy nhất)
+        expiry_threshold: Ngưỡng ngày sắp hết hạn toàn cục (mặc định: 30)
+        low_stock_threshold: Ngưỡng tồn kho thấp toàn cục (mặc định: 5)
         max_bar_items: Số lượng thuốc tối đa trong biểu đồ cột (mặc định: 10)
         max_alert_items: Số lượng mục tối đa trong bảng cảnh báo (mặc định: 5)
         max_name_length: Độ dài tối đa tên thuốc trên biểu đồ (mặc định: 15)
@@ -119,7 +212,8 @@ class DashboardManager:
         low_stock_threshold: int = 5,
         max_bar_items: int = 10,
         max_alert_items: int = 5,
-        max_name_length: int = 15
+        max_name_length: int = 15,
+        alert_system: Optional[AlertSystem] = None
     ):
         """
         Khởi tạo DashboardManager.
@@ -130,76 +224,272 @@ class DashboardManager:
             max_bar_items: Số lượng thuốc tối đa trong biểu đồ cột
             max_alert_items: Số lượng mục tối đa trong bảng cảnh báo
             max_name_length: Độ dài tối đa tên thuốc trên biểu đồ
+            alert_system: Hệ thống cảnh báo dùng chung (bỏ qua hai ngưỡng trên nếu có)
         """
-        self.alert_system = AlertSystem(
+        self.alert_system = alert_system or AlertSystem(
             expiry_threshold=expiry_threshold,
             low_stock_threshold=low_stock_threshold
         )
-        self.expiry_threshold = expiry_threshold
-        self.low_stock_threshold = low_stock_threshold
         self.max_bar_items = max_bar_items
         self.max_alert_items = max_alert_items
         self.max_name_length = max_name_length
+        self._cached_key: Optional[tuple] = None
+        self._cached: Optional[DashboardData] = None
+        # Bảng trạng thái của kho ở phiên bản _table_version, vá theo sự kiện
+        self._table: Optional[StatusTable] = None
+        self._table_version: Optional[int] = None
+        self._table_key: Optional[tuple] = None
+
+    @property
+    def expiry_threshold(self) -> int:
+        """Ngưỡng ngày sắp hết hạn toàn cục (đọc từ alert_system)."""
+        return self.alert_system.expiry_threshold
+
+    @property
+    def low_stock_threshold(self) -> int:
+        """Ngưỡng tồn kho thấp toàn cục (đọc từ alert_system)."""
+        return self.alert_system.low_stock_threshold
+
+    def _cache_key(self, version: Hashable, today: date) -> tuple:
+        """Khóa ghi nhớ: mọi thứ có thể làm thay đổi kết quả compute()."""
+        policy = self.alert_system.policy
+        return (
+            version, today, id(policy), policy.version,
+            self.max_bar_items, self.max_alert_items, self.max_name_length
+        )
 
-    def get_statistics(self, medicines: List[Medicine]) -> DashboardStats:
+    def _status_key(self, today: date) -> tuple:
+        """Khóa hợp lệ của bảng trạng thái: (ngày, chính sách, phiên bản ngưỡng)."""
+        policy = self.alert_system.policy
+        return (today, id(policy), policy.version)
+
+    def apply_event(self, event: InventoryEvent) -> None:
         """
-        Tính toán thống kê tổng quan từ danh sách thuốc.
+        Vá bảng trạng thái đã lưu theo một thay đổi thuốc.
+
+        Chỉ vá khi bảng phản ánh đúng phiên bản ngay trước sự kiện (mỗi sự
+        kiện tăng InventoryManager.version đúng 1) và ngưỡng chưa đổi; các
+        trường hợp khác bỏ bảng để lần compute() sau đánh giá lại toàn bộ.
+
+        Tham số:
+            event: Sự kiện từ InventoryManager.events
+        """
+        table = self._table
+        if table is None:
+            return
+        if (event.version != self._table_version + 1
+                or self._table_key != self._status_key(table.today)):
+            self._table = None
+            return
+
+        policy = self.alert_system.policy
+        if isinstance(event, MedicineUpdated):
+            table.apply_changes(policy, updated=[(event.old, event.new)])
+        elif isinstance(event, MedicineAdded):
+            table.apply_changes(policy, inserted=[event.medicine])
+        elif isinstance(event, MedicineRemoved):
+            table.apply_changes(policy, removed=[event.medicine])
+        elif not isinstance(event, ShelfChanged):
+            # Tải lại từ file
+            self._table = None
+            return
+        self._table_version = event.version
+
+    def advance_day(self, today: date, medicine_ids: List[str]) -> None:
+        """
+        Đưa bảng trạng thái đã lưu sang ngày mới (qua nửa đêm).
+
+        Chỉ các thuốc vừa đổi trạng thái hạn dùng được đánh giá lại; bảng
+        không còn khớp (ngưỡng đã đổi) thì bị bỏ như trong apply_event().
+
+        Tham số:
+            today: Ngày mới
+            medicine_ids: ID các thuốc vừa đổi trạng thái (AlertTransition)
+        """
+        table = self._table
+        if table is None or table.today >= today:
+            return
+        if self._table_key != self._status_key(table.today):
+            self._table = None
+            return
+        table.advance(self.alert_system.policy, today, medicine_ids)
+        self._table_key = self._status_key(today)
+
+    def _status_table(
+        self, medicines: List[Medicine], version: Optional[Hashable], today: date
+    ) -> StatusTable:
+        """
+        Bảng trạng thái của kho: bảng đã vá nếu còn khớp (phiên bản, ngày,
+        ngưỡng), ngược lại đánh giá mới (và lưu lại khi có version).
+        """
+        key = self._status_key(today)
+        table = self._table
+        if (version is not None and table is not None and version == self._table_version
+                and key == self._table_key and len(table) == len(medicines)):
+            return table
+
+        table = self.alert_system.evaluate(list(medicines), today)
+        if version is not None:
+            self._table, self._table_version, self._table_key = table, version, key
+        return table
+
+    def compute(
+        self,
+        medicines: List[Medicine],
+        version: Optional[Hashable] = None,
+        today: Optional[date] = None,
+        valuation: Optional[InventoryValuation] = None
+    ) -> DashboardData:
+        """
+        Tính toàn bộ số liệu Dashboard trong một lần đánh giá.
+
+        Khi có version (ví dụ InventoryManager.version), kết quả được ghi nhớ:
+        lần gọi tiếp theo với cùng (version, ngày, ngưỡng) trả về ngay đối
+        tượng cũ mà không duyệt lại danh sách thuốc.
+
+        Tổng giá trị và giá trị theo kệ/khu được đọc từ valuation (tổng chạy
+        do InventoryManager duy trì); chỉ giá trị có nguy cơ — phụ thuộc ngày
+        và ngưỡng — được tính từ các dòng đang trong ngưỡng hạn dùng.
 
         Tham số:
             medicines: Danh sách thuốc trong kho
+            version: Phiên bản dữ liệu kho (None = không ghi nhớ)
+            today: Ngày đánh giá (mặc định: hôm nay)
+            valuation: Tổng giá trị của kho (mặc định: tính từ medicines,
+                không có số liệu theo khu)
 
         Trả về:
-            DashboardStats chứa các chỉ số KPI
+            DashboardData
         """
-        summary = self.alert_system.get_alert_summary(medicines)
-        return DashboardStats(
-            total=summary['total_medicines'],
-            expired=summary['expired'],
-            expiring=summary['expiring_soon'],
-            low_stock=summary['low_stock'] + summary['out_of_stock']
+        today = today or date.today()
+        key = self._cache_key(version, today) if version is not None else None
+        if key is not None and key == self._cached_key:
+            return self._cached
+
+        table = self._status_table(medicines, version, today)
+        # Thứ tự dòng của bảng (đã vá) là thứ tự của danh sách thuốc
+        medicines = table.medicines
+        expired = table.expired
+        expiring_only = table.expiring & ~expired
+
+        n_expired = int(np.count_nonzero(expired))
+        n_expiring = int(np.count_nonzero(expiring_only))
+        stats = DashboardStats(
+            total=len(medicines),
+            expired=n_expired,
+            expiring=n_expiring,
+            low_stock=int(np.count_nonzero(table.low_stock))
         )
 
-    def get_pie_chart_data(
-        self,
+        # Top N theo số lượng giảm dần (bằng nhau thì giữ thứ tự gốc)
+        all_rows = np.arange(len(medicines))
+        top_rows = smallest_rows(-table.quantities, all_rows, self.max_bar_items)
+        bar = BarChartData(
+            names=[self._short_name(medicines[r].name) for r in top_rows],
+            quantities=[int(table.quantities[r]) for r in top_rows],
+            has_data=len(top_rows) > 0
+        )
+
+        rows = smallest_rows(
+            table.days_left, np.flatnonzero(expiring_only), self.max_alert_items
+        )
+        expiring_items = [
+            ExpiryItem(
+                name=medicines[r].name,
+                expiry_date=medicines[r].expiry_date.strftime("%Y-%m-%d"),
+                shelf_id=medicines[r].shelf_id,
+                days_left=int(table.days_left[r])
+            )
+            for r in rows
+        ]
+
+        rows = smallest_rows(
+            table.quantities, np.flatnonzero(table.low_stock), self.max_alert_items
+        )
+        low_stock_items = [
+            LowStockItem(
+                name=medicines[r].name,
+                shelf_id=medicines[r].shelf_id,
+                quantity=medicines[r].quantity
+            )
+            for r in rows
+        ]
+
+        data = DashboardData(
+            stats=stats,
+            expiry_counts=(len(medicines) - n_expired - n_expiring, n_expiring, n_expired),
+            bar=bar,
+            expiring_items=expiring_items,
+            low_stock_items=low_stock_items,
+            valuation=self._valuation_stats(medicines, table, valuation)
+        )
+        if key is not None:
+            self._cached_key, self._cached = key, data
+        return data
+
+    @staticmethod
+    def _valuation_stats(
         medicines: List[Medicine],
+        table: StatusTable,
+        valuation: Optional[InventoryValuation]
+    ) -> ValuationStats:
+        """Gom chỉ số giá trị: tổng chạy + giá trị các dòng trong ngưỡng hạn dùng."""
+        if valuation is None:
+            valuation = InventoryValuation()
+            valuation.rebuild(medicines, [])
+
+        value_of = InventoryValuation.value_of
+        at_risk = math.fsum(value_of(medicines[r]) for r in np.flatnonzero(table.expiring))
+        expired = math.fsum(value_of(medicines[r]) for r in np.flatnonzero(table.expired))
+        top_zone = valuation.top_zone() or ("", 0.0)
+        top_shelf = valuation.top_shelf() or ("", 0.0)
+
+        return ValuationStats(
+            total_value=valuation.total_value,
+            at_risk_value=at_risk,
+            expired_value=expired,
+            top_zone=top_zone[0],
+            top_zone_value=top_zone[1],
+            top_shelf=top_shelf[0],
+            top_shelf_value=top_shelf[1]
+        )
+
+    def invalidate(self) -> None:
+        """Xóa kết quả đã ghi nhớ."""
+        self._cached_key = None
+        self._cached = None
+        self._table = None
+
+    def _short_name(self, name: str) -> str:
+        """Cắt ngắn tên thuốc cho nhãn biểu đồ."""
+        if len(name) > self.max_name_length:
+            return name[:self.max_name_length] + '...'
+        return name
+
+    @staticmethod
+    def build_pie_chart_data(
+        expiry_counts: Tuple[int, int, int],
         chart_colors: Tuple[str, str, str] = ('#10B981', '#FF8800', '#EF4444')
     ) -> PieChartData:
         """
-        Chuẩn bị dữ liệu cho biểu đồ tròn phân bố hạn sử dụng.
-
-        Phân loại thuốc thành 3 nhóm:
-        - Bình thường (còn hạn > 30 ngày)
-        - Sắp hết hạn (0 < ngày còn lại <= 30)
-        - Đã hết hạn
+        Chuyển số đếm (bình thường, sắp hết hạn, đã hết hạn) thành dữ liệu biểu đồ tròn.
 
         Tham số:
-            medicines: Danh sách thuốc
-            chart_colors: Tuple 3 màu (bình_thường, sắp_hết_hạn, đã_hết_hạn)
+            expiry_counts: Tuple 3 số đếm
+            chart_colors: Tuple 3 màu tương ứng
 
         Trả về:
             PieChartData đã lọc bỏ các phần có giá trị 0
         """
-        if not medicines:
-            return PieChartData(has_data=False)
-
-        expired = len([m for m in medicines if m.is_expired()])
-        expiring = len([
-            m for m in medicines
-            if not m.is_expired() and m.days_until_expiry() <= self.expiry_threshold
-        ])
-        normal = len(medicines) - expired - expiring
-
-        all_sizes = [normal, expiring, expired]
         all_labels = ['Bình thường', 'Sắp hết hạn', 'Đã hết hạn']
-        all_colors = list(chart_colors)
 
         # Lọc bỏ phần có giá trị 0
         sizes, labels, colors = [], [], []
-        for i, size in enumerate(all_sizes):
+        for i, size in enumerate(expiry_counts):
             if size > 0:
                 sizes.append(size)
                 labels.append(f'{all_labels[i]}\n({size})')
-                colors.append(all_colors[i])
+                colors.append(chart_colors[i])
 
         return PieChartData(
             sizes=sizes,
@@ -208,11 +498,47 @@ class DashboardManager:
             has_data=len(sizes) > 0
         )
 
+    def get_statistics(self, medicines: List[Medicine]) -> DashboardStats:
+        """
+        Tính toán thống kê tổng quan từ danh sách thuốc.
+
+        Tham số:
+            medicines: Danh sách thuốc trong kho
+
+        Trả về:
+            DashboardStats chứa các chỉ số KPI
+        """
+        return self.compute(medicines).stats
+
+    def get_pie_chart_data(
+        self,
+        medicines: List[Medicine],
+        chart_colors: Tuple[str, str, str] = ('#10B981', '#FF8800', '#EF4444')
+    ) -> PieChartData:
+        """
+        Chuẩn bị dữ liệu cho biểu đồ tròn phân bố hạn sử dụng.
+
+        Phân loại thuốc thành 3 nhóm:
+        - Bình thường (còn hạn > ngưỡng của thuốc)
+        - Sắp hết hạn (0 < ngày còn lại <= ngưỡng của thuốc)
+        - Đã hết hạn
+
+        Tham số:
+            medicines: Danh sách thuốc
+            chart_colors: Tuple 3 màu (bình_thường, sắp_hết_hạn, đã_hết_hạn)
+
+        Trả về:
+            PieChartData đã lọc bỏ các phần có giá trị 0
+        """
+        if not medicines:
+            return PieChartData(has_data=False)
+        return self.build_pie_chart_data(self.compute(medicines).expiry_counts, chart_colors)
+
     def get_bar_chart_data(self, medicines: List[Medicine]) -> BarChartData:
         """
         Chuẩn bị dữ liệu cho biểu đồ cột top thuốc theo số lượng.
 
-        Sắp xếp thuốc theo số lượng giảm dần và lấy top N.
+        Chọn top N thuốc theo số lượng giảm dần (không sắp xếp toàn bộ kho).
         Tên thuốc được cắt ngắn nếu vượt quá max_name_length.
 
         Tham số:
@@ -221,31 +547,7 @@ class DashboardManager:
         Trả về:
             BarChartData với tên và số lượng đã xử lý
         """
-        if not medicines:
-            return BarChartData(has_data=False)
-
-        sorted_meds = sorted(
-            medicines,
-            key=lambda m: m.quantity,
-            reverse=True
-        )[:self.max_bar_items]
-
-        if not sorted_meds:
-            return BarChartData(has_data=False)
-
-        names = [
-            m.name[:self.max_name_length] + '...'
-            if len(m.name) > self.max_name_length
-            else m.name
-            for m in sorted_meds
-        ]
-        quantities = [m.quantity for m in sorted_meds]
-
-        return BarChartData(
-            names=names,
-            quantities=quantities,
-            has_data=True
-        )
+        return self.compute(medicines).bar
 
     def get_expiring_medicines(self, medicines: List[Medicine]) -> List[ExpiryItem]:
         """
@@ -260,21 +562,7 @@ class DashboardManager:
         Trả về:
             Danh sách ExpiryItem (tối đa max_alert_items mục)
         """
-        expiring = [
-            m for m in medicines
-            if not m.is_expired() and m.days_until_expiry() <= self.expiry_threshold
-        ]
-        expiring.sort(key=lambda m: m.days_until_expiry())
-
-        return [
-            ExpiryItem(
-                name=m.name,
-                expiry_date=m.expiry_date.strftime("%Y-%m-%d"),
-                shelf_id=m.shelf_id,
-                days_left=m.days_until_expiry()
-            )
-            for m in expiring[:self.max_alert_items]
-        ]
+        return self.compute(medicines).expiring_items
 
     def get_low_stock_medicines(self, medicines: List[Medicine]) -> List[LowStockItem]:
         """
@@ -288,17 +576,21 @@ class DashboardManager:
         Trả về:
             Danh sách LowStockItem (tối đa max_alert_items mục)
         """
-        low_stock = [
-            m for m in medicines
-            if m.quantity <= self.low_stock_threshold
-        ]
-        low_stock.sort(key=lambda m: m.quantity)
+        return self.compute(medicines).low_stock_items
 
-        return [
-            LowStockItem(
-                name=m.name,
-                shelf_id=m.shelf_id,
-                quantity=m.quantity
-            )
-            for m in low_stock[:self.max_alert_items]
-        ]
+    def get_valuation(
+        self,
+        medicines: List[Medicine],
+        valuation: Optional[InventoryValuation] = None
+    ) -> ValuationStats:
+        """
+        Lấy chỉ số giá trị tồn kho cho các thẻ KPI giá trị.
+
+        Tham số:
+            medicines: Danh sách thuốc
+            valuation: Tổng giá trị do InventoryManager duy trì (nếu có)
+
+        Trả về:
+            ValuationStats
+        """
+        return self.compute(medicines, valuation=valuation).valuation
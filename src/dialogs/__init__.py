@@ -1,17 +1,9 @@
 """
 Package hộp thoại cho PHARMA.SYS.
-Chứa các cửa sổ hộp thoại để tạo, chỉnh sửa, xem chi tiết và thông báo.
+Chứa các cửa sổ hộp thoại để tạo, chỉnh sửa, xem chi tiết và thông báo,
+cùng DialogPool để dùng lại hộp thoại đã dựng.
 """
 
-from src.dialogs.medicine_dialog import MedicineDialog
-from src.dialogs.shelf_dialog import ShelfDialog
-from src.dialogs.filter_dialog import FilterMedicineDialog
-from src.dialogs.medicine_detail_view import MedicineDetailView
-from src.dialogs.notification_dialogs import (
-    AddSuccessDialog, EditSuccessDialog, DeleteSuccessDialog,
-    ConfirmDeleteDialog, ShelfFullErrorDialog
-)
-
 __all__ = [
     'MedicineDialog',
     'ShelfDialog',
@@ -22,4 +14,29 @@ __all__ = [
     'DeleteSuccessDialog',
     'ConfirmDeleteDialog',
     'ShelfFullErrorDialog',
+    'DialogPool',
 ]
+
+# Nạp lười: mỗi hộp thoại (và file UI generated của nó) chỉ được import khi
+# được dùng lần đầu
+_IMPORT_MAP = {
+    'MedicineDialog': ('src.dialogs.medicine_dialog', 'MedicineDialog'),
+    'ShelfDialog': ('src.dialogs.shelf_dialog', 'ShelfDialog'),
+    'FilterMedicineDialog': ('src.dialogs.filter_dialog', 'FilterMedicineDialog'),
+    'MedicineDetailView': ('src.dialogs.medicine_detail_view', 'MedicineDetailView'),
+    'AddSuccessDialog': ('src.dialogs.notification_dialogs', 'AddSuccessDialog'),
+    'EditSuccessDialog': ('src.dialogs.notification_dialogs', 'EditSuccessDialog'),
+    'DeleteSuccessDialog': ('src.dialogs.notification_dialogs', 'DeleteSuccessDialog'),
+    'ConfirmDeleteDialog': ('src.dialogs.notification_dialogs', 'ConfirmDeleteDialog'),
+    'ShelfFullErrorDialog': ('src.dialogs.notification_dialogs', 'ShelfFullErrorDialog'),
+    'DialogPool': ('src.dialogs.dialog_pool', 'DialogPool'),
+}
+
+
+def __getattr__(name):
+    if name in _IMPORT_MAP:
+        module_path, attr_name = _IMPORT_MAP[name]
+        import importlib
+        module = importlib.import_module(module_path)
+        return getattr(module, attr_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
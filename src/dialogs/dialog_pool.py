@@ -0,0 +1,84 @@
+"""
+Dialog pool — PHARMA.SYS.
+
+Keeps constructed dialogs around so that reopening one does not run the
+generated setupUi() again or create new validators:
+- One instance per dialog name and theme mode (light/dark UI classes differ)
+- acquire() calls the dialog's reset(**state) before handing it out
+- A dialog that is still open (e.g. nested use) is never handed out
+  twice; a temporary instance is built instead
+"""
+from typing import Any, Callable, Dict, Tuple
+
+from PyQt6.QtCore import Qt
+
+from src.ui.theme import Theme, ThemeMode
+
+
+class DialogPool:
+    """
+    Per-theme cache of reusable dialogs.
+
+    Dialogs are registered by name with a factory that builds a new
+    instance for the current theme mode. Every pooled dialog must provide
+    reset(**state), which clears what the previous use left behind.
+
+    Attributes:
+        theme: Shared Theme whose mode selects the cached instance
+    """
+
+    def __init__(self, theme: Theme):
+        """
+        Initialize Dialog Pool.
+
+        Args:
+            theme: Shared Theme (its current mode is read on every acquire)
+        """
+        self.theme = theme
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._dialogs: Dict[Tuple[str, ThemeMode], Any] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """
+        Register how to build a dialog.
+
+        The factory is only called on the first acquire() per theme mode,
+        so registering does not import or construct anything.
+
+        Args:
+            name: Key used with acquire()
+            factory: Callable returning a new dialog for the current theme
+        """
+        self._factories[name] = factory
+
+    def acquire(self, name: str, **state):
+        """
+        Return a dialog ready for use, built only the first time.
+
+        Args:
+            name: Registered dialog name
+            **state: Keyword arguments forwarded to the dialog's reset()
+
+        Returns:
+            The pooled dialog (or a temporary one if it is already open)
+
+        Raises:
+            KeyError: If no factory is registered under name
+        """
+        key = (name, self.theme.mode)
+        dialog = self._dialogs.get(key)
+        if dialog is None:
+            dialog = self._factories[name]()
+            self._dialogs[key] = dialog
+        elif dialog.isVisible():
+            # Đang mở (gọi lồng nhau) — không dùng chung, dựng bản tạm
+            dialog = self._factories[name]()
+            dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.reset(**state)
+        return dialog
+
+    def clear(self):
+        """Drop every pooled dialog (they are deleted by Qt later)."""
+        for dialog in self._dialogs.values():
+            dialog.deleteLater()
+        self._dialogs.clear()
@@ -3,6 +3,7 @@ Filter Medicine Dialog.
 
 Uses Qt Designer-generated UI from loc_thuoc.py for layout.
 Provides filtering options by shelf, price range, and status.
+A constructed dialog is reused via reset(), which restores the defaults.
 """
 from typing import Optional, List, Dict
 
@@ -11,7 +12,6 @@ from PyQt6.QtWidgets import QDialog, QApplication
 from src.models import Shelf
 from src.ui.theme import Theme, ThemeMode
 from src.ui.generated.loc_thuoc import Ui_dlg_filter_medicine
-from src.ui.generated.loc_thuoc_dark import Ui_dlg_filter_medicine as Ui_dlg_filter_medicine_dark
 
 
 class FilterMedicineDialog(QDialog):
@@ -61,30 +61,19 @@ class FilterMedicineDialog(QDialog):
         self.result_filters: Optional[Dict] = None
         
         self.setup_ui()
+        self.reset(shelves)
     
     def setup_ui(self):
         """Setup dialog UI using Qt Designer generated class."""
         # Choose UI class based on current theme mode
         if self.theme.mode == ThemeMode.DARK:
+            # Bản UI tối chỉ được nạp khi cần
+            from src.ui.generated.loc_thuoc_dark import Ui_dlg_filter_medicine as Ui_dlg_filter_medicine_dark
             self.ui = Ui_dlg_filter_medicine_dark()
         else:
             self.ui = Ui_dlg_filter_medicine()
         self.ui.setupUi(self)
         
-        # Center on parent
-        if self.parent():
-            parent_geo = self.parent().geometry()
-            self.move(
-                parent_geo.center().x() - self.width() // 2,
-                parent_geo.center().y() - self.height() // 2
-            )
-        
-        # Populate shelf combo
-        self.ui.cb_filter_shelf.clear()
-        self.ui.cb_filter_shelf.addItem("Tất cả", None)
-        for shelf in self.shelves:
-            self.ui.cb_filter_shelf.addItem(shelf.id, shelf.id)
-        
         # Populate price range combo
         self.ui.cb_filter_price.clear()
         for label, _, _ in self.PRICE_RANGES:
@@ -98,6 +87,43 @@ class FilterMedicineDialog(QDialog):
         # Connect buttons
         self.ui.btn_primary.clicked.connect(self.apply_filters)
         self.ui.btn_secondary.clicked.connect(self.reject)
+
+        # Danh sách kệ đang có trong combo (chỉ dựng lại khi đổi)
+        self._shelf_ids: List[str] = []
+
+    def reset(self, shelves: Optional[List[Shelf]] = None):
+        """
+        Prepare the dialog for another use (called by DialogPool).
+
+        Every criterion goes back to "Tất cả"; the shelf combo is only
+        rebuilt when the shelf list changed.
+
+        Args:
+            shelves: List of available shelves for filter options
+        """
+        self.shelves = shelves or []
+        self.result_filters = None
+
+        # Center on parent
+        if self.parent():
+            parent_geo = self.parent().geometry()
+            self.move(
+                parent_geo.center().x() - self.width() // 2,
+                parent_geo.center().y() - self.height() // 2
+            )
+
+        # Populate shelf combo
+        shelf_ids = [shelf.id for shelf in self.shelves]
+        if shelf_ids != self._shelf_ids:
+            self.ui.cb_filter_shelf.clear()
+            self.ui.cb_filter_shelf.addItem("Tất cả", None)
+            for shelf_id in shelf_ids:
+                self.ui.cb_filter_shelf.addItem(shelf_id, shelf_id)
+            self._shelf_ids = shelf_ids
+
+        self.ui.cb_filter_shelf.setCurrentIndex(0)
+        self.ui.cb_filter_price.setCurrentIndex(0)
+        self.ui.cb_filter_status.setCurrentIndex(0)
     
     def apply_filters(self):
         """Collect filter values and accept dialog."""
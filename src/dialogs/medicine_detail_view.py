@@ -4,18 +4,21 @@ Medicine Detail View dialog — PHARMA.SYS.
 Uses Qt Designer-generated UI from thong_tin_thuoc.py for layout.
 Displays read-only medicine information with image, basic info,
 stock info, and price sections. Uses Theme badge styles.
+A constructed view can be reused for another medicine via reset().
 """
 from typing import Optional
 
 from PyQt6.QtWidgets import QDialog
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import QSize, pyqtSignal
 from PyQt6.QtGui import QPixmap
 
 from src.models import Medicine
+from src.alerts import AlertSystem
+from src.thresholds import MedicineStatus
 from src.image_manager import ImageManager
 from src.ui.theme import Theme, ThemeMode
+from src.ui.thumbnails import ThumbnailCache, load_preview
 from src.ui.generated.thong_tin_thuoc import Ui_dlg_medicine_detail
-from src.ui.generated.thong_tin_thuoc_dark import Ui_dlg_medicine_detail as Ui_dlg_medicine_detail_dark
 
 
 class MedicineDetailView(QDialog):
@@ -33,11 +36,25 @@ class MedicineDetailView(QDialog):
     edit_requested = pyqtSignal(str)    # medicine_id
     delete_requested = pyqtSignal(str)  # medicine_id
 
+    # Nhãn và kiểu huy hiệu cho từng mã trạng thái
+    STATUS_TAGS = {
+        MedicineStatus.EXPIRED: ("Da het han", 'danger'),
+        MedicineStatus.OUT_OF_STOCK: ("Het hang", 'danger'),
+        MedicineStatus.EXPIRING: ("Sap het han", 'warning'),
+        MedicineStatus.LOW_STOCK: ("Ton kho thap", 'low_stock'),
+        MedicineStatus.NORMAL: ("Con hang", 'success'),
+    }
+
+    # Khung xem trước ảnh
+    PREVIEW_SIZE = QSize(280, 280)
+
     def __init__(
         self, parent=None,
         medicine: Optional[Medicine] = None,
         image_manager: Optional[ImageManager] = None,
-        theme: Optional[Theme] = None
+        theme: Optional[Theme] = None,
+        alert_system: Optional[AlertSystem] = None,
+        thumbnails: Optional[ThumbnailCache] = None
     ):
         """
         Initialize Medicine Detail View.
@@ -47,31 +64,56 @@ class MedicineDetailView(QDialog):
             medicine: Medicine object to display
             image_manager: ImageManager for loading images
             theme: Theme instance for styling
+            alert_system: Shared AlertSystem (single source of thresholds)
+            thumbnails: Thumbnail cache (None: decode the image file itself)
         """
         super().__init__(parent)
 
         self.medicine = medicine
         self.image_manager = image_manager or ImageManager()
         self.theme = theme or Theme()
+        self.alert_system = alert_system or AlertSystem()
+        self.thumbnails = thumbnails
+        # Ảnh đang xem trước — thay bằng thumbnail khi tạo xong
+        self._preview_path: Optional[str] = None
+        if thumbnails is not None:
+            thumbnails.thumbnail_ready.connect(self._on_thumbnail_ready)
 
         self.setup_ui()
 
         if medicine:
-            self.load_medicine(medicine)
+            self.reset(medicine)
 
     def setup_ui(self):
         """Setup dialog UI using Qt Designer generated class."""
         # Choose UI class based on current theme mode
         if self.theme.mode == ThemeMode.DARK:
+            # Bản UI tối chỉ được nạp khi cần
+            from src.ui.generated.thong_tin_thuoc_dark import Ui_dlg_medicine_detail as Ui_dlg_medicine_detail_dark
             self.ui = Ui_dlg_medicine_detail_dark()
         else:
             self.ui = Ui_dlg_medicine_detail()
         self.ui.setupUi(self)
 
+        # Chữ gợi ý khi thuốc không có ảnh (khôi phục khi dùng lại hộp thoại)
+        self._image_placeholder = self.ui.lbl_medicine_image.text()
+
         # Connect buttons
         self.ui.btn_primary.clicked.connect(self._on_edit_clicked)
         self.ui.btn_secondary.clicked.connect(self._on_delete_clicked)
 
+    def reset(self, medicine: Medicine):
+        """
+        Show another medicine in this dialog (called by DialogPool).
+
+        Args:
+            medicine: Medicine object to display
+        """
+        self.ui.lbl_medicine_image.setPixmap(QPixmap())
+        self.ui.lbl_medicine_image.setText(self._image_placeholder)
+        self._preview_path = None
+        self.load_medicine(medicine)
+
     def load_medicine(self, medicine: Medicine):
         """
         Populate dialog with medicine data.
@@ -85,31 +127,12 @@ class MedicineDetailView(QDialog):
         self.ui.lbl_detail_name.setText(medicine.name)
 
         # Status tag — using theme badge styles
-        if medicine.is_expired():
-            self.ui.lbl_status_tag.setText("Da het han")
-            self.ui.lbl_status_tag.setStyleSheet(
-                self.theme.get_badge_style('danger')
-            )
-        elif medicine.days_until_expiry() <= 30:
-            self.ui.lbl_status_tag.setText("Sap het han")
-            self.ui.lbl_status_tag.setStyleSheet(
-                self.theme.get_badge_style('warning')
-            )
-        elif medicine.quantity == 0:
-            self.ui.lbl_status_tag.setText("Het hang")
-            self.ui.lbl_status_tag.setStyleSheet(
-                self.theme.get_badge_style('danger')
-            )
-        elif medicine.quantity <= 5:
-            self.ui.lbl_status_tag.setText("Ton kho thap")
-            self.ui.lbl_status_tag.setStyleSheet(
-                self.theme.get_badge_style('low_stock')
-            )
-        else:
-            self.ui.lbl_status_tag.setText("Con hang")
-            self.ui.lbl_status_tag.setStyleSheet(
-                self.theme.get_badge_style('success')
-            )
+        status = self.alert_system.status_of(medicine)
+        tag_text, badge_type = self.STATUS_TAGS[status]
+        self.ui.lbl_status_tag.setText(tag_text)
+        self.ui.lbl_status_tag.setStyleSheet(
+            self.theme.get_badge_style(badge_type)
+        )
 
         # Basic info
         self.ui.lbl_data_generic_name.setText(medicine.name)
@@ -130,16 +153,23 @@ class MedicineDetailView(QDialog):
                 medicine.image_path
             )
             if abs_path:
-                pixmap = QPixmap(abs_path)
-                if not pixmap.isNull():
-                    scaled = pixmap.scaled(
-                        280, 280,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation
-                    )
-                    self.ui.lbl_medicine_image.setPixmap(scaled)
+                # Ảnh thu nhỏ đã cache — không giải mã lại ảnh gốc mỗi lần mở;
+                # chưa có thì hiện bản giải mã thu nhỏ, thumbnail thay vào sau
+                self._preview_path = abs_path
+                pixmap = load_preview(self.thumbnails, abs_path, self.PREVIEW_SIZE)
+                if pixmap is not None:
+                    self.ui.lbl_medicine_image.setPixmap(pixmap)
                     self.ui.lbl_medicine_image.setText("")
 
+    def _on_thumbnail_ready(self, source_path: str):
+        """Swap the thumbnail in for a preview decoded from the image itself."""
+        if source_path != self._preview_path:
+            return
+        pixmap = self.thumbnails.pixmap(source_path, self.PREVIEW_SIZE)
+        if pixmap is not None:
+            self.ui.lbl_medicine_image.setPixmap(pixmap)
+            self.ui.lbl_medicine_image.setText("")
+
     def _on_edit_clicked(self):
         """Handle edit button click."""
         if self.medicine:
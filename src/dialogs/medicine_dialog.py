@@ -9,19 +9,20 @@ Features:
 - Image upload/remove
 - Remaining shelf capacity display
 - QDateEdit for expiry date selection
+- Reusable: reset() prepares a constructed dialog for the next add/edit
 """
 from typing import Optional, List, Dict, Any
 from datetime import date
 
 from PyQt6.QtWidgets import QDialog, QFileDialog, QMessageBox
-from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtCore import Qt, QDate, QSize
 from PyQt6.QtGui import QPixmap, QIntValidator, QDoubleValidator
 
 from src.models import Medicine, Shelf
 from src.image_manager import ImageManager
 from src.ui.theme import Theme, ThemeMode
+from src.ui.thumbnails import ThumbnailCache, load_preview
 from src.ui.generated.them_thuoc import Ui_dlg_medicine_detail
-from src.ui.generated.them_thuoc_dark import Ui_dlg_medicine_detail as Ui_dlg_medicine_detail_dark
 
 
 class MedicineDialog(QDialog):
@@ -42,6 +43,9 @@ class MedicineDialog(QDialog):
         selected_image_path: Path to selected image file
     """
 
+    # Khung xem trước ảnh
+    PREVIEW_SIZE = QSize(280, 140)
+
     def __init__(
         self,
         parent=None,
@@ -50,7 +54,8 @@ class MedicineDialog(QDialog):
         shelves: Optional[List[Shelf]] = None,
         image_manager: Optional[ImageManager] = None,
         theme: Optional[Theme] = None,
-        remaining_capacity_func=None
+        remaining_capacity_func=None,
+        thumbnails: Optional[ThumbnailCache] = None
     ):
         """
         Initialize Medicine Dialog.
@@ -63,6 +68,8 @@ class MedicineDialog(QDialog):
             image_manager: ImageManager for image operations
             theme: Theme instance for styling
             remaining_capacity_func: Callable(shelf_id, exclude_id) -> int
+            thumbnails: Thumbnail cache for stored images (None: decode
+                the image file itself)
         """
         super().__init__(parent)
 
@@ -72,75 +79,140 @@ class MedicineDialog(QDialog):
         self.image_manager = image_manager or ImageManager()
         self.theme = theme or Theme()
         self.remaining_capacity_func = remaining_capacity_func
+        self.thumbnails = thumbnails
         self.result_data: Optional[Dict[str, Any]] = None
         self.selected_image_path: Optional[str] = None
+        # Ảnh trong kho đang xem trước — thay bằng thumbnail khi tạo xong
+        self._preview_path: Optional[str] = None
+        if thumbnails is not None:
+            thumbnails.thumbnail_ready.connect(self._on_thumbnail_ready)
 
         self.setup_ui()
-
-        if mode == "edit" and medicine:
-            self.load_medicine(medicine)
+        self.reset(mode, medicine, shelves)
 
     def setup_ui(self):
         """Setup dialog UI using Qt Designer generated class."""
         # Choose UI class based on current theme mode
         if self.theme.mode == ThemeMode.DARK:
+            # Bản UI tối chỉ được nạp khi cần
+            from src.ui.generated.them_thuoc_dark import Ui_dlg_medicine_detail as Ui_dlg_medicine_detail_dark
             self.ui = Ui_dlg_medicine_detail_dark()
         else:
             self.ui = Ui_dlg_medicine_detail()
         self.ui.setupUi(self)
 
-        # ── Mode-specific setup (layout cố định, khớp Qt Designer) ──
         self.ui.txt_medicine_id.setReadOnly(True)
+        # Giá trị gốc từ Qt Designer — khôi phục mỗi lần dùng lại hộp thoại
+        self._id_style = self.ui.txt_medicine_id.styleSheet()
+        self._default_expiry = self.ui.txt_expiry_date.date()
+        self._shelf_label = self.ui.lbl_shelf.text()
+        self._shelf_items: List[tuple] = []
+
+        # ── Input validators ──
+        self.ui.txt_quantity.setValidator(QIntValidator(0, 999999, self))
+        self.ui.txt_price.setValidator(QDoubleValidator(0, 999999999, 2, self))
+
+        # ── Connect signals ──
+        self.ui.btn_primary.clicked.connect(self.on_save)
+        self.ui.btn_secondary.clicked.connect(self.reject)
+        self.ui.btn_add_img.clicked.connect(self.on_add_image)
+        self.ui.btn_remove_img.clicked.connect(self.on_remove_image)
+
+        # Update remaining capacity when shelf changes
+        self.ui.cb_shelf_location.currentIndexChanged.connect(
+            self.update_remaining_capacity_display
+        )
+
+    def reset(
+        self,
+        mode: str = "add",
+        medicine: Optional[Medicine] = None,
+        shelves: Optional[List[Shelf]] = None
+    ):
+        """
+        Prepare the dialog for another use (called by DialogPool).
+
+        Clears every field and the image, switches the mode-specific
+        widgets and refreshes the shelf selector. Only combo items whose
+        text changed are rewritten, so reopening costs little even with
+        many shelves.
+
+        Args:
+            mode: 'add' or 'edit'
+            medicine: Medicine object to edit (edit mode only)
+            shelves: List of Shelf objects for shelf selector
+        """
+        self.mode = mode
+        self.medicine = medicine if mode == "edit" else None
+        self.shelves = shelves or []
+        self.result_data = None
+        self.selected_image_path = None
+
+        # ── Mode-specific setup (layout cố định, khớp Qt Designer) ──
         if self.mode == "add":
             self.setWindowTitle("Thêm thuốc mới")
             self.ui.lbl_title.setText("Thêm thuốc")
             # Add mode: ẩn ID field — với pure QVBoxLayout, adjustSize() sẽ co dialog đúng
             self.ui.lbl_id.setVisible(False)
             self.ui.txt_medicine_id.setVisible(False)
+            self.ui.txt_medicine_id.setStyleSheet(self._id_style)
             self.ui.btn_primary.setText("Thêm")
-            self.ui.btn_secondary.setText("Hủy")
         else:
             self.setWindowTitle("Chỉnh sửa thuốc")
             self.ui.lbl_title.setText("Chỉnh sửa thuốc")
             # Edit mode: ID chỉ đọc, hiển thị giá trị thực
-            self.ui.txt_medicine_id.setStyleSheet(
-                self.ui.txt_medicine_id.styleSheet() + " color: #94A3B8;"
-            )
+            self.ui.lbl_id.setVisible(True)
+            self.ui.txt_medicine_id.setVisible(True)
+            self.ui.txt_medicine_id.setStyleSheet(self._id_style + " color: #94A3B8;")
             self.ui.btn_primary.setText("Lưu")
-            self.ui.btn_secondary.setText("Hủy")
+        self.ui.btn_secondary.setText("Hủy")
+
+        # ── Xóa dữ liệu của lần dùng trước ──
+        self.ui.txt_medicine_id.clear()
+        self.ui.txt_medicine_name.clear()
+        self.ui.txt_quantity.clear()
+        self.ui.txt_price.clear()
+        self.ui.txt_expiry_date.setDate(self._default_expiry)
+        self.ui.lbl_shelf.setText(self._shelf_label)
+        self.on_remove_image()
+
+        self._populate_shelves()
+        self.ui.cb_shelf_location.setCurrentIndex(0)
+        self.update_remaining_capacity_display()
 
         # Co dialog khớp với nội dung thực tế sau khi ẩn/hiện widget
         self.adjustSize()
 
+        if self.medicine:
+            self.load_medicine(self.medicine)
 
-        # ── Populate shelf combo ──
-        self.ui.cb_shelf_location.clear()
-        self.ui.cb_shelf_location.addItem("Chọn kệ thuốc", None)
+    def _populate_shelves(self):
+        """Sync the shelf combo with self.shelves, touching changed items only."""
+        items = [("Chọn kệ thuốc", None)]
         for shelf in self.shelves:
-            # Tính sức chứa còn lại thực tế (không kể thuốc đang sửa)
+            # Tính sức chứa còn lại thực tế (không kể thuốc đang sửa — chỉ
+            # ảnh hưởng kệ hiện tại của nó)
             if self.remaining_capacity_func:
-                exclude_id = self.medicine.id if self.medicine else ""
+                on_shelf = self.medicine is not None and self.medicine.shelf_id == shelf.id
+                exclude_id = self.medicine.id if on_shelf else ""
                 remaining = self.remaining_capacity_func(shelf.id, exclude_id)
             else:
                 remaining = shelf.capacity
-            self.ui.cb_shelf_location.addItem(
-                f"{shelf.id} (Còn chứa: {remaining})", shelf.id
-            )
-
-        # ── Input validators ──
-        self.ui.txt_quantity.setValidator(QIntValidator(0, 999999, self))
-        self.ui.txt_price.setValidator(QDoubleValidator(0, 999999999, 2, self))
-
-        # ── Connect signals ──
-        self.ui.btn_primary.clicked.connect(self.on_save)
-        self.ui.btn_secondary.clicked.connect(self.reject)
-        self.ui.btn_add_img.clicked.connect(self.on_add_image)
-        self.ui.btn_remove_img.clicked.connect(self.on_remove_image)
-
-        # Update remaining capacity when shelf changes
-        self.ui.cb_shelf_location.currentIndexChanged.connect(
-            self.update_remaining_capacity_display
-        )
+            items.append((f"{shelf.id} (Còn chứa: {remaining})", shelf.id))
+
+        combo = self.ui.cb_shelf_location
+        # Không phát currentIndexChanged cho từng mục khi đang đồng bộ
+        combo.blockSignals(True)
+        if [data for _, data in items] != [data for _, data in self._shelf_items]:
+            combo.clear()
+            for text, data in items:
+                combo.addItem(text, data)
+        else:
+            for i, (item, previous) in enumerate(zip(items, self._shelf_items)):
+                if item != previous:
+                    combo.setItemText(i, item[0])
+        combo.blockSignals(False)
+        self._shelf_items = items
 
     def load_medicine(self, medicine: Medicine):
         """
@@ -179,7 +251,7 @@ class MedicineDialog(QDialog):
                 medicine.image_path
             )
             if abs_path:
-                self._display_image(abs_path)
+                self._display_image(abs_path, stored=True)
 
     def update_remaining_capacity_display(self):
         """Update shelf combo text to show remaining capacity."""
@@ -287,26 +359,35 @@ class MedicineDialog(QDialog):
     def on_remove_image(self):
         """Handle image remove button click."""
         self.selected_image_path = None
+        self._preview_path = None
         self.ui.lbl_upload_text.setText("Upload hình ảnh thuốc")
         self.ui.lbl_upload_text.setPixmap(QPixmap())
 
-    def _display_image(self, filepath: str):
+    def _display_image(self, filepath: str, stored: bool = False):
         """
         Display image preview in the upload frame.
 
         Args:
             filepath: Absolute path to image file
+            stored: The image is in the image store (served from its
+                thumbnail); a newly picked file is decoded directly
         """
-        pixmap = QPixmap(filepath)
-        if not pixmap.isNull():
-            scaled = pixmap.scaled(
-                280, 140,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            self.ui.lbl_upload_text.setPixmap(scaled)
+        # Ảnh vừa chọn chưa nằm trong kho ảnh — không tạo thumbnail cho nó
+        thumbnails = self.thumbnails if stored else None
+        self._preview_path = filepath if thumbnails is not None else None
+        pixmap = load_preview(thumbnails, filepath, self.PREVIEW_SIZE)
+        if pixmap is not None:
+            self.ui.lbl_upload_text.setPixmap(pixmap)
             self.ui.lbl_upload_text.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
+    def _on_thumbnail_ready(self, source_path: str):
+        """Swap the thumbnail in for a preview decoded from the image itself."""
+        if source_path != self._preview_path:
+            return
+        pixmap = self.thumbnails.pixmap(source_path, self.PREVIEW_SIZE)
+        if pixmap is not None:
+            self.ui.lbl_upload_text.setPixmap(pixmap)
+
     def get_data(self) -> Optional[Dict[str, Any]]:
         """
         Get the validated form data.
@@ -9,7 +9,9 @@ Uses Qt Designer-generated UI classes for layout:
 - ShelfFullErrorDialog: ke_day.py
 
 Each dialog selects the light or dark UI variant based on the
-current ThemeMode passed in via the `theme` parameter.
+current ThemeMode passed in via the `theme` parameter. The message is
+set by reset(), so a constructed dialog can be shown again for another
+medicine or shelf.
 """
 from typing import Optional
 
@@ -25,11 +27,7 @@ from src.ui.generated.xoa_thanh_cong import Ui_dlg_success
 from src.ui.generated.xac_nhan_xoa import Ui_dlg_confirm_delete
 from src.ui.generated.ke_day import Ui_dlg_error_full
 
-# Dark UI classes
-from src.ui.generated.them_thanh_cong_dark import Ui_dlg_add_success as Ui_dlg_add_success_dark
-from src.ui.generated.sua_thanh_cong_dark import Ui_dlg_edit_success as Ui_dlg_edit_success_dark
-from src.ui.generated.xoa_thanh_cong_dark import Ui_dlg_success as Ui_dlg_success_dark
-from src.ui.generated.xac_nhan_xoa_dark import Ui_dlg_confirm_delete as Ui_dlg_confirm_delete_dark
+# Dark UI classes are imported on demand (only when the dark theme is active)
 
 
 class AddSuccessDialog(QDialog):
@@ -41,6 +39,8 @@ class AddSuccessDialog(QDialog):
         
         # Choose UI class based on theme mode
         if self.theme.mode == ThemeMode.DARK:
+            # Bản UI tối chỉ được nạp khi cần
+            from src.ui.generated.them_thanh_cong_dark import Ui_dlg_add_success as Ui_dlg_add_success_dark
             self.ui = Ui_dlg_add_success_dark()
         else:
             self.ui = Ui_dlg_add_success()
@@ -52,14 +52,17 @@ class AddSuccessDialog(QDialog):
         )
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         
-        # Update dynamic content
+        # Connect close button
+        self.ui.btn_close.clicked.connect(self.accept)
+
+        self.reset(medicine_name, medicine_id)
+
+    def reset(self, medicine_name: str = "", medicine_id: str = ""):
+        """Show another medicine in this dialog (called by DialogPool)."""
         self.ui.lbl_desc.setText(
             f"Thuốc '{medicine_name}' đã được thêm vào kho hệ thống"
         )
         self.ui.lbl_code.setText(f"Mã thuốc: {medicine_id}")
-        
-        # Connect close button
-        self.ui.btn_close.clicked.connect(self.accept)
 
 
 class EditSuccessDialog(QDialog):
@@ -71,6 +74,7 @@ class EditSuccessDialog(QDialog):
         
         # Choose UI class based on theme mode
         if self.theme.mode == ThemeMode.DARK:
+            from src.ui.generated.sua_thanh_cong_dark import Ui_dlg_edit_success as Ui_dlg_edit_success_dark
             self.ui = Ui_dlg_edit_success_dark()
         else:
             self.ui = Ui_dlg_edit_success()
@@ -82,14 +86,17 @@ class EditSuccessDialog(QDialog):
         )
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         
-        # Update dynamic content
+        # Connect close button
+        self.ui.btn_close.clicked.connect(self.accept)
+
+        self.reset(medicine_name, medicine_id)
+
+    def reset(self, medicine_name: str = "", medicine_id: str = ""):
+        """Show another medicine in this dialog (called by DialogPool)."""
         self.ui.lbl_desc.setText(
             f"Thông tin thuốc '{medicine_name}' đã được cập nhật"
         )
         self.ui.lbl_code.setText(f"Mã thuốc: {medicine_id}")
-        
-        # Connect close button
-        self.ui.btn_close.clicked.connect(self.accept)
 
 
 class DeleteSuccessDialog(QDialog):
@@ -101,6 +108,7 @@ class DeleteSuccessDialog(QDialog):
         
         # Choose UI class based on theme mode
         if self.theme.mode == ThemeMode.DARK:
+            from src.ui.generated.xoa_thanh_cong_dark import Ui_dlg_success as Ui_dlg_success_dark
             self.ui = Ui_dlg_success_dark()
         else:
             self.ui = Ui_dlg_success()
@@ -112,14 +120,17 @@ class DeleteSuccessDialog(QDialog):
         )
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         
-        # Update dynamic content
+        # Connect close button
+        self.ui.btn_close.clicked.connect(self.accept)
+
+        self.reset(medicine_name, medicine_id)
+
+    def reset(self, medicine_name: str = "", medicine_id: str = ""):
+        """Show another medicine in this dialog (called by DialogPool)."""
         # Note: xoa_thanh_cong.ui does not have lbl_desc — use lbl_code instead
         self.ui.lbl_code.setText(
             f"Thuốc '{medicine_name}' | Mã: {medicine_id}"
         )
-        
-        # Connect close button
-        self.ui.btn_close.clicked.connect(self.accept)
 
 
 class ConfirmDeleteDialog(QDialog):
@@ -143,6 +154,7 @@ class ConfirmDeleteDialog(QDialog):
         
         # Choose UI class based on theme mode
         if self.theme.mode == ThemeMode.DARK:
+            from src.ui.generated.xac_nhan_xoa_dark import Ui_dlg_confirm_delete as Ui_dlg_confirm_delete_dark
             self.ui = Ui_dlg_confirm_delete_dark()
         else:
             self.ui = Ui_dlg_confirm_delete()
@@ -154,7 +166,14 @@ class ConfirmDeleteDialog(QDialog):
         )
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         
-        # Update dynamic content
+        # Connect buttons
+        self.ui.btn_delete.clicked.connect(self.accept)
+        self.ui.btn_cancel.clicked.connect(self.reject)
+
+        self.reset(medicine_name, medicine_id, quantity)
+
+    def reset(self, medicine_name: str = "", medicine_id: str = "", quantity: int = 0):
+        """Ask about another medicine with this dialog (called by DialogPool)."""
         self.ui.lbl_qty.setText(f"SỐ LƯỢNG: {quantity}")
         self.ui.lbl_code.setText(f"Mã thuốc: {medicine_id}")
         
@@ -163,10 +182,6 @@ class ConfirmDeleteDialog(QDialog):
             self.ui.lbl_warning.setVisible(True)
         else:
             self.ui.lbl_warning.setVisible(False)
-        
-        # Connect buttons
-        self.ui.btn_delete.clicked.connect(self.accept)
-        self.ui.btn_cancel.clicked.connect(self.reject)
 
 
 class ShelfFullErrorDialog(QDialog):
@@ -189,12 +204,15 @@ class ShelfFullErrorDialog(QDialog):
         )
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         
-        # Update dynamic content
+        # Connect close button
+        self.ui.btn_close.clicked.connect(self.accept)
+
+        self.reset(shelf_id, remaining_capacity)
+
+    def reset(self, shelf_id: str = "", remaining_capacity: int = 0):
+        """Report another full shelf with this dialog (called by DialogPool)."""
         self.ui.lbl_desc.setText(
             f"Kệ {shelf_id} hiện tại chỉ còn sức chứa "
             f"{remaining_capacity} đơn vị thuốc. "
             "Vui lòng chọn kệ khác hoặc thay đổi lượng thuốc nhập vào"
         )
-        
-        # Connect close button
-        self.ui.btn_close.clicked.connect(self.accept)
@@ -18,7 +18,6 @@ from PyQt6.QtCore import Qt
 from src.models import Shelf
 from src.ui.theme import Theme, ThemeMode
 from src.ui.generated.them_ke import Ui_dlg_add_shelf
-from src.ui.generated.them_ke_dark import Ui_dlg_add_shelf as Ui_dlg_add_shelf_dark
 
 
 class ShelfDialog(QDialog):
@@ -72,6 +71,8 @@ class ShelfDialog(QDialog):
         """Setup dialog UI using Qt Designer generated class."""
         # Choose UI class based on current theme mode
         if self.theme.mode == ThemeMode.DARK:
+            # Bản UI tối chỉ được nạp khi cần
+            from src.ui.generated.them_ke_dark import Ui_dlg_add_shelf as Ui_dlg_add_shelf_dark
             self.ui = Ui_dlg_add_shelf_dark()
         else:
             self.ui = Ui_dlg_add_shelf()
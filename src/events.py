@@ -0,0 +1,128 @@
+"""
+Bus sự kiện thay đổi kho cho Hệ Thống Quản Lý Kho Thuốc.
+
+Module này cung cấp:
+- Các sự kiện có kiểu (MedicineAdded/Updated/Removed, ShelfChanged,
+  InventoryReloaded) do InventoryManager phát sau mỗi thay đổi
+- EventBus đồng bộ: đăng ký callback theo lớp sự kiện (kể cả lớp cha), để
+  chỉ mục tìm kiếm, cảnh báo và Dashboard tự cập nhật phần bị ảnh hưởng
+  thay vì dựng lại từ toàn bộ kho
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Type
+
+from src.models import Medicine, Shelf
+
+
+@dataclass(frozen=True)
+class InventoryEvent:
+    """
+    Lớp cha của mọi sự kiện kho.
+
+    Thuộc tính:
+        version: InventoryManager.version ngay sau thay đổi
+    """
+    version: int
+
+
+@dataclass(frozen=True)
+class MedicineAdded(InventoryEvent):
+    """
+    Một thuốc vừa được thêm.
+
+    Thuộc tính:
+        medicine: Thuốc mới
+    """
+    medicine: Medicine
+
+
+@dataclass(frozen=True)
+class MedicineUpdated(InventoryEvent):
+    """
+    Một thuốc vừa được sửa (đổi kệ thì ID mới khác ID cũ).
+
+    Thuộc tính:
+        old: Thuốc trước khi sửa
+        new: Thuốc sau khi sửa
+    """
+    old: Medicine
+    new: Medicine
+
+
+@dataclass(frozen=True)
+class MedicineRemoved(InventoryEvent):
+    """
+    Một thuốc vừa bị xóa.
+
+    Thuộc tính:
+        medicine: Thuốc đã xóa
+    """
+    medicine: Medicine
+
+
+@dataclass(frozen=True)
+class ShelfChanged(InventoryEvent):
+    """
+    Một kệ vừa được thêm, sửa hoặc xóa.
+
+    Thuộc tính:
+        old: Kệ trước thay đổi (None nếu vừa thêm)
+        new: Kệ sau thay đổi (None nếu vừa xóa)
+    """
+    old: Optional[Shelf]
+    new: Optional[Shelf]
+
+
+@dataclass(frozen=True)
+class InventoryReloaded(InventoryEvent):
+    """Dữ liệu kho được thay từ file — mọi trạng thái dẫn xuất cần dựng lại."""
+
+
+# Callback nhận một sự kiện
+EventCallback = Callable[[InventoryEvent], None]
+
+
+class EventBus:
+    """
+    Bus phát sự kiện đồng bộ theo kiểu.
+
+    Callback đăng ký cho một lớp nhận mọi sự kiện thuộc lớp đó hoặc lớp
+    con (đăng ký InventoryEvent để nhận tất cả), theo thứ tự đăng ký.
+    """
+
+    def __init__(self):
+        """Khởi tạo bus rỗng."""
+        self._subscribers: Dict[Type[InventoryEvent], List[EventCallback]] = {}
+
+    def subscribe(self, event_type: Type[InventoryEvent], callback: EventCallback) -> None:
+        """
+        Đăng ký callback cho một loại sự kiện.
+
+        Tham số:
+            event_type: Lớp sự kiện cần theo dõi
+            callback: Hàm nhận sự kiện
+        """
+        self._subscribers.setdefault(event_type, []).append(callback)
+
+    def unsubscribe(self, event_type: Type[InventoryEvent], callback: EventCallback) -> None:
+        """
+        Hủy đăng ký (không làm gì nếu chưa đăng ký).
+
+        Tham số:
+            event_type: Lớp sự kiện đã dùng khi đăng ký
+            callback: Hàm đã đăng ký
+        """
+        callbacks = self._subscribers.get(event_type, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def publish(self, event: InventoryEvent) -> None:
+        """
+        Gửi sự kiện tới các callback của lớp nó và các lớp cha.
+
+        Tham số:
+            event: Sự kiện vừa xảy ra
+        """
+        for event_type in type(event).__mro__:
+            for callback in list(self._subscribers.get(event_type, ())):
+                callback(event)
@@ -6,11 +6,23 @@ Xử lý thao tác ảnh thuốc:
 - Tạo tên file duy nhất dựa trên ID thuốc
 - Kiểm tra file ảnh (định dạng, kích thước)
 - Xóa ảnh khi thuốc bị loại bỏ
+- Chỉ mục ID -> tên file trong bộ nhớ: thư mục ảnh chỉ được quét một lần,
+  sau đó mỗi lần tra cứu chỉ cần một lần stat thư mục (so sánh mtime) thay
+  vì thử Path.exists() cho từng định dạng
+- Ảnh thu nhỏ (thumbnail): tạo trên thread pool ngay khi ảnh được lưu, cất
+  trong thư mục cache theo khóa (hash nội dung, mtime) nên đổi tên/chép lại
+  ảnh không phải tạo lại. Việc giải mã/ghi ảnh do hàm thumbnail_writer bên
+  ngoài đảm nhận (giao diện dùng Qt — xem src/ui/thumbnails.py); không có
+  hàm này thì không tạo thumbnail. Thumbnail của ảnh bị xóa hoặc bị thay
+  được xóa theo (trừ khi ảnh khác còn dùng chung)
 """
+import hashlib
 import os
 import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List
+from typing import Callable, Dict, Optional, List, Tuple
 
 # Các định dạng ảnh được hỗ trợ
 SUPPORTED_FORMATS: List[str] = [".png", ".jpg", ".jpeg", ".bmp", ".webp"]
@@ -21,6 +33,18 @@ MAX_IMAGE_SIZE: int = 5 * 1024 * 1024
 # Thư mục ảnh mặc định
 DEFAULT_IMAGES_DIR: str = "data/images"
 
+# Cạnh dài tối đa của ảnh thu nhỏ (px) — đủ cho khung xem trước 280px
+THUMBNAIL_SIZE: int = 320
+
+# Số luồng tạo ảnh thu nhỏ
+THUMBNAIL_WORKERS: int = 2
+
+# Hàm tạo ảnh thu nhỏ PNG: (ảnh nguồn, file đích .png, cạnh dài tối đa) -> thành công
+ThumbnailWriter = Callable[[str, str, int], bool]
+
+# Callback khi một file ảnh bị thay, đổi tên hoặc xóa: (đường dẫn tuyệt đối)
+ImageCallback = Callable[[str], None]
+
 
 class ImageManager:
     """
@@ -29,24 +53,140 @@ class ImageManager:
     Ảnh được lưu trong thư mục riêng (data/images/) với
     tên file dựa trên ID thuốc để tra cứu dễ dàng.
 
+    Tên file được tra trong một chỉ mục (ID đã làm sạch -> các tên file,
+    theo thứ tự SUPPORTED_FORMATS). Các thao tác lưu/đổi tên/xóa cập nhật
+    chỉ mục trực tiếp; thay đổi từ bên ngoài được phát hiện qua mtime của
+    thư mục và khi đó thư mục được quét lại.
+
+    Ảnh thu nhỏ nằm trong thumbnails_dir với tên "<sha1 nội dung>-<mtime>.png"
+    — đây chỉ là cache, xóa đi thì sẽ được tạo lại khi cần. Xóa/thay ảnh
+    cũng xóa thumbnail và khóa đã tính của nó; đổi tên chỉ chuyển khóa.
+
     Thuộc tính:
         images_dir: Đường dẫn tới thư mục ảnh
+        thumbnails_dir: Thư mục cache ảnh thu nhỏ
     """
 
-    def __init__(self, images_dir: str = DEFAULT_IMAGES_DIR):
+    def __init__(
+        self,
+        images_dir: str = DEFAULT_IMAGES_DIR,
+        thumbnail_writer: Optional[ThumbnailWriter] = None,
+        thumbnails_dir: Optional[str] = None
+    ):
         """
         Khởi tạo ImageManager.
 
         Tham số:
             images_dir: Đường dẫn tới thư mục lưu ảnh
+            thumbnail_writer: Hàm tạo ảnh thu nhỏ (None: không tạo thumbnail)
+            thumbnails_dir: Thư mục cache thumbnail (mặc định: "thumbnails"
+                cạnh images_dir)
         """
         self.images_dir = images_dir
         self._ensure_directory()
+        self.thumbnails_dir = thumbnails_dir or str(Path(images_dir).parent / "thumbnails")
+
+        # Ảnh thu nhỏ: thread pool tạo khi cần; khóa đã tính theo đường dẫn
+        # nguồn -> (mtime, kích thước, khóa) để không băm lại file chưa đổi
+        self._thumbnail_writer = thumbnail_writer
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._thumbnail_keys: Dict[str, Tuple[int, int, str]] = {}
+        # Số lần khóa của một đường dẫn bị gỡ/chuyển: luồng nền chỉ ghi khóa
+        # vừa băm nếu số này không đổi trong lúc băm
+        self._key_generations: Dict[str, int] = {}
+        # Bảo vệ _pending, _thumbnail_keys và _key_generations (GUI và thread pool)
+        self._lock = threading.Lock()
+
+        # Chỉ mục: ID đã làm sạch -> tên file; mtime thư mục lúc chỉ mục khớp
+        self._resolved_dir = Path(self.images_dir).resolve()
+        self._index: Dict[str, List[str]] = {}
+        self._index_mtime: Optional[int] = None
+
+        # Nơi giữ bản sao của ảnh (VD cache pixmap) được báo khi file đổi
+        self._subscribers: List[ImageCallback] = []
+
+    def subscribe(self, callback: ImageCallback) -> None:
+        """
+        Đăng ký callback khi một file ảnh bị thay, đổi tên hoặc xóa.
+
+        Tham số:
+            callback: Hàm nhận đường dẫn tuyệt đối của file ảnh
+        """
+        self._subscribers.append(callback)
+
+    def _notify(self, path: Path) -> None:
+        """Báo cho các callback đã đăng ký rằng file ảnh đã đổi."""
+        for callback in list(self._subscribers):
+            callback(str(path))
 
     def _ensure_directory(self) -> None:
         """Tạo thư mục ảnh nếu chưa tồn tại."""
         Path(self.images_dir).mkdir(parents=True, exist_ok=True)
 
+    @staticmethod
+    def _safe_id(medicine_id: str) -> str:
+        """Làm sạch medicine_id cho an toàn hệ thống file."""
+        return medicine_id.replace("/", "_").replace("\\", "_")
+
+    def _dir_mtime(self) -> Optional[int]:
+        """mtime (ns) của thư mục ảnh, None nếu thư mục không còn."""
+        try:
+            return os.stat(self.images_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh_index(self) -> None:
+        """Quét lại thư mục ảnh nếu nó đã đổi kể từ lần quét/ghi cuối."""
+        mtime = self._dir_mtime()
+        if mtime is not None and mtime == self._index_mtime:
+            return
+
+        index: Dict[str, List[str]] = {}
+        try:
+            with os.scandir(self.images_dir) as entries:
+                for entry in entries:
+                    stem, ext = os.path.splitext(entry.name)
+                    if ext in SUPPORTED_FORMATS and entry.is_file():
+                        index.setdefault(stem, []).append(entry.name)
+        except OSError:
+            pass
+        for names in index.values():
+            names.sort(key=lambda name: SUPPORTED_FORMATS.index(os.path.splitext(name)[1]))
+        self._index = index
+        self._index_mtime = mtime
+
+    def _filenames(self, safe_id: str) -> List[str]:
+        """Tên các file ảnh của một ID đã làm sạch (theo thứ tự định dạng)."""
+        self._refresh_index()
+        return self._index.get(safe_id, [])
+
+    def _index_add(self, filename: str) -> None:
+        """Ghi nhận file vừa được tạo trong thư mục ảnh."""
+        stem, ext = os.path.splitext(filename)
+        names = self._index.setdefault(stem, [])
+        if filename not in names:
+            names.append(filename)
+            names.sort(key=lambda name: SUPPORTED_FORMATS.index(os.path.splitext(name)[1]))
+
+    def _index_remove(self, filename: str) -> None:
+        """Ghi nhận file vừa bị xóa/đổi tên khỏi thư mục ảnh."""
+        stem = os.path.splitext(filename)[0]
+        names = self._index.get(stem)
+        if names and filename in names:
+            names.remove(filename)
+            if not names:
+                del self._index[stem]
+
+    def _mark_synced(self) -> None:
+        """
+        Nhận mtime mới của thư mục sau một thao tác ghi của chính mình.
+
+        Chỉ gọi ngay sau khi chỉ mục vừa được làm mới và đã được cập nhật
+        theo thao tác, để lần tra cứu sau không phải quét lại.
+        """
+        self._index_mtime = self._dir_mtime()
+
     def validate_image(self, source_path: str) -> None:
         """
         Kiểm tra file ảnh trước khi nhập.
@@ -105,8 +245,7 @@ class ImageManager:
         ext = source.suffix.lower()
 
         # Tạo tên file: medicine_id + phần mở rộng
-        # Làm sạch medicine_id cho an toàn hệ thống file
-        safe_id = medicine_id.replace("/", "_").replace("\\", "_")
+        safe_id = self._safe_id(medicine_id)
         filename = f"{safe_id}{ext}"
         dest_path = Path(self.images_dir) / filename
 
@@ -117,6 +256,13 @@ class ImageManager:
             shutil.copy2(str(source), str(dest_path))
         except Exception as e:
             raise IOError(f"Lưu ảnh thất bại: {str(e)}") from e
+        self._index_add(filename)
+        self._mark_synced()
+        self._notify(self._resolved_dir / filename)
+
+        # Tạo sẵn ảnh thu nhỏ trên luồng nền (cùng dạng đường dẫn với các
+        # lần tra cứu sau, để dùng lại khóa đã tính)
+        self.request_thumbnail(str(self._resolved_dir / filename))
 
         # Trả về đường dẫn tương đối từ thư mục cha data/
         return str(Path(self.images_dir).name / Path(filename))
@@ -134,17 +280,27 @@ class ImageManager:
         Trả về:
             True nếu đã xóa ảnh, False nếu không tìm thấy
         """
-        safe_id = medicine_id.replace("/", "_").replace("\\", "_")
-        deleted = False
+        filenames = list(self._filenames(self._safe_id(medicine_id)))
+        if not filenames:
+            return False
 
-        for ext in SUPPORTED_FORMATS:
-            image_path = Path(self.images_dir) / f"{safe_id}{ext}"
-            if image_path.exists():
-                try:
-                    image_path.unlink()
-                    deleted = True
-                except OSError:
-                    pass
+        deleted = False
+        for filename in filenames:
+            source_path = str(self._resolved_dir / filename)
+            # Khóa thumbnail phải tính khi file còn (có thể chưa băm trong phiên này)
+            key = self._thumbnail_key(source_path) if os.path.isdir(self.thumbnails_dir) else None
+            try:
+                (Path(self.images_dir) / filename).unlink()
+                deleted = True
+            except FileNotFoundError:
+                # Chỉ mục cũ hơn thư mục — bỏ mục thừa
+                pass
+            except OSError:
+                continue
+            self._drop_thumbnail(source_path, key)
+            self._index_remove(filename)
+            self._notify(self._resolved_dir / filename)
+        self._mark_synced()
 
         return deleted
 
@@ -158,12 +314,9 @@ class ImageManager:
         Trả về:
             Đường dẫn tuyệt đối tới file ảnh, hoặc None nếu không có ảnh
         """
-        safe_id = medicine_id.replace("/", "_").replace("\\", "_")
-
-        for ext in SUPPORTED_FORMATS:
-            image_path = Path(self.images_dir) / f"{safe_id}{ext}"
-            if image_path.exists():
-                return str(image_path.resolve())
+        filenames = self._filenames(self._safe_id(medicine_id))
+        if filenames:
+            return str(self._resolved_dir / filenames[0])
 
         return None
 
@@ -180,6 +333,15 @@ class ImageManager:
         if not relative_path:
             return None
 
+        # Ảnh trong images_dir: tra chỉ mục, không cần stat file
+        relative = Path(relative_path)
+        if (relative.parent == Path(Path(self.images_dir).name)
+                and relative.suffix in SUPPORTED_FORMATS):
+            stem = os.path.splitext(relative.name)[0]
+            if relative.name in self._filenames(stem):
+                return str(self._resolved_dir / relative.name)
+            return None
+
         # Thử tương đối với thư mục cha images_dir
         abs_path = Path(self.images_dir).parent / relative_path
         if abs_path.exists():
@@ -213,17 +375,187 @@ class ImageManager:
         Trả về:
             Đường dẫn ảnh tương đối mới, hoặc None nếu không tìm thấy ảnh
         """
-        old_safe = old_medicine_id.replace("/", "_").replace("\\", "_")
-        new_safe = new_medicine_id.replace("/", "_").replace("\\", "_")
-
-        for ext in SUPPORTED_FORMATS:
-            old_path = Path(self.images_dir) / f"{old_safe}{ext}"
-            if old_path.exists():
-                new_path = Path(self.images_dir) / f"{new_safe}{ext}"
-                try:
-                    old_path.rename(new_path)
-                    return str(Path(self.images_dir).name / Path(f"{new_safe}{ext}"))
-                except OSError:
-                    pass
+        old_safe = self._safe_id(old_medicine_id)
+        new_safe = self._safe_id(new_medicine_id)
+
+        for old_name in list(self._filenames(old_safe)):
+            ext = os.path.splitext(old_name)[1]
+            new_name = f"{new_safe}{ext}"
+            try:
+                (Path(self.images_dir) / old_name).rename(Path(self.images_dir) / new_name)
+            except OSError:
+                continue
+            # Nội dung và mtime giữ nguyên: thumbnail dùng lại, chỉ chuyển khóa
+            old_path = str(self._resolved_dir / old_name)
+            with self._lock:
+                cached = self._thumbnail_keys.pop(old_path, None)
+                self._key_generations[old_path] = self._key_generations.get(old_path, 0) + 1
+                if cached is not None:
+                    self._thumbnail_keys[str(self._resolved_dir / new_name)] = cached
+            self._index_remove(old_name)
+            self._index_add(new_name)
+            self._mark_synced()
+            self._notify(self._resolved_dir / old_name)
+            self._notify(self._resolved_dir / new_name)
+            return str(Path(self.images_dir).name / Path(new_name))
 
         return None
+
+    # ── Ảnh thu nhỏ ──
+
+    def _thumbnail_key(self, source_path: str) -> Optional[str]:
+        """
+        Khóa cache của ảnh: hash nội dung + mtime (chỉ băm lại khi file đổi).
+
+        Trả về:
+            Khóa, hoặc None nếu không đọc được file
+        """
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._thumbnail_keys.get(source_path)
+            generation = self._key_generations.get(source_path, 0)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        digest = hashlib.sha1()
+        try:
+            with open(source_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        except OSError:
+            return None
+        key = f"{digest.hexdigest()}-{stat.st_mtime_ns:x}"
+        with self._lock:
+            # Ảnh bị xóa/đổi tên trong lúc băm: không ghi lại khóa cũ
+            if self._key_generations.get(source_path, 0) == generation:
+                self._thumbnail_keys[source_path] = (stat.st_mtime_ns, stat.st_size, key)
+        return key
+
+    def _drop_thumbnail(self, source_path: str, key: Optional[str]) -> None:
+        """
+        Xóa ảnh thu nhỏ và khóa đã tính của một ảnh nguồn vừa bị xóa.
+
+        Thumbnail dùng chung với ảnh khác (cùng nội dung và mtime, VD ảnh
+        chép từ cùng một file) được giữ lại.
+
+        Tham số:
+            source_path: Đường dẫn ảnh nguồn (file đã bị xóa)
+            key: Khóa thumbnail của ảnh, tính trước khi xóa (None: không có)
+        """
+        with self._lock:
+            future = self._pending.get(source_path)
+            if future is not None and future.cancel():
+                # Luồng nền sẽ không chạy để tự gỡ mục này
+                del self._pending[source_path]
+            self._thumbnail_keys.pop(source_path, None)
+            self._key_generations[source_path] = self._key_generations.get(source_path, 0) + 1
+            shared = any(cached[2] == key for cached in self._thumbnail_keys.values())
+        if key is None or shared:
+            return
+        try:
+            os.remove(os.path.join(self.thumbnails_dir, f"{key}.png"))
+        except OSError:
+            pass
+
+    def cached_thumbnail(self, source_path: str) -> Optional[str]:
+        """
+        Đường dẫn ảnh thu nhỏ đã có của ảnh nguồn, không tạo mới và không
+        băm file (chỉ dùng khóa đã tính).
+
+        Tham số:
+            source_path: Đường dẫn ảnh nguồn
+
+        Trả về:
+            Đường dẫn thumbnail, hoặc None nếu chưa có/không chắc còn đúng
+        """
+        with self._lock:
+            cached = self._thumbnail_keys.get(source_path)
+        if cached is None:
+            return None
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return None
+        if cached[:2] != (stat.st_mtime_ns, stat.st_size):
+            return None
+        path = os.path.join(self.thumbnails_dir, f"{cached[2]}.png")
+        return path if os.path.exists(path) else None
+
+    def _generate_thumbnail(self, source_path: str) -> Optional[str]:
+        """Tạo (nếu chưa có) ảnh thu nhỏ trên luồng của thread pool."""
+        try:
+            key = self._thumbnail_key(source_path)
+            if key is None:
+                return None
+            path = os.path.join(self.thumbnails_dir, f"{key}.png")
+            if os.path.exists(path):
+                return path
+
+            Path(self.thumbnails_dir).mkdir(parents=True, exist_ok=True)
+            # Ghi ra file tạm rồi đổi tên — luồng khác không bao giờ đọc file dở
+            temp_path = os.path.join(
+                self.thumbnails_dir, f".{key}.{threading.get_ident()}.png"
+            )
+            if not self._thumbnail_writer(source_path, temp_path, THUMBNAIL_SIZE):
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                return None
+            os.replace(temp_path, path)
+            return path
+        except OSError:
+            return None
+        finally:
+            with self._lock:
+                self._pending.pop(source_path, None)
+
+    def request_thumbnail(self, source_path: str) -> Optional[Future]:
+        """
+        Yêu cầu tạo ảnh thu nhỏ trên thread pool.
+
+        Yêu cầu trùng cho cùng một ảnh đang chờ được gộp làm một.
+
+        Tham số:
+            source_path: Đường dẫn ảnh nguồn
+
+        Trả về:
+            Future trả về đường dẫn thumbnail (None nếu thất bại), hoặc None
+            nếu ImageManager không có thumbnail_writer
+        """
+        if self._thumbnail_writer is None:
+            return None
+        with self._lock:
+            future = self._pending.get(source_path)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        THUMBNAIL_WORKERS, thread_name_prefix="thumbnail"
+                    )
+                # Luồng nền chỉ gỡ mục này sau khi lấy được khóa — luôn sau dòng dưới
+                future = self._executor.submit(self._generate_thumbnail, source_path)
+                self._pending[source_path] = future
+        return future
+
+    def get_thumbnail(self, source_path: str) -> Optional[str]:
+        """
+        Đường dẫn ảnh thu nhỏ, tạo ngay (chờ thread pool) nếu chưa có.
+
+        Tham số:
+            source_path: Đường dẫn ảnh nguồn
+
+        Trả về:
+            Đường dẫn thumbnail, hoặc None nếu không tạo được
+        """
+        path = self.cached_thumbnail(source_path)
+        if path is not None:
+            return path
+        future = self.request_thumbnail(source_path)
+        return future.result() if future is not None else None
+
+    def shutdown(self) -> None:
+        """Hủy các yêu cầu thumbnail đang chờ và dừng thread pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
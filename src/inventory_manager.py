@@ -5,13 +5,86 @@ Module này cung cấp bộ điều khiển trung tâm cho tất cả thao tác
 - Thao tác CRUD (Tạo, Đọc, Cập nhật, Xóa) cho thuốc
 - Tích hợp với StorageEngine để lưu trữ bền vững
 - Kiểm tra và thực thi logic nghiệp vụ
+- Nhật ký thay đổi để giao diện cập nhật từng dòng thay vì dựng lại toàn bộ
+- Bus sự kiện (src/events.py) để các chỉ mục dẫn xuất cập nhật tăng dần
 """
 import uuid
+from dataclasses import dataclass, field
 from datetime import date
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Set, Tuple
 
+from src.events import (
+    EventBus, InventoryReloaded, MedicineAdded, MedicineRemoved,
+    MedicineUpdated, ShelfChanged
+)
 from src.models import Medicine, Shelf
 from src.storage import StorageEngine
+from src.valuation import InventoryValuation
+
+
+@dataclass
+class ChangeSet:
+    """
+    Thay đổi thực (đã gộp) của kho giữa hai phiên bản.
+
+    Mỗi thuốc/kệ xuất hiện tối đa một lần: thêm rồi xóa thì biến mất,
+    thêm rồi sửa là thêm, sửa rồi xóa là xóa. Đổi kệ làm thuốc đổi ID nên
+    được báo là xóa ID cũ + thêm ID mới.
+
+    Thuộc tính:
+        inserted: Thuốc mới thêm
+        updated: Cặp (thuốc cũ, thuốc mới) cùng ID
+        removed: Thuốc đã xóa (bản cuối cùng trước khi xóa)
+        shelves_inserted: Kệ mới thêm
+        shelves_updated: Cặp (kệ cũ, kệ mới) cùng ID
+        shelves_removed: Kệ đã xóa
+    """
+    inserted: List[Medicine] = field(default_factory=list)
+    updated: List[Tuple[Medicine, Medicine]] = field(default_factory=list)
+    removed: List[Medicine] = field(default_factory=list)
+    shelves_inserted: List[Shelf] = field(default_factory=list)
+    shelves_updated: List[Tuple[Shelf, Shelf]] = field(default_factory=list)
+    shelves_removed: List[Shelf] = field(default_factory=list)
+
+    @property
+    def inserted_ids(self) -> List[str]:
+        """ID các thuốc mới thêm."""
+        return [m.id for m in self.inserted]
+
+    @property
+    def updated_ids(self) -> List[str]:
+        """ID các thuốc đã sửa."""
+        return [new.id for _, new in self.updated]
+
+    @property
+    def removed_ids(self) -> List[str]:
+        """ID các thuốc đã xóa."""
+        return [m.id for m in self.removed]
+
+    @property
+    def touched_shelf_ids(self) -> Set[str]:
+        """ID các kệ bị thêm/sửa/xóa hoặc có thuốc bị thêm/sửa/xóa (đổi số lượng đã dùng)."""
+        touched = {s.id for s in self.shelves_inserted}
+        touched.update(new.id for _, new in self.shelves_updated)
+        touched.update(s.id for s in self.shelves_removed)
+        touched.update(m.shelf_id for m in self.inserted)
+        touched.update(m.shelf_id for m in self.removed)
+        for old, new in self.updated:
+            touched.add(old.shelf_id)
+            touched.add(new.shelf_id)
+        return touched
+
+    @property
+    def has_shelf_changes(self) -> bool:
+        """True nếu có kệ được thêm/sửa/xóa."""
+        return bool(self.shelves_inserted or self.shelves_updated or self.shelves_removed)
+
+    def __len__(self) -> int:
+        return (
+            len(self.inserted) + len(self.updated) + len(self.removed)
+            + len(self.shelves_inserted) + len(self.shelves_updated)
+            + len(self.shelves_removed)
+        )
 
 
 class InventoryManager:
@@ -30,9 +103,15 @@ class InventoryManager:
         storage: Thực thể StorageEngine cho thao tác file
         medicines_filepath: Đường dẫn tới file JSON thuốc
         shelves_filepath: Đường dẫn tới file JSON kệ
+        version: Tăng sau mỗi thay đổi thuốc/kệ (dùng làm khóa cache)
+        valuation: Tổng giá trị tồn kho (tổng/kệ/khu), cập nhật sau mỗi thay đổi
+        events: Bus phát sự kiện có kiểu sau mỗi thay đổi thuốc/kệ
     """
     
     VALID_SORT_FIELDS = ("id", "name", "quantity", "expiry_date", "price")
+
+    # Số thay đổi tối đa giữ trong nhật ký; xa hơn thì giao diện tải lại toàn bộ
+    MAX_CHANGE_LOG = 1000
     
     def __init__(
         self,
@@ -51,6 +130,12 @@ class InventoryManager:
         self.storage = StorageEngine()
         self.medicines_filepath = medicines_filepath
         self.shelves_filepath = shelves_filepath
+        self.version = 0
+        self.valuation = InventoryValuation()
+        self.events = EventBus()
+        # Nhật ký thay đổi: (phiên bản, loại "medicine"/"shelf", ID, cũ, mới)
+        self._change_log: List[Tuple[int, str, str, Any, Any]] = []
+        self._change_log_start = 0
     
     def load_data(self) -> None:
         """
@@ -60,20 +145,98 @@ class InventoryManager:
         - FileNotFoundError: Khởi tạo danh sách rỗng
         - JSONDecodeError: Ghi log, cố gắng phục hồi từ bản sao lưu
         """
-        # Tải thuốc
+        self.set_data(*self.read_data())
+
+    def read_data(self) -> Tuple[List[Medicine], List[Shelf]]:
+        """
+        Đọc thuốc và kệ từ file JSON mà không thay đổi trạng thái kho.
+
+        Không chạm tới thuộc tính nào của InventoryManager nên có thể gọi từ
+        luồng nền; kết quả được áp dụng sau bằng set_data() trên luồng chính.
+
+        Trả về:
+            Cặp (danh sách thuốc, danh sách kệ); file không tồn tại cho danh sách rỗng
+        """
+        _, chunks = self.read_medicine_chunks()
+        medicines = [medicine for chunk in chunks for medicine in chunk]
+        return medicines, self.read_shelves()
+
+    def read_shelves(self) -> List[Shelf]:
+        """
+        Đọc kệ từ file JSON (không thay đổi trạng thái kho).
+
+        Trả về:
+            Danh sách kệ; rỗng nếu file không tồn tại
+        """
         try:
-            data = self.storage.read_json(self.medicines_filepath)
-            self.medicines = [Medicine.from_dict(item) for item in data]
+            data = self.storage.read_json(self.shelves_filepath)
         except FileNotFoundError:
-            self.medicines = []
-        
-        # Tải kệ
+            return []
+        return [Shelf.from_dict(item) for item in data]
+
+    def read_medicine_chunks(
+        self, chunk_size: int = 5000
+    ) -> Tuple[int, Iterator[List[Medicine]]]:
+        """
+        Đọc file thuốc một lần, chuyển bản ghi thành Medicine theo từng lô.
+
+        Việc dựng đối tượng diễn ra dần khi bộ lặp được duyệt, nên bên gọi
+        (luồng nền) có thể trao từng lô cho giao diện ngay khi có.
+
+        Tham số:
+            chunk_size: Số thuốc mỗi lô
+
+        Trả về:
+            Cặp (tổng số thuốc, bộ lặp các lô); file không tồn tại cho (0, rỗng)
+        """
         try:
-            data = self.storage.read_json(self.shelves_filepath)
-            self.shelves = [Shelf.from_dict(item) for item in data]
+            data = self.storage.read_json(self.medicines_filepath)
         except FileNotFoundError:
-            self.shelves = []
-    
+            data = []
+        chunks = (
+            [Medicine.from_dict(item) for item in data[start:start + chunk_size]]
+            for start in range(0, len(data), chunk_size)
+        )
+        return len(data), chunks
+
+    def set_data(self, medicines: List[Medicine], shelves: List[Shelf]) -> None:
+        """
+        Thay toàn bộ dữ liệu kho (thường là kết quả của read_data()).
+
+        Tham số:
+            medicines: Danh sách thuốc mới
+            shelves: Danh sách kệ mới
+        """
+        self.medicines = medicines
+        self.shelves = shelves
+
+        self.valuation.rebuild(self.medicines, self.shelves)
+        self._reset_change_log()
+
+    def append_loaded(self, medicines: List[Medicine]) -> None:
+        """
+        Thêm một lô thuốc vừa đọc (tải dần) — không lưu, không kiểm tra kệ.
+
+        Khác add_medicine(): dữ liệu đến từ file nên đã hợp lệ; chỉ cập nhật
+        các tổng giá trị và phiên bản.
+
+        Tham số:
+            medicines: Lô thuốc từ read_medicine_chunks()
+        """
+        self.medicines.extend(medicines)
+        for medicine in medicines:
+            self.valuation.add(medicine)
+        self._reset_change_log()
+
+    def _reset_change_log(self) -> None:
+        """Tăng phiên bản sau khi dữ liệu được thay từ file và báo InventoryReloaded."""
+        self.version += 1
+
+        # Dữ liệu thay mới hoàn toàn — không còn diff nào có nghĩa
+        self._change_log = []
+        self._change_log_start = self.version
+        self.events.publish(InventoryReloaded(self.version))
+
     def save_data(self) -> None:
         """
         Lưu thuốc vào file JSON.
@@ -96,6 +259,67 @@ class InventoryManager:
         data = [shelf.to_dict() for shelf in self.shelves]
         self.storage.write_json(self.shelves_filepath, data)
     
+    def _log_change(self, kind: str, key: str, old: Any, new: Any) -> None:
+        """
+        Ghi một thay đổi vào nhật ký (gọi ngay sau khi tăng version).
+
+        Tham số:
+            kind: "medicine" hoặc "shelf"
+            key: ID thuốc/kệ
+            old: Đối tượng trước thay đổi (None nếu là thêm mới)
+            new: Đối tượng sau thay đổi (None nếu là xóa)
+        """
+        self._change_log.append((self.version, kind, key, old, new))
+        if len(self._change_log) > self.MAX_CHANGE_LOG:
+            dropped = self._change_log.pop(0)
+            self._change_log_start = dropped[0]
+
+    def changes_since(self, version: int) -> Optional[ChangeSet]:
+        """
+        Lấy các thay đổi (đã gộp) kể từ một phiên bản.
+
+        Tham số:
+            version: Phiên bản mà bên gọi đang hiển thị
+
+        Trả về:
+            ChangeSet (rỗng nếu không có gì đổi), hoặc None nếu nhật ký không
+            còn đủ để trả lời (dữ liệu vừa tải lại, hoặc quá nhiều thay đổi)
+            — khi đó bên gọi phải tải lại toàn bộ
+        """
+        if version < self._change_log_start or version > self.version:
+            return None
+
+        # Gộp theo (loại, ID): giữ bản cũ đầu tiên và bản mới cuối cùng
+        net: Dict[Tuple[str, str], List[Any]] = {}
+        for entry_version, kind, key, old, new in self._change_log:
+            if entry_version <= version:
+                continue
+            pair = net.get((kind, key))
+            if pair is None:
+                net[(kind, key)] = [old, new]
+            else:
+                pair[1] = new
+
+        changes = ChangeSet()
+        for (kind, _), (old, new) in net.items():
+            if old is None and new is None:
+                continue
+            if kind == "medicine":
+                if old is None:
+                    changes.inserted.append(new)
+                elif new is None:
+                    changes.removed.append(old)
+                else:
+                    changes.updated.append((old, new))
+            else:
+                if old is None:
+                    changes.shelves_inserted.append(new)
+                elif new is None:
+                    changes.shelves_removed.append(old)
+                else:
+                    changes.shelves_updated.append((old, new))
+        return changes
+
     def _generate_id(self, shelf_id: str) -> str:
         """
         Tạo ID thuốc duy nhất dựa trên vị trí kệ.
@@ -199,12 +423,28 @@ class InventoryManager:
         except (ValueError, TypeError):
             return 0
         
-        used = sum(
-            m.quantity for m in self.medicines
-            if m.shelf_id == shelf_id and m.id != exclude_medicine_id
-        )
+        used = self.get_shelf_used(shelf_id)
+        if exclude_medicine_id:
+            excluded = self._find_medicine_by_id(exclude_medicine_id)
+            if excluded is not None and excluded.shelf_id == shelf_id:
+                used -= excluded.quantity
         
         return total_capacity - used
+
+    def get_shelf_used(self, shelf_id: str) -> int:
+        """
+        Lấy tổng số lượng thuốc đang nằm trên kệ — O(1).
+
+        Đọc từ bộ đếm theo kệ của InventoryValuation, được cập nhật sau mỗi
+        thao tác thêm/sửa/xóa thuốc.
+
+        Tham số:
+            shelf_id: ID kệ
+
+        Trả về:
+            Số lượng đã dùng (0 nếu kệ trống hoặc không tồn tại)
+        """
+        return self.valuation.shelf_quantity(shelf_id)
     
     def add_medicine(self, medicine: Medicine, auto_save: bool = True) -> Medicine:
         """
@@ -253,6 +493,10 @@ class InventoryManager:
                 )
         
         self.medicines.append(medicine)
+        self.valuation.add(medicine)
+        self.version += 1
+        self._log_change("medicine", medicine.id, None, medicine)
+        self.events.publish(MedicineAdded(self.version, medicine))
         
         if auto_save:
             self.save_data()
@@ -279,6 +523,10 @@ class InventoryManager:
             raise ValueError(f"Không tìm thấy thuốc với ID '{medicine_id}'")
         
         removed = self.medicines.pop(index)
+        self.valuation.remove(removed)
+        self.version += 1
+        self._log_change("medicine", removed.id, removed, None)
+        self.events.publish(MedicineRemoved(self.version, removed))
         
         if auto_save:
             self.save_data()
@@ -360,6 +608,14 @@ class InventoryManager:
         
         # Thay thế trong danh sách
         self.medicines[index] = new_medicine
+        self.valuation.replace(old_medicine, new_medicine)
+        self.version += 1
+        if new_medicine.id == old_medicine.id:
+            self._log_change("medicine", new_medicine.id, old_medicine, new_medicine)
+        else:
+            self._log_change("medicine", old_medicine.id, old_medicine, None)
+            self._log_change("medicine", new_medicine.id, None, new_medicine)
+        self.events.publish(MedicineUpdated(self.version, old_medicine, new_medicine))
         
         if auto_save:
             self.save_data()
@@ -449,6 +705,10 @@ class InventoryManager:
             raise ValueError(f"Kệ với ID '{shelf.id}' đã tồn tại")
         
         self.shelves.append(shelf)
+        self.valuation.set_shelf_zone(shelf.id, shelf.zone)
+        self.version += 1
+        self._log_change("shelf", shelf.id, None, shelf)
+        self.events.publish(ShelfChanged(self.version, None, shelf))
         
         if auto_save:
             self.save_shelves()
@@ -510,6 +770,11 @@ class InventoryManager:
         )
         
         self.shelves[index] = new_shelf
+        if new_shelf.zone != old_shelf.zone:
+            self.valuation.set_shelf_zone(new_shelf.id, new_shelf.zone)
+        self.version += 1
+        self._log_change("shelf", new_shelf.id, old_shelf, new_shelf)
+        self.events.publish(ShelfChanged(self.version, old_shelf, new_shelf))
         
         if auto_save:
             self.save_shelves()
@@ -549,6 +814,10 @@ class InventoryManager:
             raise ValueError(f"Không tìm thấy kệ với ID '{shelf_id}'")
         
         removed = self.shelves.pop(index)
+        self.valuation.set_shelf_zone(removed.id, None)
+        self.version += 1
+        self._log_change("shelf", removed.id, removed, None)
+        self.events.publish(ShelfChanged(self.version, removed, None))
         
         if auto_save:
             self.save_shelves()
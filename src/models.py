@@ -7,7 +7,7 @@ Module này chứa các lớp dữ liệu chính:
 """
 from dataclasses import dataclass
 from datetime import date
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 
 @dataclass
@@ -39,23 +39,29 @@ class Medicine:
         if self.price < 0:
             raise ValueError("Giá phải >= 0")
 
-    def is_expired(self) -> bool:
+    def is_expired(self, today: Optional[date] = None) -> bool:
         """
         Kiểm tra thuốc đã hết hạn chưa.
 
+        Tham số:
+            today: Ngày tham chiếu (mặc định: hôm nay)
+
         Trả về:
             True nếu expiry_date <= hôm nay, False nếu ngược lại
         """
-        return self.expiry_date <= date.today()
+        return self.expiry_date <= (today or date.today())
 
-    def days_until_expiry(self) -> int:
+    def days_until_expiry(self, today: Optional[date] = None) -> int:
         """
         Tính số ngày còn lại đến hạn sử dụng.
 
+        Tham số:
+            today: Ngày tham chiếu (mặc định: hôm nay)
+
         Trả về:
             Số ngày đến hạn (âm nếu đã hết hạn)
         """
-        delta = self.expiry_date - date.today()
+        delta = self.expiry_date - (today or date.today())
         return delta.days
 
     def to_dict(self) -> Dict[str, Any]:
@@ -5,11 +5,11 @@ Module này cung cấp chức năng tìm kiếm mờ sử dụng thư viện The
 - Đánh chỉ mục tên thuốc để tra cứu nhanh
 - Thực hiện khớp mờ với ngưỡng có thể cấu hình
 - Trả về kết quả hàng đầu với điểm khớp
+- Cập nhật chỉ mục tăng dần theo sự kiện kho (src/events.py)
 """
 from typing import List, Tuple, Dict, Optional
 
-from thefuzz import fuzz
-
+from src.events import InventoryEvent, MedicineAdded, MedicineRemoved, MedicineUpdated
 from src.models import Medicine
 
 
@@ -33,9 +33,14 @@ class SearchEngine:
         Tham số:
             match_threshold: Điểm khớp mờ tối thiểu (0-100) cho kết quả
         """
-        self.medicines: List[Medicine] = []
+        self._medicines: Dict[str, Medicine] = {}  # id -> thuốc
         self.name_index: Dict[str, str] = {}  # id -> tên đã chuẩn hóa
         self.match_threshold = match_threshold
+
+    @property
+    def medicines(self) -> List[Medicine]:
+        """Danh sách thuốc đã đánh chỉ mục (theo thứ tự thêm vào)."""
+        return list(self._medicines.values())
     
     def index_data(self, medicines: List[Medicine]) -> None:
         """
@@ -46,11 +51,39 @@ class SearchEngine:
         Tham số:
             medicines: Danh sách thuốc cần đánh chỉ mục
         """
-        self.medicines = medicines
+        self._medicines = {med.id: med for med in medicines}
         self.name_index = {
             med.id: self._normalize(med.name)
             for med in medicines
         }
+
+    def apply_event(self, event: InventoryEvent) -> None:
+        """
+        Cập nhật chỉ mục cho một thay đổi thuốc (O(1), không đánh chỉ mục lại).
+
+        Các sự kiện khác (kệ, tải lại) bị bỏ qua: tải lại toàn bộ đi qua
+        index_data().
+
+        Tham số:
+            event: Sự kiện từ InventoryManager.events
+        """
+        if isinstance(event, MedicineUpdated):
+            self._unindex(event.old.id)
+            self._index(event.new)
+        elif isinstance(event, MedicineAdded):
+            self._index(event.medicine)
+        elif isinstance(event, MedicineRemoved):
+            self._unindex(event.medicine.id)
+
+    def _index(self, medicine: Medicine) -> None:
+        """Thêm hoặc thay một thuốc trong chỉ mục."""
+        self._medicines[medicine.id] = medicine
+        self.name_index[medicine.id] = self._normalize(medicine.name)
+
+    def _unindex(self, medicine_id: str) -> None:
+        """Bỏ một thuốc khỏi chỉ mục."""
+        self._medicines.pop(medicine_id, None)
+        self.name_index.pop(medicine_id, None)
     
     def _normalize(self, text: str) -> str:
         """
@@ -74,10 +107,7 @@ class SearchEngine:
         Trả về:
             Đối tượng Medicine nếu tìm thấy, None nếu không
         """
-        for med in self.medicines:
-            if med.id == medicine_id:
-                return med
-        return None
+        return self._medicines.get(medicine_id)
     
     def search(
         self,
@@ -100,7 +130,10 @@ class SearchEngine:
         """
         if not query or not query.strip():
             return []
-        
+
+        # thefuzz chỉ được nạp ở lần tìm kiếm đầu tiên (không làm chậm khởi động)
+        from thefuzz import fuzz
+
         normalized_query = self._normalize(query)
         results: List[Tuple[Medicine, int]] = []
         
@@ -163,7 +196,9 @@ class SearchEngine:
         """
         if not partial_query or not partial_query.strip():
             return []
-        
+
+        from thefuzz import fuzz
+
         normalized_query = self._normalize(partial_query)
         suggestions: List[Tuple[str, int]] = []
         
@@ -184,7 +219,7 @@ class SearchEngine:
     
     def clear_index(self) -> None:
         """Xóa chỉ mục tìm kiếm."""
-        self.medicines = []
+        self._medicines = {}
         self.name_index = {}
     
     def update_index(self, medicines: List[Medicine]) -> None:
@@ -0,0 +1,519 @@
+"""
+Chính sách ngưỡng cảnh báo cho Hệ Thống Quản Lý Kho Thuốc.
+
+Module này cung cấp:
+- ThresholdPolicy: Bảng ngưỡng nhiều cấp (toàn cục → khu → kệ → thuốc)
+- MedicineStatus: Mã trạng thái thuốc dùng chung cho mọi nơi hiển thị
+- StatusTable: Kết quả đánh giá trạng thái dạng vector (NumPy) cho cả kho
+
+Ngưỡng được phân giải một lần thành mảng theo từng dòng, sau đó trạng thái
+được tính bằng phép so sánh mảng thay vì gọi is_expired()/days_until_expiry()
+cho từng thuốc.
+"""
+from datetime import date
+from enum import IntEnum
+from typing import Dict, Iterable, List, Optional, Tuple, Any
+
+import numpy as np
+
+from src.models import Medicine, Shelf
+from src.storage import StorageEngine
+
+
+class MedicineStatus(IntEnum):
+    """
+    Mã trạng thái thuốc, giá trị lớn hơn = ưu tiên hiển thị cao hơn.
+
+    Thứ tự: Hết hạn > Hết hàng > Sắp hết hạn > Tồn kho thấp > Bình thường
+    """
+    NORMAL = 0
+    LOW_STOCK = 1
+    EXPIRING = 2
+    OUT_OF_STOCK = 3
+    EXPIRED = 4
+
+
+# Bit cờ cho từng lựa chọn "status" của bộ lọc (FilterMedicineDialog). Khác
+# mã trạng thái, một thuốc có thể thuộc nhiều nhóm (VD: sắp hết hạn + tồn thấp)
+STATUS_FILTER_BITS = {
+    'expired': 1,
+    'expiring': 2,
+    'low_stock': 4,
+    'out_of_stock': 8,
+    'normal': 16,
+}
+
+
+class ThresholdPolicy:
+    """
+    Bảng ngưỡng cảnh báo nhiều cấp.
+
+    Thứ tự phân giải (cấp sau ghi đè cấp trước):
+        1. Toàn cục (expiry_threshold, low_stock_threshold)
+        2. Khu (zone) của kệ
+        3. Kệ (shelf_id)
+        4. Thuốc (medicine_id)
+
+    Mỗi mục ghi đè là dictionary có thể chứa 'expiry_threshold' và/hoặc
+    'low_stock_threshold'; khóa nào thiếu sẽ kế thừa từ cấp trên.
+
+    Thuộc tính:
+        expiry_threshold: Ngưỡng ngày sắp hết hạn toàn cục
+        low_stock_threshold: Ngưỡng tồn kho thấp toàn cục
+        zone_overrides: Ghi đè theo khu
+        shelf_overrides: Ghi đè theo kệ
+        medicine_overrides: Ghi đè theo thuốc
+        version: Tăng mỗi khi chính sách thay đổi (dùng làm khóa cache)
+    """
+
+    LEVELS = ("zones", "shelves", "medicines")
+    KEYS = ("expiry_threshold", "low_stock_threshold")
+
+    def __init__(
+        self,
+        expiry_threshold: int = 30,
+        low_stock_threshold: int = 5
+    ):
+        """
+        Khởi tạo ThresholdPolicy với ngưỡng toàn cục.
+
+        Tham số:
+            expiry_threshold: Số ngày trước hạn để kích hoạt cảnh báo
+            low_stock_threshold: Số lượng dưới ngưỡng để kích hoạt cảnh báo
+        """
+        self._expiry_threshold = expiry_threshold
+        self._low_stock_threshold = low_stock_threshold
+        self.zone_overrides: Dict[str, Dict[str, int]] = {}
+        self.shelf_overrides: Dict[str, Dict[str, int]] = {}
+        self.medicine_overrides: Dict[str, Dict[str, int]] = {}
+        self._shelf_zones: Dict[str, str] = {}
+        self.version = 0
+
+    @property
+    def expiry_threshold(self) -> int:
+        """Ngưỡng ngày sắp hết hạn toàn cục."""
+        return self._expiry_threshold
+
+    @expiry_threshold.setter
+    def expiry_threshold(self, value: int) -> None:
+        if value != self._expiry_threshold:
+            self._expiry_threshold = value
+            self.version += 1
+
+    @property
+    def low_stock_threshold(self) -> int:
+        """Ngưỡng tồn kho thấp toàn cục."""
+        return self._low_stock_threshold
+
+    @low_stock_threshold.setter
+    def low_stock_threshold(self, value: int) -> None:
+        if value != self._low_stock_threshold:
+            self._low_stock_threshold = value
+            self.version += 1
+
+    def has_overrides(self) -> bool:
+        """
+        Kiểm tra có ghi đè nào ngoài ngưỡng toàn cục không.
+
+        Trả về:
+            True nếu có ít nhất một ghi đè theo khu, kệ hoặc thuốc
+        """
+        return bool(
+            self.zone_overrides or self.shelf_overrides or self.medicine_overrides
+        )
+
+    def _overrides_for(self, level: str) -> Dict[str, Dict[str, int]]:
+        """Lấy bảng ghi đè của một cấp."""
+        if level == "zones":
+            return self.zone_overrides
+        if level == "shelves":
+            return self.shelf_overrides
+        if level == "medicines":
+            return self.medicine_overrides
+        raise ValueError(
+            f"Cấp ngưỡng không hợp lệ '{level}'. "
+            f"Phải là một trong: {', '.join(self.LEVELS)}"
+        )
+
+    def set_override(
+        self,
+        level: str,
+        key: str,
+        expiry_threshold: Optional[int] = None,
+        low_stock_threshold: Optional[int] = None
+    ) -> None:
+        """
+        Đặt ngưỡng ghi đè cho một khu, kệ hoặc thuốc.
+
+        Tham số:
+            level: 'zones', 'shelves' hoặc 'medicines'
+            key: Mã khu / ID kệ / ID thuốc
+            expiry_threshold: Ngưỡng ngày sắp hết hạn (None = kế thừa)
+            low_stock_threshold: Ngưỡng tồn kho thấp (None = kế thừa)
+
+        Ngoại lệ:
+            ValueError: Nếu cấp không hợp lệ hoặc ngưỡng âm
+        """
+        overrides = self._overrides_for(level)
+        entry: Dict[str, int] = {}
+        if expiry_threshold is not None:
+            if expiry_threshold < 0:
+                raise ValueError("Ngưỡng hạn dùng phải >= 0")
+            entry["expiry_threshold"] = expiry_threshold
+        if low_stock_threshold is not None:
+            if low_stock_threshold < 0:
+                raise ValueError("Ngưỡng tồn kho phải >= 0")
+            entry["low_stock_threshold"] = low_stock_threshold
+
+        if entry:
+            overrides[key] = entry
+        else:
+            overrides.pop(key, None)
+        self.version += 1
+
+    def clear_override(self, level: str, key: str) -> None:
+        """
+        Xóa ngưỡng ghi đè của một khu, kệ hoặc thuốc.
+
+        Tham số:
+            level: 'zones', 'shelves' hoặc 'medicines'
+            key: Mã khu / ID kệ / ID thuốc
+        """
+        if self._overrides_for(level).pop(key, None) is not None:
+            self.version += 1
+
+    def set_shelves(self, shelves: List[Shelf]) -> None:
+        """
+        Cập nhật ánh xạ kệ -> khu dùng cho ghi đè theo khu.
+
+        Tham số:
+            shelves: Danh sách kệ hiện có
+        """
+        shelf_zones = {shelf.id: shelf.zone for shelf in shelves}
+        if shelf_zones != self._shelf_zones:
+            self._shelf_zones = shelf_zones
+            self.version += 1
+
+    def set_shelf_zone(self, shelf_id: str, zone: Optional[str]) -> None:
+        """
+        Cập nhật khu của một kệ (kệ mới/sửa/xóa) mà không quét lại danh sách kệ.
+
+        Phiên bản chỉ tăng khi thay đổi có thể đổi ngưỡng của thuốc: khu cũ
+        hoặc khu mới có ghi đè riêng.
+
+        Tham số:
+            shelf_id: ID kệ
+            zone: Khu mới của kệ (None nếu kệ đã bị xóa)
+        """
+        old_zone = self._shelf_zones.get(shelf_id)
+        if zone is None:
+            self._shelf_zones.pop(shelf_id, None)
+        else:
+            self._shelf_zones[shelf_id] = zone
+        if old_zone != zone and (
+            old_zone in self.zone_overrides or zone in self.zone_overrides
+        ):
+            self.version += 1
+
+    def thresholds_for(self, medicine: Medicine) -> Tuple[int, int]:
+        """
+        Phân giải ngưỡng cho một thuốc.
+
+        Tham số:
+            medicine: Thuốc cần phân giải
+
+        Trả về:
+            Tuple (expiry_threshold, low_stock_threshold)
+        """
+        expiry = self._expiry_threshold
+        stock = self._low_stock_threshold
+        if not self.has_overrides():
+            return expiry, stock
+
+        zone = self._shelf_zones.get(medicine.shelf_id)
+        for entry in (
+            self.zone_overrides.get(zone) if zone is not None else None,
+            self.shelf_overrides.get(medicine.shelf_id),
+            self.medicine_overrides.get(medicine.id),
+        ):
+            if entry:
+                expiry = entry.get("expiry_threshold", expiry)
+                stock = entry.get("low_stock_threshold", stock)
+        return expiry, stock
+
+    def resolve(self, medicines: List[Medicine]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Phân giải ngưỡng cho cả danh sách thành mảng theo từng dòng.
+
+        Khi không có ghi đè, trả về mảng hằng mà không duyệt danh sách.
+
+        Tham số:
+            medicines: Danh sách thuốc
+
+        Trả về:
+            Tuple (mảng expiry_threshold, mảng low_stock_threshold)
+        """
+        n = len(medicines)
+        if not self.has_overrides():
+            return (
+                np.full(n, self._expiry_threshold, dtype=np.int64),
+                np.full(n, self._low_stock_threshold, dtype=np.int64),
+            )
+
+        pairs = [self.thresholds_for(m) for m in medicines]
+        resolved = np.array(pairs, dtype=np.int64).reshape(n, 2)
+        return resolved[:, 0], resolved[:, 1]
+
+    def evaluate(
+        self,
+        medicines: List[Medicine],
+        today: Optional[date] = None
+    ) -> 'StatusTable':
+        """
+        Đánh giá trạng thái toàn bộ danh sách thuốc dạng vector.
+
+        Tham số:
+            medicines: Danh sách thuốc
+            today: Ngày tham chiếu (mặc định: hôm nay)
+
+        Trả về:
+            StatusTable chứa mặt nạ và mã trạng thái theo từng dòng
+        """
+        return StatusTable(medicines, self, today or date.today())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Chuyển đổi các ghi đè thành dictionary để lưu JSON.
+
+        Trả về:
+            Dictionary với các khóa 'zones', 'shelves', 'medicines'
+        """
+        return {
+            "zones": dict(self.zone_overrides),
+            "shelves": dict(self.shelf_overrides),
+            "medicines": dict(self.medicine_overrides),
+        }
+
+    def load_overrides(self, filepath: str) -> None:
+        """
+        Tải bảng ghi đè từ file JSON.
+
+        File không tồn tại được coi như không có ghi đè.
+
+        Tham số:
+            filepath: Đường dẫn tới file JSON ngưỡng
+        """
+        try:
+            data = StorageEngine().read_json(filepath)
+        except FileNotFoundError:
+            data = {}
+
+        for level in self.LEVELS:
+            overrides = self._overrides_for(level)
+            overrides.clear()
+            for key, entry in data.get(level, {}).items():
+                overrides[key] = {
+                    k: int(v) for k, v in entry.items() if k in self.KEYS
+                }
+        self.version += 1
+
+    def save_overrides(self, filepath: str) -> None:
+        """
+        Lưu bảng ghi đè vào file JSON.
+
+        Tham số:
+            filepath: Đường dẫn tới file JSON ngưỡng
+
+        Ngoại lệ:
+            IOError: Nếu thao tác ghi thất bại
+        """
+        StorageEngine().write_json(filepath, self.to_dict())
+
+
+class StatusTable:
+    """
+    Trạng thái của cả danh sách thuốc, tính một lần dạng vector.
+
+    Thuộc tính:
+        medicines: Danh sách thuốc đã đánh giá (giữ nguyên thứ tự)
+        today: Ngày tham chiếu
+        days_left: Số ngày còn lại đến hạn theo từng dòng
+        quantities: Số lượng theo từng dòng
+        expiry_thresholds: Ngưỡng hạn dùng đã phân giải theo từng dòng
+        low_stock_thresholds: Ngưỡng tồn kho đã phân giải theo từng dòng
+        expired: Mặt nạ thuốc đã hết hạn
+        expiring: Mặt nạ thuốc trong ngưỡng hạn dùng (kể cả đã hết hạn)
+        out_of_stock: Mặt nạ thuốc hết hàng
+        low_stock: Mặt nạ thuốc dưới ngưỡng tồn kho (kể cả hết hàng)
+        status: Mã MedicineStatus ưu tiên cao nhất theo từng dòng
+    """
+
+    def __init__(self, medicines: List[Medicine], policy: ThresholdPolicy, today: date):
+        """
+        Đánh giá trạng thái danh sách thuốc.
+
+        Tham số:
+            medicines: Danh sách thuốc
+            policy: Chính sách ngưỡng để phân giải
+            today: Ngày tham chiếu
+        """
+        n = len(medicines)
+        self.medicines = medicines
+        self.today = today
+        self._row_index: Optional[Dict[str, int]] = None
+
+        ordinals = np.fromiter(
+            (m.expiry_date.toordinal() for m in medicines),
+            dtype=np.int64, count=n
+        )
+        self.quantities = np.fromiter(
+            (m.quantity for m in medicines), dtype=np.int64, count=n
+        )
+        self.days_left = ordinals - today.toordinal()
+        self.expiry_thresholds, self.low_stock_thresholds = policy.resolve(medicines)
+
+        self.expired = self.days_left <= 0
+        self.expiring = self.days_left <= self.expiry_thresholds
+        self.out_of_stock = self.quantities == 0
+        self.low_stock = self.quantities <= self.low_stock_thresholds
+
+        # Gán theo thứ tự ưu tiên tăng dần — trạng thái sau ghi đè trạng thái trước
+        status = np.full(n, MedicineStatus.NORMAL, dtype=np.int8)
+        status[self.low_stock] = MedicineStatus.LOW_STOCK
+        status[self.expiring] = MedicineStatus.EXPIRING
+        status[self.out_of_stock] = MedicineStatus.OUT_OF_STOCK
+        status[self.expired] = MedicineStatus.EXPIRED
+        self.status = status
+
+    # Các mảng theo dòng (cùng độ dài với medicines)
+    _ROW_ARRAYS = (
+        "days_left", "quantities", "expiry_thresholds", "low_stock_thresholds",
+        "expired", "expiring", "out_of_stock", "low_stock", "status",
+    )
+
+    def __len__(self) -> int:
+        return len(self.medicines)
+
+    def apply_changes(
+        self,
+        policy: ThresholdPolicy,
+        inserted: Iterable[Medicine] = (),
+        updated: Iterable[Tuple[Medicine, Medicine]] = (),
+        removed: Iterable[Medicine] = ()
+    ) -> None:
+        """
+        Cập nhật bảng tại chỗ theo thay đổi của kho.
+
+        Chỉ các thuốc thêm/sửa được đánh giá; các dòng khác giữ nguyên. Thứ
+        tự dòng khớp với InventoryManager.medicines: sửa thay tại chỗ, xóa
+        bỏ dòng, thêm nối vào cuối.
+
+        Tham số:
+            policy: Chính sách ngưỡng (cùng phiên bản với lúc đánh giá bảng)
+            inserted: Thuốc mới
+            updated: Cặp (cũ, mới); ID có thể khác nhau khi đổi kệ
+            removed: Thuốc đã xóa
+        """
+        inserted, updated = list(inserted), list(updated)
+        changed = [new for _, new in updated] + inserted
+        delta = StatusTable(changed, policy, self.today) if changed else None
+
+        for i, (old, new) in enumerate(updated):
+            row = self.row_of(old.id)
+            if row < 0:
+                continue
+            self.medicines[row] = new
+            for name in self._ROW_ARRAYS:
+                getattr(self, name)[row] = getattr(delta, name)[i]
+            if new.id != old.id:
+                del self._row_index[old.id]
+                self._row_index[new.id] = row
+
+        rows = [row for row in (self.row_of(m.id) for m in removed) if row >= 0]
+        if rows:
+            for name in self._ROW_ARRAYS:
+                setattr(self, name, np.delete(getattr(self, name), rows))
+            for row in sorted(rows, reverse=True):
+                del self.medicines[row]
+            self._row_index = None
+
+        if inserted:
+            first = len(updated)
+            for name in self._ROW_ARRAYS:
+                setattr(self, name, np.concatenate(
+                    (getattr(self, name), getattr(delta, name)[first:])
+                ))
+            start = len(self.medicines)
+            self.medicines.extend(inserted)
+            if self._row_index is not None:
+                for offset, medicine in enumerate(inserted):
+                    self._row_index[medicine.id] = start + offset
+
+    def advance(self, policy: ThresholdPolicy, today: date, medicine_ids: Iterable[str]) -> None:
+        """
+        Đưa bảng sang ngày mới mà không đánh giá lại toàn bộ.
+
+        Số ngày còn lại của mọi dòng chỉ cần dịch đi (phép trừ vector); các
+        mặt nạ hạn dùng chỉ đổi ở những thuốc vừa chuyển trạng thái (theo
+        ExpiryIndex), nên chỉ các dòng đó được đánh giá lại.
+
+        Tham số:
+            policy: Chính sách ngưỡng (cùng phiên bản với lúc đánh giá bảng)
+            today: Ngày mới
+            medicine_ids: ID các thuốc vừa đổi trạng thái hạn dùng
+        """
+        self.days_left -= (today - self.today).days
+        self.today = today
+        changed = [self.medicines[row] for row in map(self.row_of, medicine_ids) if row >= 0]
+        if changed:
+            self.apply_changes(policy, updated=[(m, m) for m in changed])
+
+    def select(self, mask: np.ndarray) -> List[Medicine]:
+        """
+        Lấy các thuốc thỏa mặt nạ, giữ nguyên thứ tự gốc.
+
+        Tham số:
+            mask: Mảng bool cùng độ dài danh sách
+
+        Trả về:
+            Danh sách thuốc tương ứng
+        """
+        return [self.medicines[i] for i in np.flatnonzero(mask)]
+
+    def row_of(self, medicine_id: str) -> int:
+        """
+        Tìm dòng của thuốc theo ID.
+
+        Tham số:
+            medicine_id: ID thuốc
+
+        Trả về:
+            Chỉ mục dòng, -1 nếu không có
+        """
+        if self._row_index is None:
+            self._row_index = {m.id: i for i, m in enumerate(self.medicines)}
+        return self._row_index.get(medicine_id, -1)
+
+    def status_at(self, row: int) -> MedicineStatus:
+        """
+        Lấy mã trạng thái của một dòng.
+
+        Tham số:
+            row: Chỉ mục dòng
+
+        Trả về:
+            MedicineStatus của dòng
+        """
+        return MedicineStatus(int(self.status[row]))
+
+    def count(self, status: MedicineStatus) -> int:
+        """
+        Đếm số dòng có mã trạng thái chỉ định.
+
+        Tham số:
+            status: MedicineStatus cần đếm
+
+        Trả về:
+            Số dòng
+        """
+        return int(np.count_nonzero(self.status == status))
@@ -0,0 +1,195 @@
+"""
+Bộ lập lịch cảnh báo nền — PHARMA.SYS.
+
+Giữ trạng thái cảnh báo hạn dùng luôn đúng khi ứng dụng mở qua đêm:
+- QTimer trên luồng GUI chỉ hẹn giờ tới nửa đêm (không tính toán gì)
+- Worker trên QThread riêng sở hữu ExpiryIndex: xây chỉ mục và xử lý
+  các bucket đến hạn, không bao giờ quét toàn bộ kho trên luồng GUI
+- Phát tín hiệu Qt khi sang ngày mới và khi có thuốc đổi trạng thái
+"""
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from PyQt6.QtCore import (
+    QCoreApplication, QObject, QThread, QTimer, pyqtSignal, pyqtSlot
+)
+
+from src.models import Medicine
+from src.alerts import AlertSystem, ExpiryIndex
+from src.events import InventoryEvent, ShelfChanged
+
+
+class _AlertWorker(QObject):
+    """
+    Worker living on the scheduler thread; owns the ExpiryIndex.
+
+    Signals:
+        advanced: Emitted after a day rollover was processed (today, transitions)
+        rebucketed: Emitted after a threshold change was applied (transitions)
+    """
+
+    advanced = pyqtSignal(object, list)  # date, List[AlertTransition]
+    rebucketed = pyqtSignal(list)        # List[AlertTransition]
+
+    def __init__(self, alert_system: AlertSystem):
+        super().__init__()
+        self.index = ExpiryIndex(alert_system)
+
+    @pyqtSlot(list)
+    def rebuild(self, medicines: List[Medicine]):
+        """Rebuild the index from a snapshot of the medicine list."""
+        self.index.build(medicines, date.today())
+
+    @pyqtSlot(object)
+    def apply_event(self, event: InventoryEvent):
+        """Update the index for one inventory change."""
+        if isinstance(event, ShelfChanged):
+            # Đổi khu có thể đổi ngưỡng (ghi đè theo khu) của mọi thuốc trên kệ
+            if event.old and event.new and event.old.zone != event.new.zone:
+                self.rebucket()
+            return
+        self.index.apply_event(event)
+
+    @pyqtSlot()
+    def rebucket(self):
+        """Re-classify indexed medicines after a threshold change."""
+        transitions = self.index.rebucket()
+        self.rebucketed.emit(transitions)
+
+    @pyqtSlot()
+    def advance(self):
+        """Process due buckets up to today and report state changes."""
+        today = date.today()
+        transitions = self.index.advance(today)
+        self.advanced.emit(today, transitions)
+
+
+class AlertScheduler(QObject):
+    """
+    Background scheduler that re-evaluates expiry alerts at day rollover.
+
+    The GUI thread only owns a single-shot QTimer armed for the next
+    midnight. All index work (full rebuilds and incremental bucket
+    processing) runs on a dedicated QThread.
+
+    Signals:
+        day_changed: Emitted after midnight rollover with the new date and
+            the list of AlertTransition it caused (possibly empty)
+        alerts_changed: Emitted with a list of AlertTransition when
+            at least one medicine entered or left an expiry state
+    """
+
+    day_changed = pyqtSignal(object, list)  # date, List[AlertTransition]
+    alerts_changed = pyqtSignal(list)    # List[AlertTransition]
+
+    _rebuild_requested = pyqtSignal(list)
+    _event_requested = pyqtSignal(object)
+    _advance_requested = pyqtSignal()
+    _rebucket_requested = pyqtSignal()
+
+    # Thức dậy tối thiểu mỗi 15 phút để bắt kịp khi máy ngủ/đổi giờ hệ thống
+    MAX_WAKE_INTERVAL_MS = 15 * 60 * 1000
+
+    # Trễ thêm sau nửa đêm để chắc chắn date.today() đã sang ngày mới
+    ROLLOVER_SLACK_MS = 1000
+
+    def __init__(self, alert_system: Optional[AlertSystem] = None, parent=None):
+        """
+        Initialize Alert Scheduler.
+
+        Args:
+            alert_system: AlertSystem providing thresholds
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+
+        self.alert_system = alert_system or AlertSystem()
+        self._current_day = date.today()
+
+        self._thread = QThread(self)
+        self._worker = _AlertWorker(self.alert_system)
+        self._worker.moveToThread(self._thread)
+        self._thread.finished.connect(self._worker.deleteLater)
+
+        # Kết nối xuyên luồng (tự động dùng QueuedConnection)
+        self._rebuild_requested.connect(self._worker.rebuild)
+        self._event_requested.connect(self._worker.apply_event)
+        self._advance_requested.connect(self._worker.advance)
+        self._rebucket_requested.connect(self._worker.rebucket)
+        self._worker.advanced.connect(self._on_advanced)
+        self._worker.rebucketed.connect(self._on_rebucketed)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timeout)
+
+        app = QCoreApplication.instance()
+        if app:
+            app.aboutToQuit.connect(self.stop)
+
+    def start(self):
+        """Start the worker thread and arm the rollover timer."""
+        if not self._thread.isRunning():
+            self._thread.start()
+        self._current_day = date.today()
+        self._arm_timer()
+
+    def stop(self):
+        """Stop the timer and shut the worker thread down."""
+        self._timer.stop()
+        if self._thread.isRunning():
+            self._thread.quit()
+            self._thread.wait()
+
+    def set_medicines(self, medicines: List[Medicine]):
+        """
+        Hand a new medicine snapshot to the worker for re-indexing.
+
+        Args:
+            medicines: Current medicine list (copied before crossing threads)
+        """
+        self._rebuild_requested.emit(list(medicines))
+
+    def apply_event(self, event: InventoryEvent):
+        """
+        Forward one inventory change to the worker (incremental re-index).
+
+        Args:
+            event: Event from InventoryManager.events
+        """
+        self._event_requested.emit(event)
+
+    def thresholds_changed(self):
+        """
+        Re-bucket the existing index for new thresholds on the worker thread.
+
+        Cheaper than set_medicines(): no snapshot is copied and nothing is
+        reloaded; only alert states are re-classified.
+        """
+        self._rebucket_requested.emit()
+
+    def _arm_timer(self):
+        """Arm the single-shot timer for the next midnight (capped)."""
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        msecs = int((midnight - now).total_seconds() * 1000) + self.ROLLOVER_SLACK_MS
+        self._timer.start(max(0, min(msecs, self.MAX_WAKE_INTERVAL_MS)))
+
+    def _on_timeout(self):
+        """Check for rollover; only signal the worker when the day changed."""
+        today = date.today()
+        if today != self._current_day:
+            self._current_day = today
+            self._advance_requested.emit()
+        self._arm_timer()
+
+    def _on_advanced(self, today: date, transitions: list):
+        """Forward worker results to GUI listeners."""
+        self.day_changed.emit(today, transitions)
+        if transitions:
+            self.alerts_changed.emit(transitions)
+
+    def _on_rebucketed(self, transitions: list):
+        """Forward threshold-change results to GUI listeners."""
+        if transitions:
+            self.alerts_changed.emit(transitions)
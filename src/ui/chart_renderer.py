@@ -0,0 +1,313 @@
+"""
+Bộ vẽ biểu đồ nền — PHARMA.SYS.
+
+Đưa việc vẽ Matplotlib ra khỏi luồng GUI:
+- Worker trên QThread riêng sở hữu các Figure (src/ui/charts.py), cập
+  nhật artist và vẽ bằng Agg vào bộ đệm RGBA
+- Khung hình hoàn tất được bọc bằng QImage trỏ thẳng vào bộ đệm Agg
+  (không sao chép) rồi gửi về luồng GUI qua tín hiệu
+- ChartView chỉ việc vẽ QImage có sẵn trong paintEvent
+- Nhiều yêu cầu cập nhật liên tiếp được gộp thành một lần vẽ
+- Đổi chủ đề gửi bảng màu mới cho biểu đồ có sẵn (không dựng lại Figure)
+- Biểu đồ được tạo ngay trên luồng vẽ: Matplotlib chỉ được nạp ở đó, không
+  làm chậm lần hiển thị đầu tiên của cửa sổ
+"""
+from itertools import count
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Set, Tuple
+
+from PyQt6.QtCore import (
+    QCoreApplication, QObject, QSize, QThread, QTimer, pyqtSignal, pyqtSlot
+)
+from PyQt6.QtGui import QColor, QImage, QPainter
+from PyQt6.QtWidgets import QSizePolicy, QWidget
+
+from src.ui.theme.cards import ChartPalette
+
+if TYPE_CHECKING:
+    from src.ui.charts import AggChart
+
+
+class ChartFrame:
+    """
+    A finished chart frame.
+
+    The QImage points directly at the Agg renderer's RGBA buffer (no copy);
+    the frame keeps the renderer alive for as long as the image is in use.
+    Each frame has its own renderer, so a later draw never overwrites it.
+
+    Attributes:
+        image: QImage wrapping the Agg buffer
+    """
+
+    __slots__ = ("image", "_renderer", "_buffer")
+
+    def __init__(self, renderer, device_pixel_ratio: float = 1.0):
+        self._renderer = renderer
+        self._buffer = renderer.buffer_rgba()
+        width, height = int(renderer.width), int(renderer.height)
+        self.image = QImage(
+            self._buffer, width, height, width * 4, QImage.Format.Format_RGBA8888
+        )
+        self.image.setDevicePixelRatio(device_pixel_ratio)
+
+
+class _ChartWorker(QObject):
+    """
+    Worker living on the renderer thread; owns every registered chart.
+
+    Signals:
+        frame_ready: Emitted with (chart key, ChartFrame) after a draw
+    """
+
+    frame_ready = pyqtSignal(int, object)
+
+    def __init__(self):
+        super().__init__()
+        self._charts: Dict[int, "AggChart"] = {}
+        self._pixel_ratios: Dict[int, float] = {}
+        self._dirty: Set[int] = set()
+        self._scheduled = False
+
+    @pyqtSlot(int, object)
+    def add(self, key: int, make_chart: Callable[[], "AggChart"]):
+        """Create a chart on this thread and take ownership of it."""
+        self._charts[key] = make_chart()
+        self._pixel_ratios[key] = 1.0
+
+    @pyqtSlot(int)
+    def remove(self, key: int):
+        """Forget a chart whose view was destroyed."""
+        self._charts.pop(key, None)
+        self._pixel_ratios.pop(key, None)
+        self._dirty.discard(key)
+
+    @pyqtSlot(int, object)
+    def update(self, key: int, data: object):
+        """Apply new data to a chart and schedule a draw."""
+        chart = self._charts.get(key)
+        if chart is not None:
+            chart.set_data(data)
+            self._schedule(key)
+
+    @pyqtSlot(int, object)
+    def set_palette(self, key: int, palette: ChartPalette):
+        """Re-colour a chart for a new theme and schedule a draw."""
+        chart = self._charts.get(key)
+        if chart is not None:
+            chart.set_palette(palette)
+            self._schedule(key)
+
+    @pyqtSlot(int, int, int, float)
+    def resize(self, key: int, width: int, height: int, device_pixel_ratio: float):
+        """Resize a chart's figure and schedule a draw."""
+        chart = self._charts.get(key)
+        if chart is not None:
+            chart.resize(width, height, device_pixel_ratio)
+            self._pixel_ratios[key] = device_pixel_ratio
+            self._schedule(key)
+
+    def _schedule(self, key: int):
+        """Mark a chart dirty; draw once the queued requests are drained."""
+        self._dirty.add(key)
+        if not self._scheduled:
+            self._scheduled = True
+            QTimer.singleShot(0, self._render_dirty)
+
+    def _render_dirty(self):
+        """Draw every dirty chart and hand the frames to the GUI thread."""
+        self._scheduled = False
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            chart = self._charts.get(key)
+            if chart is None:
+                continue
+            frame = ChartFrame(chart.render(), self._pixel_ratios[key])
+            self.frame_ready.emit(key, frame)
+
+
+class ChartRenderer(QObject):
+    """
+    Background renderer shared by all ChartView widgets.
+
+    The GUI thread only forwards data and sizes; all Matplotlib work runs on
+    a dedicated QThread, and finished QImages come back via a signal.
+    """
+
+    _add_requested = pyqtSignal(int, object)
+    _remove_requested = pyqtSignal(int)
+    _update_requested = pyqtSignal(int, object)
+    _palette_requested = pyqtSignal(int, object)
+    _resize_requested = pyqtSignal(int, int, int, float)
+
+    def __init__(self, parent=None):
+        """
+        Initialize Chart Renderer.
+
+        Args:
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+
+        self._keys = count()
+        self._views: Dict[int, "ChartView"] = {}
+
+        self._thread = QThread(self)
+        self._worker = _ChartWorker()
+        self._worker.moveToThread(self._thread)
+        self._thread.finished.connect(self._worker.deleteLater)
+
+        # Kết nối xuyên luồng (tự động dùng QueuedConnection)
+        self._add_requested.connect(self._worker.add)
+        self._remove_requested.connect(self._worker.remove)
+        self._update_requested.connect(self._worker.update)
+        self._palette_requested.connect(self._worker.set_palette)
+        self._resize_requested.connect(self._worker.resize)
+        self._worker.frame_ready.connect(self._on_frame_ready)
+
+        app = QCoreApplication.instance()
+        if app:
+            app.aboutToQuit.connect(self.stop)
+
+    def start(self):
+        """Start the worker thread."""
+        if not self._thread.isRunning():
+            self._thread.start()
+
+    def stop(self):
+        """Shut the worker thread down."""
+        if self._thread.isRunning():
+            self._thread.quit()
+            self._thread.wait()
+
+    def attach(self, view: "ChartView", make_chart: Callable[[], "AggChart"]) -> int:
+        """
+        Register a view; its chart is created by the worker thread.
+
+        Args:
+            view: View showing the chart
+            make_chart: Factory called once on the worker thread
+
+        Returns:
+            Key identifying the chart
+        """
+        key = next(self._keys)
+        self._views[key] = view
+        view.destroyed.connect(lambda _=None, k=key: self.detach(k))
+        self._add_requested.emit(key, make_chart)
+        return key
+
+    def detach(self, key: int):
+        """Unregister a view (called automatically when it is destroyed)."""
+        if self._views.pop(key, None) is None:
+            return
+        try:
+            self._remove_requested.emit(key)
+        except RuntimeError:
+            # Bộ vẽ đã bị hủy trước view (khi đóng ứng dụng) — không còn gì để dọn
+            pass
+
+    def update_chart(self, key: int, data: object):
+        """Send new chart data to the worker."""
+        self._update_requested.emit(key, data)
+
+    def set_chart_palette(self, key: int, palette: ChartPalette):
+        """Send a new theme palette to the worker."""
+        self._palette_requested.emit(key, palette)
+
+    def resize_chart(self, key: int, width: int, height: int, device_pixel_ratio: float):
+        """Send a new widget size to the worker."""
+        self._resize_requested.emit(key, width, height, device_pixel_ratio)
+
+    def _on_frame_ready(self, key: int, frame: ChartFrame):
+        """Route a finished frame to its view."""
+        view = self._views.get(key)
+        if view is not None:
+            view.set_frame(frame)
+
+
+class ChartView(QWidget):
+    """
+    Widget showing a chart rendered off-thread by a ChartRenderer.
+
+    Drop-in replacement for a FigureCanvasQTAgg: paintEvent only blits the
+    latest QImage; it never runs Matplotlib.
+    """
+
+    # Gộp các sự kiện đổi kích thước liên tiếp (kéo cửa sổ)
+    RESIZE_DEBOUNCE_MS = 30
+
+    # Độ phân giải của figsize (bằng AggChart.DPI)
+    CHART_DPI = 100
+
+    def __init__(
+        self,
+        renderer: ChartRenderer,
+        make_chart: Callable[[], "AggChart"],
+        palette: ChartPalette,
+        figsize: Tuple[float, float] = (5, 3.5),
+        parent=None
+    ):
+        """
+        Initialize Chart View.
+
+        Args:
+            renderer: Shared background renderer
+            make_chart: Factory building the chart; called on the renderer
+                thread, so Matplotlib is never imported by the GUI thread
+            palette: Colours the chart is created with
+            figsize: Figure size in inches passed to the chart (size hint)
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self._renderer = renderer
+        self._background = QColor(palette.surface)
+        self._frame: Optional[ChartFrame] = None
+
+        # Kích thước gợi ý theo figsize, giống FigureCanvasQTAgg
+        width, height = figsize
+        self._size_hint = QSize(int(width * self.CHART_DPI), int(height * self.CHART_DPI))
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self._key = renderer.attach(self, make_chart)
+
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(self.RESIZE_DEBOUNCE_MS)
+        self._resize_timer.timeout.connect(self._send_size)
+
+    def set_data(self, data: object):
+        """Request a redraw with new data (returns immediately)."""
+        self._renderer.update_chart(self._key, data)
+
+    def set_palette(self, palette: ChartPalette):
+        """Re-colour the chart for a new theme (returns immediately)."""
+        self._background = QColor(palette.surface)
+        self._renderer.set_chart_palette(self._key, palette)
+        self.update()
+
+    def set_frame(self, frame: ChartFrame):
+        """Show a finished frame."""
+        self._frame = frame
+        self.update()
+
+    def _send_size(self):
+        """Forward the current size to the renderer."""
+        self._renderer.resize_chart(
+            self._key, self.width(), self.height(), self.devicePixelRatioF()
+        )
+
+    def sizeHint(self) -> QSize:
+        return self._size_hint
+
+    def minimumSizeHint(self) -> QSize:
+        return QSize(10, 10)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._resize_timer.start()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self._background)
+        if self._frame is not None:
+            painter.drawImage(0, 0, self._frame.image)
+        painter.end()
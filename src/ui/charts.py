@@ -0,0 +1,247 @@
+"""
+Biểu đồ Dashboard vẽ bằng Matplotlib Agg — PHARMA.SYS.
+
+Không phụ thuộc Qt: mỗi biểu đồ sở hữu một Figure riêng và được vẽ ra bộ
+đệm RGBA, nên có thể chạy trên luồng nền (xem src/ui/chart_renderer.py).
+
+Tính năng:
+- Tạo artist một lần; mỗi lần làm mới chỉ cập nhật dữ liệu tại chỗ
+- Bố cục (tight_layout) chỉ tính lại khi đổi kích thước hoặc nhãn trục
+- Mỗi khung hình dùng RendererAgg mới, nên bộ đệm đã giao cho giao diện
+  không bao giờ bị vẽ đè
+- Đổi chủ đề chỉ tô lại màu các artist có sẵn (set_palette), không dựng
+  lại Figure
+"""
+from typing import List, Optional
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg, RendererAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Wedge
+
+from src.dashboard_manager import PieChartData, BarChartData
+from src.ui.theme.cards import ChartPalette
+
+
+class AggChart:
+    """
+    Base class for a Matplotlib figure rendered with Agg into RGBA buffers.
+
+    Not thread-safe: all calls on one instance must come from one thread
+    at a time (the chart renderer worker owns it after construction).
+    """
+
+    DPI = 100
+
+    def __init__(self, palette: ChartPalette, figsize=(5, 3.5)):
+        self.palette = palette
+        self.figure = Figure(figsize=figsize, dpi=self.DPI)
+        FigureCanvasAgg(self.figure)
+        self.figure.subplots_adjust(left=0.05, right=0.95, top=0.92, bottom=0.05)
+        self.ax = self.figure.add_subplot(111)
+        self._apply_surface(palette)
+        self._empty_text = self.ax.text(
+            0.5, 0.5, 'Không có dữ liệu',
+            ha='center', va='center',
+            fontsize=14, color='gray',
+            transform=self.ax.transAxes,
+            visible=False
+        )
+
+    def set_palette(self, palette: ChartPalette):
+        """
+        Re-colour the existing artists for a new theme.
+
+        Args:
+            palette: Colours of the new theme
+        """
+        self.palette = palette
+        self._apply_surface(palette)
+
+    def _apply_surface(self, palette: ChartPalette):
+        """Colour the figure and axes background."""
+        self.figure.patch.set_facecolor(palette.surface)
+        self.ax.set_facecolor(palette.surface)
+
+    def resize(self, width: int, height: int, device_pixel_ratio: float = 1.0):
+        """
+        Match the figure to a widget size.
+
+        Args:
+            width: Logical width in pixels
+            height: Logical height in pixels
+            device_pixel_ratio: Screen scale factor (HiDPI)
+        """
+        self.figure.set_dpi(self.DPI * device_pixel_ratio)
+        self.figure.set_size_inches(
+            max(width, 1) / self.DPI, max(height, 1) / self.DPI, forward=False
+        )
+
+    def render(self) -> RendererAgg:
+        """
+        Draw the figure into a fresh Agg renderer.
+
+        Returns:
+            The renderer; its buffer_rgba() holds the finished frame
+        """
+        width, height = self.figure.bbox.size
+        renderer = RendererAgg(int(width), int(height), self.figure.dpi)
+        self.figure.draw(renderer)
+        return renderer
+
+
+class DonutChart(AggChart):
+    """Donut chart of the expiry distribution with reusable wedge artists."""
+
+    # Hình học donut — giống các tham số trước đây truyền cho ax.pie()
+    START_ANGLE = 90
+    LABEL_DISTANCE = 1.1
+    PCT_DISTANCE = 0.75
+    WIDTH = 0.4
+
+    def __init__(self, palette: ChartPalette, figsize=(5, 3.5)):
+        super().__init__(palette, figsize)
+        self.ax.set(frame_on=False, xticks=[], yticks=[],
+                    xlim=(-1.25, 1.25), ylim=(-1.25, 1.25))
+        self.ax.set_aspect('equal')
+        self._slices: List[tuple] = []
+
+    def _slice(self, index: int) -> tuple:
+        """Return the (wedge, label, percent) artists for a slot, creating them once."""
+        while len(self._slices) <= index:
+            wedge = Wedge(
+                (0, 0), 1, 0, 0,
+                width=self.WIDTH,
+                edgecolor=self.palette.surface,
+                linewidth=2,
+                clip_on=False
+            )
+            self.ax.add_patch(wedge)
+            label = self.ax.text(
+                0, 0, '', va='center',
+                fontsize=9, color=self.palette.text_primary
+            )
+            pct = self.ax.text(
+                0, 0, '', ha='center', va='center',
+                fontsize=8, fontweight='bold', color='#FFFFFF'
+            )
+            self._slices.append((wedge, label, pct))
+        return self._slices[index]
+
+    def set_palette(self, palette: ChartPalette):
+        super().set_palette(palette)
+        for wedge, label, _ in self._slices:
+            wedge.set_edgecolor(palette.surface)
+            label.set_color(palette.text_primary)
+
+    def set_data(self, data: PieChartData):
+        """Cập nhật góc, nhãn và màu các lát donut tại chỗ."""
+        sizes = data.sizes if data.has_data else []
+        total = float(sum(sizes))
+        theta1 = float(self.START_ANGLE)
+
+        for i, size in enumerate(sizes):
+            wedge, label, pct = self._slice(i)
+            theta2 = theta1 + 360.0 * size / total
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+            wedge.set_facecolor(data.colors[i])
+
+            mid = np.deg2rad((theta1 + theta2) / 2)
+            x, y = np.cos(mid), np.sin(mid)
+            label.set_text(data.labels[i])
+            label.set_position((self.LABEL_DISTANCE * x, self.LABEL_DISTANCE * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            pct.set_text('%1.0f%%' % (100.0 * size / total))
+            pct.set_position((self.PCT_DISTANCE * x, self.PCT_DISTANCE * y))
+
+            for artist in (wedge, label, pct):
+                artist.set_visible(True)
+            theta1 = theta2
+
+        # Ẩn các lát không còn dùng thay vì xóa chúng
+        for wedge, label, pct in self._slices[len(sizes):]:
+            for artist in (wedge, label, pct):
+                artist.set_visible(False)
+
+        self._empty_text.set_visible(not sizes)
+
+
+class BarChart(AggChart):
+    """Top-N quantity bar chart with a fixed pool of bar artists."""
+
+    def __init__(self, palette: ChartPalette, max_bars: int, figsize=(6, 3.5)):
+        super().__init__(palette, figsize)
+        self._bars = list(self.ax.bar(
+            range(max_bars), [0] * max_bars,
+            color=palette.bar,
+            width=0.6,
+            edgecolor='none',
+            linewidth=0,
+            zorder=3
+        ))
+        self.ax.tick_params(axis='x', labelsize=8)
+        self.ax.tick_params(axis='y', labelsize=9)
+        self.ax.spines['top'].set_visible(False)
+        self.ax.spines['right'].set_visible(False)
+        self.ax.yaxis.grid(True, alpha=0.3)
+        self.ax.set_axisbelow(True)
+        self._apply_axis_colors(palette)
+
+        # Chỉ tính lại bố cục khi đổi kích thước hoặc nhãn trục x đổi
+        self._layout_pending = True
+        self._names: Optional[tuple] = None
+
+    def set_palette(self, palette: ChartPalette):
+        super().set_palette(palette)
+        for bar in self._bars:
+            bar.set_facecolor(palette.bar)
+        self._apply_axis_colors(palette)
+
+    def _apply_axis_colors(self, palette: ChartPalette):
+        """Colour ticks, spines and grid lines."""
+        self.ax.tick_params(axis='both', colors=palette.text_secondary)
+        self.ax.spines['left'].set_color(palette.border)
+        self.ax.spines['bottom'].set_color(palette.border)
+        self.ax.yaxis.grid(True, color=palette.border)
+
+    def resize(self, width: int, height: int, device_pixel_ratio: float = 1.0):
+        super().resize(width, height, device_pixel_ratio)
+        self._layout_pending = True
+
+    def set_data(self, data: BarChartData):
+        """Cập nhật chiều cao cột và nhãn trục tại chỗ."""
+        n = min(len(data.quantities), len(self._bars)) if data.has_data else 0
+
+        for i, bar in enumerate(self._bars):
+            if i < n:
+                bar.set_height(data.quantities[i])
+                bar.set_visible(True)
+            else:
+                bar.set_visible(False)
+
+        # Nhãn trục x chỉ đổi khi tập top N đổi; khi đó mới cần tính lại bố cục
+        names = tuple(data.names[:n])
+        if names != self._names:
+            self.ax.set_xticks(range(n))
+            self.ax.set_xticklabels(names, rotation=45, ha='right')
+            self._names = names
+            self._layout_pending = True
+
+        self.ax.yaxis.set_visible(n > 0)
+        self.ax.spines['left'].set_visible(n > 0)
+        self.ax.spines['bottom'].set_visible(n > 0)
+        self._empty_text.set_visible(n == 0)
+
+        # Tỉ lệ trục chỉ theo các cột đang hiển thị
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+
+    # Dưới kích thước này tight_layout không thể xếp đủ nhãn — bỏ qua
+    MIN_LAYOUT_HEIGHT = 120
+
+    def render(self) -> RendererAgg:
+        if self._layout_pending and self.figure.bbox.height >= self.MIN_LAYOUT_HEIGHT:
+            self.figure.tight_layout()
+            self._layout_pending = False
+        return super().render()
@@ -0,0 +1,200 @@
+"""
+Bộ tải dữ liệu nền — PHARMA.SYS.
+
+Giữ cửa sổ phản hồi ngay khi khởi động, kể cả với kho rất lớn:
+- Worker trên QThread riêng đọc JSON và dựng Medicine theo từng lô
+  (InventoryManager.read_medicine_chunks), không chạm vào trạng thái của
+  luồng GUI
+- Mỗi lô được trao về luồng GUI ngay khi xong để bảng được lấp dần; lô kế
+  tiếp chỉ được dựng khi GUI đã nhận lô trước (tránh dồn hàng đợi sự kiện)
+- Sau lô cuối, chỉ mục danh mục SQLite (kho lớn, chế độ theo trang) rồi chỉ
+  mục tìm kiếm được xây trên luồng nền và trao về riêng — luồng GUI chỉ
+  việc nhận
+"""
+from typing import Iterator, List, Optional
+
+from PyQt6.QtCore import QCoreApplication, QObject, QThread, pyqtSignal, pyqtSlot
+
+from src.catalog_index import CatalogIndex
+from src.inventory_manager import InventoryManager
+from src.models import Medicine, Shelf
+from src.search_engine import SearchEngine
+from src.thresholds import ThresholdPolicy
+
+
+class _LoadWorker(QObject):
+    """
+    Worker living on the loader thread.
+
+    Signals:
+        shelves_loaded: Emitted with (shelves, medicine total) before any chunk
+        chunk_loaded: Emitted with (medicines, loaded so far, total) per chunk
+        medicines_loaded: Emitted after the last chunk
+        catalog_built: Emitted with a CatalogIndex of the loaded data when
+            there are at least catalog_min_medicines medicines
+        indexed: Emitted with a SearchEngine indexed over every loaded medicine
+        failed: Emitted with an error message when the files cannot be read
+            or a record cannot be converted
+    """
+
+    shelves_loaded = pyqtSignal(list, int)    # List[Shelf], tổng số thuốc
+    chunk_loaded = pyqtSignal(list, int, int)  # List[Medicine], đã tải, tổng
+    medicines_loaded = pyqtSignal()
+    catalog_built = pyqtSignal(object)         # CatalogIndex
+    indexed = pyqtSignal(object)               # SearchEngine
+    failed = pyqtSignal(str)
+
+    def __init__(
+        self,
+        inventory_manager: InventoryManager,
+        chunk_size: int,
+        policy: Optional[ThresholdPolicy],
+        catalog_min_medicines: int
+    ):
+        super().__init__()
+        self.inventory_manager = inventory_manager
+        self.chunk_size = chunk_size
+        self.policy = policy
+        self.catalog_min_medicines = catalog_min_medicines
+        self._chunks: Optional[Iterator[List[Medicine]]] = None
+        self._medicines: List[Medicine] = []
+        self._shelves: List[Shelf] = []
+        self._total = 0
+
+    @pyqtSlot()
+    def load(self):
+        """Read the inventory files and send the shelves and first chunk."""
+        try:
+            shelves = self.inventory_manager.read_shelves()
+            self._total, self._chunks = self.inventory_manager.read_medicine_chunks(
+                self.chunk_size
+            )
+        except (IOError, ValueError) as e:
+            self.failed.emit(str(e))
+            return
+        self._medicines = []
+        self._shelves = shelves
+        self.shelves_loaded.emit(shelves, self._total)
+        self.next_chunk()
+
+    @pyqtSlot()
+    def next_chunk(self):
+        """Build and send the next chunk; build the indexes after the last one."""
+        if self._chunks is None:
+            return
+        try:
+            chunk = next(self._chunks, None)
+        except (KeyError, TypeError, ValueError) as e:
+            # Bản ghi hỏng (VD ngày không hợp lệ) chỉ lộ ra khi dựng lô
+            self._chunks = None
+            self._medicines = []
+            self.failed.emit(str(e))
+            return
+        if chunk is not None:
+            self._medicines.extend(chunk)
+            self.chunk_loaded.emit(chunk, len(self._medicines), self._total)
+            return
+
+        self._chunks = None
+        self.medicines_loaded.emit()
+        if self.policy is not None and len(self._medicines) >= self.catalog_min_medicines:
+            # Chính sách ngưỡng đã có đủ kệ: GUI nhận shelves_loaded trước mọi lô
+            catalog = CatalogIndex(check_same_thread=False)
+            catalog.build(self._medicines, self._shelves, self.policy)
+            self.catalog_built.emit(catalog)
+        self._shelves = []
+        search_engine = SearchEngine()
+        search_engine.index_data(self._medicines)
+        self._medicines = []
+        self.indexed.emit(search_engine)
+
+
+class DataLoader(QObject):
+    """
+    Loads inventory data in chunks and indexes it on a background thread.
+
+    The worker only reads files and builds new objects; every result is
+    handed back through a signal and applied on the GUI thread. The GUI
+    acknowledges each chunk with request_next_chunk(), so at most one
+    chunk is queued while the next one is being built.
+
+    Signals:
+        shelves_loaded: Emitted with (shelves, medicine total)
+        chunk_loaded: Emitted with (medicines, loaded so far, total)
+        medicines_loaded: Emitted after the last chunk
+        catalog_built: Emitted with the CatalogIndex built for a large
+            inventory (handed over to the GUI thread)
+        indexed: Emitted with the SearchEngine built for the loaded data
+        failed: Emitted with an error message when loading failed
+    """
+
+    shelves_loaded = pyqtSignal(list, int)
+    chunk_loaded = pyqtSignal(list, int, int)
+    medicines_loaded = pyqtSignal()
+    catalog_built = pyqtSignal(object)
+    indexed = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    # Số thuốc mỗi lô gửi về luồng GUI
+    CHUNK_SIZE = 5000
+
+    _load_requested = pyqtSignal()
+    _next_chunk_requested = pyqtSignal()
+
+    def __init__(
+        self,
+        inventory_manager: InventoryManager,
+        policy: Optional[ThresholdPolicy] = None,
+        catalog_min_medicines: int = 0,
+        parent=None
+    ):
+        """
+        Initialize Data Loader.
+
+        Args:
+            inventory_manager: Manager whose files are read (its state is
+                not modified on the loader thread)
+            policy: Threshold policy for the catalog index statuses
+                (None: never build a catalog index)
+            catalog_min_medicines: Build the catalog index from this many
+                loaded medicines
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+
+        self._thread = QThread(self)
+        self._worker = _LoadWorker(
+            inventory_manager, self.CHUNK_SIZE, policy, catalog_min_medicines
+        )
+        self._worker.moveToThread(self._thread)
+        self._thread.finished.connect(self._worker.deleteLater)
+
+        # Kết nối xuyên luồng (tự động dùng QueuedConnection)
+        self._load_requested.connect(self._worker.load)
+        self._next_chunk_requested.connect(self._worker.next_chunk)
+        self._worker.shelves_loaded.connect(self.shelves_loaded)
+        self._worker.chunk_loaded.connect(self.chunk_loaded)
+        self._worker.medicines_loaded.connect(self.medicines_loaded)
+        self._worker.catalog_built.connect(self.catalog_built)
+        self._worker.indexed.connect(self.indexed)
+        self._worker.failed.connect(self.failed)
+
+        app = QCoreApplication.instance()
+        if app:
+            app.aboutToQuit.connect(self.stop)
+
+    def start(self):
+        """Start the worker thread (if needed) and request a load."""
+        if not self._thread.isRunning():
+            self._thread.start()
+        self._load_requested.emit()
+
+    def request_next_chunk(self):
+        """Ask the worker for the next chunk (call when a chunk was received)."""
+        self._next_chunk_requested.emit()
+
+    def stop(self):
+        """Shut the worker thread down (waits for a running step)."""
+        if self._thread.isRunning():
+            self._thread.quit()
+            self._thread.wait()
@@ -13,37 +13,41 @@ File này chỉ chứa LOGIC XỬ LÝ.
 Bố cục giao diện được định nghĩa trong src/ui/generated/main_window_ui.py (Ui_MainWindow).
 """
 import os
-from typing import Optional, List
+from datetime import date
+from typing import Optional, List, Dict
 
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QStackedWidget, QLabel, QPushButton, QFrame, QMessageBox,
-    QSizePolicy, QApplication
+    QSizePolicy, QApplication, QSystemTrayIcon, QProgressBar
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont, QShortcut, QKeySequence, QPixmap, QCloseEvent
 
 from src.models import Medicine, Shelf
+from src.alerts import AlertSystem, AlertType
+from src.thresholds import ThresholdPolicy
+from src.config import ConfigService
+from src.events import InventoryEvent, InventoryReloaded, ShelfChanged
+from src.alert_history import AlertHistory
 from src.inventory_manager import InventoryManager
+from src.catalog_index import CatalogIndex
 from src.image_manager import ImageManager
 from src.search_engine import SearchEngine
+from src.warehouse_map import OccupancyGrid
 from src.ui.theme import Theme, ThemeMode
 from src.ui.theme.sidebar import SIDEBAR_INACTIVE_STYLE, SIDEBAR_ACTIVE_STYLE
+from src.ui.alert_scheduler import AlertScheduler
+from src.ui.chart_renderer import ChartRenderer
+from src.ui.data_loader import DataLoader
+from src.ui.thumbnails import ThumbnailCache, write_thumbnail
 from src.views.dashboard import Dashboard
 from src.views.inventory_view import InventoryView
 from src.views.shelf_view import ShelfView
-from src.dialogs.medicine_dialog import MedicineDialog
-from src.dialogs.shelf_dialog import ShelfDialog
-from src.dialogs.medicine_detail_view import MedicineDetailView
-from src.dialogs.filter_dialog import FilterMedicineDialog
-from src.dialogs.notification_dialogs import (
-    AddSuccessDialog, EditSuccessDialog, DeleteSuccessDialog,
-    ConfirmDeleteDialog, ShelfFullErrorDialog
-)
+# Hộp thoại được nạp lười (src/dialogs/__init__.py): import lần đầu khi mở
+import src.dialogs as dialogs
 from src.ui.generated.search import Ui_dlg_search
-from src.ui.generated.search_dark import Ui_dlg_search as Ui_dlg_search_dark
 from src.ui.generated.main_window_ui import Ui_MainWindow
-from src.ui.generated.main_window_ui_dark import Ui_MainWindow as Ui_MainWindow_dark
 
 
 class SearchDialog(QFrame):
@@ -70,6 +74,8 @@ class SearchDialog(QFrame):
 
         # Chọn lớp UI dựa trên chế độ chủ đề
         if self.theme.mode == ThemeMode.DARK:
+            # Bản UI tối chỉ được nạp khi cần
+            from src.ui.generated.search_dark import Ui_dlg_search as Ui_dlg_search_dark
             self.ui = Ui_dlg_search_dark()
         else:
             self.ui = Ui_dlg_search()
@@ -118,6 +124,20 @@ class SearchDialog(QFrame):
         self.selected_medicine_id = item.data(Qt.ItemDataRole.UserRole)
         self.dialog.accept()
 
+    def reset(self, search_engine: Optional[SearchEngine] = None):
+        """
+        Prepare the dialog for another search (called by DialogPool).
+
+        Args:
+            search_engine: Current search engine (replaced once the
+                background index is ready)
+        """
+        if search_engine is not None:
+            self.search_engine = search_engine
+        self.ui.txt_search.clear()
+        self.ui.list_results.clear()
+        self.selected_medicine_id = None
+
     def exec(self) -> int:
         """Show dialog and return result."""
         self.ui.txt_search.clear()
@@ -144,31 +164,107 @@ class MainWindow(QMainWindow):
     PAGE_INVENTORY = 1
     PAGE_SHELVES = 2
 
+    # Từ số thuốc này trở lên, bảng Kho/Kệ đọc theo trang từ chỉ mục SQLite
+    PAGING_MIN_MEDICINES = 100_000
+
+    # Bảng ngưỡng cảnh báo riêng theo khu/kệ/thuốc (tùy chọn)
+    THRESHOLDS_FILEPATH = "data/thresholds.json"
+
+    # Cài đặt người dùng — được theo dõi để tải lại nóng
+    SETTINGS_FILEPATH = "data/settings.json"
+    CONFIG_POLL_INTERVAL_MS = 2000
+
+    # Nhật ký vào/ra trạng thái cảnh báo (JSON Lines, chỉ ghi thêm)
+    ALERT_HISTORY_FILEPATH = "data/alert_history.jsonl"
+
+    # Phát khi mọi lô dữ liệu tải nền đã được áp dụng vào các view
+    data_loaded = pyqtSignal()
+    # Phát khi chỉ mục tìm kiếm xây trên luồng nền đã sẵn sàng
+    search_indexed = pyqtSignal()
+
     def __init__(self):
         """Initialize Main Window."""
         super().__init__()
 
+        # Cài đặt (settings.json) — đọc một lần, sau đó chỉ kiểm tra mtime
+        self.config = ConfigService(self.SETTINGS_FILEPATH)
+        self.config.load()
+
         # Dịch vụ cốt lõi
-        self.theme = Theme(ThemeMode.LIGHT)
+        self.theme = Theme(ThemeMode(self.config.get("theme")))
         self.inventory_manager = InventoryManager()
-        self.image_manager = ImageManager()
+        self.image_manager = ImageManager(thumbnail_writer=write_thumbnail)
+        # Ảnh thu nhỏ (tạo nền khi lưu ảnh) cho hộp thoại và cột ảnh của bảng
+        self.thumbnails = ThumbnailCache(self.image_manager, self)
         self.search_engine = SearchEngine()
-
-        # Tải dữ liệu
-        self.inventory_manager.load_data()
-        self.search_engine.index_data(self.inventory_manager.medicines)
+        self.alert_system = AlertSystem(policy=ThresholdPolicy(
+            expiry_threshold=self.config.get("expiry_threshold"),
+            low_stock_threshold=self.config.get("low_stock_threshold")
+        ))
+        self.alert_system.policy.load_overrides(self.THRESHOLDS_FILEPATH)
+        self.alert_history = AlertHistory(self.ALERT_HISTORY_FILEPATH, self.alert_system)
+        self.alert_history.load()
+        # Ma trận chiếm dụng cho bản đồ kho (cập nhật theo sự kiện kho)
+        self.warehouse_grid = OccupancyGrid(self.inventory_manager, self.alert_system)
+        self._tray_icon: Optional[QSystemTrayIcon] = None
+
+        # Chỉ mục SQLite cho chế độ theo trang — tạo khi kho đủ lớn
+        self.catalog_index: Optional[CatalogIndex] = None
+
+        # Dữ liệu và chỉ mục được tải trên luồng nền sau khi cửa sổ hiện ra
+        self.is_loading = True
+        self.search_available = False
+        self._loaded_version = 0
+        self.data_loader = DataLoader(
+            self.inventory_manager,
+            policy=self.alert_system.policy,
+            catalog_min_medicines=self.PAGING_MIN_MEDICINES,
+            parent=self
+        )
+        self.data_loader.shelves_loaded.connect(self._on_shelves_loaded)
+        self.data_loader.chunk_loaded.connect(self._on_chunk_loaded)
+        self.data_loader.medicines_loaded.connect(self._on_medicines_loaded)
+        self.data_loader.catalog_built.connect(self._on_catalog_built)
+        self.data_loader.indexed.connect(self._on_search_indexed)
+        self.data_loader.failed.connect(self._on_load_failed)
+
+        # Bộ lập lịch cảnh báo — tự cập nhật khi qua nửa đêm
+        self.alert_scheduler = AlertScheduler(self.alert_system, parent=self)
+        self.alert_scheduler.day_changed.connect(self._on_day_changed)
+        self.alert_scheduler.alerts_changed.connect(self._on_alerts_changed)
+        self.alert_scheduler.start()
+
+        # Bộ vẽ biểu đồ nền — dùng chung cho mọi biểu đồ Dashboard
+        self.chart_renderer = ChartRenderer(parent=self)
+        self.chart_renderer.start()
 
         # Theo dõi trạng thái hộp thoại tìm kiếm
         self._search_dialog: Optional[SearchDialog] = None
 
+        # Hộp thoại được dựng một lần cho mỗi chủ đề rồi dùng lại
+        self.dialog_pool = dialogs.DialogPool(self.theme)
+        self._register_dialogs()
+
         # Xây dựng UI đầy đủ (generated + views + tín hiệu)
         self._build_ui()
 
         # Phím tắt — chỉ tạo MỘT LẦN (không nằm trong _build_ui)
         self._setup_shortcuts()
 
-        # Tải dữ liệu vào views
-        self.refresh_all()
+        # Bus sự kiện kho — mỗi thành phần chỉ cập nhật phần bị thay đổi.
+        # AlertSystem đăng ký trước để ngưỡng theo khu đã đúng khi các
+        # thành phần sau đánh giá lại.
+        self._page_refresh_pending = False
+        events = self.inventory_manager.events
+        events.subscribe(InventoryEvent, self.alert_system.apply_event)
+        events.subscribe(InventoryEvent, self.warehouse_grid.apply_event)
+        events.subscribe(InventoryEvent, self.search_engine.apply_event)
+        events.subscribe(InventoryEvent, self.dashboard.manager.apply_event)
+        events.subscribe(InventoryEvent, self._on_inventory_event)
+
+        # Khung cửa sổ hiển thị ngay; bảng được lấp dần khi các lô dữ liệu về
+        self._set_loading(True)
+        self.data_loader.start()
 
         # Đặt trang mặc định
         self.navigate_to(self.PAGE_DASHBOARD, self.ui.btn_nav_dashboard)
@@ -176,27 +272,42 @@ class MainWindow(QMainWindow):
         # Canh giữa cửa sổ trên màn hình
         self._center_on_screen()
 
+        # Tải lại nóng settings.json — mỗi khóa chỉ kích hoạt phần bị ảnh hưởng
+        self.config.subscribe("expiry_threshold", self._on_expiry_threshold_changed)
+        self.config.subscribe("low_stock_threshold", self._on_low_stock_threshold_changed)
+        self.config.subscribe("theme", self._on_theme_setting_changed)
+        self._config_timer = QTimer(self)
+        self._config_timer.timeout.connect(self.config.poll)
+        self._config_timer.start(self.CONFIG_POLL_INTERVAL_MS)
+
     def _build_ui(self):
         """
-        Build (or rebuild) the entire UI from the appropriate generated file.
+        Build the entire UI from the appropriate generated file.
         Selects light or dark Ui_MainWindow based on current theme mode.
+
+        Called once: later theme switches go through apply_theme(), which
+        keeps every widget (and its data) in place.
         """
-        # Xóa stylesheet hiện tại trước khi áp dụng UI mới
-        self.setStyleSheet("")
         app = QApplication.instance()
         if app:
             app.setStyleSheet("")
 
         # Chọn lớp UI dựa trên chế độ chủ đề
         if self.theme.mode == ThemeMode.DARK:
+            from src.ui.generated.main_window_ui_dark import Ui_MainWindow as Ui_MainWindow_dark
             self.ui = Ui_MainWindow_dark()
         else:
             self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
 
+        # Stylesheet nhúng trong file generated được thay bằng bản tạo từ
+        # bảng màu (đã cache theo chế độ) — cùng bản mà apply_theme() hoán đổi
+        self.setStyleSheet(self.theme.get_stylesheet())
+
         # Thiết lập UI bổ sung (logo, views, kết nối)
         self._setup_logo()
         self._setup_views()
+        self._setup_loading_indicator()
         self._connect_signals()
 
     # ── Khởi tạo UI (kết nối UI generated với logic xử lý) ──
@@ -215,20 +326,43 @@ class MainWindow(QMainWindow):
 
     def _setup_views(self):
         """Create view widgets and add them to the stacked widget."""
+        # Các view mới tạo đều trống — mọi trang cần dựng lại khi hiển thị
+        self._rendered_inputs: Dict[int, tuple] = {}
+
         # Trang Dashboard
-        self.dashboard = Dashboard(theme=self.theme)
+        self.dashboard = Dashboard(
+            theme=self.theme, alert_system=self.alert_system,
+            chart_renderer=self.chart_renderer
+        )
         self.ui.stacked_main_content.addWidget(self.dashboard)
 
         # Trang Kho thuốc
-        self.inventory_view = InventoryView(theme=self.theme)
+        self.inventory_view = InventoryView(
+            theme=self.theme, alert_system=self.alert_system,
+            thumbnails=self.thumbnails
+        )
         self.ui.inv_layout.addWidget(self.inventory_view)
         self.ui.stacked_main_content.addWidget(self.ui.page_inventory)
 
         # Trang Kệ
-        self.shelf_view = ShelfView(theme=self.theme)
+        self.shelf_view = ShelfView(
+            theme=self.theme, used_of=self.inventory_manager.get_shelf_used,
+            grid=self.warehouse_grid
+        )
         self.ui.shelf_layout.addWidget(self.shelf_view)
         self.ui.stacked_main_content.addWidget(self.ui.page_shelf)
 
+    def _setup_loading_indicator(self):
+        """Add the data-loading label and progress bar to the header."""
+        self._loading_label = QLabel()
+        self._loading_progress = QProgressBar()
+        self._loading_progress.setRange(0, 100)
+        self._loading_progress.setTextVisible(False)
+        self._loading_progress.setFixedSize(160, 8)
+        # Đặt ngay sau tiêu đề trang
+        self.ui.header_layout.insertWidget(1, self._loading_label)
+        self.ui.header_layout.insertWidget(2, self._loading_progress)
+
     def _connect_signals(self):
         """Connect all signals to slots (business logic wiring)."""
         # Nút điều hướng
@@ -242,6 +376,9 @@ class MainWindow(QMainWindow):
             lambda: self.navigate_to(self.PAGE_SHELVES, self.ui.btn_nav_shelf)
         )
 
+        # Trang ẩn chỉ được dựng lại khi trở nên hiển thị
+        self.ui.stacked_main_content.currentChanged.connect(self._refresh_page)
+
         # Nút tiêu đề
         self.ui.btn_search.clicked.connect(self.show_search)
         self.ui.btn_toggle_theme.clicked.connect(self.toggle_theme)
@@ -334,46 +471,397 @@ class MainWindow(QMainWindow):
         btn = btn_map.get(index, self.ui.btn_nav_dashboard)
         self.navigate_to(index, btn)
 
+    # ── Tải dữ liệu nền ──
+
+    def _set_loading(self, loading: bool):
+        """
+        Show or hide the loading indicator.
+
+        While loading, pages can be browsed (the inventory table fills in
+        as chunks arrive) but nothing can be added, edited or deleted.
+        """
+        self.is_loading = loading
+        self._loading_label.setVisible(loading or not self.search_available)
+        self._loading_progress.setVisible(loading or not self.search_available)
+        self.inventory_view.ui.btn_add.setEnabled(not loading)
+        self.shelf_view.ui.btn_add.setEnabled(not loading)
+        self.ui.btn_search.setEnabled(self.search_available)
+
+    def _on_shelves_loaded(self, shelves: List[Shelf], total: int):
+        """Start from the shelves and an empty medicine list."""
+        self.inventory_manager.set_data([], shelves)
+        self.alert_system.policy.set_shelves(shelves)
+        self.inventory_view.load_medicines(self.inventory_manager.medicines)
+        self._loading_label.setText(f"Đang tải 0/{total:,} thuốc…")
+        self._loading_progress.setValue(0)
+
+    def _on_chunk_loaded(self, chunk: List[Medicine], loaded: int, total: int):
+        """Append a chunk to the inventory and the inventory table."""
+        # Xin lô kế tiếp trước — worker dựng lô sau trong lúc GUI áp dụng lô này
+        self.data_loader.request_next_chunk()
+
+        self.inventory_manager.append_loaded(chunk)
+        self.inventory_view.append_medicines(self.inventory_manager.medicines, chunk)
+        # Bảng đã khớp với dữ liệu đến giờ — không cần dựng lại khi hiển thị
+        self._rendered_inputs[self.PAGE_INVENTORY] = self._page_inputs(self.PAGE_INVENTORY)
+
+        self._loading_label.setText(f"Đang tải {loaded:,}/{total:,} thuốc…")
+        self._loading_progress.setValue(loaded * 100 // max(total, 1))
+
+    def _on_medicines_loaded(self):
+        """Every chunk is in: render aggregates and start alert tracking."""
+        self._loaded_version = self.inventory_manager.version
+        self.refresh_all(reindex_search=False)
+        self._loading_label.setText("Đang lập chỉ mục tìm kiếm…")
+        self._set_loading(False)
+        self.data_loaded.emit()
+
+    def _on_catalog_built(self, catalog_index: CatalogIndex):
+        """
+        Adopt the catalog index built on the loader thread (large inventory).
+
+        The inventory and shelf tables switch to paged mode; edits made since
+        loading finished are applied to the index as a delta.
+        """
+        # Chỉ mục dựng từ đúng dữ liệu lúc tải xong — sync() chỉ áp phần chênh
+        catalog_index.version = self._loaded_version
+        catalog_index.sync(self.inventory_manager, self.alert_system.policy)
+        self.catalog_index = catalog_index
+        self.inventory_view.enable_paging(catalog_index)
+        self.shelf_view.enable_paging(catalog_index)
+        self._rendered_inputs.pop(self.PAGE_INVENTORY, None)
+        self._rendered_inputs.pop(self.PAGE_SHELVES, None)
+        page_index = self.ui.stacked_main_content.currentIndex()
+        if page_index in (self.PAGE_INVENTORY, self.PAGE_SHELVES):
+            self._refresh_page(page_index)
+
+    def _on_search_indexed(self, search_engine):
+        """Adopt the search index built on the loader thread."""
+        events = self.inventory_manager.events
+        events.unsubscribe(InventoryEvent, self.search_engine.apply_event)
+        self.search_engine = search_engine
+        events.subscribe(InventoryEvent, self.search_engine.apply_event)
+        if self.inventory_manager.version != self._loaded_version:
+            # Kho đã đổi sau khi tải xong — chỉ mục nền đã cũ
+            self.search_engine.index_data(self.inventory_manager.get_all_medicines())
+        self.search_available = True
+        self._set_loading(self.is_loading)
+        self.search_indexed.emit()
+
+    def _on_load_failed(self, message: str):
+        """Report a load error and continue with an empty inventory."""
+        self.search_available = True
+        self._set_loading(False)
+        self.refresh_all()
+        QMessageBox.warning(self, "Lỗi tải dữ liệu", message)
+        self.data_loaded.emit()
+        self.search_indexed.emit()
+
     # ── Làm mới dữ liệu ──
 
-    def refresh_all(self):
-        """Refresh all views with current data."""
+    def refresh_all(self, reindex_search: bool = True):
+        """
+        Update shared state after a data change and refresh the visible page.
+
+        Hidden pages are only marked stale (their inputs changed) and get
+        rebuilt when they are shown — see _refresh_page().
+
+        Args:
+            reindex_search: Rebuild the search index (skipped while the
+                loader is still building it)
+        """
         medicines = self.inventory_manager.get_all_medicines()
         shelves = self.inventory_manager.get_all_shelves()
 
+        # Ghi đè ngưỡng theo khu cần biết kệ thuộc khu nào
+        self.alert_system.policy.set_shelves(shelves)
+
         # Cập nhật chỉ mục tìm kiếm
-        self.search_engine.index_data(medicines)
+        if reindex_search:
+            self.search_engine.index_data(medicines)
+
+        # Chỉ mục cảnh báo được xây lại trên luồng nền
+        self.alert_scheduler.set_medicines(medicines)
+
+        self._record_alert_history(medicines)
+
+        self._refresh_page(self.ui.stacked_main_content.currentIndex())
+
+    def _on_inventory_event(self, event: InventoryEvent):
+        """
+        Apply one inventory change to the alert state and schedule a redraw.
+
+        Search, dashboard statistics and zone thresholds are patched by their
+        own subscribers; the visible page is refreshed once per event-loop
+        pass, however many edits one action made. Hidden pages catch up from
+        the change log when they are shown.
+        """
+        if self.is_loading or isinstance(event, InventoryReloaded):
+            return
+
+        # Chỉ mục HSD trên luồng nền: thêm/xóa đúng một thuốc
+        self.alert_scheduler.apply_event(event)
+
+        if isinstance(event, ShelfChanged):
+            # Đổi khu có thể đổi ngưỡng của mọi thuốc trên kệ — ghi lại toàn bộ
+            if event.old and event.new and event.old.zone != event.new.zone:
+                self._record_alert_history(self.inventory_manager.get_all_medicines())
+        else:
+            try:
+                self.alert_history.apply_event(event)
+            except IOError:
+                pass
+
+        if not self._page_refresh_pending:
+            self._page_refresh_pending = True
+            QTimer.singleShot(0, self._refresh_current_page)
+
+    def _refresh_current_page(self):
+        """Refresh the visible page after a batch of inventory events."""
+        self._page_refresh_pending = False
+        self._refresh_page(self.ui.stacked_main_content.currentIndex())
+
+    def _refresh_alert_views(self):
+        """Re-render the visible page after a threshold change."""
+        page_index = self.ui.stacked_main_content.currentIndex()
+        self._refresh_page(page_index)
+        if page_index == self.PAGE_SHELVES:
+            # Bảng kệ không phụ thuộc ngưỡng, nhưng màu cảnh báo của bản đồ thì có
+            self.shelf_view.refresh_map()
+
+    def _page_inputs(self, page_index: int) -> tuple:
+        """
+        Return the inputs a page is rendered from.
 
-        # Trang tổng quan
-        self.dashboard.load_data(medicines)
+        A page is dirty when these differ from the ones it was last
+        rendered with.
+        """
+        version = self.inventory_manager.version
+        if page_index == self.PAGE_SHELVES:
+            return (version,)
+        # Trạng thái cảnh báo còn phụ thuộc ngày hiện tại và ngưỡng
+        return (version, date.today(), self.alert_system.policy.version)
 
-        # Bảng kho thuốc
-        self.inventory_view.load_medicines(medicines)
+    def _changes_since(self, rendered: Optional[tuple], inputs: tuple):
+        """
+        Return the inventory changes a page can apply row by row.
 
-        # Trang kệ — tính đã dùng mỗi kệ
-        medicines_per_shelf = {}
-        for med in medicines:
-            medicines_per_shelf[med.shelf_id] = (
-                medicines_per_shelf.get(med.shelf_id, 0) + med.quantity
+        Only possible when the page was rendered before and nothing but the
+        inventory version changed since (same day, same thresholds).
+
+        Returns:
+            ChangeSet, or None when the page must be rebuilt
+        """
+        if rendered is None or rendered[1:] != inputs[1:]:
+            return None
+        return self.inventory_manager.changes_since(rendered[0])
+
+    def _refresh_page(self, page_index: int):
+        """
+        Rebuild a page only if its inputs changed since it was last rendered.
+
+        When only the inventory version moved, the inventory and shelf
+        tables apply the change set row by row instead of reloading.
+
+        Args:
+            page_index: Index in stacked_main_content
+        """
+        inputs = self._page_inputs(page_index)
+        rendered = self._rendered_inputs.get(page_index)
+        if rendered == inputs:
+            return
+        changes = self._changes_since(rendered, inputs)
+        if page_index in (self.PAGE_INVENTORY, self.PAGE_SHELVES):
+            self._sync_catalog_index()
+
+        if page_index == self.PAGE_DASHBOARD:
+            self.dashboard.load_data(
+                self.inventory_manager.get_all_medicines(),
+                self.inventory_manager.version,
+                self.inventory_manager.valuation
             )
-        self.shelf_view.load_shelves(shelves, medicines_per_shelf)
+        elif page_index == self.PAGE_INVENTORY:
+            medicines = self.inventory_manager.get_all_medicines()
+            if changes is not None:
+                self.inventory_view.apply_changes(medicines, changes)
+            else:
+                self.inventory_view.load_medicines(medicines)
+        elif page_index == self.PAGE_SHELVES and changes is not None:
+            self.shelf_view.apply_changes(self.inventory_manager.get_all_shelves(), changes)
+        elif page_index == self.PAGE_SHELVES:
+            # Đã dùng mỗi kệ đọc từ bộ đếm của InventoryManager (chế độ theo
+            # trang: chỉ mục tự tính)
+            self.shelf_view.set_shelves(self.inventory_manager.get_all_shelves())
+        else:
+            return
 
-    # ── CRUD Thuốc ──
+        self._rendered_inputs[page_index] = inputs
 
-    def show_add_medicine(self):
-        """Show dialog to add a new medicine."""
-        shelves = self.inventory_manager.get_all_shelves()
+    def _sync_catalog_index(self):
+        """
+        Bring the catalog index in step with the inventory (paged mode only).
+
+        The index is built on the loader thread when the inventory has at
+        least PAGING_MIN_MEDICINES medicines (see _on_catalog_built()). It is
+        a query copy: the JSON files stay the source of truth.
+        """
+        if self.catalog_index is None:
+            return
+        self.catalog_index.sync(self.inventory_manager, self.alert_system.policy)
 
-        dialog = MedicineDialog(
+    def _record_alert_history(self, medicines):
+        """Append alert state changes to the history log (deduplicated)."""
+        try:
+            self.alert_history.record(medicines)
+        except IOError:
+            # Nhật ký chỉ mang tính báo cáo — không chặn giao diện khi ghi lỗi
+            pass
+
+    def _on_day_changed(self, today: date, transitions: list):
+        """
+        Move date-dependent state to the new day after midnight rollover.
+
+        The scheduler's worker already knows exactly which medicines changed
+        expiry state, so the dashboard's status table, the warehouse map and
+        the inventory table are patched from that list — nothing re-evaluates
+        the whole inventory on the GUI thread. The history log is patched
+        from the same list in _on_alerts_changed().
+
+        Args:
+            today: The new day
+            transitions: List of AlertTransition from the scheduler
+        """
+        medicine_ids = [t.medicine.id for t in transitions]
+        self.dashboard.manager.advance_day(today, medicine_ids)
+        self.warehouse_grid.advance_day(today, transitions)
+
+        # Bảng thuốc đã dựng cho hôm qua (cùng ngưỡng) chỉ cần chuyển ngày;
+        # thay đổi kho còn treo vẫn được áp dụng từng dòng ở lần làm mới tới
+        rendered = self._rendered_inputs.get(self.PAGE_INVENTORY)
+        policy_version = self.alert_system.policy.version
+        if rendered is not None and rendered[2] == policy_version:
+            if self.catalog_index is not None:
+                self._sync_catalog_index()
+            self.inventory_view.advance_day(
+                self.inventory_manager.get_all_medicines(), today, medicine_ids
+            )
+            self._rendered_inputs[self.PAGE_INVENTORY] = (rendered[0], today, policy_version)
+
+        page_index = self.ui.stacked_main_content.currentIndex()
+        self._refresh_page(page_index)
+        if page_index == self.PAGE_SHELVES:
+            self.shelf_view.refresh_map()
+
+    # ── Tải lại nóng cài đặt ──
+
+    def _on_expiry_threshold_changed(self, value: int, old_value: int):
+        """Apply a new global expiry threshold without a full refresh."""
+        self.alert_system.expiry_threshold = value
+        # Xếp lại bucket từ chỉ mục hạn dùng trên luồng nền; nhật ký được vá
+        # từ các AlertTransition trả về (_on_alerts_changed)
+        self.alert_scheduler.thresholds_changed()
+        self._refresh_alert_views()
+
+    def _on_low_stock_threshold_changed(self, value: int, old_value: int):
+        """Apply a new global low-stock threshold (no expiry re-index needed)."""
+        self.alert_system.low_stock_threshold = value
+        # Chỉ mục hạn dùng không theo dõi tồn kho — nhật ký cần đánh giá lại toàn kho
+        self._record_alert_history(self.inventory_manager.get_all_medicines())
+        self._refresh_alert_views()
+
+    def _on_theme_setting_changed(self, value: str, old_value: str):
+        """Switch theme when settings.json was edited externally."""
+        if ThemeMode(value) != self.theme.mode:
+            self.toggle_theme()
+
+    def _on_alerts_changed(self, transitions: list):
+        """
+        Record medicines that changed expiry state (day rollover or expiry
+        threshold change) in the history and show a desktop notification.
+
+        Args:
+            transitions: List of AlertTransition from the scheduler
+        """
+        try:
+            self.alert_history.apply_transitions(transitions)
+        except IOError:
+            # Nhật ký chỉ mang tính báo cáo — không chặn giao diện khi ghi lỗi
+            pass
+
+        expired = [t for t in transitions if t.current == AlertType.EXPIRED]
+        expiring = [t for t in transitions if t.current == AlertType.EXPIRING_SOON]
+        if not expired and not expiring:
+            return
+
+        lines = []
+        if expired:
+            lines.append(f"{len(expired)} thuốc vừa hết hạn")
+        if expiring:
+            lines.append(f"{len(expiring)} thuốc sắp hết hạn")
+
+        if not QSystemTrayIcon.isSystemTrayAvailable():
+            return
+        if self._tray_icon is None:
+            self._tray_icon = QSystemTrayIcon(self.windowIcon(), self)
+            self._tray_icon.show()
+        self._tray_icon.showMessage(
+            "Cảnh báo hạn sử dụng",
+            "\n".join(lines),
+            QSystemTrayIcon.MessageIcon.Warning
+        )
+
+    # ── Hộp thoại dùng lại ──
+
+    def _register_dialogs(self):
+        """Register factories for the pooled dialogs (built on first use)."""
+        pool = self.dialog_pool
+        pool.register("medicine", lambda: dialogs.MedicineDialog(
+            parent=self,
+            image_manager=self.image_manager,
+            theme=self.theme,
+            remaining_capacity_func=self._get_shelf_remaining,
+            thumbnails=self.thumbnails
+        ))
+        pool.register("medicine_detail", self._create_medicine_detail)
+        pool.register("filter", lambda: dialogs.FilterMedicineDialog(
+            parent=self, theme=self.theme
+        ))
+        pool.register("search", lambda: SearchDialog(
+            parent=self, search_engine=self.search_engine, theme=self.theme
+        ))
+        pool.register("add_success", lambda: dialogs.AddSuccessDialog(self, theme=self.theme))
+        pool.register("edit_success", lambda: dialogs.EditSuccessDialog(self, theme=self.theme))
+        pool.register("delete_success", lambda: dialogs.DeleteSuccessDialog(self, theme=self.theme))
+        pool.register("confirm_delete", lambda: dialogs.ConfirmDeleteDialog(self, theme=self.theme))
+        pool.register("shelf_full", lambda: dialogs.ShelfFullErrorDialog(self, theme=self.theme))
+
+    def _create_medicine_detail(self):
+        """Build a detail view with its signals connected once."""
+        detail = dialogs.MedicineDetailView(
             parent=self,
-            mode="add",
-            shelves=shelves,
             image_manager=self.image_manager,
             theme=self.theme,
-            remaining_capacity_func=self._get_shelf_remaining
+            alert_system=self.alert_system,
+            thumbnails=self.thumbnails
+        )
+        detail.edit_requested.connect(self.show_edit_medicine)
+        detail.delete_requested.connect(self.delete_medicine)
+        return detail
+
+    # ── CRUD Thuốc ──
+
+    def show_add_medicine(self):
+        """Show dialog to add a new medicine."""
+        # Chưa cho sửa kho khi dữ liệu còn đang tải
+        if self.is_loading:
+            return
+        dialog = self.dialog_pool.acquire(
+            "medicine",
+            mode="add",
+            shelves=self.inventory_manager.get_all_shelves()
         )
 
-        if dialog.exec() == MedicineDialog.DialogCode.Accepted:
+        if dialog.exec() == dialogs.MedicineDialog.DialogCode.Accepted:
             data = dialog.get_data()
             if data:
                 try:
@@ -406,14 +894,11 @@ class MainWindow(QMainWindow):
                             {"image_path": relative_path}
                         )
 
-                    self.refresh_all()
-
                     # Hiện hộp thoại thành công
-                    success = AddSuccessDialog(
-                        self,
+                    success = self.dialog_pool.acquire(
+                        "add_success",
                         medicine_name=added.name,
-                        medicine_id=added.id,
-                        theme=self.theme
+                        medicine_id=added.id
                     )
                     success.exec()
 
@@ -435,6 +920,8 @@ class MainWindow(QMainWindow):
         Args:
             medicine_id: ID of medicine to edit
         """
+        if self.is_loading:
+            return
         medicine = self.inventory_manager.get_medicine(medicine_id)
         if not medicine:
             QMessageBox.warning(
@@ -443,19 +930,14 @@ class MainWindow(QMainWindow):
             )
             return
 
-        shelves = self.inventory_manager.get_all_shelves()
-
-        dialog = MedicineDialog(
-            parent=self,
+        dialog = self.dialog_pool.acquire(
+            "medicine",
             mode="edit",
             medicine=medicine,
-            shelves=shelves,
-            image_manager=self.image_manager,
-            theme=self.theme,
-            remaining_capacity_func=self._get_shelf_remaining
+            shelves=self.inventory_manager.get_all_shelves()
         )
 
-        if dialog.exec() == MedicineDialog.DialogCode.Accepted:
+        if dialog.exec() == dialogs.MedicineDialog.DialogCode.Accepted:
             data = dialog.get_data()
             if data:
                 try:
@@ -483,14 +965,11 @@ class MainWindow(QMainWindow):
                                 {"image_path": new_img_path}
                             )
 
-                    self.refresh_all()
-
                     # Hiện hộp thoại thành công với ID đã cập nhật
-                    success = EditSuccessDialog(
-                        self,
+                    success = self.dialog_pool.acquire(
+                        "edit_success",
                         medicine_name=updated.name,
-                        medicine_id=updated.id,
-                        theme=self.theme
+                        medicine_id=updated.id
                     )
                     success.exec()
 
@@ -512,29 +991,28 @@ class MainWindow(QMainWindow):
         Args:
             medicine_id: ID of medicine to delete
         """
+        if self.is_loading:
+            return
         medicine = self.inventory_manager.get_medicine(medicine_id)
         if not medicine:
             return
 
-        confirm = ConfirmDeleteDialog(
-            self,
+        confirm = self.dialog_pool.acquire(
+            "confirm_delete",
             medicine_name=medicine.name,
             medicine_id=medicine_id,
-            quantity=medicine.quantity,
-            theme=self.theme
+            quantity=medicine.quantity
         )
 
-        if confirm.exec() == ConfirmDeleteDialog.DialogCode.Accepted:
+        if confirm.exec() == dialogs.ConfirmDeleteDialog.DialogCode.Accepted:
             try:
                 removed = self.inventory_manager.remove_medicine(medicine_id)
                 self.image_manager.delete_image(medicine_id)
-                self.refresh_all()
 
-                success = DeleteSuccessDialog(
-                    self,
+                success = self.dialog_pool.acquire(
+                    "delete_success",
                     medicine_name=removed.name,
-                    medicine_id=medicine_id,
-                    theme=self.theme
+                    medicine_id=medicine_id
                 )
                 success.exec()
 
@@ -545,13 +1023,15 @@ class MainWindow(QMainWindow):
 
     def show_add_shelf(self):
         """Show dialog to add a new shelf."""
-        dialog = ShelfDialog(
+        if self.is_loading:
+            return
+        dialog = dialogs.ShelfDialog(
             parent=self,
             mode="add",
             theme=self.theme
         )
 
-        if dialog.exec() == ShelfDialog.DialogCode.Accepted:
+        if dialog.exec() == dialogs.ShelfDialog.DialogCode.Accepted:
             data = dialog.get_data()
             if data:
                 try:
@@ -563,7 +1043,6 @@ class MainWindow(QMainWindow):
                         capacity=data["capacity"]
                     )
                     self.inventory_manager.add_shelf(shelf)
-                    self.refresh_all()
 
                     QMessageBox.information(
                         self, "Thành công",
@@ -579,6 +1058,8 @@ class MainWindow(QMainWindow):
         Args:
             shelf_id: ID of shelf to edit
         """
+        if self.is_loading:
+            return
         shelf = self.inventory_manager.get_shelf(shelf_id)
         if not shelf:
             QMessageBox.warning(
@@ -587,14 +1068,14 @@ class MainWindow(QMainWindow):
             )
             return
 
-        dialog = ShelfDialog(
+        dialog = dialogs.ShelfDialog(
             parent=self,
             mode="edit",
             shelf=shelf,
             theme=self.theme
         )
 
-        if dialog.exec() == ShelfDialog.DialogCode.Accepted:
+        if dialog.exec() == dialogs.ShelfDialog.DialogCode.Accepted:
             data = dialog.get_data()
             if data:
                 try:
@@ -607,7 +1088,6 @@ class MainWindow(QMainWindow):
                             "capacity": data["capacity"],
                         }
                     )
-                    self.refresh_all()
 
                     QMessageBox.information(
                         self, "Thành công",
@@ -623,6 +1103,8 @@ class MainWindow(QMainWindow):
         Args:
             shelf_id: ID of shelf to delete
         """
+        if self.is_loading:
+            return
         reply = QMessageBox.question(
             self,
             "Xác nhận xóa",
@@ -635,7 +1117,6 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.StandardButton.Yes:
             try:
                 self.inventory_manager.remove_shelf(shelf_id)
-                self.refresh_all()
 
                 QMessageBox.information(
                     self, "Thành công",
@@ -648,16 +1129,14 @@ class MainWindow(QMainWindow):
 
     def show_search(self):
         """Show/toggle search dialog."""
+        if not self.search_available:
+            return
         if self._search_dialog is not None:
             self._search_dialog._on_close()
             self._search_dialog = None
             return
 
-        search = SearchDialog(
-            parent=self,
-            search_engine=self.search_engine,
-            theme=self.theme
-        )
+        search = self.dialog_pool.acquire("search", search_engine=self.search_engine)
         self._search_dialog = search
 
         result = search.exec()
@@ -685,66 +1164,57 @@ class MainWindow(QMainWindow):
             )
             return
 
-        detail = MedicineDetailView(
-            parent=self,
-            medicine=medicine,
-            image_manager=self.image_manager,
-            theme=self.theme
-        )
-        detail.edit_requested.connect(self.show_edit_medicine)
-        detail.delete_requested.connect(self.delete_medicine)
+        detail = self.dialog_pool.acquire("medicine_detail", medicine=medicine)
         detail.exec()
 
     # ── Lọc ──
 
     def show_filter_dialog(self):
         """Show filter dialog for inventory."""
-        shelves = self.inventory_manager.get_all_shelves()
-
-        dialog = FilterMedicineDialog(
-            parent=self,
-            shelves=shelves,
-            theme=self.theme
+        dialog = self.dialog_pool.acquire(
+            "filter", shelves=self.inventory_manager.get_all_shelves()
         )
 
-        if dialog.exec() == FilterMedicineDialog.DialogCode.Accepted:
+        if dialog.exec() == dialogs.FilterMedicineDialog.DialogCode.Accepted:
             filters = dialog.get_filters()
             self.inventory_view.set_filters(filters)
 
     # ── Chủ đề ──
 
     def toggle_theme(self):
-        """Toggle between Light and Dark modes by rebuilding UI."""
-        # Lưu chỉ mục trang hiện tại TRƯỚC KHI xây lại UI
-        current_index = self.ui.stacked_main_content.currentIndex()
+        """
+        Toggle between Light and Dark modes.
 
+        Only stylesheets and palettes change — no widget is rebuilt and no
+        data is reloaded, so the switch costs the same for any inventory size.
+        """
         new_mode = self.theme.toggle_mode()
 
+        # Ghi nhớ lựa chọn vào settings.json (không chặn nếu ghi thất bại)
+        try:
+            self.config.set("theme", new_mode.value)
+        except IOError:
+            pass
+
         if new_mode == ThemeMode.DARK:
             self.ui.btn_toggle_theme.setText("☀️ Light")
         else:
             self.ui.btn_toggle_theme.setText("🌙 Dark")
 
-        # Xây lại toàn bộ UI với file generated của chủ đề mới
-        self._build_ui()
-
-        # Reload data into rebuilt views
-        self.refresh_all()
-
-        # Restore the page that was active before theme change
-        btn_map = {
-            self.PAGE_DASHBOARD: self.ui.btn_nav_dashboard,
-            self.PAGE_INVENTORY: self.ui.btn_nav_inventory,
-            self.PAGE_SHELVES: self.ui.btn_nav_shelf,
-        }
-        active_btn = btn_map.get(current_index, self.ui.btn_nav_dashboard)
-        self.navigate_to(current_index, active_btn)
-
+        self.apply_theme()
 
     def apply_theme(self):
-        """Apply current theme — no longer uses hard-coded stylesheet.
-        Theme is now embedded in the generated .ui files."""
-        pass  # Styling comes from the generated Ui_MainWindow / Ui_MainWindow_dark
+        """
+        Apply the current theme mode to the existing widgets.
+
+        Swaps in the cached stylesheet of the mode, then re-colours what the
+        stylesheet does not cover: dashboard cards and chart artists, and
+        the status brushes of the inventory table.
+        """
+        self.setStyleSheet(self.theme.get_stylesheet())
+        self.dashboard.apply_theme()
+        self.inventory_view.apply_theme()
+        self.shelf_view.apply_theme()
 
     # ── Helpers ──
 
@@ -776,11 +1246,8 @@ class MainWindow(QMainWindow):
         remaining = self.inventory_manager.get_shelf_remaining_capacity(
             shelf_id
         )
-        dialog = ShelfFullErrorDialog(
-            self,
-            shelf_id=shelf_id,
-            remaining_capacity=remaining,
-            theme=self.theme
+        dialog = self.dialog_pool.acquire(
+            "shelf_full", shelf_id=shelf_id, remaining_capacity=remaining
         )
         dialog.exec()
 
@@ -797,6 +1264,10 @@ class MainWindow(QMainWindow):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
+            self.data_loader.stop()
+            self.alert_scheduler.stop()
+            self.chart_renderer.stop()
+            self.image_manager.shutdown()
             event.accept()
         else:
             event.ignore()
\ No newline at end of file
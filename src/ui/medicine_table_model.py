@@ -0,0 +1,951 @@
+"""
+Medicine Table Model — PHARMA.SYS.
+
+QAbstractTableModel ảo hóa cho bảng danh sách thuốc:
+- Không tạo QTableWidgetItem nào; mọi giá trị (chữ, màu, font, khóa sắp
+  xếp) được tính theo yêu cầu trong data() — chỉ các dòng đang hiển thị
+  trên màn hình mới tốn chi phí
+- Trạng thái theo dòng được tính một lần (StatusTable, dạng vector) và giữ
+  theo (phiên bản thuốc, ngày): thuốc là bất biến nên đối tượng Medicine
+  chính là phiên bản; chỉ các dòng mới hoặc đã sửa được đánh giá lại
+- Số ngày còn lại được tính từ ngày hiện tại khi vẽ, nên qua nửa đêm chỉ các
+  thuốc vừa đổi trạng thái (AlertTransition) được đánh giá lại
+- Bút vẽ (QBrush) và font dựng sẵn theo mã trạng thái và chế độ chủ đề,
+  mọi dòng và mọi model dùng chung — data() không cấp phát đối tượng nào
+- Cập nhật từng dòng (thêm/sửa/xóa) qua begin/endInsertRows và dataChanged;
+  dòng bị xóa thành tombstone nên các dòng sau không bị đánh số lại —
+  lựa chọn và vị trí cuộn được giữ nguyên
+- Cột ảnh (tùy chọn) lấy ảnh thu nhỏ từ ThumbnailCache; thumbnail còn thiếu
+  được tạo nền và các lần hoàn tất được gộp thành một dataChanged
+
+MedicineFilterProxyModel đứng giữa model và QTableView, đảm nhận lọc và
+sắp xếp:
+- Khóa sắp xếp là giá trị số (SORT_ROLE), không phải chữ hiển thị
+- Bộ lọc chỉ so sánh các khóa đã tính sẵn (kệ, giá, cờ trạng thái); đổi
+  bộ lọc chỉ tính lại ánh xạ của proxy (NumPy), model nguồn không bị nạp lại
+"""
+from datetime import date
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PyQt6.QtCore import (
+    QAbstractProxyModel, QAbstractTableModel, QModelIndex, QSize, Qt, QTimer,
+)
+from PyQt6.QtGui import QBrush, QColor, QFont
+
+from src.models import Medicine
+from src.thresholds import STATUS_FILTER_BITS, MedicineStatus, StatusTable
+from src.ui.theme import Theme, ThemeMode
+from src.ui.thumbnails import ThumbnailCache
+
+
+def status_filter_flags(table: StatusTable) -> np.ndarray:
+    """
+    Per-row bitmask of the status filter categories a medicine falls into.
+
+    A medicine can match several categories (e.g. expiring and low stock),
+    unlike its single display status code.
+
+    Args:
+        table: Evaluated StatusTable
+
+    Returns:
+        int64 array of STATUS_FILTER_BITS combinations, one per row
+    """
+    masks = {
+        'expired': table.expired,
+        'expiring': table.expiring & ~table.expired,
+        'low_stock': table.low_stock & ~table.out_of_stock,
+        'out_of_stock': table.out_of_stock,
+        'normal': table.status == MedicineStatus.NORMAL,
+    }
+    flags = np.zeros(len(table), dtype=np.int64)
+    for name, mask in masks.items():
+        flags[mask] |= STATUS_FILTER_BITS[name]
+    return flags
+
+
+def describe_status(status: MedicineStatus, days_left: int) -> str:
+    """
+    Badge text for a status code.
+
+    Args:
+        status: MedicineStatus of the row
+        days_left: Days until expiry (negative when expired)
+    """
+    if status == MedicineStatus.EXPIRED:
+        return f"Hết hạn ({abs(days_left)} ngày)"
+    if status == MedicineStatus.OUT_OF_STOCK:
+        return "Hết hàng"
+    if status == MedicineStatus.EXPIRING:
+        return f"Sắp hết hạn ({days_left} ngày)"
+    if status == MedicineStatus.LOW_STOCK:
+        return "Tồn kho thấp"
+    return "Còn hàng"
+
+
+class MedicineTableModel(QAbstractTableModel):
+    """
+    Table model exposing a medicine list and its statuses to a QTableView.
+
+    Rows keep the inventory's storage order and are stored as aligned
+    lists (medicine, ID, status code, filter flags), so a single
+    row can be inserted, updated or removed without touching the others.
+    New rows are always appended. A removed row is left as a tombstone
+    (ID None, hidden by the proxy) so later rows keep their numbers;
+    tombstones are compacted away in one layout change once they outnumber
+    the live rows. Sorting and filtering are left to MedicineFilterProxyModel.
+    """
+
+    # Cột bảng
+    (COL_ID, COL_NAME, COL_QUANTITY, COL_EXPIRY, COL_SHELF, COL_PRICE, COL_STATUS,
+     COL_IMAGE) = range(8)
+    HEADERS = ("ID", "TÊN THUỐC", "SỐ LƯỢNG", "HSD", "KỆ", "GIÁ", "TRẠNG THÁI", "ẢNH")
+
+    # Khung ảnh thu nhỏ trong cột ảnh (vừa dòng cao 42px)
+    THUMBNAIL_CELL = QSize(32, 32)
+
+    # Vai trò dữ liệu bổ sung
+    SORT_ROLE = Qt.ItemDataRole.UserRole          # khóa sắp xếp dạng số/chuỗi
+    MEDICINE_ID_ROLE = Qt.ItemDataRole.UserRole + 1
+
+    # Kiểu huy hiệu cho từng mã trạng thái
+    STATUS_TYPES = {
+        MedicineStatus.EXPIRED: "danger",
+        MedicineStatus.OUT_OF_STOCK: "danger",
+        MedicineStatus.EXPIRING: "warning",
+        MedicineStatus.LOW_STOCK: "low_stock",
+        MedicineStatus.NORMAL: "normal",
+    }
+
+    _CENTERED = (COL_QUANTITY, COL_SHELF, COL_STATUS, COL_IMAGE)
+
+    # Số dòng đã xóa (tombstone) tối thiểu trước khi dồn bảng
+    COMPACT_MIN = 1024
+
+    # (bút chữ, bút nền huy hiệu) theo mã trạng thái, dựng một lần cho mỗi
+    # chế độ chủ đề và dùng chung giữa mọi model
+    _brush_palettes: Dict[ThemeMode, Dict[int, Tuple[QBrush, QBrush]]] = {}
+
+    def __init__(self, theme: Optional[Theme] = None, parent=None):
+        """
+        Initialize Medicine Table Model.
+
+        Args:
+            theme: Theme providing badge colours
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self._medicines: List[Medicine] = []
+        self._ids: List[Optional[str]] = []   # None: dòng đã xóa (tombstone)
+        self._row_of: Dict[str, int] = {}     # ID -> dòng
+        self._removed = 0                     # số tombstone
+        self._codes: List[int] = []       # MedicineStatus theo dòng
+        self._flags: List[int] = []       # STATUS_FILTER_BITS theo dòng
+
+        # Các danh sách trạng thái ở trên là bộ nhớ đệm theo dòng, hợp lệ
+        # với khóa này (phiên bản ngưỡng, ngày)
+        self._status_key: Optional[Hashable] = None
+        # Ngày (ordinal) dùng để tính số ngày còn lại khi vẽ
+        self._today = date.today().toordinal()
+
+        self._name_font = QFont()
+        self._name_font.setWeight(QFont.Weight.Medium)
+        self._status_font = QFont()
+        self._status_font.setBold(True)
+        self._status_font.setPointSize(Theme.FONT_SIZE_BADGE)
+        self.set_theme(theme or Theme())
+
+        # Cột ảnh: nguồn ảnh thu nhỏ (None: cột để trống); các thumbnail tạo
+        # xong trong cùng một vòng sự kiện chỉ gây một lần vẽ lại
+        self._thumbnails: Optional[ThumbnailCache] = None
+        self._thumbnail_timer = QTimer(self)
+        self._thumbnail_timer.setSingleShot(True)
+        self._thumbnail_timer.timeout.connect(self._repaint_images)
+
+    # ── Dữ liệu ──
+
+    def set_medicines(
+        self,
+        medicines: List[Medicine],
+        evaluate: Callable[[List[Medicine]], StatusTable],
+        cache_key: Hashable
+    ):
+        """
+        Replace the displayed medicines (full reset).
+
+        Statuses are evaluated once for the whole list (vectorized) and kept
+        per row until the rows change or the cache key does.
+
+        Args:
+            medicines: Medicines to show
+            evaluate: Evaluates statuses for a list of medicines
+            cache_key: Identifies the evaluation context, e.g.
+                       (threshold policy version, day)
+        """
+        table = evaluate(medicines)
+        self.beginResetModel()
+        self._status_key = cache_key
+        self._today = table.today.toordinal()
+        self._medicines = list(medicines)
+        self._ids = [m.id for m in medicines]
+        self._row_of = {medicine_id: row for row, medicine_id in enumerate(self._ids)}
+        self._removed = 0
+        self._codes = table.status.tolist()
+        self._flags = status_filter_flags(table).tolist()
+        self.endResetModel()
+
+    def apply_changes(
+        self,
+        inserted: Iterable[Medicine],
+        updated: Iterable[Tuple[Medicine, Medicine]],
+        removed: Iterable[Medicine],
+        evaluate: Callable[[List[Medicine]], StatusTable]
+    ):
+        """
+        Apply a change set row by row.
+
+        Only the inserted and updated medicines are evaluated; the other
+        rows keep their cached statuses (same day and thresholds).
+
+        Args:
+            inserted: New medicines
+            updated: (old, new) pairs with the same ID
+            removed: Medicines that were deleted
+            evaluate: Evaluates statuses for a list of medicines
+                      (called once for all inserted and updated rows)
+        """
+        for medicine in removed:
+            row = self.row_of(medicine.id)
+            if row >= 0:
+                self._remove_row(row)
+        if self._removed >= max(self.COMPACT_MIN, len(self._row_of)):
+            self._compact()
+
+        inserted, updated = list(inserted), list(updated)
+        changed = [new for _, new in updated] + inserted
+        if not changed:
+            return
+        table = evaluate(changed)
+        codes = table.status.tolist()
+        flags = status_filter_flags(table).tolist()
+
+        for i, medicine in enumerate(changed):
+            row = self.row_of(medicine.id) if i < len(updated) else -1
+            if row < 0:
+                self._insert_row(medicine, codes[i], flags[i])
+                continue
+            self._medicines[row] = medicine
+            self._codes[row] = codes[i]
+            self._flags[row] = flags[i]
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def append_medicines(
+        self,
+        medicines: List[Medicine],
+        evaluate: Callable[[List[Medicine]], StatusTable]
+    ):
+        """
+        Append a block of new rows with a single insert (progressive loading).
+
+        Args:
+            medicines: Medicines to append (IDs not already shown)
+            evaluate: Evaluates statuses for a list of medicines
+        """
+        if not medicines:
+            return
+        table = evaluate(medicines)
+        first = len(self._medicines)
+        self.beginInsertRows(QModelIndex(), first, first + len(medicines) - 1)
+        for medicine, code, flags in zip(
+            medicines, table.status.tolist(), status_filter_flags(table).tolist()
+        ):
+            self._append(medicine, code, flags)
+        self.endInsertRows()
+
+    def advance_day(
+        self,
+        today: date,
+        medicine_ids: Iterable[str],
+        evaluate: Callable[[List[Medicine]], StatusTable],
+        cache_key: Hashable
+    ):
+        """
+        Move the rows to a new day (midnight rollover) without a full evaluation.
+
+        Only the medicines that just changed expiry state are re-evaluated
+        (and re-sorted/re-filtered by the proxy); days-left text of the
+        other rows follows from the new date when they are painted.
+
+        Args:
+            today: The new day
+            medicine_ids: IDs from the scheduler's AlertTransition list
+            evaluate: Evaluates statuses for a list of medicines (new day)
+            cache_key: Evaluation context of the new day
+        """
+        self._today = today.toordinal()
+        self._status_key = cache_key
+        rows = [row for row in map(self.row_of, medicine_ids) if row >= 0]
+        if rows:
+            table = evaluate([self._medicines[row] for row in rows])
+            codes = table.status.tolist()
+            flags = status_filter_flags(table).tolist()
+            for i, row in enumerate(rows):
+                self._codes[row] = codes[i]
+                self._flags[row] = flags[i]
+                self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+        if self._medicines:
+            # Số ngày trong huy hiệu trạng thái — chỉ chữ đổi, không sắp xếp lại
+            self.dataChanged.emit(
+                self.index(0, self.COL_STATUS),
+                self.index(self.rowCount() - 1, self.COL_STATUS),
+                [Qt.ItemDataRole.DisplayRole]
+            )
+
+    def status_of(
+        self,
+        medicine: Medicine,
+        evaluate: Callable[[List[Medicine]], StatusTable],
+        cache_key: Hashable
+    ) -> Tuple[MedicineStatus, int]:
+        """
+        Status code and days left of one medicine.
+
+        Served from the row cache when the row holds this exact medicine
+        object (medicines are immutable, so the object is its version) and
+        the cache key still matches; evaluated otherwise.
+
+        Returns:
+            Tuple of (MedicineStatus, days_left)
+        """
+        row = self.row_of(medicine.id) if cache_key == self._status_key else -1
+        if row >= 0 and self._medicines[row] is medicine:
+            return MedicineStatus(self._codes[row]), self.days_left_of(row)
+        table = evaluate([medicine])
+        return table.status_at(0), int(table.days_left[0])
+
+    def set_theme(self, theme: Theme):
+        """Switch to the shared brushes of a theme and repaint."""
+        self.theme = theme
+        self._brushes = self.status_brushes(theme)
+        if self._medicines:
+            # Chỉ đổi màu — proxy không cần sắp xếp/lọc lại
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(self.rowCount() - 1, self.columnCount() - 1),
+                [Qt.ItemDataRole.ForegroundRole, Qt.ItemDataRole.BackgroundRole]
+            )
+
+    def set_thumbnails(self, thumbnails: Optional[ThumbnailCache]):
+        """
+        Serve the image column from a thumbnail cache.
+
+        Args:
+            thumbnails: Thumbnail cache (None: empty image column)
+        """
+        if self._thumbnails is not None:
+            self._thumbnails.thumbnail_ready.disconnect(self._on_thumbnail_ready)
+        self._thumbnails = thumbnails
+        if thumbnails is not None:
+            thumbnails.thumbnail_ready.connect(self._on_thumbnail_ready)
+        self._repaint_images()
+
+    def _on_thumbnail_ready(self, source_path: str):
+        # Có thể được gọi ngay trong data() (thumbnail vừa xong) — chỉ hẹn giờ
+        self._thumbnail_timer.start(0)
+
+    def _repaint_images(self):
+        """Repaint the image column (decoration only: no re-sort or re-filter)."""
+        if self._medicines:
+            self.dataChanged.emit(
+                self.index(0, self.COL_IMAGE),
+                self.index(self.rowCount() - 1, self.COL_IMAGE),
+                [Qt.ItemDataRole.DecorationRole]
+            )
+
+    @classmethod
+    def status_brushes(cls, theme: Theme) -> Dict[int, Tuple[QBrush, QBrush]]:
+        """
+        (text, badge background) brushes per status code for a theme mode.
+
+        Built on first use and shared by every model afterwards.
+        """
+        brushes = cls._brush_palettes.get(theme.mode)
+        if brushes is None:
+            by_type = {}
+            for status_type in set(cls.STATUS_TYPES.values()):
+                alert = theme.get_alert_colors(
+                    status_type if status_type != "normal" else "success"
+                )
+                by_type[status_type] = (
+                    QBrush(QColor(alert['text'])), QBrush(QColor(alert['bg']))
+                )
+            brushes = {
+                int(status): by_type[status_type]
+                for status, status_type in cls.STATUS_TYPES.items()
+            }
+            cls._brush_palettes[theme.mode] = brushes
+        return brushes
+
+    def medicine_at(self, row: int) -> Optional[Medicine]:
+        """Return the medicine stored at a source row (None for a removed row)."""
+        if 0 <= row < len(self._medicines) and self._ids[row] is not None:
+            return self._medicines[row]
+        return None
+
+    def row_of(self, medicine_id: str) -> int:
+        """Return the source row of a medicine ID, -1 if not loaded."""
+        return self._row_of.get(medicine_id, -1)
+
+    def live_rows(self) -> np.ndarray:
+        """Boolean mask of the source rows that are not tombstones."""
+        return np.fromiter((medicine_id is not None for medicine_id in self._ids),
+                           dtype=bool, count=len(self._ids))
+
+    def filter_keys(self, row: int) -> Tuple[str, float, int]:
+        """Precomputed filter keys of a source row: (shelf ID, price, status flags)."""
+        medicine = self._medicines[row]
+        return medicine.shelf_id, medicine.price, self._flags[row]
+
+    def days_left_of(self, row: int) -> int:
+        """Days until expiry of a source row, counted from the model's day."""
+        return self._medicines[row].expiry_date.toordinal() - self._today
+
+    def status_of_row(self, row: int) -> Tuple[str, str]:
+        """
+        Get status text and type for a source row.
+
+        Returns:
+            Tuple of (status_text, status_type)
+            status_type: 'danger', 'warning', 'low_stock', or 'normal'
+        """
+        status = MedicineStatus(self._codes[row])
+        return describe_status(status, self.days_left_of(row)), self.STATUS_TYPES[status]
+
+    # ── Thao tác từng dòng ──
+
+    def _append(self, medicine: Medicine, code: int, flags: int):
+        """Store one row at the end (no signals)."""
+        self._row_of[medicine.id] = len(self._medicines)
+        self._medicines.append(medicine)
+        self._ids.append(medicine.id)
+        self._codes.append(code)
+        self._flags.append(flags)
+
+    def _insert_row(self, medicine: Medicine, code: int, flags: int):
+        """Append one row."""
+        row = len(self._medicines)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._append(medicine, code, flags)
+        self.endInsertRows()
+
+    def _remove_row(self, row: int):
+        """
+        Turn one row into a tombstone.
+
+        The row stays in place (later rows keep their numbers) and is
+        reported as changed; the proxy drops it because it no longer
+        passes any filter. The medicine is kept so key arrays stay aligned.
+        """
+        del self._row_of[self._ids[row]]
+        self._ids[row] = None
+        self._flags[row] = 0
+        self._removed += 1
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def _compact(self):
+        """Drop every tombstone in one layout change (rows keep their order)."""
+        self.layoutAboutToBeChanged.emit()
+        kept = [row for row, medicine_id in enumerate(self._ids) if medicine_id is not None]
+        new_rows = np.full(len(self._ids), -1, dtype=np.int64)
+        new_rows[kept] = np.arange(len(kept))
+        self._medicines = [self._medicines[row] for row in kept]
+        self._ids = [self._ids[row] for row in kept]
+        self._codes = [self._codes[row] for row in kept]
+        self._flags = [self._flags[row] for row in kept]
+        self._row_of = {medicine_id: row for row, medicine_id in enumerate(self._ids)}
+        self._removed = 0
+
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(persistent, [
+            self.index(int(new_rows[index.row()]), index.column())
+            if new_rows[index.row()] >= 0 else QModelIndex()
+            for index in persistent
+        ])
+        self.layoutChanged.emit()
+
+    # ── QAbstractTableModel ──
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._medicines)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole):
+        if (orientation == Qt.Orientation.Horizontal
+                and role == Qt.ItemDataRole.DisplayRole
+                and 0 <= section < len(self.HEADERS)):
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        medicine = self._medicines[row]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == self.COL_ID:
+                return medicine.id
+            if col == self.COL_NAME:
+                return medicine.name
+            if col == self.COL_QUANTITY:
+                return str(medicine.quantity)
+            if col == self.COL_EXPIRY:
+                return medicine.expiry_date.strftime("%d/%m/%Y")
+            if col == self.COL_SHELF:
+                return medicine.shelf_id
+            if col == self.COL_PRICE:
+                return f"{medicine.price:,.2f}"
+            if col == self.COL_IMAGE:
+                return None
+            return self.status_of_row(row)[0]
+
+        if role == Qt.ItemDataRole.DecorationRole:
+            if col == self.COL_IMAGE and self._thumbnails is not None:
+                # Chưa có thumbnail: trả None, cột được vẽ lại khi tạo xong
+                return self._thumbnails.medicine_pixmap(
+                    medicine.image_path, self.THUMBNAIL_CELL
+                )
+            return None
+
+        if role == Qt.ItemDataRole.ForegroundRole:
+            code = self._codes[row]
+            if col == self.COL_STATUS or code != MedicineStatus.NORMAL:
+                return self._brushes[code][0]
+            return None
+
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if col == self.COL_STATUS:
+                return self._brushes[self._codes[row]][1]
+            return None
+
+        if role == Qt.ItemDataRole.FontRole:
+            if col == self.COL_NAME:
+                return self._name_font
+            if col == self.COL_STATUS:
+                return self._status_font
+            return None
+
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if col in self._CENTERED:
+                return Qt.AlignmentFlag.AlignCenter
+            return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+
+        if role == self.SORT_ROLE:
+            return self.sort_key(row, col)
+
+        if role == self.MEDICINE_ID_ROLE:
+            return medicine.id
+
+        return None
+
+    # ── Khóa sắp xếp / lọc ──
+
+    def sort_key(self, row: int, column: int):
+        """Sort key of one cell: numbers for numeric columns, never display text."""
+        if column == self.COL_QUANTITY:
+            return self._medicines[row].quantity
+        if column == self.COL_EXPIRY:
+            # Hạn dùng (ordinal): cùng thứ tự với số ngày còn lại, không đổi qua ngày
+            return self._medicines[row].expiry_date.toordinal()
+        if column == self.COL_PRICE:
+            return self._medicines[row].price
+        if column == self.COL_STATUS:
+            return self._codes[row]
+        if column == self.COL_NAME:
+            return self._medicines[row].name.lower()
+        if column == self.COL_SHELF:
+            return self._medicines[row].shelf_id
+        if column == self.COL_IMAGE:
+            return int(bool(self._medicines[row].image_path))
+        return self._medicines[row].id
+
+    def sort_keys(self, column: int) -> Sequence:
+        """
+        Sort keys of every row for a column.
+
+        Returns:
+            NumPy array for numeric columns, list of strings otherwise
+        """
+        n = len(self._medicines)
+        if column == self.COL_QUANTITY:
+            return np.fromiter((m.quantity for m in self._medicines), dtype=np.int64, count=n)
+        if column == self.COL_EXPIRY:
+            return np.fromiter((m.expiry_date.toordinal() for m in self._medicines),
+                               dtype=np.int64, count=n)
+        if column == self.COL_PRICE:
+            return np.fromiter((m.price for m in self._medicines), dtype=np.float64, count=n)
+        if column == self.COL_STATUS:
+            return np.asarray(self._codes, dtype=np.int64)
+        if column == self.COL_IMAGE:
+            return np.fromiter((bool(m.image_path) for m in self._medicines),
+                               dtype=np.int64, count=n)
+        return [self.sort_key(row, column) for row in range(n)]
+
+    def filter_arrays(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Filter keys of every row: (shelf IDs, prices, status flags)."""
+        n = len(self._medicines)
+        return (
+            [m.shelf_id for m in self._medicines],
+            np.fromiter((m.price for m in self._medicines), dtype=np.float64, count=n),
+            np.asarray(self._flags, dtype=np.int64),
+        )
+
+
+# Vai trò chỉ ảnh hưởng cách vẽ, không ảnh hưởng lọc/sắp xếp (proxy chỉ đọc
+# SORT_ROLE và khóa lọc, không bao giờ so sánh chữ hiển thị)
+_PRESENTATION_ROLES = (
+    Qt.ItemDataRole.ForegroundRole, Qt.ItemDataRole.BackgroundRole, Qt.ItemDataRole.FontRole,
+    Qt.ItemDataRole.DecorationRole, Qt.ItemDataRole.DisplayRole,
+)
+
+
+class MedicineFilterProxyModel(QAbstractProxyModel):
+    """
+    Sorting and filtering layer between MedicineTableModel and the view.
+
+    The proxy only holds a mapping (view row -> source row). Filters and
+    sorts rebuild that mapping with NumPy over the source's precomputed
+    keys (shelf, price, status flags; numeric SORT_ROLE keys), so the source
+    is never reloaded. Inserted, edited and removed source rows are
+    re-filtered and placed by binary search, one row at a time.
+
+    View rows are totally ordered by (sort key, source row) and the proxy
+    remembers the key each shown row was placed with, so an edited row is
+    found by bisecting on its old key — no source -> view map is kept.
+    Source rows are append-only (removals are tombstones) and never
+    renumbered except by a source layout change.
+
+    QSortFilterProxyModel is not used: it compares rows through data()
+    calls, which from Python costs seconds for a 10k-row sort.
+    """
+
+    def __init__(self, source: MedicineTableModel, parent=None):
+        """
+        Initialize Medicine Filter Proxy Model.
+
+        Args:
+            source: Model holding every loaded medicine
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self._shelf_id: Optional[str] = None
+        self._price_min: Optional[float] = None
+        self._price_max: Optional[float] = None
+        self._status_bits: Optional[int] = None
+        self._sort_column = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+        self._source_rows: List[int] = []   # dòng proxy -> dòng nguồn
+        self._keys: list = []               # dòng nguồn -> khóa lúc xếp vào (None: ẩn)
+        self._layout_ids: List[str] = []    # ID của các chỉ mục bền khi nguồn đổi bố cục
+
+        self.setSourceModel(source)
+        source.modelAboutToBeReset.connect(self.beginResetModel)
+        source.modelReset.connect(self._on_source_reset)
+        source.rowsInserted.connect(self._on_rows_inserted)
+        source.layoutAboutToBeChanged.connect(self._on_source_layout_about_to_change)
+        source.layoutChanged.connect(self._on_source_layout_changed)
+        source.dataChanged.connect(self._on_data_changed)
+        self._source_rows, self._keys = self._compute_mapping()
+
+    # ── Bộ lọc / sắp xếp ──
+
+    def set_filters(self, filters: Optional[dict]):
+        """
+        Apply filter criteria (keys: shelf_id, price_min, price_max, status).
+
+        Args:
+            filters: Filter dictionary, or None to show everything
+        """
+        filters = filters or {}
+        self._shelf_id = filters.get('shelf_id') or None
+        self._price_min = filters.get('price_min')
+        self._price_max = filters.get('price_max')
+        status = filters.get('status')
+        # Trạng thái không hợp lệ (bit 0): không dòng nào khớp, giống filter_medicines
+        self._status_bits = STATUS_FILTER_BITS.get(status, 0) if status else None
+        self._remap()
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        """Sort view rows by a column, keeping the selection on the same medicines."""
+        self._sort_column, self._sort_order = column, order
+        self._remap()
+
+    def sortColumn(self) -> int:
+        return self._sort_column
+
+    def sortOrder(self) -> Qt.SortOrder:
+        return self._sort_order
+
+    def medicine_at(self, row: int) -> Optional[Medicine]:
+        """Return the medicine shown at a view row."""
+        if 0 <= row < len(self._source_rows):
+            return self.sourceModel().medicine_at(self._source_rows[row])
+        return None
+
+    def accepts(self, source_row: int) -> bool:
+        """True if a source row passes the active filters (never for a removed row)."""
+        source = self.sourceModel()
+        if source.medicine_at(source_row) is None:
+            return False
+        shelf_id, price, flags = source.filter_keys(source_row)
+        if self._shelf_id is not None and shelf_id != self._shelf_id:
+            return False
+        if self._price_min is not None and price < self._price_min:
+            return False
+        if self._price_max is not None and price > self._price_max:
+            return False
+        if self._status_bits is not None and not flags & self._status_bits:
+            return False
+        return True
+
+    def _compute_mapping(self) -> Tuple[List[int], list]:
+        """
+        Filter and sort every source row at once (vectorized).
+
+        Returns:
+            (view row -> source row, source row -> sort key or None if hidden)
+        """
+        source = self.sourceModel()
+        shelf_ids, prices, flags = source.filter_arrays()
+        mask = source.live_rows()
+        if self._shelf_id is not None:
+            mask &= np.fromiter((s == self._shelf_id for s in shelf_ids),
+                                dtype=bool, count=len(shelf_ids))
+        if self._price_min is not None:
+            mask &= prices >= self._price_min
+        if self._price_max is not None:
+            mask &= prices <= self._price_max
+        if self._status_bits is not None:
+            mask &= (flags & self._status_bits) != 0
+        rows = np.flatnonzero(mask)
+        shown = mask.tolist()
+
+        if self._sort_column < 0:
+            # Không sắp xếp: khóa chính là dòng nguồn
+            return rows.tolist(), [row if ok else None for row, ok in enumerate(shown)]
+        keys = source.sort_keys(self._sort_column)
+        descending = self._sort_order == Qt.SortOrder.DescendingOrder
+        if isinstance(keys, np.ndarray):
+            selected = keys[rows]
+            # Đảo dấu thay vì đảo mảng để giữ thứ tự ổn định (theo dòng nguồn) khi bằng nhau
+            order = np.argsort(-selected if descending else selected, kind="stable")
+            rows = rows[order].tolist()
+            keys = keys.tolist()
+        else:
+            rows = sorted(rows.tolist(), key=keys.__getitem__, reverse=descending)
+        return rows, [key if ok else None for key, ok in zip(keys, shown)]
+
+    def _remap(self):
+        """Rebuild the mapping, carrying persistent indexes (selection) along."""
+        self.layoutAboutToBeChanged.emit()
+        old_rows = self._source_rows
+        self._source_rows, self._keys = self._compute_mapping()
+        proxy_rows = self._proxy_rows()
+
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(persistent, [
+            self._moved_index(proxy_rows[old_rows[index.row()]], index.column())
+            for index in persistent
+        ])
+        self.layoutChanged.emit()
+
+    def _moved_index(self, row: int, column: int) -> QModelIndex:
+        return self.index(int(row), column) if row >= 0 else QModelIndex()
+
+    def _proxy_rows(self) -> np.ndarray:
+        """Source row -> view row array (-1 when hidden); only for whole-mapping rebuilds."""
+        proxy_rows = np.full(self.sourceModel().rowCount(), -1, dtype=np.int64)
+        proxy_rows[self._source_rows] = np.arange(len(self._source_rows))
+        return proxy_rows
+
+    def _sort_key(self, source_row: int):
+        """Current sort key of a source row."""
+        if self._sort_column < 0:
+            return source_row
+        return self.sourceModel().sort_key(source_row, self._sort_column)
+
+    def _position(self, key, source_row: int) -> int:
+        """
+        Binary-search the number of view rows ordered before (key, source_row).
+
+        Equal keys are ordered by source row, as the stable sort in
+        _compute_mapping leaves them, so every shown row has one exact place.
+        """
+        rows, keys = self._source_rows, self._keys
+        descending = self._sort_column >= 0 and self._sort_order == Qt.SortOrder.DescendingOrder
+        low, high = 0, len(rows)
+        while low < high:
+            middle = (low + high) // 2
+            other = rows[middle]
+            other_key = keys[other]
+            if other_key == key:
+                before = other < source_row
+            else:
+                before = (other_key > key) if descending else (other_key < key)
+            if before:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _view_row(self, source_row: int) -> int:
+        """View row of a source row, found by its placement key (-1 when hidden)."""
+        if not 0 <= source_row < len(self._keys) or self._keys[source_row] is None:
+            return -1
+        return self._position(self._keys[source_row], source_row)
+
+    # ── Tín hiệu từ model nguồn ──
+
+    def _on_source_reset(self):
+        self._source_rows, self._keys = self._compute_mapping()
+        self.endResetModel()
+
+    def _on_rows_inserted(self, parent: QModelIndex, first: int, last: int):
+        # Nguồn chỉ nối thêm vào cuối: các dòng cũ giữ nguyên số
+        self._keys.extend([None] * (last - first + 1))
+        if self._sort_column < 0:
+            # Chưa sắp xếp: các dòng được nhận cũng nằm cuối bảng — một lần
+            # chèn cho cả khối (tải dần theo lô)
+            accepted = [row for row in range(first, last + 1) if self.accepts(row)]
+            if accepted:
+                row = len(self._source_rows)
+                self.beginInsertRows(QModelIndex(), row, row + len(accepted) - 1)
+                self._source_rows.extend(accepted)
+                for source_row in accepted:
+                    self._keys[source_row] = source_row
+                self.endInsertRows()
+            return
+        for source_row in range(first, last + 1):
+            if self.accepts(source_row):
+                self._insert_source_row(source_row)
+
+    def _on_source_layout_about_to_change(self, parents=(), hint=None):
+        # Nguồn đánh số lại dòng (dồn tombstone): ghi nhớ chỉ mục bền theo ID
+        self.layoutAboutToBeChanged.emit()
+        self._layout_ids = [
+            self.medicine_at(index.row()).id for index in self.persistentIndexList()
+        ]
+
+    def _on_source_layout_changed(self, parents=(), hint=None):
+        source = self.sourceModel()
+        self._source_rows, self._keys = self._compute_mapping()
+        proxy_rows = self._proxy_rows()
+
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(persistent, [
+            self._moved_index(proxy_rows[row] if row >= 0 else -1, index.column())
+            for index, row in zip(persistent, map(source.row_of, self._layout_ids))
+        ])
+        self._layout_ids = []
+        self.layoutChanged.emit()
+
+    def _on_data_changed(self, top_left: QModelIndex, bottom_right: QModelIndex,
+                         roles: List[int] = ()):
+        if roles and all(role in _PRESENTATION_ROLES for role in roles):
+            # Chỉ đổi màu/font/chữ — vị trí và bộ lọc không đổi
+            if self._source_rows:
+                self.dataChanged.emit(
+                    self.index(0, 0),
+                    self.index(len(self._source_rows) - 1, self.columnCount() - 1),
+                    roles
+                )
+            return
+        for source_row in range(top_left.row(), bottom_right.row() + 1):
+            self._source_row_changed(source_row)
+
+    def _insert_source_row(self, source_row: int):
+        """Show a source row at its sorted position."""
+        key = self._sort_key(source_row)
+        row = self._position(key, source_row)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._source_rows.insert(row, source_row)
+        self._keys[source_row] = key
+        self.endInsertRows()
+
+    def _source_row_changed(self, source_row: int):
+        """Re-filter and re-place one edited (or removed) source row."""
+        row = self._view_row(source_row)
+        accepted = self.accepts(source_row)
+        if row < 0:
+            if accepted:
+                self._insert_source_row(source_row)
+            return
+        if not accepted:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._source_rows[row]
+            self._keys[source_row] = None
+            self.endRemoveRows()
+            return
+
+        key = self._sort_key(source_row)
+        # Vị trí tính khi dòng vẫn còn ở chỗ cũ: trừ chính nó nếu nằm trước
+        target = self._position(key, source_row)
+        if target > row:
+            target -= 1
+        self._keys[source_row] = key
+        if target != row:
+            # Chỉ số đích của beginMoveRows tính trước khi bỏ dòng nguồn
+            destination = target + 1 if target > row else target
+            self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), destination)
+            del self._source_rows[row]
+            self._source_rows.insert(target, source_row)
+            self.endMoveRows()
+            row = target
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    # ── QAbstractProxyModel ──
+
+    def mapToSource(self, proxy_index: QModelIndex) -> QModelIndex:
+        if not proxy_index.isValid() or proxy_index.row() >= len(self._source_rows):
+            return QModelIndex()
+        return self.sourceModel().index(
+            self._source_rows[proxy_index.row()], proxy_index.column()
+        )
+
+    def mapFromSource(self, source_index: QModelIndex) -> QModelIndex:
+        if not source_index.isValid():
+            return QModelIndex()
+        return self._moved_index(self._view_row(source_index.row()), source_index.column())
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if parent.isValid() or not (0 <= row < len(self._source_rows)
+                                    and 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        return QModelIndex()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._source_rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.sourceModel().columnCount()
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and bool(self._source_rows)
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal:
+            return self.sourceModel().headerData(section, orientation, role)
+        return super().headerData(section, orientation, role)
@@ -0,0 +1,442 @@
+"""
+Paged Table Models — PHARMA.SYS.
+
+Model theo trang cho kho rất lớn, đọc từ CatalogIndex (SQLite):
+- Chỉ các trang đã cuộn tới mới được tải: QTableView gọi canFetchMore()/
+  fetchMore() khi người dùng cuộn gần cuối bảng
+- Lọc và sắp xếp được đẩy xuống chỉ mục (WHERE/ORDER BY trên cột có chỉ
+  mục), phân trang theo khóa (keyset) nên trang thứ N tốn như trang đầu
+- Trạng thái theo dòng đến sẵn từ chỉ mục, không cần đánh giá lại
+- Sau mỗi lần sửa, chỉ các dòng bị đổi được đọc lại và vá tại chỗ (sửa,
+  chuyển vị trí, thêm, xóa) — vùng chọn và vị trí cuộn được giữ nguyên
+
+PagedMedicineModel dùng lại cách hiển thị của MedicineTableModel (cột,
+màu huy hiệu, font); PagedShelfModel dùng lại ShelfTableModel.
+"""
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PyQt6.QtCore import QModelIndex, Qt
+
+from src.catalog_index import CatalogIndex, MedicineQuery
+from src.models import Shelf
+from src.ui.medicine_table_model import MedicineTableModel
+from src.ui.shelf_table_model import ShelfTableModel, shelf_capacity
+from src.ui.theme import Theme
+
+
+def _key_row(keys: List[tuple], key: tuple, descending: bool) -> int:
+    """Row at which a paging key belongs among the sorted loaded keys (binary search)."""
+    low, high = 0, len(keys)
+    while low < high:
+        middle = (low + high) // 2
+        if (keys[middle] > key) if descending else (keys[middle] < key):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _in_loaded_pages(key: tuple, cursor: Optional[tuple], has_more: bool,
+                     descending: bool) -> bool:
+    """True if a row with this paging key falls within the pages loaded so far."""
+    if not has_more:
+        return True
+    if cursor is None:
+        return False
+    return key >= cursor if descending else key <= cursor
+
+
+class PagedMedicineModel(MedicineTableModel):
+    """
+    Medicine table model that loads filtered, sorted pages from a CatalogIndex.
+
+    The index must be synced with the inventory before reload() is called;
+    the model never reads the inventory itself.
+    """
+
+    # Số dòng mỗi lần fetchMore()
+    PAGE_SIZE = 200
+
+    # Cột -> khóa sắp xếp của CatalogIndex
+    SORT_KEYS = {
+        MedicineTableModel.COL_ID: "id",
+        MedicineTableModel.COL_NAME: "name",
+        MedicineTableModel.COL_QUANTITY: "quantity",
+        MedicineTableModel.COL_EXPIRY: "expiry",
+        MedicineTableModel.COL_SHELF: "shelf_id",
+        MedicineTableModel.COL_PRICE: "price",
+        MedicineTableModel.COL_STATUS: "status",
+    }
+
+    def __init__(self, index: CatalogIndex, theme: Optional[Theme] = None, parent=None):
+        """
+        Initialize Paged Medicine Model.
+
+        Args:
+            index: Catalog index serving the pages
+            theme: Theme providing badge colours
+            parent: Parent QObject
+        """
+        super().__init__(theme, parent)
+        self._index = index
+        self._query = MedicineQuery()
+        self._cursor: Optional[tuple] = None
+        self._has_more = False
+        self._sort_column = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+        self.total = 0   # số thuốc khớp bộ lọc (kể cả các trang chưa tải)
+
+        # Khóa phân trang theo dòng (đúng thứ tự hiển thị) và theo ID — dòng
+        # của một ID được tìm bằng tìm kiếm nhị phân, nên thêm/xóa một dòng
+        # không phải đánh số lại các dòng sau (_row_of không dùng ở đây)
+        self._keys: List[tuple] = []
+        self._key_of: Dict[str, tuple] = {}
+
+    def set_filters(self, filters: Optional[dict]):
+        """Filter by the FilterMedicineDialog criteria and reload from the first page."""
+        self._query.filters = dict(filters or {})
+        self.reload()
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        """Sort by a column (pushed down to the index) and reload from the first page."""
+        self._sort_column, self._sort_order = column, order
+        self._query.sort_key = self.SORT_KEYS.get(column)
+        self._query.descending = order == Qt.SortOrder.DescendingOrder
+        self.reload()
+
+    def reload(self, keep_rows: int = 0):
+        """
+        Re-run the query from the first page.
+
+        Args:
+            keep_rows: Fetch pages until at least this many rows are loaded
+                (keeps the scroll position after an edit)
+        """
+        self.beginResetModel()
+        self._medicines, self._ids, self._row_of = [], [], {}
+        self._codes, self._flags = [], []
+        self._keys, self._key_of = [], {}
+        self._today = date.today().toordinal()
+        self._cursor = None
+        self._has_more = True
+        self.total = self._index.count_medicines(self._query)
+        self.endResetModel()
+        self.fetchMore()
+        while self._has_more and len(self._medicines) < keep_rows:
+            self.fetchMore()
+
+    def refresh(self):
+        """Reload after the index was synced, keeping the rows loaded so far."""
+        self.reload(len(self._medicines))
+
+    def refresh_rows(self, medicine_ids: Iterable[str]):
+        """
+        Patch the loaded rows after the index was synced with these medicines changed.
+
+        Each changed medicine is re-read from the index and updated in place,
+        moved to its new sort position, inserted or removed — only within
+        the pages loaded so far. Selection and scroll position are kept and
+        the cost follows the number of changed medicines, not the rows loaded.
+
+        Args:
+            medicine_ids: IDs of inserted, edited, removed or re-evaluated medicines
+        """
+        medicine_ids = set(medicine_ids)
+        if not medicine_ids:
+            return
+        page = self._index.medicines_by_id(self._query, medicine_ids)
+        descending = self._query.descending
+        found = {
+            medicine.id: (medicine, code, flags, key)
+            for (medicine, code, _, flags), key in zip(page.rows, page.keys)
+            if _in_loaded_pages(key, self._cursor, self._has_more, descending)
+        }
+
+        # Đã xóa, không còn khớp bộ lọc, hoặc đã rời khỏi các trang đã tải
+        for medicine_id in medicine_ids - found.keys():
+            row = self.row_of(medicine_id)
+            if row >= 0:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                self._take_row(row)
+                self.endRemoveRows()
+
+        last = self.columnCount() - 1
+        for medicine_id, (medicine, code, flags, key) in found.items():
+            row = self.row_of(medicine_id)
+            if row < 0:
+                row = _key_row(self._keys, key, descending)
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._put_row(row, medicine, code, flags, key)
+                self.endInsertRows()
+                continue
+            target = _key_row(self._keys, key, descending)
+            if target > row:
+                target -= 1   # không tính chính dòng này
+            if target != row:
+                self.beginMoveRows(
+                    QModelIndex(), row, row, QModelIndex(),
+                    target + 1 if target > row else target
+                )
+                self._take_row(row)
+                self._put_row(target, medicine, code, flags, key)
+                self.endMoveRows()
+            else:
+                self._medicines[row] = medicine
+                self._codes[row], self._flags[row] = code, flags
+                self._keys[row] = self._key_of[medicine_id] = key
+            self.dataChanged.emit(self.index(target, 0), self.index(target, last))
+        self.total = self._index.count_medicines(self._query)
+
+    def refresh_day(self, today: date, medicine_ids: Iterable[str]):
+        """
+        Move the loaded rows to a new day (midnight rollover).
+
+        Only the medicines that just changed expiry state are patched;
+        days-left text of the other rows follows from the new date.
+
+        Args:
+            today: The new day
+            medicine_ids: IDs from the scheduler's AlertTransition list
+        """
+        self._today = today.toordinal()
+        self.refresh_rows(medicine_ids)
+        if self._medicines:
+            self.dataChanged.emit(
+                self.index(0, self.COL_STATUS),
+                self.index(self.rowCount() - 1, self.COL_STATUS),
+                [Qt.ItemDataRole.DisplayRole]
+            )
+
+    def row_of(self, medicine_id: str) -> int:
+        """Return the row of a medicine ID, -1 if not loaded."""
+        key = self._key_of.get(medicine_id)
+        return -1 if key is None else _key_row(self._keys, key, self._query.descending)
+
+    def sortColumn(self) -> int:
+        return self._sort_column
+
+    def sortOrder(self) -> Qt.SortOrder:
+        return self._sort_order
+
+    def _put_row(self, row: int, medicine, code: int, flags: int, key: tuple):
+        """Store one row at a position (no signals)."""
+        self._medicines.insert(row, medicine)
+        self._ids.insert(row, medicine.id)
+        self._codes.insert(row, code)
+        self._flags.insert(row, flags)
+        self._keys.insert(row, key)
+        self._key_of[medicine.id] = key
+
+    def _take_row(self, row: int):
+        """Drop one row (no signals)."""
+        del self._key_of[self._ids[row]]
+        del self._medicines[row], self._ids[row], self._codes[row]
+        del self._flags[row], self._keys[row]
+
+    # ── Tải theo trang ──
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self._has_more
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if parent.isValid() or not self._has_more:
+            return
+        page = self._index.medicine_page(self._query, self.PAGE_SIZE, self._cursor)
+        self._cursor = page.cursor
+        self._has_more = page.cursor is not None
+        # Chỉ mục có thể đã đồng bộ trước bảng (trang đang ẩn): dòng đã tải
+        # với khóa cũ sẽ được refresh_rows() dời chỗ, không thêm lần nữa
+        rows = [
+            (row, key) for row, key in zip(page.rows, page.keys)
+            if row[0].id not in self._key_of
+        ]
+        if not rows:
+            return
+
+        first = len(self._medicines)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        for (medicine, code, _, flags), key in rows:
+            self._put_row(len(self._medicines), medicine, code, flags, key)
+        self.endInsertRows()
+
+
+class PagedShelfModel(ShelfTableModel):
+    """
+    Shelf table model (with used / remaining capacity) paged from a CatalogIndex.
+
+    Display is inherited from ShelfTableModel; used quantities arrive with
+    each page from the index instead of a live counter.
+    """
+
+    # Số dòng mỗi lần fetchMore()
+    PAGE_SIZE = 200
+
+    SORT_KEYS = ("id", "column", "row", "capacity", "used", "remaining")
+
+    def __init__(self, index: CatalogIndex, parent=None):
+        """
+        Initialize Paged Shelf Model.
+
+        Args:
+            index: Catalog index serving the pages
+            parent: Parent QObject
+        """
+        super().__init__(parent=parent)
+        self._index = index
+        self._rows: List[Tuple[Shelf, int, int, int]] = []   # (kệ, sức chứa, đã dùng, còn lại)
+        self._keys: List[tuple] = []          # khóa phân trang theo dòng
+        self._key_of: Dict[str, tuple] = {}   # ID kệ -> khóa phân trang
+        self._cursor: Optional[tuple] = None
+        self._has_more = False
+        self._sort_column = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+        self.total = 0
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        """Sort by a column (pushed down to the index) and reload from the first page."""
+        self._sort_column, self._sort_order = column, order
+        self.reload()
+
+    def reload(self, keep_rows: int = 0):
+        """
+        Re-run the query from the first page.
+
+        Args:
+            keep_rows: Fetch pages until at least this many rows are loaded
+        """
+        self.beginResetModel()
+        self._rows, self._keys, self._key_of = [], [], {}
+        self._cursor = None
+        self._has_more = True
+        self.total = self._index.count_shelves()
+        self.endResetModel()
+        self.fetchMore()
+        while self._has_more and len(self._rows) < keep_rows:
+            self.fetchMore()
+
+    def refresh(self):
+        """Reload after the index was synced, keeping the rows loaded so far."""
+        self.reload(len(self._rows))
+
+    def refresh_rows(self, shelf_ids: Iterable[str]):
+        """
+        Patch the loaded rows after the index was synced with these shelves changed.
+
+        Works like PagedMedicineModel.refresh_rows(): edited shelves and
+        shelves whose used quantity changed are re-read, moved if their sort
+        key changed, inserted or removed — selection and scroll are kept.
+
+        Args:
+            shelf_ids: IDs of inserted, edited or removed shelves, and of
+                shelves holding an added, edited or removed medicine
+        """
+        shelf_ids = set(shelf_ids)
+        if not shelf_ids:
+            return
+        page = self._index.shelves_by_id(shelf_ids, self._sort_key())
+        descending = self._sort_order == Qt.SortOrder.DescendingOrder
+        found = {
+            shelf.id: (shelf, used, key)
+            for (shelf, used), key in zip(page.rows, page.keys)
+            if _in_loaded_pages(key, self._cursor, self._has_more, descending)
+        }
+
+        for shelf_id in shelf_ids - found.keys():
+            row = self.row_of(shelf_id)
+            if row >= 0:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                self._take_row(row)
+                self.endRemoveRows()
+
+        last = self.columnCount() - 1
+        for shelf_id, (shelf, used, key) in found.items():
+            row = self.row_of(shelf_id)
+            if row < 0:
+                row = _key_row(self._keys, key, descending)
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._put_row(row, shelf, used, key)
+                self.endInsertRows()
+                continue
+            target = _key_row(self._keys, key, descending)
+            if target > row:
+                target -= 1   # không tính chính dòng này
+            if target != row:
+                self.beginMoveRows(
+                    QModelIndex(), row, row, QModelIndex(),
+                    target + 1 if target > row else target
+                )
+                self._take_row(row)
+                self._put_row(target, shelf, used, key)
+                self.endMoveRows()
+            else:
+                capacity = shelf_capacity(shelf)
+                self._rows[row] = (shelf, capacity, used, capacity - used)
+                self._keys[row] = self._key_of[shelf_id] = key
+            self.dataChanged.emit(self.index(target, 0), self.index(target, last))
+        self.total = self._index.count_shelves()
+
+    def sortColumn(self) -> int:
+        return self._sort_column
+
+    def sortOrder(self) -> Qt.SortOrder:
+        return self._sort_order
+
+    def _row_values(self, row: int) -> Tuple[Shelf, int, int, int]:
+        return self._rows[row]
+
+    def row_of(self, shelf_id: str) -> int:
+        """Row of a loaded shelf ID (binary search on the paging keys), -1 if not loaded."""
+        key = self._key_of.get(shelf_id)
+        if key is None:
+            return -1
+        return _key_row(self._keys, key, self._sort_order == Qt.SortOrder.DescendingOrder)
+
+    def _sort_key(self) -> Optional[str]:
+        """CatalogIndex shelf sort key of the current sort column (None: storage order)."""
+        if 0 <= self._sort_column < len(self.SORT_KEYS):
+            return self.SORT_KEYS[self._sort_column]
+        return None
+
+    def _put_row(self, row: int, shelf: Shelf, used: int, key: tuple):
+        """Store one row at a position (no signals)."""
+        capacity = shelf_capacity(shelf)
+        self._rows.insert(row, (shelf, capacity, used, capacity - used))
+        self._keys.insert(row, key)
+        self._key_of[shelf.id] = key
+
+    def _take_row(self, row: int):
+        """Drop one row (no signals)."""
+        del self._key_of[self._rows[row][0].id]
+        del self._rows[row], self._keys[row]
+
+    # ── Tải theo trang ──
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self._has_more
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if parent.isValid() or not self._has_more:
+            return
+        page = self._index.shelf_page(
+            self.PAGE_SIZE, self._cursor, self._sort_key(),
+            self._sort_order == Qt.SortOrder.DescendingOrder
+        )
+        self._cursor = page.cursor
+        self._has_more = page.cursor is not None
+        # Như PagedMedicineModel.fetchMore(): bỏ qua kệ đã tải với khóa cũ
+        rows = [
+            (row, key) for row, key in zip(page.rows, page.keys)
+            if row[0].id not in self._key_of
+        ]
+        if not rows:
+            return
+
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        for (shelf, used), key in rows:
+            self._put_row(len(self._rows), shelf, used, key)
+        self.endInsertRows()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
@@ -0,0 +1,218 @@
+"""
+Shelf Table Model — PHARMA.SYS.
+
+QAbstractTableModel ảo hóa cho bảng kệ:
+- Chỉ giữ danh sách kệ; "Đã dùng" và "Còn lại" được đọc từ bộ đếm theo kệ
+  của InventoryManager (get_shelf_used, O(1)) khi ô được vẽ — không còn
+  phải cộng số lượng của cả kho thành medicines_per_shelf
+- Thuốc thêm/sửa/xóa/chuyển kệ chỉ phát dataChanged cho ba ô sức chứa của
+  đúng các kệ bị ảnh hưởng; kệ thêm/xóa chèn/xóa đúng một dòng
+- Sắp xếp do QSortFilterProxyModel đảm nhận theo SORT_ROLE (giá trị số cho
+  các cột sức chứa)
+
+PagedShelfModel (paged_table_model.py) dùng lại cách hiển thị này cho các
+trang đọc từ CatalogIndex.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt6.QtGui import QBrush, QColor, QFont
+
+from src.inventory_manager import ChangeSet
+from src.models import Shelf
+from src.ui.theme import Theme
+
+
+def shelf_capacity(shelf: Shelf) -> int:
+    """Capacity of a shelf as int (Shelf.capacity is stored as str; invalid -> 0)."""
+    try:
+        return int(shelf.capacity)
+    except (ValueError, TypeError):
+        return 0
+
+
+class ShelfTableModel(QAbstractTableModel):
+    """
+    Table model exposing the shelf list with live capacity usage.
+
+    Rows keep the inventory's storage order. Used quantities come from a
+    `used_of(shelf_id)` callable (normally InventoryManager.get_shelf_used),
+    so a medicine change only needs a dataChanged for the shelves it
+    touched. The value read last is cached per shelf and dropped just
+    before that shelf's dataChanged: a sorting proxy handles the rows one
+    by one and must still see the old values of rows not yet notified.
+    """
+
+    # Cột bảng (cùng thứ tự với bảng kệ trong shelf_view.ui)
+    COL_ID, COL_COLUMN, COL_ROW, COL_CAPACITY, COL_USED, COL_REMAINING = range(6)
+    HEADERS = ("ID Kệ", "Dãy", "Cột", "Sức chứa", "Đã dùng", "Còn lại")
+
+    # Vai trò dữ liệu bổ sung
+    SORT_ROLE = Qt.ItemDataRole.UserRole
+
+    def __init__(self, used_of: Optional[Callable[[str], int]] = None, parent=None):
+        """
+        Initialize Shelf Table Model.
+
+        Args:
+            used_of: Returns the used quantity of a shelf (default: always 0)
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self._used_of = used_of or (lambda shelf_id: 0)
+        self._shelves: List[Shelf] = []
+        self._row_by_id: Dict[str, int] = {}
+        # Đã dùng theo kệ như lần đọc gần nhất — proxy sắp xếp theo các giá
+        # trị này, nên chỉ được đổi đúng lúc báo dataChanged cho dòng đó
+        self._used: Dict[str, int] = {}
+
+        # Màu cột "Còn lại": hết chỗ / sắp đầy
+        self._full_brush = QBrush(QColor(Theme.CHART_RED))
+        self._almost_full_brush = QBrush(QColor(Theme.CHART_ORANGE))
+        self._bold_font = QFont()
+        self._bold_font.setBold(True)
+
+    def set_shelves(
+        self,
+        shelves: List[Shelf],
+        used_of: Optional[Callable[[str], int]] = None
+    ):
+        """
+        Replace every row (model reset).
+
+        Args:
+            shelves: Shelves in display order
+            used_of: New usage source (kept when omitted)
+        """
+        self.beginResetModel()
+        if used_of is not None:
+            self._used_of = used_of
+        self._shelves = list(shelves)
+        self._row_by_id = {}
+        self._used = {}
+        self._reindex()
+        self.endResetModel()
+
+    def apply_changes(self, changes: ChangeSet):
+        """
+        Apply a change set as single-row operations.
+
+        Removed and inserted shelves remove/insert their rows, edited
+        shelves refresh their row, and shelves holding an added, edited or
+        removed medicine refresh only their capacity cells.
+
+        Args:
+            changes: Net changes since the model was last updated
+        """
+        for shelf in changes.shelves_removed:
+            row = self._row_by_id.get(shelf.id)
+            if row is None:
+                continue
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._shelves[row]
+            del self._row_by_id[shelf.id]
+            self._used.pop(shelf.id, None)
+            self._reindex(row)
+            self.endRemoveRows()
+
+        last = self.columnCount() - 1
+        updated = set()
+        for _, shelf in changes.shelves_updated:
+            row = self._row_by_id.get(shelf.id)
+            if row is not None:
+                self._shelves[row] = shelf
+                self._used.pop(shelf.id, None)
+                updated.add(shelf.id)
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last))
+
+        # Đã dùng/còn lại đọc trực tiếp từ bộ đếm — chỉ cần báo ô nào đã đổi
+        touched = {m.shelf_id for m in changes.inserted}
+        touched.update(m.shelf_id for m in changes.removed)
+        for old, new in changes.updated:
+            touched.add(old.shelf_id)
+            touched.add(new.shelf_id)
+        for shelf_id in touched - updated:
+            row = self._row_by_id.get(shelf_id)
+            if row is not None:
+                self._used.pop(shelf_id, None)
+                self.dataChanged.emit(
+                    self.index(row, self.COL_USED), self.index(row, self.COL_REMAINING)
+                )
+
+        inserted = [s for s in changes.shelves_inserted if s.id not in self._row_by_id]
+        if inserted:
+            first = len(self._shelves)
+            self.beginInsertRows(QModelIndex(), first, first + len(inserted) - 1)
+            self._shelves.extend(inserted)
+            self._reindex(first)
+            self.endInsertRows()
+
+    def _reindex(self, start: int = 0):
+        """Update the ID -> row map from `start` on (rows before it did not move)."""
+        for row in range(start, len(self._shelves)):
+            self._row_by_id[self._shelves[row].id] = row
+
+    def shelf_id_at(self, row: int) -> Optional[str]:
+        """Return the shelf ID shown at a row."""
+        if 0 <= row < self.rowCount():
+            return self._row_values(row)[0].id
+        return None
+
+    def _row_values(self, row: int) -> Tuple[Shelf, int, int, int]:
+        """Return (shelf, capacity, used, remaining) of a row."""
+        shelf = self._shelves[row]
+        capacity = shelf_capacity(shelf)
+        used = self._used.get(shelf.id)
+        if used is None:
+            used = self._used[shelf.id] = self._used_of(shelf.id)
+        return shelf, capacity, used, capacity - used
+
+    # ── QAbstractTableModel ──
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._shelves)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole):
+        if (orientation == Qt.Orientation.Horizontal
+                and role == Qt.ItemDataRole.DisplayRole
+                and 0 <= section < len(self.HEADERS)):
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        shelf, capacity, used, remaining = self._row_values(index.row())
+        col = index.column()
+
+        if role in (Qt.ItemDataRole.DisplayRole, self.SORT_ROLE):
+            if col == self.COL_ID:
+                return shelf.id
+            if col == self.COL_COLUMN:
+                return shelf.column
+            if col == self.COL_ROW:
+                return shelf.row
+            value = (capacity, used, remaining)[col - self.COL_CAPACITY]
+            return str(value) if role == Qt.ItemDataRole.DisplayRole else value
+
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if col == self.COL_ID:
+                return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+            return Qt.AlignmentFlag.AlignCenter
+
+        if col == self.COL_REMAINING and (remaining <= 0 or remaining <= capacity * 0.2):
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return self._full_brush if remaining <= 0 else self._almost_full_brush
+            if role == Qt.ItemDataRole.FontRole:
+                return self._bold_font
+
+        return None
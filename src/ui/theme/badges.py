@@ -2,7 +2,10 @@
 Các hàm trợ giúp màu huy hiệu trạng thái và cảnh báo — Hệ thống Thiết kế PHARMA.SYS.
 """
 from src.ui.theme.tokens import BORDER_RADIUS, BORDER_RADIUS_PILL, FONT_SIZE_BADGE
-from src.ui.theme.cards import STAT_CARD_BLUE, STAT_CARD_YELLOW, STAT_CARD_RED, STAT_CARD_GREEN
+from src.ui.theme.cards import (
+    STAT_CARD_BLUE, STAT_CARD_YELLOW, STAT_CARD_RED, STAT_CARD_GREEN,
+    STAT_CARD_TEAL, STAT_CARD_ROSE, STAT_CARD_INDIGO, STAT_CARD_SLATE,
+)
 
 
 def get_alert_colors(current_colors: dict, alert_type: str) -> dict:
@@ -43,7 +46,8 @@ def get_stat_card_style(card_type: str) -> str:
     Lấy stylesheet cho thẻ thống kê trên dashboard.
 
     Tham số:
-        card_type: Một trong 'total', 'expiring', 'expired', 'low_stock'.
+        card_type: Một trong 'total', 'expiring', 'expired', 'low_stock',
+            'value', 'value_at_risk', 'zone_value', 'shelf_value'.
 
     Trả về:
         Chuỗi stylesheet inline cho thẻ.
@@ -53,6 +57,10 @@ def get_stat_card_style(card_type: str) -> str:
         'expiring': STAT_CARD_YELLOW,
         'expired': STAT_CARD_RED,
         'low_stock': STAT_CARD_GREEN,
+        'value': STAT_CARD_TEAL,
+        'value_at_risk': STAT_CARD_ROSE,
+        'zone_value': STAT_CARD_INDIGO,
+        'shelf_value': STAT_CARD_SLATE,
     }
     bg = color_map.get(card_type, STAT_CARD_BLUE)
 
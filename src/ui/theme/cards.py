@@ -1,15 +1,42 @@
 """
 Hằng số màu Thẻ thống kê và Biểu đồ — Hệ thống Thiết kế PHARMA.SYS.
 """
+from dataclasses import dataclass
 
 # ── Màu nền Thẻ thống kê (từ Figma / Qt_designer) ──
 STAT_CARD_BLUE = '#3B82F6'
 STAT_CARD_YELLOW = '#FF8800'
 STAT_CARD_RED = '#EF4444'
 STAT_CARD_GREEN = '#FFAD00'
+STAT_CARD_TEAL = '#0D9488'
+STAT_CARD_ROSE = '#E11D48'
+STAT_CARD_INDIGO = '#6366F1'
+STAT_CARD_SLATE = '#475569'
 
 # ── Màu biểu đồ ──
 CHART_BLUE = '#3B82F6'
 CHART_ORANGE = '#FF8800'
 CHART_GREEN = '#10B981'
 CHART_RED = '#EF4444'
+
+
+@dataclass
+class ChartPalette:
+    """
+    Màu dùng cho biểu đồ (lấy từ Theme hiện tại).
+
+    Đặt ở đây (không phải src/ui/charts.py) để giao diện dựng bảng màu mà
+    không phải nạp Matplotlib.
+
+    Attributes:
+        surface: Màu nền
+        text_primary: Màu chữ chính (nhãn donut)
+        text_secondary: Màu chữ phụ (nhãn trục)
+        border: Màu viền/lưới
+        bar: Màu cột
+    """
+    surface: str
+    text_primary: str
+    text_secondary: str
+    border: str
+    bar: str
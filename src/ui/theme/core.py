@@ -56,6 +56,10 @@ class Theme:
     STAT_CARD_YELLOW = cards.STAT_CARD_YELLOW
     STAT_CARD_RED = cards.STAT_CARD_RED
     STAT_CARD_GREEN = cards.STAT_CARD_GREEN
+    STAT_CARD_TEAL = cards.STAT_CARD_TEAL
+    STAT_CARD_ROSE = cards.STAT_CARD_ROSE
+    STAT_CARD_INDIGO = cards.STAT_CARD_INDIGO
+    STAT_CARD_SLATE = cards.STAT_CARD_SLATE
 
     CHART_BLUE = cards.CHART_BLUE
     CHART_ORANGE = cards.CHART_ORANGE
@@ -66,6 +70,9 @@ class Theme:
     LIGHT_COLORS = LIGHT_COLORS
     DARK_COLORS = DARK_COLORS
 
+    # Stylesheet đã tạo theo chế độ, dùng chung giữa mọi Theme
+    _stylesheets: Dict[ThemeMode, str] = {}
+
     def __init__(self, mode: ThemeMode = ThemeMode.LIGHT):
         """
         Khởi tạo chủ đề với chế độ chỉ định.
@@ -122,8 +129,12 @@ class Theme:
         )
 
     def get_stylesheet(self) -> str:
-        """Tạo stylesheet Qt cho chủ đề hiện tại."""
-        return get_stylesheet(self._current_colors)
+        """Lấy stylesheet Qt cho chủ đề hiện tại (tạo một lần cho mỗi chế độ)."""
+        stylesheet = self._stylesheets.get(self.mode)
+        if stylesheet is None:
+            stylesheet = get_stylesheet(self._current_colors)
+            self._stylesheets[self.mode] = stylesheet
+        return stylesheet
 
     def get_sidebar_stylesheet(self) -> str:
         """Lấy stylesheet riêng cho sidebar."""
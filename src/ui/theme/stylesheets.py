@@ -35,7 +35,8 @@ def get_stylesheet(colors: dict) -> str:
 
         /* ── Buttons ── */
         /* Nút phụ / Hủy */
-        QPushButton#btn_toggle_theme, QPushButton#btn_search, QPushButton#btn_filter {{
+        QPushButton#btn_toggle_theme, QPushButton#btn_search, QPushButton#btn_filter,
+        QPushButton#btn_map, QPushButton#btn_images {{
             background-color: {c['cancel_btn_bg']};
             border: 1px solid {c['border']};
             border-radius: 6px;
@@ -56,6 +57,11 @@ def get_stylesheet(colors: dict) -> str:
         QPushButton#btn_add_medicine:hover, QPushButton#pushButton:hover {{
             background-color: {c['primary_hover']};
         }}
+        QPushButton#btn_map:checked, QPushButton#btn_images:checked {{
+            background-color: {c['primary']};
+            border-color: {c['primary']};
+            color: #FFFFFF;
+        }}
 
         /* Generic button defaults */
         QPushButton {{
@@ -101,7 +107,7 @@ def get_stylesheet(colors: dict) -> str:
         }}
 
         /* ── BẢNG DỮ LIỆU ── */
-        QTableWidget {{
+        QTableView {{
             background-color: {c['surface']};
             border: 1px solid {c['border']};
             border-radius: 8px;
@@ -109,11 +115,11 @@ def get_stylesheet(colors: dict) -> str:
             color: {c['text_primary']};
             alternate-background-color: {c['table_row_alt']};
         }}
-        QTableWidget::item:selected {{
+        QTableView::item:selected {{
             background-color: {c['table_selection_bg']};
             color: {c['table_selection_text']};
         }}
-        QTableWidget::item:hover:!selected {{
+        QTableView::item:hover:!selected {{
             background-color: {c['table_hover_bg']};
         }}
         QHeaderView::section {{
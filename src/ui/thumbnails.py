@@ -0,0 +1,212 @@
+"""
+Ảnh thu nhỏ — PHARMA.SYS.
+
+Phần Qt của đường ống ảnh thu nhỏ của ImageManager:
+- write_thumbnail: giải mã ảnh bằng QImageReader ở kích thước đã thu nhỏ
+  (JPEG được giải mã thẳng ở độ phân giải thấp) và ghi PNG — chỉ dùng
+  QImage nên chạy được trên thread pool của ImageManager
+- ThumbnailCache: phục vụ QPixmap từ file thumbnail qua QPixmapCache, nên
+  mở lại hộp thoại hoặc cuộn bảng không giải mã lại ảnh (ô đã có trong
+  cache không tốn lần gọi hệ thống file nào); báo thumbnail_ready khi một
+  thumbnail tạo nền đã xong
+"""
+from typing import Dict, Optional, Set
+
+from PyQt6.QtCore import QObject, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QImageReader, QPixmap, QPixmapCache
+
+from src.image_manager import ImageManager
+
+
+def write_thumbnail(source_path: str, dest_path: str, max_size: int) -> bool:
+    """
+    Write a PNG thumbnail of an image (safe to call off the GUI thread).
+
+    Args:
+        source_path: Full-size image
+        dest_path: PNG file to write
+        max_size: Longest side of the thumbnail in pixels
+
+    Returns:
+        True if the thumbnail was written
+    """
+    reader = QImageReader(source_path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and (size.width() > max_size or size.height() > max_size):
+        # Bộ giải mã tự thu nhỏ (rẻ hơn nhiều so với giải mã đầy đủ rồi scaled())
+        reader.setScaledSize(size.scaled(
+            QSize(max_size, max_size), Qt.AspectRatioMode.KeepAspectRatio
+        ))
+    image = reader.read()
+    if image.isNull():
+        return False
+    if image.width() > max_size or image.height() > max_size:
+        # Định dạng không báo được kích thước trước khi giải mã
+        image = image.scaled(
+            max_size, max_size,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+    return image.save(dest_path, "PNG")
+
+
+class ThumbnailCache(QObject):
+    """
+    In-memory (QPixmapCache) access to ImageManager thumbnails.
+
+    Pixmaps are cached per image name (relative or absolute path, as
+    given) and display size, and looked up before any filesystem call.
+    Entries of an image are dropped when ImageManager reports it replaced,
+    renamed or deleted, and when a new thumbnail of it is ready.
+
+    Signals:
+        thumbnail_ready: Emitted with a source image path once its
+            background-generated thumbnail is available
+    """
+
+    thumbnail_ready = pyqtSignal(str)   # đường dẫn ảnh nguồn
+
+    def __init__(self, image_manager: ImageManager, parent=None):
+        """
+        Initialize Thumbnail Cache.
+
+        Args:
+            image_manager: ImageManager owning the thumbnail files and pool
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.image_manager = image_manager
+        # Đường dẫn ảnh nguồn -> các khóa QPixmapCache đã chèn cho ảnh đó
+        self._pixmap_keys: Dict[str, Set[str]] = {}
+        image_manager.subscribe(self.invalidate)
+        self.thumbnail_ready.connect(self.invalidate)
+
+    def pixmap(self, source_path: str, size: Optional[QSize] = None) -> Optional[QPixmap]:
+        """
+        Return the thumbnail of an image, scaled to fit `size`.
+
+        A missing thumbnail is requested from the pool and None is
+        returned; thumbnail_ready is emitted when it is written.
+
+        Args:
+            source_path: Absolute path of the full-size image
+            size: Bounding box (default: the thumbnail's own size)
+
+        Returns:
+            The pixmap, or None if no thumbnail is available (yet)
+        """
+        key = self._cache_key(source_path, size)
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None:
+            pixmap = self._load(source_path, size)
+            if pixmap is not None:
+                self._insert(source_path, key, pixmap)
+        return pixmap
+
+    def medicine_pixmap(
+        self,
+        relative_path: str,
+        size: Optional[QSize] = None
+    ) -> Optional[QPixmap]:
+        """
+        Thumbnail of a medicine image given its stored relative path.
+
+        Args:
+            relative_path: Medicine.image_path
+            size: Bounding box
+
+        Returns:
+            The pixmap, or None if there is no image/thumbnail
+        """
+        if not relative_path:
+            return None
+        # Tra cache trước: ô đã vẽ không cần phân giải đường dẫn hay stat file
+        key = self._cache_key(relative_path, size)
+        pixmap = QPixmapCache.find(key)
+        if pixmap is not None:
+            return pixmap
+        source_path = self.image_manager.get_image_path_from_relative(relative_path)
+        if source_path is None:
+            return None
+        pixmap = self._load(source_path, size)
+        if pixmap is not None:
+            self._insert(source_path, key, pixmap)
+        return pixmap
+
+    def invalidate(self, source_path: str):
+        """
+        Drop the cached pixmaps of an image (replaced, renamed or deleted).
+
+        Args:
+            source_path: Absolute path of the full-size image
+        """
+        for key in self._pixmap_keys.pop(source_path, ()):
+            QPixmapCache.remove(key)
+
+    @staticmethod
+    def _cache_key(name: str, size: Optional[QSize]) -> str:
+        return name if size is None else f"{name}@{size.width()}x{size.height()}"
+
+    def _insert(self, source_path: str, key: str, pixmap: QPixmap):
+        QPixmapCache.insert(key, pixmap)
+        self._pixmap_keys.setdefault(source_path, set()).add(key)
+
+    def _load(self, source_path: str, size: Optional[QSize]) -> Optional[QPixmap]:
+        """Read (and scale) the thumbnail file of an image, requesting it if missing."""
+        manager = self.image_manager
+        path = manager.cached_thumbnail(source_path)
+        if path is None:
+            future = manager.request_thumbnail(source_path)
+            if future is not None:
+                # Tín hiệu phát từ luồng nền được chuyển về luồng GUI (queued)
+                future.add_done_callback(
+                    lambda f: not f.cancelled() and f.result()
+                    and self.thumbnail_ready.emit(source_path)
+                )
+            return None
+
+        pixmap = QPixmap(path)
+        if pixmap.isNull():
+            return None
+        if size is not None:
+            pixmap = pixmap.scaled(
+                size, Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation
+            )
+        return pixmap
+
+
+def load_preview(
+    thumbnails: Optional[ThumbnailCache],
+    source_path: str,
+    size: QSize
+) -> Optional[QPixmap]:
+    """
+    Pixmap for an image preview: the thumbnail when it exists, else a
+    reduced-size decode of the image itself.
+
+    Never waits for the thumbnail pool: a missing thumbnail is requested
+    in the background and the caller may swap it in on thumbnail_ready.
+
+    Args:
+        thumbnails: Thumbnail cache (None: always decode the image)
+        source_path: Absolute path of the image
+        size: Bounding box of the preview
+
+    Returns:
+        The pixmap, or None if the image cannot be read
+    """
+    if thumbnails is not None:
+        pixmap = thumbnails.pixmap(source_path, size)
+        if pixmap is not None:
+            return pixmap
+    reader = QImageReader(source_path)
+    reader.setAutoTransform(True)
+    source_size = reader.size()
+    if source_size.isValid():
+        reader.setScaledSize(source_size.scaled(size, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+    return QPixmap.fromImage(image)
@@ -0,0 +1,334 @@
+"""
+Warehouse Map View — PHARMA.SYS.
+
+Bản đồ nhiệt của kho theo lưới khu × cột × dãy:
+- Mỗi khu là một khung (cột theo chiều ngang, dãy theo chiều dọc); các
+  khung được xếp thành lưới gần vuông
+- Toàn bộ ô được tô vào MỘT ảnh raster từ các mảng NumPy của OccupancyGrid
+  (tô màu dạng vector, không có widget/item cho từng kệ), nên kho 10.000
+  kệ vẫn cuộn, thu phóng và rê chuột mượt
+- Hai chế độ tô màu: mức lấp đầy (đã dùng / sức chứa) và mật độ cảnh báo
+  (thuốc có cảnh báo / số thuốc trên kệ)
+- Nhãn khu/cột/dãy chỉ dựng lại khi tập nhãn thay đổi; ảnh chỉ vẽ lại khi
+  lưới có revision mới
+- Rê chuột xem chi tiết ô, nhấp đúp để mở kệ
+"""
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PyQt6.QtCore import QPoint, Qt, pyqtSignal
+from PyQt6.QtGui import QBrush, QColor, QFont, QImage, QPixmap
+from PyQt6.QtWidgets import (
+    QGraphicsPixmapItem, QGraphicsScene, QGraphicsSimpleTextItem,
+    QGraphicsView, QToolTip,
+)
+
+from src.ui.theme import Theme
+from src.warehouse_map import OccupancyGrid
+
+
+class WarehouseMapView(QGraphicsView):
+    """
+    Heatmap of shelf occupancy drawn as a single raster image.
+
+    The map reads the precomputed arrays of an OccupancyGrid (kept up to
+    date by inventory events) and converts them to colours with NumPy; the
+    scene holds one pixmap item plus the axis labels.
+
+    Signals:
+        shelf_activated: Emitted with a shelf ID when a cell is double-clicked
+    """
+
+    shelf_activated = pyqtSignal(str)   # shelf_id
+
+    # Chế độ tô màu
+    MODE_UTILIZATION = "utilization"
+    MODE_ALERT_DENSITY = "alert_density"
+    MODE_LABELS = {
+        MODE_UTILIZATION: "Mức lấp đầy",
+        MODE_ALERT_DENSITY: "Mật độ cảnh báo",
+    }
+
+    # Thang màu: (ngưỡng, màu) — giá trị lớn hơn ngưỡng cuối giữ màu cuối
+    COLOR_STOPS = {
+        MODE_UTILIZATION: (
+            (0.0, Theme.CHART_GREEN), (0.7, "#FACC15"),
+            (0.9, Theme.CHART_ORANGE), (1.0, Theme.CHART_RED),
+        ),
+        MODE_ALERT_DENSITY: (
+            (0.0, Theme.CHART_GREEN), (0.1, "#FACC15"),
+            (0.3, Theme.CHART_ORANGE), (0.6, Theme.CHART_RED),
+        ),
+    }
+    EMPTY_CELL_RGBA = (148, 163, 184, 50)   # ô không có kệ
+
+    # Kích thước một ô trong scene và số pixel ảnh mỗi ô (pixel cuối = khe lưới)
+    CELL = 24
+    CELL_PIXELS = 8
+    # Khung mỗi khu: 1 cột nhãn dãy + 1 cột khe; 1 dòng tên khu + 1 dòng
+    # nhãn cột + 1 dòng khe
+    PANEL_EXTRA_COLUMNS = 2
+    PANEL_EXTRA_ROWS = 3
+
+    ZOOM_STEP = 1.15
+    ZOOM_RANGE = (0.05, 8.0)
+
+    def __init__(self, grid: OccupancyGrid, theme: Optional[Theme] = None, parent=None):
+        """
+        Initialize Warehouse Map View.
+
+        Args:
+            grid: Occupancy grid to draw (shared with the main window)
+            theme: Theme instance for label and background colours
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self.grid = grid
+        self.theme = theme or Theme()
+        self.mode = self.MODE_UTILIZATION
+
+        self._scene = QGraphicsScene(self)
+        self.setScene(self._scene)
+        self._pixmap_item = QGraphicsPixmapItem()
+        self._pixmap_item.setTransformationMode(Qt.TransformationMode.FastTransformation)
+        self._pixmap_item.setScale(self.CELL / self.CELL_PIXELS)
+        self._scene.addItem(self._pixmap_item)
+        self._label_items: List[QGraphicsSimpleTextItem] = []
+
+        # Trạng thái lần vẽ trước
+        self._rendered: Optional[tuple] = None     # (revision, mode, theme mode)
+        self._labels_key: Optional[tuple] = None   # (nhãn các trục, theme mode)
+        self._display: Optional[dict] = None
+        self._layout: Tuple[int, int, int] = (1, 0, 0)   # (khu mỗi hàng, rộng, cao)
+
+        self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self.setMouseTracking(True)
+
+    # ── Vẽ ──
+
+    def set_mode(self, mode: str):
+        """
+        Switch the colouring mode.
+
+        Args:
+            mode: MODE_UTILIZATION or MODE_ALERT_DENSITY
+        """
+        self.mode = mode
+        self.refresh()
+
+    def apply_theme(self):
+        """Re-colour labels and background for the current theme mode."""
+        # Chế độ chủ đề nằm trong khóa vẽ — chỉ vẽ lại khi thật sự đổi
+        self.refresh()
+
+    def refresh(self, force: bool = False):
+        """
+        Redraw the map if the grid changed since the last draw.
+
+        Args:
+            force: Redraw even when nothing changed
+        """
+        self.grid.ensure_current()
+        key = (self.grid.revision, self.mode, self.theme.mode)
+        if key == self._rendered and not force:
+            return
+
+        self._display = display = self.grid.display()
+        zones, columns, rows = display["zones"], display["columns"], display["rows"]
+        per_line = max(1, math.ceil(math.sqrt(len(zones))))
+        self._layout = (
+            per_line,
+            len(columns) + self.PANEL_EXTRA_COLUMNS,
+            len(rows) + self.PANEL_EXTRA_ROWS,
+        )
+
+        labels_key = (tuple(zones), tuple(columns), tuple(rows), self.theme.mode)
+        if labels_key != self._labels_key or force:
+            self._rebuild_labels(zones, columns, rows)
+            self.setBackgroundBrush(QBrush(QColor(self.theme.get_color("surface"))))
+            first_layout = self._labels_key is None
+            self._labels_key = labels_key
+        else:
+            first_layout = False
+
+        self._pixmap_item.setPixmap(self._render_pixmap(display))
+        rect = self._pixmap_item.sceneBoundingRect()
+        self._scene.setSceneRect(rect)
+        if first_layout:
+            self._fit_to_view()
+        self._rendered = key
+
+    def _cell_colors(self, display: dict) -> np.ndarray:
+        """Map the active mode's values to an RGBA array of shape (Z, C, R, 4)."""
+        values = display[self.mode]
+        stops = self.COLOR_STOPS[self.mode]
+        xs = [value for value, _ in stops]
+        colors = [QColor(color) for _, color in stops]
+        channels = (
+            [c.red() for c in colors], [c.green() for c in colors], [c.blue() for c in colors]
+        )
+
+        empty = np.isnan(values)
+        clipped = np.clip(np.nan_to_num(values), xs[0], xs[-1])
+        rgba = np.empty(values.shape + (4,), dtype=np.uint8)
+        for i, channel in enumerate(channels):
+            rgba[..., i] = np.interp(clipped, xs, channel)
+        rgba[..., 3] = 255
+        rgba[empty] = self.EMPTY_CELL_RGBA
+        return rgba
+
+    def _render_pixmap(self, display: dict) -> QPixmap:
+        """Paint every zone panel into one image (one pixel per cell, then upscaled)."""
+        per_line, panel_w, panel_h = self._layout
+        zone_count = len(display["zones"])
+        lines = max(1, math.ceil(zone_count / per_line))
+        image = np.zeros((lines * panel_h, per_line * panel_w, 4), dtype=np.uint8)
+
+        rgba = self._cell_colors(display)
+        columns, rows = len(display["columns"]), len(display["rows"])
+        for zone in range(zone_count):
+            x, y = self._panel_origin(zone)
+            # Mảng theo (cột, dãy) — ảnh theo (dòng = dãy, cột = cột)
+            image[y + 2:y + 2 + rows, x + 1:x + 1 + columns] = rgba[zone].transpose(1, 0, 2)
+
+        # Phóng mỗi ô thành CELL_PIXELS × CELL_PIXELS, chừa pixel cuối làm khe
+        n = self.CELL_PIXELS
+        image = np.repeat(np.repeat(image, n, axis=0), n, axis=1)
+        image[n - 1::n, :, 3] = 0
+        image[:, n - 1::n, 3] = 0
+        height, width = image.shape[:2]
+        qimage = QImage(image.data, width, height, width * 4, QImage.Format.Format_RGBA8888)
+        # copy(): QImage không giữ mảng NumPy sống
+        return QPixmap.fromImage(qimage.copy())
+
+    def _rebuild_labels(self, zones: List[str], columns: List[str], rows: List[str]):
+        """Recreate the zone, column and row label items."""
+        for item in self._label_items:
+            self._scene.removeItem(item)
+        self._label_items = []
+
+        text_brush = QBrush(QColor(self.theme.get_color("text_secondary")))
+        title_brush = QBrush(QColor(self.theme.get_color("text_primary")))
+        font = QFont()
+        font.setPixelSize(self.CELL // 2)
+        title_font = QFont(font)
+        title_font.setBold(True)
+
+        def add(text: str, x: float, y: float, item_font: QFont, brush: QBrush, center: bool):
+            item = QGraphicsSimpleTextItem(text)
+            item.setFont(item_font)
+            item.setBrush(brush)
+            rect = item.boundingRect()
+            dx = (self.CELL - rect.width()) / 2 if center else 0
+            item.setPos(x * self.CELL + dx, y * self.CELL + (self.CELL - rect.height()) / 2)
+            self._scene.addItem(item)
+            self._label_items.append(item)
+
+        for zone_index, zone in enumerate(zones):
+            x, y = self._panel_origin(zone_index)
+            add(f"Khu {zone}", x + 1, y, title_font, title_brush, False)
+            for c, column in enumerate(columns):
+                add(column, x + 1 + c, y + 1, font, text_brush, True)
+            for r, row in enumerate(rows):
+                add(row, x, y + 2 + r, font, text_brush, True)
+
+    def _panel_origin(self, zone_index: int) -> Tuple[int, int]:
+        """Top-left cell (x, y) of a zone panel."""
+        per_line, panel_w, panel_h = self._layout
+        line, position = divmod(zone_index, per_line)
+        return position * panel_w, line * panel_h
+
+    def _fit_to_view(self):
+        """Show the whole map, never enlarging it past 1:1."""
+        self.resetTransform()
+        rect = self._scene.sceneRect()
+        viewport = self.viewport().rect()
+        if rect.isEmpty() or viewport.isEmpty():
+            return
+        scale = min(1.0, viewport.width() / rect.width(), viewport.height() / rect.height())
+        self.scale(scale, scale)
+
+    # ── Tương tác ──
+
+    def cell_at(self, pos: QPoint) -> Optional[Tuple[int, int, int]]:
+        """
+        Return the (zone, column, row) display indices under a viewport point.
+
+        Args:
+            pos: Position in viewport coordinates
+
+        Returns:
+            Display indices, or None outside every cell
+        """
+        if self._display is None:
+            return None
+        point = self.mapToScene(pos)
+        if point.x() < 0 or point.y() < 0:
+            return None
+        x, y = int(point.x() // self.CELL), int(point.y() // self.CELL)
+        per_line, panel_w, panel_h = self._layout
+        zone = (y // panel_h) * per_line + x // panel_w
+        column = x % panel_w - 1
+        row = y % panel_h - 2
+        shape = self._display["shelves"].shape
+        if (x // panel_w >= per_line or not 0 <= zone < shape[0]
+                or not 0 <= column < shape[1] or not 0 <= row < shape[2]):
+            return None
+        return zone, column, row
+
+    def _shelves_at(self, cell: Tuple[int, int, int]):
+        """Shelves in a cell given by display indices."""
+        d = self._display
+        zone, column, row = cell
+        return self.grid.shelves_in(d["zones"][zone], d["columns"][column], d["rows"][row])
+
+    def _tooltip(self, cell: Tuple[int, int, int]) -> str:
+        """Describe a cell: location, shelves, usage and alerts."""
+        d = self._display
+        shelves = self._shelves_at(cell)
+        if not shelves:
+            return ""
+        zone, column, row = cell
+        capacity, used = int(d["capacity"][cell]), int(d["used"][cell])
+        medicines, alerts = int(d["medicines"][cell]), int(d["alerts"][cell])
+        ids = ", ".join(s.id for s in shelves[:5]) + (" …" if len(shelves) > 5 else "")
+        percent = f" ({used * 100 // capacity}%)" if capacity > 0 else ""
+        return (
+            f"Khu {d['zones'][zone]} · Dãy {d['columns'][column]} · Cột {d['rows'][row]}\n"
+            f"Kệ: {ids}\n"
+            f"Đã dùng: {used}/{capacity}{percent}\n"
+            f"Cảnh báo: {alerts}/{medicines} thuốc"
+        )
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        if event.buttons() != Qt.MouseButton.NoButton:
+            return
+        pos = event.position().toPoint()
+        cell = self.cell_at(pos)
+        text = self._tooltip(cell) if cell is not None else ""
+        if text:
+            QToolTip.showText(self.viewport().mapToGlobal(pos), text, self.viewport())
+        else:
+            QToolTip.hideText()
+
+    def mouseDoubleClickEvent(self, event):
+        cell = self.cell_at(event.position().toPoint())
+        shelves = self._shelves_at(cell) if cell is not None else []
+        if shelves:
+            self.shelf_activated.emit(shelves[0].id)
+            return
+        super().mouseDoubleClickEvent(event)
+
+    def wheelEvent(self, event):
+        # Con lăn = thu phóng quanh con trỏ
+        steps = event.angleDelta().y() / 120
+        if not steps:
+            return
+        factor = self.ZOOM_STEP ** steps
+        current = self.transform().m11()
+        low, high = self.ZOOM_RANGE
+        factor = max(low / current, min(high / current, factor))
+        self.scale(factor, factor)
@@ -0,0 +1,229 @@
+"""
+Định giá tồn kho cho Hệ Thống Quản Lý Kho Thuốc.
+
+Module này duy trì các tổng giá trị tồn kho (giá × số lượng) dưới dạng
+tổng chạy (running sum):
+- Tổng giá trị toàn kho
+- Giá trị theo từng kệ
+- Giá trị theo từng khu (zone)
+- Số lượng đã dùng theo từng kệ (dùng cho sức chứa còn lại)
+
+InventoryManager cập nhật các tổng này sau mỗi thao tác thêm/sửa/xóa nên
+việc đọc chỉ số luôn là O(1), không phụ thuộc kích thước kho.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from src.models import Medicine, Shelf
+
+
+class InventoryValuation:
+    """
+    Các tổng giá trị tồn kho được cập nhật tăng dần.
+
+    Giá trị theo khu được suy ra từ giá trị theo kệ: đổi khu của một kệ
+    chỉ cần chuyển tổng của kệ đó sang khu mới. Thuốc nằm trên kệ chưa
+    được khai báo vẫn được tính vào tổng và vào kệ, nhưng không vào khu nào.
+
+    Thuộc tính:
+        total_value: Tổng giá trị toàn kho
+        medicine_count: Số thuốc đang được tính
+    """
+
+    def __init__(self):
+        """Khởi tạo bộ định giá rỗng."""
+        self.total_value = 0.0
+        self.medicine_count = 0
+        self._shelf_values: Dict[str, float] = {}
+        self._shelf_counts: Dict[str, int] = {}
+        self._shelf_quantities: Dict[str, int] = {}
+        self._zone_values: Dict[str, float] = {}
+        self._zone_counts: Dict[str, int] = {}
+        self._shelf_zones: Dict[str, str] = {}
+
+    @staticmethod
+    def value_of(medicine: Medicine) -> float:
+        """
+        Tính giá trị của một thuốc.
+
+        Tham số:
+            medicine: Thuốc cần định giá
+
+        Trả về:
+            Giá × số lượng
+        """
+        return medicine.price * medicine.quantity
+
+    def rebuild(self, medicines: List[Medicine], shelves: List[Shelf]) -> None:
+        """
+        Tính lại toàn bộ các tổng (quét đầy đủ một lần, dùng khi tải dữ liệu).
+
+        Tham số:
+            medicines: Danh sách thuốc
+            shelves: Danh sách kệ
+        """
+        self.total_value = 0.0
+        self.medicine_count = 0
+        self._shelf_values = {}
+        self._shelf_counts = {}
+        self._shelf_quantities = {}
+        self._zone_values = {}
+        self._zone_counts = {}
+        self._shelf_zones = {shelf.id: shelf.zone for shelf in shelves}
+        for medicine in medicines:
+            self.add(medicine)
+
+    def add(self, medicine: Medicine) -> None:
+        """
+        Cộng giá trị của thuốc mới vào các tổng.
+
+        Tham số:
+            medicine: Thuốc vừa được thêm
+        """
+        value = self.value_of(medicine)
+        shelf_id = medicine.shelf_id
+        self.total_value += value
+        self.medicine_count += 1
+        self._shelf_values[shelf_id] = self._shelf_values.get(shelf_id, 0.0) + value
+        self._shelf_counts[shelf_id] = self._shelf_counts.get(shelf_id, 0) + 1
+        self._shelf_quantities[shelf_id] = (
+            self._shelf_quantities.get(shelf_id, 0) + medicine.quantity
+        )
+
+        zone = self._shelf_zones.get(shelf_id)
+        if zone is not None:
+            self._add_to_zone(zone, value, 1)
+
+    def remove(self, medicine: Medicine) -> None:
+        """
+        Trừ giá trị của thuốc đã xóa khỏi các tổng.
+
+        Khi kệ không còn thuốc nào, tổng của kệ được xóa hẳn thay vì để lại
+        phần dư do sai số dấu phẩy động.
+
+        Tham số:
+            medicine: Thuốc vừa bị xóa
+        """
+        value = self.value_of(medicine)
+        shelf_id = medicine.shelf_id
+        self.medicine_count -= 1
+        self.total_value = self.total_value - value if self.medicine_count else 0.0
+
+        remaining = self._shelf_counts.get(shelf_id, 0) - 1
+        if remaining > 0:
+            self._shelf_counts[shelf_id] = remaining
+            self._shelf_values[shelf_id] -= value
+            self._shelf_quantities[shelf_id] -= medicine.quantity
+        else:
+            self._shelf_counts.pop(shelf_id, None)
+            self._shelf_values.pop(shelf_id, None)
+            self._shelf_quantities.pop(shelf_id, None)
+
+        zone = self._shelf_zones.get(shelf_id)
+        if zone is not None:
+            self._add_to_zone(zone, -value, -1)
+
+    def replace(self, old: Medicine, new: Medicine) -> None:
+        """
+        Cập nhật các tổng khi một thuốc được thay bằng phiên bản mới.
+
+        Tham số:
+            old: Thuốc trước khi cập nhật
+            new: Thuốc sau khi cập nhật
+        """
+        self.remove(old)
+        self.add(new)
+
+    def set_shelf_zone(self, shelf_id: str, zone: Optional[str]) -> None:
+        """
+        Gán (hoặc gỡ) khu của một kệ và chuyển tổng giá trị của kệ theo.
+
+        Tham số:
+            shelf_id: ID kệ
+            zone: Khu mới, None nếu kệ bị xóa
+        """
+        value = self._shelf_values.get(shelf_id, 0.0)
+        count = self._shelf_counts.get(shelf_id, 0)
+        old_zone = self._shelf_zones.pop(shelf_id, None)
+        if old_zone is not None and count:
+            self._add_to_zone(old_zone, -value, -count)
+
+        if zone is not None:
+            self._shelf_zones[shelf_id] = zone
+            if count:
+                self._add_to_zone(zone, value, count)
+
+    def _add_to_zone(self, zone: str, value: float, count: int) -> None:
+        """Cộng dồn giá trị/số thuốc vào một khu; xóa khu khi hết thuốc."""
+        remaining = self._zone_counts.get(zone, 0) + count
+        if remaining > 0:
+            self._zone_counts[zone] = remaining
+            self._zone_values[zone] = self._zone_values.get(zone, 0.0) + value
+        else:
+            self._zone_counts.pop(zone, None)
+            self._zone_values.pop(zone, None)
+
+    def shelf_value(self, shelf_id: str) -> float:
+        """
+        Lấy tổng giá trị của một kệ.
+
+        Tham số:
+            shelf_id: ID kệ
+
+        Trả về:
+            Tổng giá trị (0 nếu kệ trống)
+        """
+        return self._shelf_values.get(shelf_id, 0.0)
+
+    def shelf_quantity(self, shelf_id: str) -> int:
+        """
+        Lấy tổng số lượng thuốc đang nằm trên một kệ.
+
+        Tham số:
+            shelf_id: ID kệ
+
+        Trả về:
+            Tổng số lượng (0 nếu kệ trống)
+        """
+        return self._shelf_quantities.get(shelf_id, 0)
+
+    def zone_value(self, zone: str) -> float:
+        """
+        Lấy tổng giá trị của một khu.
+
+        Tham số:
+            zone: Tên khu
+
+        Trả về:
+            Tổng giá trị (0 nếu khu trống)
+        """
+        return self._zone_values.get(zone, 0.0)
+
+    def value_by_shelf(self) -> Dict[str, float]:
+        """Lấy bản sao tổng giá trị theo kệ."""
+        return dict(self._shelf_values)
+
+    def value_by_zone(self) -> Dict[str, float]:
+        """Lấy bản sao tổng giá trị theo khu."""
+        return dict(self._zone_values)
+
+    def top_shelf(self) -> Optional[Tuple[str, float]]:
+        """
+        Lấy kệ có tổng giá trị cao nhất.
+
+        Trả về:
+            Tuple (ID kệ, giá trị), None nếu kho trống
+        """
+        if not self._shelf_values:
+            return None
+        return max(self._shelf_values.items(), key=lambda item: item[1])
+
+    def top_zone(self) -> Optional[Tuple[str, float]]:
+        """
+        Lấy khu có tổng giá trị cao nhất.
+
+        Trả về:
+            Tuple (tên khu, giá trị), None nếu chưa có khu nào chứa thuốc
+        """
+        if not self._zone_values:
+            return None
+        return max(self._zone_values.items(), key=lambda item: item[1])
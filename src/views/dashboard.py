@@ -6,32 +6,50 @@ Logic xử lý dữ liệu nằm trong src/dashboard_manager.py.
 
 Tính năng:
 - 4 thẻ KPI màu (Tổng, Sắp hết hạn, Hết hạn, Tồn kho thấp)
+- 4 thẻ KPI giá trị (Tổng giá trị, Có nguy cơ hết hạn, Khu/Kệ giá trị cao nhất)
 - Biểu đồ tròn (donut) phân bố hạn sử dụng
 - Biểu đồ cột top thuốc theo số lượng
 - Bảng cảnh báo thuốc sắp hết hạn
 - Bảng cảnh báo thuốc tồn kho thấp
 """
-from typing import List, Optional
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHeaderView,
-    QTableWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QHeaderView,
+    QTableWidgetItem, QFrame, QLabel,
 )
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QColor
-
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
+from PyQt6.QtGui import QColor, QFont
 
 from src.models import Medicine
+from src.alerts import AlertSystem
 from src.dashboard_manager import (
-    DashboardManager, DashboardStats,
-    PieChartData, BarChartData,
+    DashboardManager, DashboardData, DashboardStats,
+    PieChartData, BarChartData, ValuationStats,
 )
+from src.valuation import InventoryValuation
 from src.ui.theme import Theme
+from src.ui.chart_renderer import ChartRenderer, ChartView
+from src.ui.theme.cards import ChartPalette
 from src.ui.generated.dashboard_ui import Ui_DashboardWidget
 
 
+# Biểu đồ được tạo trên luồng vẽ nền: Matplotlib (src/ui/charts.py) chỉ được
+# nạp ở đó, không làm chậm lần hiển thị đầu tiên của cửa sổ
+
+def _donut_chart(palette: ChartPalette, figsize: Tuple[float, float]):
+    """Tạo biểu đồ donut phân bố hạn sử dụng."""
+    from src.ui.charts import DonutChart
+    return DonutChart(palette, figsize=figsize)
+
+
+def _bar_chart(palette: ChartPalette, figsize: Tuple[float, float], max_bars: int):
+    """Tạo biểu đồ cột top thuốc theo số lượng."""
+    from src.ui.charts import BarChart
+    return BarChart(palette, max_bars, figsize=figsize)
+
+
 class Dashboard(QWidget):
     """
     Widget Dashboard với thẻ KPI, biểu đồ và bảng cảnh báo.
@@ -41,11 +59,32 @@ class Dashboard(QWidget):
     ủy quyền cho DashboardManager (src/dashboard_manager.py).
     """
 
-    def __init__(self, parent=None, theme: Optional[Theme] = None):
+    # Thẻ KPI giá trị: (khóa kiểu thẻ, tiêu đề)
+    VALUE_CARDS = (
+        ("value", "Giá trị tồn kho"),
+        ("value_at_risk", "Giá trị có nguy cơ"),
+        ("zone_value", "Khu giá trị nhất"),
+        ("shelf_value", "Kệ giá trị nhất"),
+    )
+
+    def __init__(
+        self,
+        parent=None,
+        theme: Optional[Theme] = None,
+        alert_system: Optional[AlertSystem] = None,
+        chart_renderer: Optional[ChartRenderer] = None
+    ):
         super().__init__(parent)
 
         self.theme = theme or Theme()
-        self.manager = DashboardManager()
+        self.manager = DashboardManager(alert_system=alert_system)
+        self._rendered_data: Optional[DashboardData] = None
+
+        # Biểu đồ được vẽ trên luồng nền; dùng chung bộ vẽ nếu được truyền vào
+        if chart_renderer is None:
+            chart_renderer = ChartRenderer(self)
+            chart_renderer.start()
+        self.chart_renderer = chart_renderer
 
         self._setup_ui()
         self._apply_theme()
@@ -55,21 +94,27 @@ class Dashboard(QWidget):
         self.ui = Ui_DashboardWidget()
         self.ui.setupUi(self)
 
-        # ── Thay thế chart placeholders bằng matplotlib canvases ──
-        self.pie_chart_canvas = self._create_canvas(figsize=(5, 3.5))
-        self.pie_ax = self.pie_chart_canvas.figure.add_subplot(111)
+        # ── Thay thế chart placeholders bằng ChartView (vẽ ngoài luồng GUI) ──
+        palette = self._chart_palette()
+        self.pie_chart_view = ChartView(
+            self.chart_renderer, partial(_donut_chart, palette, (5, 3.5)),
+            palette, figsize=(5, 3.5)
+        )
         self._replace_placeholder(
             self.ui.pie_layout,
             self.ui.widget_pie_placeholder,
-            self.pie_chart_canvas
+            self.pie_chart_view
         )
 
-        self.bar_chart_canvas = self._create_canvas(figsize=(6, 3.5))
-        self.bar_ax = self.bar_chart_canvas.figure.add_subplot(111)
+        self.bar_chart_view = ChartView(
+            self.chart_renderer,
+            partial(_bar_chart, palette, (6, 3.5), self.manager.max_bar_items),
+            palette, figsize=(6, 3.5)
+        )
         self._replace_placeholder(
             self.ui.bar_layout,
             self.ui.widget_bar_placeholder,
-            self.bar_chart_canvas
+            self.bar_chart_view
         )
 
         # ── Cấu hình table headers ──
@@ -90,6 +135,18 @@ class Dashboard(QWidget):
             self.theme.get_stat_card_style("low_stock")
         )
 
+        # ── Hàng thẻ KPI giá trị (không có trong file .ui — dựng bằng code) ──
+        self._value_cards: Dict[str, Tuple[QLabel, QLabel]] = {}
+        value_cards_layout = QHBoxLayout()
+        value_cards_layout.setSpacing(self.ui.cards_layout.spacing())
+        for card_type, title in self.VALUE_CARDS:
+            card, value_label, subtitle_label = self._build_value_card(title)
+            card.setStyleSheet(self.theme.get_stat_card_style(card_type))
+            value_cards_layout.addWidget(card)
+            self._value_cards[card_type] = (value_label, subtitle_label)
+        index = self.ui.content_layout.indexOf(self.ui.cards_layout)
+        self.ui.content_layout.insertLayout(index + 1, value_cards_layout)
+
         # ── Đặt objectName cho chart/alert frames (dùng cho theme stylesheet) ──
         self.ui.frame_pie_chart.setObjectName("chart_card")
         self.ui.frame_bar_chart.setObjectName("chart_card")
@@ -104,12 +161,45 @@ class Dashboard(QWidget):
         placeholder.deleteLater()
         layout.insertWidget(index, replacement)
 
-    @staticmethod
-    def _create_canvas(figsize=(5, 3.5)) -> FigureCanvasQTAgg:
-        """Tạo canvas Matplotlib với kích thước chỉ định."""
-        fig = Figure(figsize=figsize, dpi=100)
-        fig.subplots_adjust(left=0.05, right=0.95, top=0.92, bottom=0.05)
-        return FigureCanvasQTAgg(fig)
+    def _build_value_card(self, title: str) -> Tuple[QFrame, QLabel, QLabel]:
+        """Create a KPI card laid out like the generated count cards."""
+        card = QFrame(self.ui.scroll_content)
+        card.setFrameShape(QFrame.Shape.NoFrame)
+        card.setMinimumHeight(100)
+        layout = QVBoxLayout(card)
+        layout.setContentsMargins(5, 5, 5, 5)
+        layout.setSpacing(4)
+
+        title_label = QLabel(title, card)
+        title_label.setStyleSheet(
+            "color: rgba(0,0,0,0.85); font-size: 14px; font-weight: 800; background: transparent;"
+        )
+        layout.addWidget(title_label)
+
+        value_label = QLabel("0", card)
+        font = QFont()
+        font.setPointSize(20)
+        font.setBold(True)
+        value_label.setFont(font)
+        value_label.setStyleSheet("color: #000000; background: transparent;")
+        layout.addWidget(value_label)
+
+        subtitle_label = QLabel("", card)
+        subtitle_label.setStyleSheet(
+            "color: rgba(0,0,0,0.7); font-size: 12px; background: transparent;"
+        )
+        layout.addWidget(subtitle_label)
+        return card, value_label, subtitle_label
+
+    def _chart_palette(self) -> ChartPalette:
+        """Collect the chart colours of the current theme."""
+        return ChartPalette(
+            surface=self.theme.get_color('surface'),
+            text_primary=self.theme.get_color('text_primary'),
+            text_secondary=self.theme.get_color('text_secondary'),
+            border=self.theme.get_color('border'),
+            bar=Theme.CHART_BLUE
+        )
 
     @staticmethod
     def _configure_table(table):
@@ -121,26 +211,40 @@ class Dashboard(QWidget):
 
     # ── Tải dữ liệu ──
 
-    def load_data(self, medicines: List[Medicine]):
+    def load_data(
+        self,
+        medicines: List[Medicine],
+        version: Optional[int] = None,
+        valuation: Optional[InventoryValuation] = None
+    ):
         """
         Tải dữ liệu thuốc và cập nhật toàn bộ dashboard.
 
         Ủy quyền xử lý cho DashboardManager, sau đó hiển thị lên giao diện.
+
+        Args:
+            medicines: Medicine list
+            version: Inventory version; when unchanged (same day, same
+                thresholds) the cached aggregates are reused and nothing
+                is redrawn
+            valuation: Running value totals kept by InventoryManager
         """
-        stats = self.manager.get_statistics(medicines)
-        pie_data = self.manager.get_pie_chart_data(
-            medicines,
+        data = self.manager.compute(medicines, version, valuation=valuation)
+        if data is self._rendered_data:
+            return
+
+        pie_data = self.manager.build_pie_chart_data(
+            data.expiry_counts,
             chart_colors=(Theme.CHART_GREEN, Theme.CHART_ORANGE, Theme.CHART_RED)
         )
-        bar_data = self.manager.get_bar_chart_data(medicines)
-        expiry_items = self.manager.get_expiring_medicines(medicines)
-        low_stock_items = self.manager.get_low_stock_medicines(medicines)
 
-        self._render_statistics(stats)
+        self._render_statistics(data.stats)
+        self._render_valuation(data.valuation)
         self._render_pie_chart(pie_data)
-        self._render_bar_chart(bar_data)
-        self._render_expiry_table(expiry_items)
-        self._render_stock_table(low_stock_items)
+        self._render_bar_chart(data.bar)
+        self._render_expiry_table(data.expiring_items)
+        self._render_stock_table(data.low_stock_items)
+        self._rendered_data = data
 
     # ── Render thẻ KPI ──
 
@@ -151,94 +255,42 @@ class Dashboard(QWidget):
         self.ui.lbl_expired_value.setText(str(stats.expired))
         self.ui.lbl_low_stock_value.setText(str(stats.low_stock))
 
-    # ── Render biểu đồ tròn ──
-
-    def _render_pie_chart(self, data: PieChartData):
-        """Vẽ biểu đồ tròn (donut) từ dữ liệu đã xử lý."""
-        self.pie_ax.clear()
-
-        bg_color = self.theme.get_color('surface')
-        text_color = self.theme.get_color('text_primary')
-
-        if not data.has_data:
-            self.pie_ax.text(
-                0.5, 0.5, 'Không có dữ liệu',
-                ha='center', va='center',
-                fontsize=14, color='gray',
-                transform=self.pie_ax.transAxes
-            )
-        else:
-            wedges, texts, autotexts = self.pie_ax.pie(
-                data.sizes,
-                labels=data.labels,
-                colors=data.colors,
-                autopct='%1.0f%%',
-                startangle=90,
-                pctdistance=0.75,
-                wedgeprops=dict(width=0.4, edgecolor=bg_color, linewidth=2),
-                textprops={'fontsize': 9, 'color': text_color}
-            )
-
-            for t in autotexts:
-                t.set_fontsize(8)
-                t.set_fontweight('bold')
-                t.set_color('#FFFFFF')
-
-        self.pie_ax.set_facecolor(bg_color)
-        self.pie_chart_canvas.figure.patch.set_facecolor(bg_color)
-        self.pie_chart_canvas.draw()
-
-    # ── Render biểu đồ cột ──
-
-    def _render_bar_chart(self, data: BarChartData):
-        """Vẽ biểu đồ cột từ dữ liệu đã xử lý."""
-        self.bar_ax.clear()
-
-        bg_color = self.theme.get_color('surface')
-        secondary_color = self.theme.get_color('text_secondary')
-
-        if not data.has_data:
-            self.bar_ax.text(
-                0.5, 0.5, 'Không có dữ liệu',
-                ha='center', va='center',
-                fontsize=14, color='gray',
-                transform=self.bar_ax.transAxes
-            )
-            self.bar_ax.set_facecolor(bg_color)
-            self.bar_chart_canvas.figure.patch.set_facecolor(bg_color)
-            self.bar_chart_canvas.draw()
-            return
-
-        bars = self.bar_ax.bar(
-            range(len(data.names)), data.quantities,
-            color=Theme.CHART_BLUE,
-            width=0.6,
-            edgecolor='none',
-            zorder=3
+    @staticmethod
+    def _format_money(value: float) -> str:
+        """Format a value in VND with thousands separators."""
+        return f"{value:,.0f} đ"
+
+    def _render_valuation(self, valuation: ValuationStats):
+        """Cập nhật giá trị các thẻ KPI giá trị."""
+        cards = self._value_cards
+
+        value_label, subtitle_label = cards["value"]
+        value_label.setText(self._format_money(valuation.total_value))
+        subtitle_label.setText(
+            f"Đã hết hạn: {self._format_money(valuation.expired_value)}"
         )
 
-        for bar in bars:
-            bar.set_linewidth(0)
+        value_label, subtitle_label = cards["value_at_risk"]
+        value_label.setText(self._format_money(valuation.at_risk_value))
+        subtitle_label.setText(f"{valuation.at_risk_ratio:.1%} tổng giá trị")
 
-        self.bar_ax.set_xticks(range(len(data.names)))
-        self.bar_ax.set_xticklabels(
-            data.names, rotation=45, ha='right',
-            fontsize=8, color=secondary_color
-        )
-        self.bar_ax.tick_params(axis='y', colors=secondary_color, labelsize=9)
+        value_label, subtitle_label = cards["zone_value"]
+        value_label.setText(self._format_money(valuation.top_zone_value))
+        subtitle_label.setText(f"Khu {valuation.top_zone}" if valuation.top_zone else "—")
 
-        self.bar_ax.spines['top'].set_visible(False)
-        self.bar_ax.spines['right'].set_visible(False)
-        self.bar_ax.spines['left'].set_color(self.theme.get_color('border'))
-        self.bar_ax.spines['bottom'].set_color(self.theme.get_color('border'))
+        value_label, subtitle_label = cards["shelf_value"]
+        value_label.setText(self._format_money(valuation.top_shelf_value))
+        subtitle_label.setText(f"Kệ {valuation.top_shelf}" if valuation.top_shelf else "—")
 
-        self.bar_ax.yaxis.grid(True, alpha=0.3, color=self.theme.get_color('border'))
-        self.bar_ax.set_axisbelow(True)
+    # ── Render biểu đồ ──
 
-        self.bar_ax.set_facecolor(bg_color)
-        self.bar_chart_canvas.figure.patch.set_facecolor(bg_color)
-        self.bar_chart_canvas.figure.tight_layout()
-        self.bar_chart_canvas.draw()
+    def _render_pie_chart(self, data: PieChartData):
+        """Gửi dữ liệu donut cho bộ vẽ nền (không chặn luồng GUI)."""
+        self.pie_chart_view.set_data(data)
+
+    def _render_bar_chart(self, data: BarChartData):
+        """Gửi dữ liệu biểu đồ cột cho bộ vẽ nền (không chặn luồng GUI)."""
+        self.bar_chart_view.set_data(data)
 
     # ── Render bảng cảnh báo ──
 
@@ -288,6 +340,18 @@ class Dashboard(QWidget):
 
     # ── Áp dụng chủ đề ──
 
+    def apply_theme(self):
+        """
+        Áp dụng chế độ chủ đề hiện tại lên các widget có sẵn.
+
+        Biểu đồ nhận bảng màu mới và được vẽ lại trên luồng nền; dữ liệu
+        không được tính lại.
+        """
+        self._apply_theme()
+        palette = self._chart_palette()
+        self.pie_chart_view.set_palette(palette)
+        self.bar_chart_view.set_palette(palette)
+
     def _apply_theme(self):
         """Áp dụng stylesheet chủ đề."""
         c = self.theme
@@ -300,17 +364,3 @@ class Dashboard(QWidget):
             f"}}"
         )
         self.setStyleSheet(card_style)
-
-        bg_color = c.get_color('surface')
-        text_color = c.get_color('text_primary')
-
-        for canvas in [self.pie_chart_canvas, self.bar_chart_canvas]:
-            canvas.figure.patch.set_facecolor(bg_color)
-            for ax in canvas.figure.get_axes():
-                ax.set_facecolor(bg_color)
-                ax.tick_params(colors=text_color)
-                ax.xaxis.label.set_color(text_color)
-                ax.yaxis.label.set_color(text_color)
-                ax.title.set_color(text_color)
-                for spine in ax.spines.values():
-                    spine.set_edgecolor(c.get_color('border'))
@@ -3,22 +3,40 @@ Inventory View — PHARMA.SYS Medicine Table.
 
 Uses Qt Designer-generated UI from inventory_view_ui.py for layout.
 Features:
+- Virtualized table (QTableView + MedicineTableModel): cells are produced
+  on demand, so only visible rows cost anything
+- Sorting and filtering in a proxy model (numeric sort keys, precomputed
+  filter keys): changing filters never reloads the table
+- Paged mode for very large inventories (PagedMedicineModel): rows are
+  fetched from a SQLite catalog index as the table is scrolled, with
+  sorting and filtering done by index queries
 - Sortable table with color-coded status badges (pill shape)
+- Optional image column showing cached thumbnails (toggled with "Ảnh")
 - Context menu (Edit/Delete)
 - Double-click to edit
 - Alternating row colors with colored text for alert statuses
 """
-from typing import List, Optional
+from typing import Callable, List, Optional
 from datetime import date
 
 from PyQt6.QtWidgets import (
-    QWidget, QTableWidgetItem, QMenu, QHeaderView,
+    QWidget, QTableWidget, QTableView, QMenu, QHeaderView, QPushButton,
 )
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QColor, QFont, QAction
+from PyQt6.QtCore import Qt, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QAction
 
 from src.models import Medicine
+from src.inventory_manager import ChangeSet
+from src.alerts import AlertSystem
+from src.thresholds import StatusTable
+from src.catalog_index import CatalogIndex
 from src.ui.theme import Theme
+from src.ui.medicine_table_model import (
+    STATUS_FILTER_BITS, MedicineFilterProxyModel, MedicineTableModel,
+    describe_status, status_filter_flags,
+)
+from src.ui.paged_table_model import PagedMedicineModel
+from src.ui.thumbnails import ThumbnailCache
 from src.ui.generated.inventory_view_ui import Ui_InventoryView
 
 
@@ -48,53 +66,158 @@ class InventoryView(QWidget):
     detail_requested = pyqtSignal(str)   # medicine_id
     filter_requested = pyqtSignal()      # request to show filter dialog
 
-    def __init__(self, parent=None, theme: Optional[Theme] = None):
+    # Kiểu huy hiệu cho từng mã trạng thái
+    STATUS_TYPES = MedicineTableModel.STATUS_TYPES
+
+    # Số dòng được đo khi tự co độ rộng cột (mặc định của Qt là 1000)
+    COLUMN_SIZE_SAMPLE_ROWS = 50
+
+    # Độ rộng cột ảnh khi hiện
+    IMAGE_COLUMN_WIDTH = 56
+
+    def __init__(
+        self,
+        parent=None,
+        theme: Optional[Theme] = None,
+        alert_system: Optional[AlertSystem] = None,
+        thumbnails: Optional[ThumbnailCache] = None
+    ):
         """
         Initialize Inventory View.
 
         Args:
             parent: Parent widget
             theme: Theme instance for styling
+            alert_system: Shared AlertSystem (single source of thresholds)
+            thumbnails: Thumbnail cache for the image column (no image
+                column when omitted)
         """
         super().__init__(parent)
 
         self.theme = theme or Theme()
+        self.alert_system = alert_system or AlertSystem()
+        self.thumbnails = thumbnails
         self.medicines: List[Medicine] = []
-        self.filtered_medicines: List[Medicine] = []
         self.active_filters: Optional[dict] = None
+        self.image_column_visible = False
 
         self.setup_ui()
+        if thumbnails is not None:
+            self._setup_image_column()
 
     def setup_ui(self):
         """Setup table UI using Qt Designer generated class."""
         self.ui = Ui_InventoryView()
         self.ui.setupUi(self)
 
-        # Configure column widths (not in .ui)
-        header = self.ui.tbl_medicines.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        # Thay QTableWidget sinh từ .ui bằng QTableView + model ảo hóa;
+        # proxy đảm nhận sắp xếp và lọc
+        self.model = MedicineTableModel(self.theme, self)
+        self.proxy = MedicineFilterProxyModel(self.model, self)
+        self.paged: Optional[PagedMedicineModel] = None   # chế độ theo trang
+        self.tbl_medicines = self._build_table_view(self.ui.tbl_medicines)
+        self.tbl_medicines.setModel(self.proxy)
+        self.tbl_medicines.setColumnHidden(MedicineTableModel.COL_IMAGE, True)
+
+        # Configure column widths (not in .ui). Cột co theo nội dung dùng
+        # Interactive + resizeColumnsToContents một lần: ResizeToContents
+        # sẽ đo mọi dòng mỗi khi dữ liệu đổi.
+        header = self.tbl_medicines.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)
-
-        # Row height
-        self.ui.tbl_medicines.verticalHeader().setDefaultSectionSize(42)
+        header.setResizeContentsPrecision(self.COLUMN_SIZE_SAMPLE_ROWS)
+        self.tbl_medicines.verticalHeader().setDefaultSectionSize(42)
+        self.tbl_medicines.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self._columns_sized = False
 
         # Connect signals
         self.ui.btn_add.clicked.connect(lambda: self.add_requested.emit())
         self.ui.btn_filter.clicked.connect(lambda: self.filter_requested.emit())
         self.ui.btn_clear_filter.clicked.connect(self.clear_filters)
-        self.ui.tbl_medicines.itemDoubleClicked.connect(self.on_item_double_clicked)
-        self.ui.tbl_medicines.setContextMenuPolicy(
+        self.tbl_medicines.doubleClicked.connect(self.on_row_double_clicked)
+        self.tbl_medicines.setContextMenuPolicy(
             Qt.ContextMenuPolicy.CustomContextMenu
         )
-        self.ui.tbl_medicines.customContextMenuRequested.connect(
+        self.tbl_medicines.customContextMenuRequested.connect(
             self.show_context_menu
         )
 
+    def _setup_image_column(self):
+        """Feed the image column from the thumbnail cache and add its toggle."""
+        self.model.set_thumbnails(self.thumbnails)
+
+        self.btn_images = QPushButton("Ảnh", self)
+        self.btn_images.setObjectName("btn_images")
+        self.btn_images.setCheckable(True)
+        self.btn_images.toggled.connect(self.set_image_column_visible)
+        header = self.ui.header_layout
+        header.insertWidget(header.indexOf(self.ui.btn_filter), self.btn_images)
+
+    def set_image_column_visible(self, visible: bool):
+        """
+        Show or hide the thumbnail column.
+
+        Thumbnails are only produced for rows painted while the column is
+        shown; missing ones are generated in the background.
+
+        Args:
+            visible: True to show the column
+        """
+        self.image_column_visible = visible and self.thumbnails is not None
+        self._apply_image_column()
+
+    def _apply_image_column(self):
+        """Apply the image column visibility to the current table model."""
+        column = MedicineTableModel.COL_IMAGE
+        self.tbl_medicines.setColumnHidden(column, not self.image_column_visible)
+        if self.image_column_visible:
+            self.tbl_medicines.setColumnWidth(column, self.IMAGE_COLUMN_WIDTH)
+
+    def _build_table_view(self, placeholder: QTableWidget) -> QTableView:
+        """Create a QTableView configured like the generated table and swap it in."""
+        view = QTableView(self)
+        view.setObjectName(placeholder.objectName())
+        view.setSelectionBehavior(placeholder.selectionBehavior())
+        view.setSelectionMode(placeholder.selectionMode())
+        view.setAlternatingRowColors(placeholder.alternatingRowColors())
+        view.setShowGrid(placeholder.showGrid())
+        view.setSortingEnabled(True)
+        view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        view.verticalHeader().setVisible(False)
+
+        layout = self.ui.main_layout
+        index = layout.indexOf(placeholder)
+        layout.removeWidget(placeholder)
+        placeholder.deleteLater()
+        layout.insertWidget(index, view)
+        return view
+
+    def enable_paging(self, index: CatalogIndex):
+        """
+        Switch the table to pages served by a catalog index.
+
+        Meant for inventories too large to hold in a flat model: only the
+        pages scrolled to are loaded, and sorting/filtering become index
+        queries. The caller keeps the index synced before load_medicines()
+        and apply_changes().
+
+        Args:
+            index: Catalog index to read pages from
+        """
+        if self.paged is not None:
+            return
+        self.paged = PagedMedicineModel(index, self.theme, self)
+        self.paged.set_thumbnails(self.thumbnails)
+        self.paged.set_filters(self.active_filters)
+        self.tbl_medicines.setModel(self.paged)
+        self._apply_image_column()
+        # Bảng phẳng không còn được dùng — giải phóng các dòng đã nạp
+        self.model.set_medicines([], *self._status_source())
+
+    def _table_model(self):
+        """Model currently shown by the table (proxy, or paged model in paged mode)."""
+        return self.paged if self.paged is not None else self.proxy
+
     def load_medicines(self, medicines: List[Medicine]):
         """
         Load medicines into table.
@@ -103,102 +226,92 @@ class InventoryView(QWidget):
             medicines: List of Medicine objects to display
         """
         self.medicines = medicines
-        self.apply_current_filters()
 
-    def apply_current_filters(self):
-        """Apply current active filters and refresh table."""
-        if self.active_filters:
-            self.filtered_medicines = self.filter_medicines(
-                self.medicines, self.active_filters
-            )
+        if self.paged is not None:
+            # Chỉ mục đã được đồng bộ — tải lại các trang đang có (đổi ngày/
+            # ngưỡng), giữ dòng hiện tại và vị trí cuộn qua lần reset
+            current = self.get_selected_medicine_id()
+            scroll = self.tbl_medicines.verticalScrollBar().value()
+            self.paged.refresh()
+            row = self.paged.row_of(current) if current is not None else -1
+            if row >= 0:
+                self.tbl_medicines.selectRow(row)
+            self.tbl_medicines.verticalScrollBar().setValue(scroll)
         else:
-            self.filtered_medicines = list(self.medicines)
+            # Đánh giá trạng thái một lần cho mọi dòng; model giữ kết quả theo dòng
+            self.model.set_medicines(medicines, *self._status_source())
+        if not self._columns_sized and self._table_model().rowCount():
+            # Đo độ rộng cột một lần, chỉ trên COLUMN_SIZE_SAMPLE_ROWS dòng
+            self.tbl_medicines.resizeColumnsToContents()
+            self._columns_sized = True
+        self.update_count_label()
 
-        self.ui.tbl_medicines.setSortingEnabled(False)  # Disable during update
-        self.ui.tbl_medicines.setRowCount(0)
+    def append_medicines(self, medicines: List[Medicine], chunk: List[Medicine]):
+        """
+        Append a freshly loaded chunk (progressive loading).
 
-        for medicine in self.filtered_medicines:
-            self.add_medicine_row(medicine)
+        Args:
+            medicines: Full medicine list loaded so far
+            chunk: Medicines added by this chunk
+        """
+        self.medicines = medicines
+        if self.paged is not None:
+            return
+        self.model.append_medicines(chunk, self._status_source()[0])
+        if not self._columns_sized and self._table_model().rowCount():
+            self.tbl_medicines.resizeColumnsToContents()
+            self._columns_sized = True
+        self.update_count_label()
 
-        self.ui.tbl_medicines.setSortingEnabled(True)
+    def apply_current_filters(self):
+        """Apply current active filters (re-evaluates only the proxy mapping)."""
+        self._table_model().set_filters(self.active_filters)
         self.update_count_label()
 
-    def add_medicine_row(self, medicine: Medicine):
+    def apply_changes(self, medicines: List[Medicine], changes: ChangeSet):
         """
-        Add a single medicine row to table.
+        Update only the rows touched by a change set.
+
+        Inserted, edited and deleted medicines become single-row model
+        operations; the proxy re-sorts and re-filters just those rows, so
+        selection and scroll position are kept. In paged mode the changed
+        medicines are re-read from the (already synced) index and patched
+        into the loaded pages the same way.
 
         Args:
-            medicine: Medicine object to add
+            medicines: Full medicine list after the changes
+            changes: Net changes since the table was last updated
         """
-        row = self.ui.tbl_medicines.rowCount()
-        self.ui.tbl_medicines.insertRow(row)
-
-        # ID
-        id_item = QTableWidgetItem(medicine.id)
-        id_item.setFlags(id_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        self.ui.tbl_medicines.setItem(row, 0, id_item)
-
-        # Name
-        name_item = QTableWidgetItem(medicine.name)
-        name_item.setFlags(name_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        name_font = name_item.font()
-        name_font.setWeight(QFont.Weight.Medium)
-        name_item.setFont(name_font)
-        self.ui.tbl_medicines.setItem(row, 1, name_item)
-
-        # Quantity
-        quantity_item = QTableWidgetItem(str(medicine.quantity))
-        quantity_item.setData(Qt.ItemDataRole.UserRole, medicine.quantity)
-        quantity_item.setFlags(quantity_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        quantity_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.ui.tbl_medicines.setItem(row, 2, quantity_item)
-
-        # Expiry Date
-        expiry_str = medicine.expiry_date.strftime("%d/%m/%Y")
-        expiry_item = QTableWidgetItem(expiry_str)
-        expiry_item.setData(
-            Qt.ItemDataRole.UserRole,
-            medicine.expiry_date.toordinal()
+        self.medicines = medicines
+        if self.paged is not None:
+            self.paged.refresh_rows(
+                changes.inserted_ids + changes.updated_ids + changes.removed_ids
+            )
+            self.update_count_label()
+            return
+        self.model.apply_changes(
+            changes.inserted, changes.updated, changes.removed, self._status_source()[0]
         )
-        expiry_item.setFlags(expiry_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        self.ui.tbl_medicines.setItem(row, 3, expiry_item)
-
-        # Shelf
-        shelf_item = QTableWidgetItem(medicine.shelf_id)
-        shelf_item.setFlags(shelf_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        shelf_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.ui.tbl_medicines.setItem(row, 4, shelf_item)
-
-        # Price
-        price_str = f"{medicine.price:,.2f}"
-        price_item = QTableWidgetItem(price_str)
-        price_item.setData(Qt.ItemDataRole.UserRole, medicine.price)
-        price_item.setFlags(price_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        self.ui.tbl_medicines.setItem(row, 5, price_item)
-
-        # Status — badge style
-        status_text, status_type = self.get_medicine_status(medicine)
-        status_item = QTableWidgetItem(status_text)
-        status_item.setFlags(status_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        status_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        # Apply badge colors
-        if status_type != "normal":
-            alert_colors = self.theme.get_alert_colors(status_type)
-        else:
-            alert_colors = self.theme.get_alert_colors('success')
+        self.update_count_label()
 
-        status_item.setBackground(QColor(alert_colors['bg']))
-        status_item.setForeground(QColor(alert_colors['text']))
-        status_font = status_item.font()
-        status_font.setBold(True)
-        status_font.setPointSize(Theme.FONT_SIZE_BADGE)
-        status_item.setFont(status_font)
+    def advance_day(self, medicines: List[Medicine], today: date, medicine_ids: List[str]):
+        """
+        Bring the table to a new day after midnight rollover.
 
-        self.ui.tbl_medicines.setItem(row, 6, status_item)
+        Only the medicines whose expiry state just changed are re-evaluated
+        (in paged mode: re-read from the already synced index).
 
-        # Apply row coloring based on status
-        self.apply_row_color(row, status_type, medicine)
+        Args:
+            medicines: Full medicine list
+            today: The new day
+            medicine_ids: IDs from the scheduler's AlertTransition list
+        """
+        self.medicines = medicines
+        if self.paged is not None:
+            self.paged.refresh_day(today, medicine_ids)
+        else:
+            self.model.advance_day(today, medicine_ids, *self._status_source())
+        self.update_count_label()
 
     def get_medicine_status(self, medicine: Medicine) -> tuple[str, str]:
         """
@@ -211,52 +324,20 @@ class InventoryView(QWidget):
             Tuple of (status_text, status_type)
             status_type: 'danger', 'warning', 'low_stock', or 'normal'
         """
-        # Check if expired
-        if medicine.is_expired():
-            days_overdue = abs(medicine.days_until_expiry())
-            return f"Hết hạn ({days_overdue} ngày)", "danger"
-
-        # Check if out of stock
-        if medicine.quantity == 0:
-            return "Hết hàng", "danger"
-
-        # Check if expiring soon
-        days_left = medicine.days_until_expiry()
-        if days_left <= 30:
-            return f"Sắp hết hạn ({days_left} ngày)", "warning"
-
-        # Check if low stock
-        if medicine.quantity <= 5:
-            return "Tồn kho thấp", "low_stock"
-
-        return "Còn hàng", "normal"
-
-    def apply_row_color(self, row: int, status_type: str, medicine: Medicine):
-        """
-        Apply colored text to entire row based on status.
-        Row background remains alternating (handled by Qt); only foreground changes.
+        status, days_left = self.model.status_of(medicine, *self._status_source())
+        return describe_status(status, days_left), self.STATUS_TYPES[status]
 
-        Args:
-            row: Row index
-            status_type: Status type ('danger', 'warning', 'low_stock', 'normal')
-            medicine: Medicine object
-        """
-        if status_type == "normal":
-            return
+    def _status_source(self) -> tuple[Callable[[List[Medicine]], StatusTable], tuple]:
+        """Evaluator and cache key (threshold policy version, day) for the model."""
+        today = date.today()
+        key = (self.alert_system.policy.version, today)
+        return (lambda medicines: self.alert_system.evaluate(medicines, today)), key
 
-        alert_colors = self.theme.get_alert_colors(status_type)
-        text_color = QColor(alert_colors['text'])
-
-        for col in range(self.ui.tbl_medicines.columnCount() - 1):  # Skip status column
-            item = self.ui.tbl_medicines.item(row, col)
-            if item:
-                item.setForeground(text_color)
-
-    def on_item_double_clicked(self, item: QTableWidgetItem):
-        """Handle double-click on table item — show detail view."""
-        row = item.row()
-        medicine_id = self.ui.tbl_medicines.item(row, 0).text()
-        self.detail_requested.emit(medicine_id)
+    def on_row_double_clicked(self, index: QModelIndex):
+        """Handle double-click on a table row — show detail view."""
+        medicine = self._table_model().medicine_at(index.row())
+        if medicine is not None:
+            self.detail_requested.emit(medicine.id)
 
     def show_context_menu(self, position):
         """
@@ -265,13 +346,13 @@ class InventoryView(QWidget):
         Args:
             position: Position where menu was requested
         """
-        item = self.ui.tbl_medicines.itemAt(position)
-        if not item:
+        index = self.tbl_medicines.indexAt(position)
+        medicine = self._table_model().medicine_at(index.row()) if index.isValid() else None
+        if medicine is None:
             return
 
-        row = item.row()
-        medicine_id = self.ui.tbl_medicines.item(row, 0).text()
-        medicine_name = self.ui.tbl_medicines.item(row, 1).text()
+        medicine_id = medicine.id
+        medicine_name = medicine.name
 
         menu = QMenu(self)
 
@@ -289,7 +370,7 @@ class InventoryView(QWidget):
         )
         menu.addAction(delete_action)
 
-        menu.exec(self.ui.tbl_medicines.viewport().mapToGlobal(position))
+        menu.exec(self.tbl_medicines.viewport().mapToGlobal(position))
 
     def confirm_delete(self, medicine_id: str, medicine_name: str):
         """
@@ -305,7 +386,7 @@ class InventoryView(QWidget):
     def update_count_label(self):
         """Update the count label with current medicine count."""
         total = len(self.medicines)
-        shown = len(self.filtered_medicines)
+        shown = self.paged.total if self.paged is not None else self.proxy.rowCount()
         if self.active_filters:
             self.ui.lbl_count.setText(f"{shown}/{total} mục (đã lọc)")
         else:
@@ -313,7 +394,7 @@ class InventoryView(QWidget):
 
     def refresh(self):
         """Refresh the table display."""
-        self.apply_current_filters()
+        self.load_medicines(self.medicines)
 
     def set_filters(self, filters: Optional[dict]):
         """
@@ -336,13 +417,20 @@ class InventoryView(QWidget):
         self.set_filters(None)
 
     @staticmethod
-    def filter_medicines(medicines: List[Medicine], filters: dict) -> List[Medicine]:
+    def filter_medicines(
+        medicines: List[Medicine],
+        filters: dict,
+        alert_system: Optional[AlertSystem] = None
+    ) -> List[Medicine]:
         """
         Filter medicines by given criteria.
 
+        Same criteria as MedicineFilterProxyModel, applied to a plain list.
+
         Args:
             medicines: List of medicines to filter
             filters: Dictionary with keys: shelf_id, price_min, price_max, status
+            alert_system: AlertSystem resolving per-item thresholds
 
         Returns:
             Filtered list of medicines
@@ -365,25 +453,21 @@ class InventoryView(QWidget):
         # Filter by status
         status = filters.get('status')
         if status:
-            filtered_by_status = []
-            for m in result:
-                if status == 'expired' and m.is_expired():
-                    filtered_by_status.append(m)
-                elif status == 'expiring' and not m.is_expired() and m.days_until_expiry() <= 30:
-                    filtered_by_status.append(m)
-                elif status == 'low_stock' and 0 < m.quantity <= 5:
-                    filtered_by_status.append(m)
-                elif status == 'out_of_stock' and m.quantity == 0:
-                    filtered_by_status.append(m)
-                elif status == 'normal' and not m.is_expired() and m.days_until_expiry() > 30 and m.quantity > 5:
-                    filtered_by_status.append(m)
-            result = filtered_by_status
+            table = (alert_system or AlertSystem()).evaluate(result)
+            bit = STATUS_FILTER_BITS.get(status)
+            result = table.select(status_filter_flags(table) & bit) if bit else []
 
         return result
 
     def apply_theme(self):
-        """Apply theme stylesheet."""
-        pass  # Uses global theme from MainWindow
+        """
+        Re-colour the status badges for the current theme mode.
+
+        The table stylesheet itself comes from MainWindow.
+        """
+        self.model.set_theme(self.theme)
+        if self.paged is not None:
+            self.paged.set_theme(self.theme)
 
     def get_selected_medicine_id(self) -> Optional[str]:
         """
@@ -392,7 +476,5 @@ class InventoryView(QWidget):
         Returns:
             Medicine ID if a row is selected, None otherwise
         """
-        current_row = self.ui.tbl_medicines.currentRow()
-        if current_row >= 0:
-            return self.ui.tbl_medicines.item(current_row, 0).text()
-        return None
+        medicine = self._table_model().medicine_at(self.tbl_medicines.currentIndex().row())
+        return medicine.id if medicine is not None else None
@@ -9,17 +9,31 @@ Features:
 - Context menu (right-click) for edit/delete
 - Double-click to edit
 - Capacity usage visualization
+- Virtualized table (QTableView + ShelfTableModel): used quantities are
+  read from the inventory's per-shelf counters, and a change set only
+  emits dataChanged for the shelves it touched
+- Paged mode for very large warehouses (PagedShelfModel over a SQLite
+  catalog index): rows are fetched as the table is scrolled
+- Warehouse map (WarehouseMapView): zone × column × row heatmap of
+  utilization or alert density, toggled in place of the table
 """
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 from PyQt6.QtWidgets import (
-    QWidget, QTableWidgetItem, QMenu, QHeaderView,
+    QWidget, QTableWidget, QTableView, QMenu, QHeaderView, QPushButton,
+    QComboBox,
 )
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QColor, QFont, QAction
+from PyQt6.QtCore import Qt, QModelIndex, QSortFilterProxyModel, pyqtSignal
+from PyQt6.QtGui import QAction
 
 from src.models import Shelf
+from src.inventory_manager import ChangeSet
+from src.catalog_index import CatalogIndex
 from src.ui.theme import Theme
+from src.ui.paged_table_model import PagedShelfModel
+from src.ui.shelf_table_model import ShelfTableModel
+from src.ui.warehouse_map_view import WarehouseMapView
+from src.warehouse_map import OccupancyGrid
 from src.ui.generated.shelf_view_ui import Ui_ShelfView
 
 
@@ -45,145 +59,222 @@ class ShelfView(QWidget):
     edit_requested = pyqtSignal(str)     # shelf_id
     delete_requested = pyqtSignal(str)   # shelf_id
 
-    def __init__(self, parent=None, theme: Optional[Theme] = None):
+    # Số dòng được đo khi tự co độ rộng cột (mặc định của Qt là 1000)
+    COLUMN_SIZE_SAMPLE_ROWS = 50
+
+    def __init__(
+        self,
+        parent=None,
+        theme: Optional[Theme] = None,
+        used_of: Optional[Callable[[str], int]] = None,
+        grid: Optional[OccupancyGrid] = None
+    ):
         """
         Initialize Shelf View.
 
         Args:
             parent: Parent widget
             theme: Theme instance for styling
+            used_of: Returns the used quantity of a shelf (normally
+                InventoryManager.get_shelf_used)
+            grid: Occupancy grid for the warehouse map (no map when omitted)
         """
         super().__init__(parent)
 
         self.theme = theme or Theme()
         self.shelves: List[Shelf] = []
-        self._medicines_per_shelf: dict = {}  # shelf_id -> used quantity
 
-        self.setup_ui()
+        # Chế độ theo trang (xem enable_paging)
+        self.paged: Optional[PagedShelfModel] = None
+
+        # Bản đồ kho (xem _setup_map)
+        self.map_view: Optional[WarehouseMapView] = None
 
-    def setup_ui(self):
+        self.setup_ui(used_of)
+        if grid is not None:
+            self._setup_map(grid)
+
+    def setup_ui(self, used_of: Optional[Callable[[str], int]] = None):
         """Setup shelf table UI using Qt Designer generated class."""
         self.ui = Ui_ShelfView()
         self.ui.setupUi(self)
 
-        # Configure column widths (not in .ui)
-        header = self.ui.tbl_shelves.horizontalHeader()
+        # Thay QTableWidget sinh từ .ui bằng QTableView + model ảo hóa;
+        # proxy đảm nhận sắp xếp
+        self.model = ShelfTableModel(used_of, self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setSortRole(ShelfTableModel.SORT_ROLE)
+        self.tbl_shelves = self._build_table_view(self.ui.tbl_shelves)
+        self.tbl_shelves.setModel(self.proxy)
+
+        # Configure column widths (not in .ui) — chỉ đo một số dòng đầu
+        header = self.tbl_shelves.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
+        header.setResizeContentsPrecision(self.COLUMN_SIZE_SAMPLE_ROWS)
 
         # Row height
-        self.ui.tbl_shelves.verticalHeader().setDefaultSectionSize(42)
+        self.tbl_shelves.verticalHeader().setDefaultSectionSize(42)
 
         # Connect signals
         self.ui.btn_add.clicked.connect(lambda: self.add_requested.emit())
-        self.ui.tbl_shelves.itemDoubleClicked.connect(self.on_item_double_clicked)
-        self.ui.tbl_shelves.setContextMenuPolicy(
+        self.tbl_shelves.doubleClicked.connect(self.on_row_double_clicked)
+        self.tbl_shelves.setContextMenuPolicy(
             Qt.ContextMenuPolicy.CustomContextMenu
         )
-        self.ui.tbl_shelves.customContextMenuRequested.connect(
+        self.tbl_shelves.customContextMenuRequested.connect(
             self.show_context_menu
         )
 
-    def load_shelves(
-        self,
-        shelves: List[Shelf],
-        medicines_per_shelf: Optional[dict] = None
-    ):
+    def _setup_map(self, grid: OccupancyGrid):
+        """Add the warehouse map and its header controls (map hidden at first)."""
+        self.map_view = WarehouseMapView(grid, self.theme, self)
+        self.map_view.setVisible(False)
+        self.map_view.shelf_activated.connect(self.edit_requested)
+        layout = self.ui.main_layout
+        layout.insertWidget(layout.indexOf(self.tbl_shelves) + 1, self.map_view)
+
+        self.cmb_map_mode = QComboBox(self)
+        for mode, label in WarehouseMapView.MODE_LABELS.items():
+            self.cmb_map_mode.addItem(label, mode)
+        self.cmb_map_mode.setVisible(False)
+        self.cmb_map_mode.currentIndexChanged.connect(
+            lambda: self.map_view.set_mode(self.cmb_map_mode.currentData())
+        )
+
+        self.btn_map = QPushButton("Bản đồ kho", self)
+        self.btn_map.setObjectName("btn_map")
+        self.btn_map.setCheckable(True)
+        self.btn_map.toggled.connect(self.show_map)
+
+        header = self.ui.header_layout
+        index = header.indexOf(self.ui.btn_add)
+        header.insertWidget(index, self.cmb_map_mode)
+        header.insertWidget(index + 1, self.btn_map)
+
+    def show_map(self, visible: bool):
         """
-        Load shelves into table.
+        Show the warehouse map instead of the table (or back).
 
         Args:
-            shelves: List of Shelf objects to display
-            medicines_per_shelf: Dict mapping shelf_id -> used quantity
+            visible: True for the map, False for the table
         """
-        self.shelves = shelves
-        self._medicines_per_shelf = medicines_per_shelf or {}
+        if self.map_view is None:
+            return
+        self.tbl_shelves.setVisible(not visible)
+        self.map_view.setVisible(visible)
+        self.cmb_map_mode.setVisible(visible)
+        self.refresh_map()
+
+    def refresh_map(self):
+        """Redraw the warehouse map if it is shown and its grid changed."""
+        if self.map_view is not None and self.map_view.isVisible():
+            self.map_view.refresh()
+
+    def apply_theme(self):
+        """Re-colour the warehouse map for the current theme mode."""
+        # Bản đồ đang ẩn sẽ tự đổi màu ở lần hiện ra tiếp theo
+        self.refresh_map()
+
+    def _build_table_view(self, placeholder: QTableWidget) -> QTableView:
+        """Create a QTableView configured like the generated table and swap it in."""
+        view = QTableView(self)
+        view.setObjectName(placeholder.objectName())
+        view.setSelectionBehavior(placeholder.selectionBehavior())
+        view.setSelectionMode(placeholder.selectionMode())
+        view.setAlternatingRowColors(placeholder.alternatingRowColors())
+        view.setShowGrid(placeholder.showGrid())
+        view.setSortingEnabled(True)
+        view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        view.verticalHeader().setVisible(False)
+
+        layout = self.ui.main_layout
+        index = layout.indexOf(placeholder)
+        layout.removeWidget(placeholder)
+        placeholder.deleteLater()
+        layout.insertWidget(index, view)
+        return view
+
+    def enable_paging(self, index: CatalogIndex):
+        """
+        Switch the table to pages served by a catalog index.
 
-        self.ui.tbl_shelves.setSortingEnabled(False)
-        self.ui.tbl_shelves.setRowCount(0)
+        Used quantities come from the index, so the caller keeps it synced
+        before set_shelves() and apply_changes().
 
-        for shelf in self.shelves:
-            self.add_shelf_row(shelf)
+        Args:
+            index: Catalog index to read pages from
+        """
+        if self.paged is not None:
+            return
+        self.paged = PagedShelfModel(index, self)
+        self.tbl_shelves.setModel(self.paged)
+        self.tbl_shelves.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        # Bảng phẳng không còn được dùng
+        self.model.set_shelves([])
+
+    def _table_model(self):
+        """Model currently shown by the table (proxy, or paged model in paged mode)."""
+        return self.paged if self.paged is not None else self.proxy
 
-        self.ui.tbl_shelves.setSortingEnabled(True)
+    def set_shelves(self, shelves: List[Shelf]):
+        """
+        Show a new shelf list (full reset).
+
+        Args:
+            shelves: List of Shelf objects to display
+        """
+        self.shelves = shelves
+        if self.paged is not None:
+            # Giữ kệ hiện tại và vị trí cuộn qua lần tải lại
+            current = self.get_selected_shelf_id()
+            scroll = self.tbl_shelves.verticalScrollBar().value()
+            self.paged.refresh()
+            row = self.paged.row_of(current) if current is not None else -1
+            if row >= 0:
+                self.tbl_shelves.selectRow(row)
+            self.tbl_shelves.verticalScrollBar().setValue(scroll)
+        else:
+            self.model.set_shelves(shelves)
         self.ui.lbl_count.setText(f"{len(shelves)} kệ")
+        self.refresh_map()
 
-    def add_shelf_row(self, shelf: Shelf):
+    def apply_changes(self, shelves: List[Shelf], changes: ChangeSet):
         """
-        Add a single shelf row to table.
+        Update only the rows touched by a change set.
+
+        Shelf additions/removals insert/remove single rows; medicine changes
+        refresh the capacity cells of the affected shelves (their counters
+        are already up to date). Selection and scroll position are kept.
+        In paged mode the touched shelves are re-read from the (already
+        synced) index and patched into the loaded pages the same way.
 
         Args:
-            shelf: Shelf object to add
+            shelves: Full shelf list after the changes
+            changes: Net changes since the table was last updated
         """
-        row = self.ui.tbl_shelves.rowCount()
-        self.ui.tbl_shelves.insertRow(row)
-
-        # ID
-        id_item = QTableWidgetItem(shelf.id)
-        id_item.setFlags(id_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        self.ui.tbl_shelves.setItem(row, 0, id_item)
-
-        # Column (Dãy - letter)
-        col_item = QTableWidgetItem(shelf.column)
-        col_item.setFlags(col_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        col_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.ui.tbl_shelves.setItem(row, 1, col_item)
-
-        # Row (Cột - number)
-        row_item = QTableWidgetItem(shelf.row)
-        row_item.setFlags(row_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        row_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.ui.tbl_shelves.setItem(row, 2, row_item)
-
-        # Capacity
-        try:
-            cap = int(shelf.capacity)
-        except (ValueError, TypeError):
-            cap = 0
-        cap_item = QTableWidgetItem(str(cap))
-        cap_item.setData(Qt.ItemDataRole.UserRole, cap)
-        cap_item.setFlags(cap_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        cap_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.ui.tbl_shelves.setItem(row, 3, cap_item)
-
-        # Used
-        used = self._medicines_per_shelf.get(shelf.id, 0)
-        used_item = QTableWidgetItem(str(used))
-        used_item.setData(Qt.ItemDataRole.UserRole, used)
-        used_item.setFlags(used_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        used_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.ui.tbl_shelves.setItem(row, 4, used_item)
-
-        # Remaining
-        remaining = cap - used
-        rem_item = QTableWidgetItem(str(remaining))
-        rem_item.setData(Qt.ItemDataRole.UserRole, remaining)
-        rem_item.setFlags(rem_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        rem_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        # Color code remaining capacity
-        if remaining <= 0:
-            rem_item.setForeground(QColor(Theme.CHART_RED))
-            rem_font = rem_item.font()
-            rem_font.setBold(True)
-            rem_item.setFont(rem_font)
-        elif remaining <= cap * 0.2:
-            rem_item.setForeground(QColor(Theme.CHART_ORANGE))
-            rem_font = rem_item.font()
-            rem_font.setBold(True)
-            rem_item.setFont(rem_font)
-
-        self.ui.tbl_shelves.setItem(row, 5, rem_item)
-
-    def on_item_double_clicked(self, item: QTableWidgetItem):
-        """Handle double-click on table item."""
-        row = item.row()
-        shelf_id = self.ui.tbl_shelves.item(row, 0).text()
-        self.edit_requested.emit(shelf_id)
+        self.shelves = shelves
+        if self.paged is not None:
+            self.paged.refresh_rows(changes.touched_shelf_ids)
+        else:
+            self.model.apply_changes(changes)
+        self.ui.lbl_count.setText(f"{len(shelves)} kệ")
+        self.refresh_map()
+
+    def _shelf_id_at(self, index: QModelIndex) -> Optional[str]:
+        """Return the shelf ID of a table index (None if invalid)."""
+        if not index.isValid():
+            return None
+        if self.paged is not None:
+            return self.paged.shelf_id_at(index.row())
+        return self.model.shelf_id_at(self.proxy.mapToSource(index).row())
+
+    def on_row_double_clicked(self, index: QModelIndex):
+        """Handle double-click on a table row."""
+        shelf_id = self._shelf_id_at(index)
+        if shelf_id is not None:
+            self.edit_requested.emit(shelf_id)
 
     def show_context_menu(self, position):
         """
@@ -192,13 +283,11 @@ class ShelfView(QWidget):
         Args:
             position: Position where menu was requested
         """
-        item = self.ui.tbl_shelves.itemAt(position)
-        if not item:
+        table = self.tbl_shelves
+        shelf_id = self._shelf_id_at(table.indexAt(position))
+        if shelf_id is None:
             return
 
-        row = item.row()
-        shelf_id = self.ui.tbl_shelves.item(row, 0).text()
-
         menu = QMenu(self)
 
         # Edit action
@@ -215,7 +304,7 @@ class ShelfView(QWidget):
         )
         menu.addAction(delete_action)
 
-        menu.exec(self.ui.tbl_shelves.viewport().mapToGlobal(position))
+        menu.exec(table.viewport().mapToGlobal(position))
 
     def get_selected_shelf_id(self) -> Optional[str]:
         """
@@ -224,7 +313,4 @@ class ShelfView(QWidget):
         Returns:
             Shelf ID if a row is selected, None otherwise
         """
-        current_row = self.ui.tbl_shelves.currentRow()
-        if current_row >= 0:
-            return self.ui.tbl_shelves.item(current_row, 0).text()
-        return None
+        return self._shelf_id_at(self.tbl_shelves.currentIndex())
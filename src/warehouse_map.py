@@ -0,0 +1,352 @@
+"""
+Ma trận chiếm dụng cho bản đồ kho của Hệ Thống Quản Lý Kho Thuốc.
+
+Module này cung cấp OccupancyGrid:
+- Kệ được đặt vào lưới khu × cột × dãy (Shelf.zone/column/row)
+- Sức chứa, số lượng đã dùng, số thuốc, số thuốc có cảnh báo và số kệ theo
+  từng ô được giữ trong các mảng NumPy, dựng một lần rồi cập nhật tăng dần
+  theo sự kiện kho: một thay đổi chỉ tính lại các ô của kệ bị ảnh hưởng
+- Số lượng đã dùng đọc từ bộ đếm theo kệ của InventoryManager; trạng thái
+  cảnh báo được đánh giá lại (dạng vector) khi ngưỡng thay đổi, còn qua nửa
+  đêm chỉ các thuốc đổi trạng thái hạn dùng được cập nhật (advance_day)
+
+Giao diện (WarehouseMapView) chỉ đọc các mảng đã tính sẵn để tô màu.
+"""
+from collections import Counter
+from datetime import date
+from itertools import compress
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.alerts import AlertSystem, AlertTransition
+from src.events import (
+    InventoryEvent, InventoryReloaded, MedicineAdded, MedicineRemoved,
+    MedicineUpdated, ShelfChanged,
+)
+from src.inventory_manager import InventoryManager
+from src.models import Medicine, Shelf
+from src.thresholds import MedicineStatus
+
+# Tọa độ một ô: (khu, cột, dãy) theo thứ tự nhãn xuất hiện
+Cell = Tuple[int, int, int]
+
+
+def _label_key(label: str) -> Tuple[int, int, str]:
+    """Khóa sắp xếp nhãn: số theo giá trị (2 < 10), chữ theo bảng chữ cái."""
+    if label.isdigit():
+        return (0, int(label), label)
+    return (1, 0, label)
+
+
+def _shelf_capacity(shelf: Shelf) -> int:
+    """Sức chứa dạng số của kệ (giá trị không hợp lệ -> 0)."""
+    try:
+        return int(shelf.capacity)
+    except (ValueError, TypeError):
+        return 0
+
+
+class OccupancyGrid:
+    """
+    Lưới chiếm dụng khu × cột × dãy được cập nhật tăng dần.
+
+    Mỗi trục giữ nhãn theo thứ tự xuất hiện nên thêm kệ ở khu/cột/dãy mới
+    chỉ nới mảng thêm một lát, chỉ số của các ô cũ không đổi. Thứ tự hiển
+    thị (đã sắp xếp) được tính riêng bởi display().
+
+    Thuộc tính:
+        inventory_manager: Nguồn kệ, thuốc và số lượng đã dùng theo kệ
+        alert_system: Hệ thống cảnh báo dùng để đánh giá trạng thái thuốc
+        revision: Tăng mỗi khi nội dung lưới thay đổi (dùng làm khóa vẽ lại)
+        capacity: Tổng sức chứa theo ô
+        used: Tổng số lượng đã dùng theo ô
+        medicines: Số thuốc theo ô
+        alerts: Số thuốc có cảnh báo theo ô
+        shelves: Số kệ theo ô (0 = ô trống)
+    """
+
+    ARRAYS = ("capacity", "used", "medicines", "alerts", "shelves")
+
+    def __init__(self, inventory_manager: InventoryManager, alert_system: AlertSystem):
+        """
+        Khởi tạo lưới rỗng (dựng ở lần ensure_current() đầu tiên).
+
+        Tham số:
+            inventory_manager: Quản lý kho
+            alert_system: Hệ thống cảnh báo dùng chung với giao diện
+        """
+        self.inventory_manager = inventory_manager
+        self.alert_system = alert_system
+        self.revision = 0
+
+        self._labels: Tuple[List[str], List[str], List[str]] = ([], [], [])
+        self._label_index: Tuple[Dict[str, int], ...] = ({}, {}, {})
+        for name in self.ARRAYS:
+            setattr(self, name, np.zeros((0, 0, 0), dtype=np.int64))
+
+        self._cell_of: Dict[str, Cell] = {}
+        self._cell_shelves: Dict[Cell, List[Shelf]] = {}
+        self._shelf_medicines: Counter = Counter()
+        self._shelf_alerts: Counter = Counter()
+
+        # (ngày, chính sách, phiên bản chính sách) đã dùng để đếm cảnh báo
+        self._status_key: Optional[tuple] = None
+        self._stale = True
+
+    # ── Dựng lại ──
+
+    def _key(self, today: date) -> tuple:
+        policy = self.alert_system.policy
+        return (today, id(policy), policy.version)
+
+    def rebuild(self, today: Optional[date] = None) -> None:
+        """
+        Dựng lại toàn bộ lưới từ kho (một lần quét kệ và thuốc).
+
+        Tham số:
+            today: Ngày tham chiếu cho cảnh báo (mặc định: hôm nay)
+        """
+        self._labels = ([], [], [])
+        self._label_index = ({}, {}, {})
+        self._cell_of = {}
+        self._cell_shelves = {}
+        for shelf in self.inventory_manager.shelves:
+            cell = tuple(self._axis_index(axis, label, grow=False)
+                         for axis, label in enumerate((shelf.zone, shelf.column, shelf.row)))
+            self._cell_of[shelf.id] = cell
+            self._cell_shelves.setdefault(cell, []).append(shelf)
+
+        shape = tuple(len(labels) for labels in self._labels)
+        for name in self.ARRAYS:
+            setattr(self, name, np.zeros(shape, dtype=np.int64))
+
+        self._count_alerts(today or date.today())
+        for cell in self._cell_shelves:
+            self._recompute_cell(cell)
+        self._stale = False
+        self.revision += 1
+
+    def _count_alerts(self, today: date) -> None:
+        """Đếm số thuốc và số thuốc có cảnh báo theo kệ (đánh giá dạng vector)."""
+        medicines = self.inventory_manager.medicines
+        table = self.alert_system.evaluate(medicines, today)
+        self._shelf_medicines = Counter(m.shelf_id for m in medicines)
+        self._shelf_alerts = Counter(
+            m.shelf_id for m in compress(medicines, table.status != MedicineStatus.NORMAL)
+        )
+        self._status_key = self._key(today)
+
+    def ensure_current(self, today: Optional[date] = None) -> bool:
+        """
+        Đưa lưới về trạng thái hiện tại trước khi vẽ.
+
+        Dựng lại toàn bộ nếu dữ liệu kho vừa được tải lại; chỉ đếm lại cảnh
+        báo nếu ngày hoặc ngưỡng đã đổi.
+
+        Tham số:
+            today: Ngày tham chiếu (mặc định: hôm nay)
+
+        Trả về:
+            True nếu lưới đã thay đổi
+        """
+        today = today or date.today()
+        if self._stale:
+            self.rebuild(today)
+            return True
+        if self._status_key == self._key(today):
+            return False
+
+        self._count_alerts(today)
+        for cell in self._cell_shelves:
+            self._recompute_cell(cell)
+        self.revision += 1
+        return True
+
+    def advance_day(self, today: date, transitions: List[AlertTransition]) -> None:
+        """
+        Cập nhật số cảnh báo khi sang ngày mới chỉ từ các thuốc đổi trạng thái.
+
+        Tham số:
+            today: Ngày mới
+            transitions: AlertTransition từ ExpiryIndex.advance()
+        """
+        if self._stale or self._status_key is None or self._status_key[0] >= today:
+            return
+        if self._key(self._status_key[0]) != self._status_key:
+            # Ngưỡng vừa đổi — ensure_current() sẽ đếm lại toàn bộ
+            return
+
+        medicines = [t.medicine for t in transitions]
+        table = self.alert_system.evaluate(medicines, today)
+        # Trạng thái tồn kho không phụ thuộc ngày: trước đó thuốc có cảnh báo
+        # nếu tồn kho thấp hoặc đang ở một trạng thái hạn dùng
+        stock = table.low_stock | table.out_of_stock
+        touched = set()
+        for row, transition in enumerate(transitions):
+            before = bool(stock[row]) or transition.previous is not None
+            after = table.status[row] != MedicineStatus.NORMAL
+            if before != after:
+                shelf_id = transition.medicine.shelf_id
+                self._shelf_alerts[shelf_id] += 1 if after else -1
+                touched.add(shelf_id)
+        for shelf_id in touched:
+            cell = self._cell_of.get(shelf_id)
+            if cell is not None:
+                self._recompute_cell(cell)
+        self._status_key = self._key(today)
+        self.revision += 1
+
+    # ── Cập nhật tăng dần ──
+
+    def apply_event(self, event: InventoryEvent) -> None:
+        """
+        Cập nhật các ô bị ảnh hưởng bởi một sự kiện kho.
+
+        Tham số:
+            event: Sự kiện từ InventoryManager.events
+        """
+        if isinstance(event, InventoryReloaded):
+            self._stale = True
+            return
+        if self._stale:
+            # Sẽ dựng lại toàn bộ ở lần ensure_current() tới
+            return
+
+        if isinstance(event, ShelfChanged):
+            self._move_shelf(event.old, event.new)
+        else:
+            removed: List[Medicine] = []
+            added: List[Medicine] = []
+            if isinstance(event, MedicineAdded):
+                added.append(event.medicine)
+            elif isinstance(event, MedicineRemoved):
+                removed.append(event.medicine)
+            elif isinstance(event, MedicineUpdated):
+                removed.append(event.old)
+                added.append(event.new)
+            else:
+                return
+            for medicine in removed:
+                self._count_medicine(medicine, -1)
+            for medicine in added:
+                self._count_medicine(medicine, 1)
+            for shelf_id in {m.shelf_id for m in removed + added}:
+                cell = self._cell_of.get(shelf_id)
+                if cell is not None:
+                    self._recompute_cell(cell)
+        self.revision += 1
+
+    def _count_medicine(self, medicine: Medicine, sign: int) -> None:
+        """Cộng (sign=1) hoặc trừ (sign=-1) một thuốc vào bộ đếm của kệ."""
+        self._shelf_medicines[medicine.shelf_id] += sign
+        if self._status_key is None:
+            return
+        today = self._status_key[0]
+        if self._key(today) != self._status_key:
+            # Ngưỡng vừa đổi — ensure_current() sẽ đếm lại toàn bộ
+            return
+        if self.alert_system.status_of(medicine, today) != MedicineStatus.NORMAL:
+            self._shelf_alerts[medicine.shelf_id] += sign
+
+    def _move_shelf(self, old: Optional[Shelf], new: Optional[Shelf]) -> None:
+        """Chuyển một kệ sang ô mới (old=None: kệ mới; new=None: kệ bị xóa)."""
+        if old is not None:
+            cell = self._cell_of.pop(old.id, None)
+            if cell is not None:
+                shelves = self._cell_shelves[cell]
+                shelves[:] = [s for s in shelves if s.id != old.id]
+                if not shelves:
+                    del self._cell_shelves[cell]
+                self._recompute_cell(cell)
+        if new is not None:
+            cell = tuple(self._axis_index(axis, label)
+                         for axis, label in enumerate((new.zone, new.column, new.row)))
+            self._cell_of[new.id] = cell
+            self._cell_shelves.setdefault(cell, []).append(new)
+            self._recompute_cell(cell)
+
+    def _axis_index(self, axis: int, label: str, grow: bool = True) -> int:
+        """Chỉ số của nhãn trên một trục; nhãn mới được thêm vào cuối trục."""
+        index = self._label_index[axis].get(label)
+        if index is not None:
+            return index
+        index = len(self._labels[axis])
+        self._labels[axis].append(label)
+        self._label_index[axis][label] = index
+        if grow:
+            pad = [(0, 0)] * 3
+            pad[axis] = (0, 1)
+            for name in self.ARRAYS:
+                setattr(self, name, np.pad(getattr(self, name), pad))
+        return index
+
+    def _recompute_cell(self, cell: Cell) -> None:
+        """Tính lại các giá trị của một ô từ các kệ trong ô."""
+        shelves = self._cell_shelves.get(cell, ())
+        used_of = self.inventory_manager.get_shelf_used
+        self.capacity[cell] = sum(_shelf_capacity(s) for s in shelves)
+        self.used[cell] = sum(used_of(s.id) for s in shelves)
+        self.medicines[cell] = sum(self._shelf_medicines[s.id] for s in shelves)
+        self.alerts[cell] = sum(self._shelf_alerts[s.id] for s in shelves)
+        self.shelves[cell] = len(shelves)
+
+    # ── Đọc ──
+
+    def display(self) -> Dict[str, object]:
+        """
+        Các mảng theo thứ tự hiển thị (nhãn đã sắp xếp, bỏ nhãn không còn kệ).
+
+        Trả về:
+            Dictionary gồm "zones", "columns", "rows" (danh sách nhãn), các
+            mảng trong ARRAYS, "utilization" (đã dùng / sức chứa; NaN ở ô
+            trống; ô sức chứa 0 là 1 nếu có hàng, ngược lại 0) và
+            "alert_density" (thuốc cảnh báo / số thuốc; NaN ở ô trống)
+        """
+        # Nhãn không còn kệ nào (kệ đã xóa/chuyển) không được hiển thị
+        occupied = self.shelves > 0
+        in_use = [occupied.any(axis=tuple(a for a in range(3) if a != axis))
+                  for axis in range(3)]
+        orders = [sorted((i for i in range(len(labels)) if used[i]),
+                         key=lambda i, l=labels: _label_key(l[i]))
+                  for labels, used in zip(self._labels, in_use)]
+        selector = np.ix_(*orders)
+        result: Dict[str, object] = {
+            key: [labels[i] for i in order]
+            for key, labels, order in zip(("zones", "columns", "rows"), self._labels, orders)
+        }
+        for name in self.ARRAYS:
+            result[name] = getattr(self, name)[selector]
+
+        capacity, used = result["capacity"], result["used"]
+        medicines, alerts = result["medicines"], result["alerts"]
+        empty = result["shelves"] == 0
+        # Mẫu số tối thiểu 1 — ô sức chứa 0 / không có thuốc được thay ở np.where
+        utilization = np.where(
+            capacity > 0, used / np.maximum(capacity, 1), (used > 0).astype(float)
+        )
+        density = np.where(medicines > 0, alerts / np.maximum(medicines, 1), 0.0)
+        utilization[empty] = np.nan
+        density[empty] = np.nan
+        result["utilization"] = utilization
+        result["alert_density"] = density
+        return result
+
+    def shelves_in(self, zone: str, column: str, row: str) -> List[Shelf]:
+        """
+        Danh sách kệ nằm trong một ô.
+
+        Tham số:
+            zone: Nhãn khu
+            column: Nhãn cột
+            row: Nhãn dãy
+
+        Trả về:
+            Các kệ của ô (rỗng nếu không có)
+        """
+        try:
+            cell = tuple(self._label_index[axis][label]
+                         for axis, label in enumerate((zone, column, row)))
+        except KeyError:
+            return []
+        return list(self._cell_shelves.get(cell, ()))